@@ -10,6 +10,7 @@ from typing import Optional, Dict, Any, Tuple
 from app.auth.password_manager import PasswordManager
 from app.utils.logger import get_logger
 from app.models.database import get_db_path
+from app.core.config import ConfigManager
 
 logger = get_logger(__name__)
 
@@ -167,6 +168,9 @@ class AuthenticationManager:
             self.session_token = secrets.token_urlsafe(32)
             self.session_expiry = datetime.now() + timedelta(hours=24)
             
+            # Secure config is encrypted with a key derived from the user
+            ConfigManager.get_instance().invalidate_encryption_key()
+            
             logger.info(f"User authenticated: {username}")
             return True, None
             
@@ -185,6 +189,7 @@ class AuthenticationManager:
         self.current_user = None
         self.session_token = None
         self.session_expiry = None
+        ConfigManager.get_instance().invalidate_encryption_key()
     
     def is_authenticated(self) -> bool:
         """Check if user is currently authenticated."""
@@ -4,7 +4,6 @@ Handles password hashing, validation, and strength checking.
 """
 
 import re
-import bcrypt
 from typing import Tuple, Optional
 from app.utils.logger import get_logger
 
@@ -32,6 +31,7 @@ class PasswordManager:
         Returns:
             Hashed password string
         """
+        import bcrypt
         try:
             # Generate salt and hash password
             salt = bcrypt.gensalt(rounds=12)
@@ -53,6 +53,7 @@ class PasswordManager:
         Returns:
             True if password matches, False otherwise
         """
+        import bcrypt
         try:
             return bcrypt.checkpw(
                 password.encode('utf-8'),
@@ -5,6 +5,7 @@ Provides centralized search functionality across activities, goals, and categori
 """
 from typing import List, Dict, Any
 from datetime import datetime
+from app.models.archive import history_source
 
 
 class SearchResult:
@@ -96,11 +97,11 @@ class SearchManager:
             if not cursor:
                 return results
             
-            # Search in activities table
-            cursor.execute("""
+            # Search in activities, including archived history
+            cursor.execute(f"""
                 SELECT id, title, description, type, date, start_time, end_time, 
                        category, priority, completed
-                FROM activities
+                FROM {history_source(cursor, 'activities')}
                 WHERE title LIKE ? OR description LIKE ?
                 ORDER BY date DESC, priority DESC
                 LIMIT ?
@@ -8,12 +8,14 @@ JSON-based config files, environment variables, and runtime updates.
 import json
 import os
 import sys
+import time
+import atexit
 import base64
+import copy
+import tempfile
+import threading
 from pathlib import Path
-from typing import Any, Dict, Optional
-from cryptography.fernet import Fernet
-from cryptography.hazmat.primitives import hashes
-from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
+from typing import TYPE_CHECKING, Any, Dict, Iterable, Optional
 from app.utils.logger import get_logger
 from app.resources.constants import (
     DEFAULT_WINDOW_WIDTH,
@@ -27,11 +29,32 @@ from app.resources.constants import (
     POMODORO_LONG_BREAK_INTERVAL
 )
 
+if TYPE_CHECKING:
+    # Imported when secure values are first used, to keep startup fast
+    from cryptography.fernet import Fernet
+
 logger = get_logger(__name__)
 
+# Seconds to wait after a change before writing config.json, so a burst of
+# changes is written once
+SAVE_DELAY = 0.5
+
+_MISSING = object()
+
 
 class ConfigManager:
-    """Manages application configuration."""
+    """
+    Manages application configuration.
+    
+    Changes are written behind: set() and update_section() mark the
+    configuration dirty and a saver thread writes config.json once, SAVE_DELAY
+    after the last change, through a temporary file and an atomic rename.
+    flush() writes pending changes immediately; it runs at exit as well.
+    Writes are serialized, and a snapshot older than the file on disk is
+    never written over it.
+    
+    get() looks keys up in a table of every dot path, rebuilt after changes.
+    """
     
     _instance: Optional['ConfigManager'] = None
     _initialized = False
@@ -41,12 +64,40 @@ class ConfigManager:
         if ConfigManager._initialized:
             return
         
-        self.config: Dict[str, Any] = {}
+        self._lock = threading.RLock()
+        self._flat: Optional[Dict[str, Any]] = None
+        self._dirty = False
+        # The saver thread runs while a write is due, at _save_due (monotonic)
+        self._save_condition = threading.Condition(self._lock)
+        self._save_due: Optional[float] = None
+        self._saver: Optional[threading.Thread] = None
+        # Held from writing the temporary file until it replaces config.json;
+        # snapshots are numbered so an older one never replaces a newer one
+        self._write_lock = threading.Lock()
+        self._snapshot = 0
+        self._written_snapshot = 0
+        # Identity the secure config key is derived from, and the derived
+        # keys of this session by identity (PBKDF2 is deliberately slow)
+        self._key_lock = threading.RLock()
+        self._key_identity: Optional[str] = None
+        self._fernets: Dict[str, 'Fernet'] = {}
+        self._config: Dict[str, Any] = {}
         self.config_file = self._get_config_path()
         self._load_config()
+        atexit.register(self.flush)
         
         ConfigManager._initialized = True
     
+    @property
+    def config(self) -> Dict[str, Any]:
+        """The configuration dictionary."""
+        return self._config
+    
+    @config.setter
+    def config(self, value: Dict[str, Any]):
+        self._config = value
+        self._flat = None
+    
     def _get_config_path(self) -> Path:
         """Get the path to the configuration file."""
         if getattr(sys, 'frozen', False):
@@ -67,31 +118,40 @@ class ConfigManager:
         config_dir = self.config_file.parent
         return config_dir / 'secure_config.enc'
     
-    def _get_encryption_key(self) -> Optional[bytes]:
+    def _get_key_identity(self) -> str:
+        """Get the user or system identity the encryption key is derived from."""
+        # Try to get encryption key from user password or system
+        from app.auth.authentication import get_auth_manager
+        auth_manager = get_auth_manager()
+        
+        # Use a system identifier if user not authenticated
+        if auth_manager.is_authenticated():
+            user = auth_manager.get_current_user()
+            if user:
+                # Use username as part of key derivation
+                return user.get('username', 'tasktitan')
+            return 'tasktitan'
+        
+        # Use system identifier
+        import platform
+        return f"tasktitan_{platform.node()}"
+    
+    def _get_encryption_key(self, identity: Optional[str] = None) -> Optional[bytes]:
         """
         Get encryption key for secure config storage.
         Derives key from user's authentication or system identifier.
         
+        Args:
+            identity: Identity to derive the key from; looked up if not given
+        
         Returns:
             Encryption key bytes or None if not available
         """
         try:
-            # Try to get encryption key from user password or system
-            from app.auth.authentication import get_auth_manager
-            auth_manager = get_auth_manager()
+            from cryptography.hazmat.primitives import hashes
+            from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
             
-            # Use a system identifier if user not authenticated
-            if auth_manager.is_authenticated():
-                user = auth_manager.get_current_user()
-                if user:
-                    # Use username as part of key derivation
-                    password = user.get('username', 'tasktitan')
-                else:
-                    password = 'tasktitan'
-            else:
-                # Use system identifier
-                import platform
-                password = f"tasktitan_{platform.node()}"
+            password = identity if identity is not None else self._get_key_identity()
             
             # Derive key using PBKDF2
             salt = b'tasktitan_salt_2024'  # In production, store salt securely
@@ -108,22 +168,55 @@ class ConfigManager:
             logger.warning(f"Could not derive encryption key: {e}")
             return None
     
-    def _encrypt_value(self, value: str) -> Optional[str]:
+    def _get_fernet(self) -> Optional['Fernet']:
+        """
+        Get the cipher for secure config values, deriving its key once per identity.
+        
+        Returns:
+            Fernet instance or None if no key is available
+        """
+        with self._key_lock:
+            if self._key_identity is None:
+                try:
+                    self._key_identity = self._get_key_identity()
+                except Exception as e:
+                    logger.warning(f"Could not derive encryption key: {e}")
+                    return None
+            fernet = self._fernets.get(self._key_identity)
+            if fernet is None:
+                key = self._get_encryption_key(self._key_identity)
+                if not key:
+                    return None
+                from cryptography.fernet import Fernet
+                fernet = self._fernets[self._key_identity] = Fernet(key)
+            return fernet
+    
+    def invalidate_encryption_key(self):
+        """Forget the identity and derived keys (called on login and logout)."""
+        with self._key_lock:
+            self._key_identity = None
+            self._fernets.clear()
+    
+    def warm_encryption_key(self):
+        """Derive the encryption key on a background thread, so the first secure read does not wait for it."""
+        threading.Thread(target=self._get_fernet, name="TaskTitanKeyDerivation", daemon=True).start()
+    
+    def _encrypt_value(self, value: str, fernet: Optional['Fernet'] = None) -> Optional[str]:
         """
         Encrypt a sensitive value.
         
         Args:
             value: Value to encrypt
+            fernet: Cipher to use; defaults to the current identity's
             
         Returns:
             Encrypted value (base64) or None if encryption failed
         """
         try:
-            key = self._get_encryption_key()
-            if not key:
+            fernet = fernet or self._get_fernet()
+            if not fernet:
                 return None
             
-            fernet = Fernet(key)
             encrypted = fernet.encrypt(value.encode())
             return base64.urlsafe_b64encode(encrypted).decode()
             
@@ -131,22 +224,22 @@ class ConfigManager:
             logger.error(f"Error encrypting value: {e}", exc_info=True)
             return None
     
-    def _decrypt_value(self, encrypted_value: str) -> Optional[str]:
+    def _decrypt_value(self, encrypted_value: str, fernet: Optional['Fernet'] = None) -> Optional[str]:
         """
         Decrypt a sensitive value.
         
         Args:
             encrypted_value: Encrypted value (base64)
+            fernet: Cipher to use; defaults to the current identity's
             
         Returns:
             Decrypted value or None if decryption failed
         """
         try:
-            key = self._get_encryption_key()
-            if not key:
+            fernet = fernet or self._get_fernet()
+            if not fernet:
                 return None
             
-            fernet = Fernet(key)
             encrypted_bytes = base64.urlsafe_b64decode(encrypted_value.encode())
             decrypted = fernet.decrypt(encrypted_bytes)
             return decrypted.decode()
@@ -192,6 +285,61 @@ class ConfigManager:
         
         return value
     
+    def set_secure_many(self, values: Dict[str, str], save: bool = True) -> bool:
+        """
+        Set several secure configuration values with one cipher and one save.
+        
+        Args:
+            values: Dictionary of key paths to values
+            save: Whether to save to file
+            
+        Returns:
+            True if every value was encrypted and stored
+        """
+        fernet = self._get_fernet()
+        if not fernet:
+            logger.warning(f"Failed to encrypt values for {', '.join(values)}")
+            return False
+        
+        stored = True
+        for key_path, value in values.items():
+            encrypted_value = self._encrypt_value(value, fernet)
+            if encrypted_value:
+                self.set(key_path, f"ENC:{encrypted_value}", save=False)
+            else:
+                logger.warning(f"Failed to encrypt value for {key_path}")
+                stored = False
+        
+        if save:
+            self._schedule_save()
+        logger.debug(f"Set {len(values)} secure config values")
+        return stored
+    
+    def get_secure_many(self, key_paths: Iterable[str], default: Any = None) -> Dict[str, Any]:
+        """
+        Get several secure configuration values with one cipher.
+        
+        Args:
+            key_paths: Paths to the config keys, or a section name to read
+                every value of that section (e.g., 'ai')
+            default: Default value for keys not found or not decryptable
+            
+        Returns:
+            Dictionary of key paths to decrypted values
+        """
+        if isinstance(key_paths, str):
+            key_paths = [f"{key_paths}.{key}" for key in self.get_section(key_paths)]
+        
+        values = {key_path: self.get(key_path, default) for key_path in key_paths}
+        encrypted = [key_path for key_path, value in values.items()
+                     if isinstance(value, str) and value.startswith("ENC:")]
+        if encrypted:
+            fernet = self._get_fernet()
+            for key_path in encrypted:
+                decrypted = self._decrypt_value(values[key_path][4:], fernet) if fernet else None
+                values[key_path] = decrypted if decrypted else default
+        return values
+    
     def _get_default_config(self) -> Dict[str, Any]:
         """Get default configuration values."""
         return {
@@ -220,8 +368,19 @@ class ConfigManager:
                 'auto_backup_enabled': False,
                 'auto_backup_interval': 'daily',  # daily, weekly, monthly
                 'backup_retention_days': 30,
+                'backup_format': 'file',  # file = full .db copies, chunked = deduplicated store
                 'backup_location': None  # None = use default
             },
+            'archive': {
+                'enabled': True,
+                'horizon_days': 365  # History older than this moves to tasktitan_archive.db
+            },
+            'maintenance': {
+                'enabled': True,
+                'idle_minutes': 5,  # Minutes without input before maintenance starts
+                'step_budget_ms': 200,
+                'run_budget_seconds': 5
+            },
             'files': {
                 'max_file_size_mb': 50,
                 'allowed_extensions': [
@@ -252,8 +411,16 @@ class ConfigManager:
             'performance': {
                 'cache_enabled': True,
                 'cache_size_mb': 100,
+                'disk_cache_enabled': True,
+                'disk_cache_size_mb': 50,
                 'lazy_loading': True
             },
+            'logging': {
+                'format': 'text',  # text, or json for JSON lines
+                'rate_limit': True,  # Drop repeated DEBUG/INFO records from chatty call sites
+                'compress_rotated': True,
+                'route_print': False  # Send print() output through the logger
+            },
             'ai': {
                 'provider': 'openai',  # openai, anthropic, local
                 'openai_api_key': None,  # Stored encrypted
@@ -292,14 +459,86 @@ class ConfigManager:
         return merged
     
     def _save_config(self):
-        """Save configuration to file."""
-        try:
-            self.config_file.parent.mkdir(parents=True, exist_ok=True)
-            with open(self.config_file, 'w', encoding='utf-8') as f:
-                json.dump(self.config, f, indent=2, ensure_ascii=False)
-            logger.debug(f"Saved configuration to {self.config_file}")
-        except Exception as e:
-            logger.error(f"Error saving configuration: {e}", exc_info=True)
+        """Save configuration to file now."""
+        with self._lock:
+            self._dirty = True
+        self.flush()
+    
+    def _schedule_save(self):
+        """Write the configuration shortly, together with any other changes made meanwhile."""
+        with self._lock:
+            self._dirty = True
+            self._save_due = time.monotonic() + SAVE_DELAY
+            if self._saver is None:
+                self._saver = threading.Thread(target=self._save_loop, name="TaskTitanConfigSave", daemon=True)
+                self._saver.start()
+    
+    def _save_loop(self):
+        """Flush once no change has been made for SAVE_DELAY; exit when nothing is due."""
+        while True:
+            with self._save_condition:
+                while True:
+                    if self._save_due is None:
+                        self._saver = None
+                        return
+                    delay = self._save_due - time.monotonic()
+                    if delay <= 0:
+                        break
+                    self._save_condition.wait(delay)
+            self.flush()
+    
+    def flush(self):
+        """Write pending changes to the configuration file."""
+        with self._save_condition:
+            self._save_due = None
+            self._save_condition.notify_all()
+            if not self._dirty:
+                return
+            data = json.dumps(self.config, indent=2, ensure_ascii=False)
+            self._dirty = False
+            self._snapshot += 1
+            snapshot = self._snapshot
+            config_file = self.config_file
+        
+        with self._write_lock:
+            if snapshot <= self._written_snapshot:
+                # A newer snapshot was written while this one waited
+                return
+            temp_file = None
+            try:
+                config_file.parent.mkdir(parents=True, exist_ok=True)
+                # A crash leaves either the old or the new file, never a truncated one
+                fd, temp_file = tempfile.mkstemp(prefix=f"{config_file.name}.", suffix='.tmp',
+                                                 dir=config_file.parent)
+                with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                    f.write(data)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(temp_file, config_file)
+                self._written_snapshot = snapshot
+                logger.debug(f"Saved configuration to {config_file}")
+            except Exception as e:
+                logger.error(f"Error saving configuration: {e}", exc_info=True)
+                with self._lock:
+                    self._dirty = True
+                if temp_file is not None:
+                    try:
+                        os.unlink(temp_file)
+                    except OSError:
+                        pass
+    
+    def _flatten(self) -> Dict[str, Any]:
+        """Build the table of every dot path in the configuration."""
+        flat = {}
+        pending = [('', self.config)]
+        while pending:
+            prefix, section = pending.pop()
+            for key, value in section.items():
+                path = f"{prefix}{key}"
+                flat[path] = value
+                if isinstance(value, dict):
+                    pending.append((f"{path}.", value))
+        return flat
     
     def get(self, key_path: str, default: Any = None) -> Any:
         """
@@ -312,15 +551,17 @@ class ConfigManager:
         Returns:
             Configuration value or default
         """
-        keys = key_path.split('.')
-        value = self.config
-        
-        for key in keys:
-            if isinstance(value, dict) and key in value:
-                value = value[key]
-            else:
-                return default
-        
+        flat = self._flat
+        if flat is None:
+            with self._lock:
+                flat = self._flat = self._flatten()
+        value = flat.get(key_path, _MISSING)
+        if value is _MISSING:
+            return default
+        # A caller changing the returned value in place would leave the
+        # table and the file out of step; changes go through set()
+        if isinstance(value, (dict, list)):
+            return copy.deepcopy(value)
         return value
     
     def set(self, key_path: str, value: Any, save: bool = True):
@@ -330,22 +571,24 @@ class ConfigManager:
         Args:
             key_path: Path to the config key (e.g., 'window.width')
             value: Value to set
-            save: Whether to save to file immediately
+            save: Whether to save to file (written shortly after, see flush())
         """
         keys = key_path.split('.')
-        config = self.config
-        
-        # Navigate to the parent dict
-        for key in keys[:-1]:
-            if key not in config:
-                config[key] = {}
-            config = config[key]
-        
-        # Set the value
-        config[keys[-1]] = value
+        with self._lock:
+            config = self.config
+            
+            # Navigate to the parent dict
+            for key in keys[:-1]:
+                if not isinstance(config.get(key), dict):
+                    config[key] = {}
+                config = config[key]
+            
+            # Set the value
+            config[keys[-1]] = value
+            self._flat = None
         
         if save:
-            self._save_config()
+            self._schedule_save()
         
         logger.debug(f"Set config {key_path} = {value}")
     
@@ -357,9 +600,11 @@ class ConfigManager:
             section: Section name (e.g., 'window')
             
         Returns:
-            Configuration section dictionary
+            Copy of the configuration section dictionary; use
+            update_section() to change it
         """
-        return self.config.get(section, {})
+        with self._lock:
+            return copy.deepcopy(self.config.get(section, {}))
     
     def update_section(self, section: str, values: Dict[str, Any], save: bool = True):
         """
@@ -368,20 +613,23 @@ class ConfigManager:
         Args:
             section: Section name
             values: Dictionary of values to update
-            save: Whether to save to file immediately
+            save: Whether to save to file (written shortly after, see flush())
         """
-        if section not in self.config:
-            self.config[section] = {}
-        
-        self.config[section].update(values)
+        with self._lock:
+            if section not in self.config:
+                self.config[section] = {}
+            
+            self.config[section].update(values)
+            self._flat = None
         
         if save:
-            self._save_config()
+            self._schedule_save()
         
         logger.debug(f"Updated config section {section}")
     
     def reload(self):
-        """Reload configuration from file."""
+        """Reload configuration from file, after writing pending changes."""
+        self.flush()
         self._load_config()
     
     def reset_to_defaults(self):
@@ -426,3 +674,8 @@ def set_config(key_path: str, value: Any, save: bool = True):
     """
     ConfigManager.get_instance().set(key_path, value, save)
 
+
+def flush_config():
+    """Write pending configuration changes to disk (call on shutdown)."""
+    ConfigManager.get_instance().flush()
+
@@ -53,6 +53,10 @@ def main():
             
             logger.info("User authenticated successfully")
         
+        # Derive the secure config key while the main window is built
+        from app.core.config import ConfigManager
+        ConfigManager.get_instance().warm_encryption_key()
+        
         # Create and show the main application window
         logger.info("Creating main window...")
         window = TaskTitanApp()
@@ -73,6 +77,7 @@ def main():
         logger.info("Application started successfully")
         
         # Initialize backup manager for automatic backups
+        backup_manager = None
         try:
             from app.utils.backup_manager import BackupManager
             backup_manager = BackupManager()
@@ -81,6 +86,22 @@ def main():
         except Exception as e:
             logger.warning(f"Could not initialize backup manager: {e}")
         
+        # Run database maintenance while the user is idle
+        try:
+            from app.utils.maintenance import MaintenanceScheduler
+            from app.utils.attachment_store import AttachmentStore
+            maintenance_scheduler = MaintenanceScheduler(
+                backup_manager=backup_manager, attachment_store=AttachmentStore(), parent=app
+            )
+            app.aboutToQuit.connect(maintenance_scheduler.stop)
+            logger.debug("Maintenance scheduler initialized")
+        except Exception as e:
+            logger.warning(f"Could not initialize maintenance scheduler: {e}")
+        
+        # Write configuration changes still waiting to be saved
+        from app.core.config import flush_config
+        app.aboutToQuit.connect(flush_config)
+        
         # Run the application
         with loop:
             sys.exit(loop.run_forever())
@@ -9,6 +9,7 @@ import sqlite3
 from datetime import datetime, timedelta
 from PyQt6.QtCore import QDate, QTime
 from app.utils.logger import get_logger
+from app.models.archive import history_source, unarchive_activity
 
 logger = get_logger(__name__)
 
@@ -69,7 +70,16 @@ class ActivitiesManager:
         except Exception:
             logger.debug("Adding color column to activities table")
             self.cursor.execute("ALTER TABLE activities ADD COLUMN color TEXT")
-        
+
+        # Indexes used by date-range lookups (calendar month windows), with
+        # and without a type filter
+        self.cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_activities_type_date ON activities(type, date)"
+        )
+        self.cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_activities_date ON activities(date)"
+        )
+
         # Create migration trigger to update timestamps
         self.cursor.execute("""
             CREATE TRIGGER IF NOT EXISTS update_activity_timestamp 
@@ -119,14 +129,18 @@ class ActivitiesManager:
         date_str = date.toString("yyyy-MM-dd")
         day_name = date.toString("dddd")
         
+        # Dates past the archive boundary are read from the archive as well
+        activities_table = history_source(self.conn, 'activities', date_str)
+        completions_table = history_source(self.conn, 'activity_completions', date_str)
+        
         # Get activities specifically for this date
-        self.cursor.execute("""
+        self.cursor.execute(f"""
             SELECT 
                 a.id, a.title, a.date, a.start_time, a.end_time, 
                 CASE WHEN ac.activity_id IS NOT NULL THEN 1 ELSE 0 END as completed, 
                 a.type, a.priority, a.category, a.days_of_week, a.goal_id, a.created_at, a.color
-            FROM activities a
-            LEFT JOIN activity_completions ac ON a.id = ac.activity_id AND ac.completion_date = ?
+            FROM {activities_table} a
+            LEFT JOIN {completions_table} ac ON a.id = ac.activity_id AND ac.completion_date = ?
             WHERE a.date = ?
             ORDER BY a.start_time
         """, (date_str, date_str))
@@ -134,13 +148,13 @@ class ActivitiesManager:
         date_activities = self.cursor.fetchall()
         
         # Get repeating habits for this day of the week
-        self.cursor.execute("""
+        self.cursor.execute(f"""
             SELECT 
                 a.id, a.title, a.date, a.start_time, a.end_time, 
                 CASE WHEN ac.activity_id IS NOT NULL THEN 1 ELSE 0 END as completed, 
                 a.type, a.priority, a.category, a.days_of_week, a.goal_id, a.created_at, a.color
             FROM activities a
-            LEFT JOIN activity_completions ac ON a.id = ac.activity_id AND ac.completion_date = ?
+            LEFT JOIN {completions_table} ac ON a.id = ac.activity_id AND ac.completion_date = ?
             WHERE 
                 a.type = 'habit' AND 
                 a.days_of_week IS NOT NULL AND
@@ -195,7 +209,42 @@ class ActivitiesManager:
             results.append(activity)
             
         return results
-    
+
+    def get_activities_in_range(self, start_date, end_date, activity_type=None):
+        """Get activities whose date falls within an inclusive date range.
+
+        Args:
+            start_date: QDate or 'yyyy-MM-dd' string for the first day
+            end_date: QDate or 'yyyy-MM-dd' string for the last day
+            activity_type: Optional type filter ('task', 'event', or 'habit')
+
+        Returns:
+            A list of activity dictionaries ordered by date and start time
+        """
+        if not self.conn or not self.cursor:
+            raise ValueError("Database connection not set")
+
+        if isinstance(start_date, QDate):
+            start_date = start_date.toString("yyyy-MM-dd")
+        if isinstance(end_date, QDate):
+            end_date = end_date.toString("yyyy-MM-dd")
+
+        query = f"""
+            SELECT
+                id, title, date, start_time, end_time, completed, type,
+                priority, category, days_of_week, goal_id, created_at, color
+            FROM {history_source(self.conn, 'activities', start_date)}
+            WHERE date BETWEEN ? AND ?
+        """
+        params = [start_date, end_date]
+        if activity_type:
+            query += " AND type = ?"
+            params.append(activity_type)
+        query += " ORDER BY date, start_time"
+
+        self.cursor.execute(query, params)
+        return [self._row_to_activity(row) for row in self.cursor.fetchall()]
+
     def add_activity(self, activity_data):
         """Add a new activity.
         
@@ -258,6 +307,8 @@ class ActivitiesManager:
         """
         if not self.conn or not self.cursor:
             raise ValueError("Database connection not set")
+        
+        unarchive_activity(self.conn, activity_id)
             
         # Check if the activity exists
         self.cursor.execute("SELECT id FROM activities WHERE id = ?", (activity_id,))
@@ -322,6 +373,8 @@ class ActivitiesManager:
         """
         if not self.conn or not self.cursor:
             raise ValueError("Database connection not set")
+        
+        unarchive_activity(self.conn, activity_id)
             
         self.cursor.execute("DELETE FROM activities WHERE id = ?", (activity_id,))
         self.conn.commit()
@@ -355,6 +408,8 @@ class ActivitiesManager:
             date_str = date
         
         try:
+            unarchive_activity(self.conn, activity_id, date_str)
+            
             if completed:
                 # Add a record to activity_completions
                 self.cursor.execute(
@@ -414,11 +469,12 @@ class ActivitiesManager:
         if not self.conn or not self.cursor:
             raise ValueError("Database connection not set")
             
-        self.cursor.execute("""
+        source = history_source(self.conn, 'activities')
+        self.cursor.execute(f"""
             SELECT 
                 id, title, date, start_time, end_time, completed, type,
                 priority, category, days_of_week, goal_id, created_at, color
-            FROM activities
+            FROM {source}
             WHERE id = ?
         """, (activity_id,))
         
@@ -846,6 +902,7 @@ class ActivitiesManager:
     def add_todo_item(self, activity_id, text):
         if not self.conn or not self.cursor:
             raise ValueError("Database connection not set")
+        unarchive_activity(self.conn, activity_id)
         self.cursor.execute("INSERT INTO todo_items (activity_id, text) VALUES (?, ?)", (activity_id, text))
         self.conn.commit()
         return self.cursor.lastrowid
@@ -853,23 +910,37 @@ class ActivitiesManager:
     def get_todo_items(self, activity_id):
         if not self.conn or not self.cursor:
             raise ValueError("Database connection not set")
-        self.cursor.execute("SELECT id, text, completed FROM todo_items WHERE activity_id = ?", (activity_id,))
+        source = history_source(self.conn, 'todo_items')
+        self.cursor.execute(f"SELECT id, text, completed FROM {source} WHERE activity_id = ?", (activity_id,))
         return self.cursor.fetchall()
 
     def update_todo_item(self, item_id, text, completed):
         if not self.conn or not self.cursor:
             raise ValueError("Database connection not set")
+        self._unarchive_todo_item(item_id)
         self.cursor.execute("UPDATE todo_items SET text = ?, completed = ? WHERE id = ?", (text, completed, item_id))
         self.conn.commit()
 
     def delete_todo_item(self, item_id):
         if not self.conn or not self.cursor:
             raise ValueError("Database connection not set")
+        self._unarchive_todo_item(item_id)
         self.cursor.execute("DELETE FROM todo_items WHERE id = ?", (item_id,))
         self.conn.commit()
 
     def get_todo_item(self, item_id):
         if not self.conn or not self.cursor:
             raise ValueError("Database connection not set")
-        self.cursor.execute("SELECT id, text, completed FROM todo_items WHERE id = ?", (item_id,))
+        source = history_source(self.conn, 'todo_items')
+        self.cursor.execute(f"SELECT id, text, completed FROM {source} WHERE id = ?", (item_id,))
         return self.cursor.fetchone()
+
+    def _unarchive_todo_item(self, item_id):
+        """Move the activity owning an archived todo item back from the archive."""
+        source = history_source(self.conn, 'todo_items')
+        if source == 'todo_items':
+            return
+        self.cursor.execute(f"SELECT activity_id FROM {source} WHERE id = ?", (item_id,))
+        row = self.cursor.fetchone()
+        if row and row[0] is not None:
+            unarchive_activity(self.conn, row[0])
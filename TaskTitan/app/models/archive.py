@@ -0,0 +1,443 @@
+"""
+Hot/cold archival of old history for TaskTitan.
+
+Rows older than a configurable horizon are moved from the history tables
+(activities, activity_completions, time_entries, pomodoro_sessions) into
+tasktitan_archive.db next to the main database, so the tables the day views
+read every time stay small.
+
+Reads that reach back past the archive boundary go through history_source(),
+which attaches the archive to the caller's connection and returns a view over
+both databases; reads of recent ranges keep using the main tables directly.
+Writes to an archived activity first move it back with unarchive_activity().
+
+Backups copy the archive together with the main database, under
+history_lock, so a backup never holds a row in both databases or in neither.
+"""
+
+import os
+import re
+import sqlite3
+import threading
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional, Union
+
+from app.utils.logger import get_logger
+from app.models.database import get_db_path
+from app.core.config import get_config
+
+logger = get_logger(__name__)
+
+ARCHIVE_FILENAME = 'tasktitan_archive.db'
+
+# Schema name the archive is attached under
+ARCHIVE_SCHEMA = 'archive'
+
+# Rows moved per transaction, so the main database is never locked for long
+ARCHIVE_BATCH_SIZE = 5000
+
+# Table -> (date column, extra condition for rows that may be archived).
+# Habits recur on their days of the week, so their activity row stays hot.
+ARCHIVE_TABLES = {
+    'activities': ('date', "COALESCE(type, '') != 'habit'"),
+    'activity_completions': ('completion_date', None),
+    'time_entries': ('date', None),
+    'pomodoro_sessions': ('date', None),
+}
+
+# Child rows that follow their archived parent: table -> (foreign key, parent table)
+ARCHIVE_CHILD_TABLES = {
+    'todo_items': ('activity_id', 'activities'),
+}
+
+_CREATE_TABLE_RE = re.compile(r'^\s*CREATE\s+TABLE\s+(IF\s+NOT\s+EXISTS\s+)?', re.IGNORECASE)
+
+# Held while rows move between the databases, and while a backup copies
+# both, so the copies are taken between two batches
+history_lock = threading.Lock()
+
+# archive path -> (mtime, archived_before); avoids opening the archive on every read
+_boundary_cache: Dict[str, tuple] = {}
+
+
+def get_archive_path(db_path: Optional[str] = None) -> str:
+    """Return the path of the archive database next to the main database."""
+    return os.path.join(os.path.dirname(db_path or get_db_path()), ARCHIVE_FILENAME)
+
+
+def archived_before(archive_path: str) -> Optional[str]:
+    """
+    Return the date (YYYY-MM-DD) before which history lives in the archive,
+    or None if nothing has been archived.
+    """
+    try:
+        mtime = os.stat(archive_path).st_mtime
+    except OSError:
+        return None
+    cached = _boundary_cache.get(archive_path)
+    if cached and cached[0] == mtime:
+        return cached[1]
+
+    boundary = None
+    try:
+        conn = sqlite3.connect(f"file:{archive_path}?mode=ro", uri=True)
+        try:
+            row = conn.execute("SELECT value FROM archive_meta WHERE key = 'archived_before'").fetchone()
+            boundary = row[0] if row else None
+        finally:
+            conn.close()
+    except sqlite3.Error:
+        pass
+    _boundary_cache[archive_path] = (mtime, boundary)
+    return boundary
+
+
+def _as_date_string(value) -> Optional[str]:
+    """Accept a date, datetime, QDate or YYYY-MM-DD string."""
+    if value is None:
+        return None
+    if isinstance(value, str):
+        return value[:10]
+    if isinstance(value, (date, datetime)):
+        return value.strftime("%Y-%m-%d")
+    # QDate
+    return value.toString("yyyy-MM-dd")
+
+
+def _columns(conn, schema: str, table: str) -> List[str]:
+    return [row[1] for row in conn.execute(f'PRAGMA {schema}.table_info("{table}")')]
+
+
+def _is_attached(conn, schema: str) -> bool:
+    return any(row[1] == schema for row in conn.execute("PRAGMA database_list"))
+
+
+def _main_path(conn) -> str:
+    return next((row[2] for row in conn.execute("PRAGMA database_list") if row[1] == 'main'), '')
+
+
+def _attach_archive(conn, archive_path: str):
+    if not _is_attached(conn, ARCHIVE_SCHEMA):
+        conn.execute(f"ATTACH DATABASE ? AS {ARCHIVE_SCHEMA}", (archive_path,))
+
+
+def history_source(conn, table: str, start_date=None) -> str:
+    """
+    Return the table or view to read history from for a range starting at start_date.
+
+    If the range reaches into archived history, the archive is attached to
+    conn and a temporary view combining both databases is returned.
+    Otherwise, or if the archive cannot be attached (for example because
+    conn is inside a transaction), the main table name is returned.
+
+    Args:
+        conn: Connection (or cursor) the query will run on
+        table: History table name
+        start_date: First date of the range; None for all history
+
+    Returns:
+        Table or view name to use in the FROM clause
+    """
+    if conn is None or (table not in ARCHIVE_TABLES and table not in ARCHIVE_CHILD_TABLES):
+        return table
+    # Use a fresh cursor so a caller's cursor keeps its results
+    conn = getattr(conn, 'connection', conn)
+    main_path = _main_path(conn)
+    if not main_path:
+        return table
+    archive_path = get_archive_path(main_path)
+    boundary = archived_before(archive_path)
+    start = _as_date_string(start_date)
+    if boundary is None or (start is not None and start >= boundary):
+        return table
+
+    view = f"history_{table}"
+    try:
+        _attach_archive(conn, archive_path)
+        exists = conn.execute(
+            "SELECT 1 FROM temp.sqlite_master WHERE type = 'view' AND name = ?", (view,)
+        ).fetchone()
+        if not exists:
+            archive_columns = set(_columns(conn, ARCHIVE_SCHEMA, table))
+            if not archive_columns:
+                return table
+            main_columns = _columns(conn, 'main', table)
+            archive_select = ", ".join(
+                column if column in archive_columns else f"NULL AS {column}" for column in main_columns
+            )
+            conn.execute(f"""
+                CREATE TEMP VIEW {view} AS
+                SELECT {", ".join(main_columns)} FROM main.{table}
+                UNION ALL
+                SELECT {archive_select} FROM {ARCHIVE_SCHEMA}.{table}
+            """)
+        return view
+    except sqlite3.Error as e:
+        logger.warning(f"Could not attach history archive, reading recent {table} only: {e}")
+        return table
+
+
+def unarchive_activity(conn, activity_id: int, completion_date=None) -> bool:
+    """
+    Move an archived activity back into the main database so it can be changed.
+
+    The activity comes back with its todo items and completions. For an
+    activity that is not archived (habits stay hot), only its completion on
+    completion_date is brought back, so toggling it does not leave a copy
+    in each database. Moved rows are archived again by the next run.
+
+    Args:
+        conn: Connection (or cursor) the following write will run on
+        activity_id: ID of the activity about to be changed
+        completion_date: Optional completion date about to be toggled
+
+    Returns:
+        True if any rows were moved back
+    """
+    if conn is None:
+        return False
+    conn = getattr(conn, 'connection', conn)
+    main_path = _main_path(conn)
+    if not main_path:
+        return False
+    archive_path = get_archive_path(main_path)
+    if archived_before(archive_path) is None:
+        return False
+
+    with history_lock:
+        try:
+            _attach_archive(conn, archive_path)
+            if not _columns(conn, ARCHIVE_SCHEMA, 'activities'):
+                return False
+            archived = conn.execute(
+                f"SELECT 1 FROM {ARCHIVE_SCHEMA}.activities WHERE id = ?", (activity_id,)
+            ).fetchone()
+            if archived:
+                # Parent first on the way in, children first on the way out,
+                # so foreign keys hold and no cascade fires in the archive
+                moves = [('activities', "id = ?", (activity_id,))]
+                moves += [(child, f"{foreign_key} = ?", (activity_id,))
+                          for child, (foreign_key, parent) in ARCHIVE_CHILD_TABLES.items() if parent == 'activities']
+                moves.append(('activity_completions', "activity_id = ?", (activity_id,)))
+            elif completion_date is not None:
+                moves = [('activity_completions', "activity_id = ? AND completion_date = ?",
+                          (activity_id, _as_date_string(completion_date)))]
+            else:
+                return False
+            moves = [move for move in moves if _columns(conn, ARCHIVE_SCHEMA, move[0])]
+
+            started = not conn.in_transaction
+            if started:
+                conn.execute("BEGIN IMMEDIATE")
+            try:
+                moved = 0
+                for table, where, params in moves:
+                    archive_columns = set(_columns(conn, ARCHIVE_SCHEMA, table))
+                    columns = ", ".join(c for c in _columns(conn, 'main', table) if c in archive_columns)
+                    moved += conn.execute(
+                        f"INSERT OR REPLACE INTO main.{table} ({columns}) "
+                        f"SELECT {columns} FROM {ARCHIVE_SCHEMA}.{table} WHERE {where}", params
+                    ).rowcount
+                for table, where, params in reversed(moves):
+                    conn.execute(f"DELETE FROM {ARCHIVE_SCHEMA}.{table} WHERE {where}", params)
+                if started:
+                    conn.execute("COMMIT")
+            except Exception:
+                if started:
+                    conn.execute("ROLLBACK")
+                raise
+        except sqlite3.Error as e:
+            logger.warning(f"Could not move activity {activity_id} back from the history archive: {e}")
+            return False
+
+    if moved:
+        logger.info(f"Moved activity {activity_id} back from the history archive ({moved} rows)")
+    return moved > 0
+
+
+class ArchiveManager:
+    """Moves old history rows between the main database and the archive."""
+
+    def __init__(self, db_path: Optional[str] = None):
+        """
+        Initialize the archive manager.
+
+        Args:
+            db_path: Main database path; defaults to the application database
+        """
+        self.db_path = db_path or get_db_path()
+        self.archive_path = get_archive_path(self.db_path)
+
+    def archived_before(self) -> Optional[str]:
+        """Return the current archive boundary date, or None."""
+        return archived_before(self.archive_path)
+
+    def clear(self):
+        """
+        Empty the archive, leaving all history to the main database.
+
+        Used after restoring a backup taken before anything was archived,
+        whose database already holds every row.
+        """
+        if not os.path.exists(self.archive_path):
+            return
+        with history_lock:
+            conn = sqlite3.connect(self.archive_path, timeout=30)
+            try:
+                tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+                for table in list(ARCHIVE_TABLES) + list(ARCHIVE_CHILD_TABLES) + ['archive_meta']:
+                    if table in tables:
+                        conn.execute(f'DELETE FROM "{table}"')
+                conn.commit()
+            finally:
+                conn.close()
+        _boundary_cache.pop(self.archive_path, None)
+        logger.info("Emptied the history archive")
+
+    def archive_old_history(self, horizon_days: Optional[int] = None, should_stop=None) -> Dict[str, int]:
+        """
+        Archive history older than the configured horizon.
+
+        Args:
+            horizon_days: Days of history to keep hot; defaults to
+                the archive.horizon_days setting
+            should_stop: Optional callable checked between batches
+
+        Returns:
+            Dictionary of rows archived per table
+        """
+        if horizon_days is None:
+            horizon_days = get_config('archive.horizon_days', 365)
+        return self.archive_before(date.today() - timedelta(days=horizon_days), should_stop=should_stop)
+
+    def archive_before(self, cutoff: Union[str, date], batch_size: int = ARCHIVE_BATCH_SIZE,
+                       should_stop=None) -> Dict[str, int]:
+        """
+        Move history dated before cutoff into the archive database.
+
+        Each batch is moved in its own transaction, copied first and deleted
+        second, so an interruption never loses or duplicates rows.
+
+        Args:
+            cutoff: First date that stays in the main database
+            batch_size: Rows moved per transaction
+            should_stop: Optional callable checked between batches; returning
+                True ends the run early
+
+        Returns:
+            Dictionary of rows archived per table
+        """
+        cutoff = _as_date_string(cutoff)
+        counts = {}
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        try:
+            conn.execute(f"ATTACH DATABASE ? AS {ARCHIVE_SCHEMA}", (self.archive_path,))
+            self._ensure_archive_schema(conn)
+            conn.execute("CREATE TEMP TABLE IF NOT EXISTS archive_batch (rid INTEGER PRIMARY KEY)")
+
+            conditions = {}
+            for table, (date_column, condition) in ARCHIVE_TABLES.items():
+                if _columns(conn, 'main', table):
+                    conditions[table] = f"{date_column} < ?" + (f" AND {condition}" if condition else "")
+
+            # Advance the boundary before moving anything, so reads of the
+            # range attach the archive and see every row in one of the two
+            # databases even if this run stops part way
+            previous = self.archived_before()
+            has_rows = any(
+                conn.execute(f"SELECT 1 FROM main.{table} WHERE {where} LIMIT 1", (cutoff,)).fetchone()
+                for table, where in conditions.items()
+            )
+            if (previous is None and has_rows) or (previous is not None and cutoff > previous):
+                conn.execute(
+                    f"INSERT OR REPLACE INTO {ARCHIVE_SCHEMA}.archive_meta (key, value) "
+                    "VALUES ('archived_before', ?)", (cutoff,)
+                )
+
+            for table, where in conditions.items():
+                counts[table] = self._move_rows(conn, table, where, (cutoff,), batch_size, should_stop)
+                if should_stop and should_stop():
+                    logger.info(f"Archiving stopped early: {counts}")
+                    return counts
+        finally:
+            conn.close()
+
+        logger.info(f"Archived history before {cutoff}: {counts}")
+        return counts
+
+    def _move_rows(self, conn, table: str, where: str, params: tuple, batch_size: int, should_stop=None) -> int:
+        """Move rows matching where from main to the archive in batches."""
+        columns = ", ".join(_columns(conn, 'main', table))
+        children = [
+            (child, foreign_key) for child, (foreign_key, parent) in ARCHIVE_CHILD_TABLES.items()
+            if parent == table and _columns(conn, 'main', child)
+        ]
+        moved = 0
+        while not (should_stop and should_stop()):
+            with history_lock:
+                batch = self._move_batch(conn, table, columns, children, where, params, batch_size)
+            if batch == 0:
+                return moved
+            moved += batch
+        return moved
+
+    def _move_batch(self, conn, table: str, columns: str, children: list, where: str, params: tuple,
+                    batch_size: int) -> int:
+        """Move one batch of rows, with their child rows, in one transaction."""
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute("DELETE FROM temp.archive_batch")
+            conn.execute(
+                f"INSERT INTO temp.archive_batch SELECT rowid FROM main.{table} WHERE {where} LIMIT ?",
+                params + (batch_size,)
+            )
+            batch = conn.execute("SELECT COUNT(*) FROM temp.archive_batch").fetchone()[0]
+            if batch == 0:
+                conn.execute("COMMIT")
+                return 0
+
+            in_batch = "rowid IN (SELECT rid FROM temp.archive_batch)"
+            for child, foreign_key in children:
+                child_columns = ", ".join(_columns(conn, 'main', child))
+                child_where = f"{foreign_key} IN (SELECT id FROM main.{table} WHERE {in_batch})"
+                conn.execute(
+                    f"INSERT OR REPLACE INTO {ARCHIVE_SCHEMA}.{child} ({child_columns}) "
+                    f"SELECT {child_columns} FROM main.{child} WHERE {child_where}"
+                )
+                conn.execute(f"DELETE FROM main.{child} WHERE {child_where}")
+
+            conn.execute(
+                f"INSERT OR REPLACE INTO {ARCHIVE_SCHEMA}.{table} ({columns}) "
+                f"SELECT {columns} FROM main.{table} WHERE {in_batch}"
+            )
+            conn.execute(f"DELETE FROM main.{table} WHERE {in_batch}")
+            conn.execute("COMMIT")
+            return batch
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def _ensure_archive_schema(self, conn):
+        """Create the archive tables from the main schema and add any new columns."""
+        conn.execute(f"""
+            CREATE TABLE IF NOT EXISTS {ARCHIVE_SCHEMA}.archive_meta (
+                key TEXT PRIMARY KEY,
+                value TEXT
+            )
+        """)
+        for table in list(ARCHIVE_TABLES) + list(ARCHIVE_CHILD_TABLES):
+            row = conn.execute(
+                "SELECT sql FROM main.sqlite_master WHERE type = 'table' AND name = ?", (table,)
+            ).fetchone()
+            if not row:
+                continue
+            archive_columns = _columns(conn, ARCHIVE_SCHEMA, table)
+            if not archive_columns:
+                create_sql = _CREATE_TABLE_RE.sub(f"CREATE TABLE IF NOT EXISTS {ARCHIVE_SCHEMA}.", row[0], count=1)
+                conn.execute(create_sql)
+                continue
+            # Columns added to the main table since the archive was created
+            for column in conn.execute(f'PRAGMA main.table_info("{table}")').fetchall():
+                name, column_type = column[1], column[2]
+                if name not in archive_columns:
+                    conn.execute(f'ALTER TABLE {ARCHIVE_SCHEMA}.{table} ADD COLUMN "{name}" {column_type}')
@@ -4,6 +4,7 @@ import sys
 from datetime import datetime, timedelta
 from typing import Optional
 from app.models.database_schema import CREATE_TABLES_SQL
+from app.models.table_versions import ensure_version_triggers
 from app.utils.logger import get_logger
 from app.core.config import get_config
 
@@ -290,7 +291,12 @@ def initialize_db(db_path: Optional[str] = None):
             WHERE id = NEW.id;
         END;
     """)
-    
+
+    # Indexes for date-range lookups such as the calendar month window, with
+    # and without a type filter
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_activities_type_date ON activities(type, date)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_activities_date ON activities(date)")
+
     # Apply incremental schema updates for existing databases
     try:
         update_database_schema(cursor)
@@ -366,4 +372,22 @@ def update_database_schema(cursor):
     try:
         cursor.execute("ALTER TABLE pomodoro_sessions ADD COLUMN task_id INTEGER")
     except sqlite3.OperationalError:
-        pass
\ No newline at end of file
+        pass
+
+    # Journal attachments record the content hash and metadata of their stored file
+    for column in ("category TEXT", "shortcut_path TEXT", "content_hash TEXT", "size INTEGER",
+                   "mime_type TEXT", "width INTEGER", "height INTEGER"):
+        try:
+            cursor.execute(f"ALTER TABLE journal_attachments ADD COLUMN {column}")
+        except sqlite3.OperationalError:
+            pass
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_journal_attachments_hash ON journal_attachments(content_hash)"
+    )
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_journal_attachments_date ON journal_attachments(date)")
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_journal_attachments_category ON journal_attachments(category)"
+    )
+
+    # Write counters that let cached query results notice changes
+    ensure_version_triggers(cursor)
@@ -3,6 +3,7 @@ import os
 from datetime import datetime
 from app.utils.logger import get_logger
 from app.utils.cache import CacheManager
+from app.models.table_versions import TableVersions, ensure_version_triggers
 
 logger = get_logger(__name__)
 
@@ -24,6 +25,7 @@ class DatabaseManager:
         self.conn = None
         self.cursor = None
         self.cache = CacheManager.get_instance()
+        self.table_versions = None
         self.connect()
     
     def connect(self):
@@ -45,6 +47,8 @@ class DatabaseManager:
             self.cursor.execute("PRAGMA journal_mode = WAL;")
             self.cursor.execute("PRAGMA cache_size = -64000;")  # 64MB cache
             self.cursor.execute("PRAGMA temp_store = MEMORY;")
+            # Lets cached query results notice writes from any connection
+            ensure_version_triggers(self.cursor)
             self.conn.commit()
             logger.info(f"Connected to database: {self.db_path}")
         except sqlite3.Error as e:
@@ -89,25 +93,43 @@ class DatabaseManager:
         from app.models.database import initialize_db
         self.conn, self.cursor = initialize_db()
     
+    def cached_query(self, cache_key, tables, compute):
+        """
+        Return a cached query result, recomputing it if any table it reads has been written.
+        
+        Args:
+            cache_key: Cache key for the result
+            tables: Tables the query reads
+            compute: Callable that runs the query and returns the result
+        """
+        if self.table_versions is None or self.table_versions.conn is not self.conn:
+            self.table_versions = TableVersions(self.conn)
+        versions = self.table_versions.current(tables)
+        if versions is not None:
+            versions = (self.table_versions.database_id, versions)
+            cached = self.cache.get(cache_key)
+            if cached is not None and cached[0] == versions:
+                return cached[1]
+        
+        result = compute()
+        
+        if versions is not None:
+            # Stored with the versions read before the query, so a write
+            # that raced with it makes the next call recompute
+            self.cache.set(cache_key, (versions, result), tags=tuple(f"table:{table}" for table in tables))
+        return result
+    
     def count_items(self, table, completed=None):
         """Count items in a table, optionally filtered by completion status."""
-        # Check cache first
-        cache_key = f"count:{table}:{completed}"
-        cached_result = self.cache.get(cache_key)
-        if cached_result is not None:
-            return cached_result
-        
         query = f"SELECT COUNT(*) FROM {table}"
         if completed is not None:
             query += f" WHERE completed = {1 if completed else 0}"
-            
-        self.execute(query)
-        result = self.fetchone()[0]
         
-        # Cache result
-        self.cache.set(cache_key, result)
+        def count():
+            self.execute(query)
+            return self.fetchone()[0]
         
-        return result
+        return self.cached_query(f"count:{table}:{completed}", (table,), count)
             
     def save_goal(self, goal_data):
         """Save a goal to the database."""
@@ -175,8 +197,7 @@ class DatabaseManager:
             
             # Invalidate related caches
             if self.cache:
-                self.cache.invalidate_pattern("count:goals")
-                self.cache.invalidate_pattern(f"goal:{goal_id}")
+                self.cache.invalidate_tags("table:goals", f"goal:{goal_id}")
             
             return goal_id
             
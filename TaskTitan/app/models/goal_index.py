@@ -0,0 +1,255 @@
+"""
+Goal Index for TaskTitan
+
+In-memory index over the goal dictionaries used by the goal views. It keeps
+id -> goal and parent -> children maps so tree navigation is O(1) per step,
+and caches completion counts per goal so that a completion change only walks
+the ancestor chain instead of rescanning every goal.
+"""
+
+from __future__ import annotations
+
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+
+class GoalIndex:
+    """Parent/child index with incrementally maintained completion counts.
+
+    The index stores references to the goal dictionaries it is given, so
+    edits made through it (completion, re-parenting) are visible to any list
+    holding the same dictionaries.
+
+    Cached counts per goal id
+    -------------------------
+    - child_completed: completed direct children
+    - subtree_total: all descendants
+    - subtree_completed: completed descendants
+    """
+
+    def __init__(self, goals: Optional[Iterable[dict]] = None):
+        self._goals: Dict[int, dict] = {}
+        self._children: Dict[Optional[int], List[dict]] = {}
+        self._child_completed: Dict[int, int] = {}
+        self._subtree_total: Dict[int, int] = {}
+        self._subtree_completed: Dict[int, int] = {}
+        if goals is not None:
+            self.rebuild(goals)
+
+    # ---------- Building ----------
+    def rebuild(self, goals: Iterable[dict]) -> None:
+        """Replace the indexed goals and recompute all cached counts in O(n)."""
+        self._goals = {}
+        self._children = {}
+        for goal in goals:
+            self._goals[goal['id']] = goal
+            self._children.setdefault(goal.get('parent_id'), []).append(goal)
+
+        self._child_completed = {}
+        self._subtree_total = {}
+        self._subtree_completed = {}
+        for goal_id in self._post_order():
+            total = 0
+            completed = 0
+            direct_completed = 0
+            for child in self._children.get(goal_id, ()):
+                child_id = child['id']
+                child_done = 1 if child.get('completed') else 0
+                direct_completed += child_done
+                total += 1 + self._subtree_total.get(child_id, 0)
+                completed += child_done + self._subtree_completed.get(child_id, 0)
+            self._child_completed[goal_id] = direct_completed
+            self._subtree_total[goal_id] = total
+            self._subtree_completed[goal_id] = completed
+
+    def _post_order(self) -> List[int]:
+        """Return every goal id with descendants listed before their ancestors."""
+        order: List[int] = []
+        visited = set()
+        for goal_id in self._goals:
+            if goal_id in visited:
+                continue
+            # Climb to the top of this goal's chain so each tree is walked once
+            top = goal_id
+            seen = {top}
+            parent_id = self._goals[top].get('parent_id')
+            while parent_id in self._goals and parent_id not in seen:
+                top = parent_id
+                seen.add(top)
+                parent_id = self._goals[top].get('parent_id')
+
+            stack: List[Tuple[int, bool]] = [(top, False)]
+            while stack:
+                current, expanded = stack.pop()
+                if expanded:
+                    order.append(current)
+                    continue
+                if current in visited:
+                    continue
+                visited.add(current)
+                stack.append((current, True))
+                for child in self._children.get(current, ()):
+                    if child['id'] not in visited:
+                        stack.append((child['id'], False))
+        return order
+
+    # ---------- Lookup ----------
+    def __len__(self) -> int:
+        return len(self._goals)
+
+    def __contains__(self, goal_id) -> bool:
+        return goal_id in self._goals
+
+    def __iter__(self) -> Iterator[dict]:
+        return iter(list(self._goals.values()))
+
+    def get(self, goal_id) -> Optional[dict]:
+        """Return the goal with the given id, or None."""
+        return self._goals.get(goal_id)
+
+    def children(self, goal_id) -> List[dict]:
+        """Return the direct children of a goal (use None for root goals)."""
+        return list(self._children.get(goal_id, ()))
+
+    def roots(self) -> List[dict]:
+        """Return the goals without a parent."""
+        return self.children(None)
+
+    def has_children(self, goal_id) -> bool:
+        return bool(self._children.get(goal_id))
+
+    def ancestors(self, goal_id) -> Iterator[dict]:
+        """Yield the parent, grandparent, ... of a goal, nearest first."""
+        seen = {goal_id}
+        goal = self._goals.get(goal_id)
+        while goal is not None:
+            parent_id = goal.get('parent_id')
+            if parent_id in seen:
+                return
+            goal = self._goals.get(parent_id)
+            if goal is not None:
+                seen.add(parent_id)
+                yield goal
+
+    def descendant_ids(self, goal_id) -> List[int]:
+        """Return the ids of all descendants of a goal in depth-first order."""
+        result: List[int] = []
+        seen = {goal_id}
+        stack = list(reversed(self._children.get(goal_id, ())))
+        while stack:
+            goal = stack.pop()
+            if goal['id'] in seen:
+                continue
+            seen.add(goal['id'])
+            result.append(goal['id'])
+            stack.extend(reversed(self._children.get(goal['id'], ())))
+        return result
+
+    # ---------- Progress ----------
+    def progress(self, goal_id) -> int:
+        """Progress percentage from direct subgoals (100 when the goal itself is done)."""
+        goal = self._goals.get(goal_id)
+        if goal is None:
+            return 0
+        if goal.get('completed'):
+            return 100
+        total = len(self._children.get(goal_id, ()))
+        if not total:
+            return 0
+        return int((self._child_completed[goal_id] / total) * 100)
+
+    def subtree_counts(self, goal_id) -> Tuple[int, int]:
+        """Return (completed, total) over all descendants of a goal."""
+        return self._subtree_completed.get(goal_id, 0), self._subtree_total.get(goal_id, 0)
+
+    # ---------- Mutation ----------
+    def set_completed(self, goal_id, completed: bool) -> List[int]:
+        """Set a goal's completion and update cached counts along its ancestors.
+
+        Returns:
+            Ids of the goals whose progress may have changed (the goal and its
+            ancestors), or an empty list when nothing changed.
+        """
+        goal = self._goals.get(goal_id)
+        if goal is None:
+            return []
+        completed = bool(completed)
+        if bool(goal.get('completed')) == completed:
+            return []
+
+        goal['completed'] = completed
+        delta = 1 if completed else -1
+        parent = self._goals.get(goal.get('parent_id'))
+        if parent is not None:
+            self._child_completed[parent['id']] += delta
+
+        affected = [goal_id]
+        for ancestor in self.ancestors(goal_id):
+            self._subtree_completed[ancestor['id']] += delta
+            affected.append(ancestor['id'])
+        return affected
+
+    def add(self, goal: dict) -> None:
+        """Index a new leaf goal."""
+        goal_id = goal['id']
+        self._goals[goal_id] = goal
+        self._child_completed[goal_id] = 0
+        self._subtree_total[goal_id] = 0
+        self._subtree_completed[goal_id] = 0
+        self._attach(goal)
+
+    def remove(self, goal_id) -> List[int]:
+        """Remove a goal and its whole subtree.
+
+        Returns:
+            Ids of all removed goals, starting with goal_id.
+        """
+        goal = self._goals.get(goal_id)
+        if goal is None:
+            return []
+        self._detach(goal)
+        removed = [goal_id] + self.descendant_ids(goal_id)
+        for removed_id in removed:
+            self._goals.pop(removed_id, None)
+            self._children.pop(removed_id, None)
+            self._child_completed.pop(removed_id, None)
+            self._subtree_total.pop(removed_id, None)
+            self._subtree_completed.pop(removed_id, None)
+        return removed
+
+    def move(self, goal_id, new_parent_id) -> None:
+        """Re-parent a goal together with its subtree."""
+        goal = self._goals.get(goal_id)
+        if goal is None or goal.get('parent_id') == new_parent_id:
+            return
+        if new_parent_id == goal_id or new_parent_id in self.descendant_ids(goal_id):
+            raise ValueError("A goal cannot be moved under itself or its descendants")
+        self._detach(goal)
+        goal['parent_id'] = new_parent_id
+        self._attach(goal)
+
+    def _attach(self, goal: dict) -> None:
+        """Link a goal under its parent and add its subtree to the ancestor counts."""
+        self._children.setdefault(goal.get('parent_id'), []).append(goal)
+        self._apply_subtree_delta(goal, +1)
+
+    def _detach(self, goal: dict) -> None:
+        """Unlink a goal from its parent and subtract its subtree from the ancestor counts."""
+        siblings = self._children.get(goal.get('parent_id'), [])
+        for i, sibling in enumerate(siblings):
+            if sibling is goal:
+                del siblings[i]
+                break
+        self._apply_subtree_delta(goal, -1)
+
+    def _apply_subtree_delta(self, goal: dict, sign: int) -> None:
+        goal_id = goal['id']
+        done = 1 if goal.get('completed') else 0
+        size = 1 + self._subtree_total.get(goal_id, 0)
+        size_completed = done + self._subtree_completed.get(goal_id, 0)
+
+        parent = self._goals.get(goal.get('parent_id'))
+        if parent is not None:
+            self._child_completed[parent['id']] += sign * done
+        for ancestor in self.ancestors(goal_id):
+            self._subtree_total[ancestor['id']] += sign * size
+            self._subtree_completed[ancestor['id']] += sign * size_completed
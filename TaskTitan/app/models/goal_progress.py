@@ -0,0 +1,137 @@
+"""
+Goal progress queries for TaskTitan
+
+Computes progress for every goal in a single statement. A recursive CTE
+builds the ancestor/descendant pairs of the goal hierarchy, which are then
+aggregated into direct and transitive subgoal counts. Time-based progress is
+computed in SQL as well, so callers never need a query per goal.
+"""
+
+from __future__ import annotations
+
+from datetime import date
+from typing import List, Optional
+
+# Time-based progress of an unfinished goal that is past its due date
+OVERDUE_PROGRESS = 90
+
+GOAL_PROGRESS_SQL = """
+    WITH RECURSIVE
+    -- One row per (ancestor, descendant) pair, carrying the descendant's
+    -- completion flag. The depth bound stops the recursion on parent cycles.
+    lineage(ancestor_id, done, depth) AS (
+        SELECT parent_id, completed = 1, 1 FROM goals WHERE parent_id IS NOT NULL
+        UNION ALL
+        SELECT g.parent_id, l.done, l.depth + 1
+        FROM lineage l
+        JOIN goals g ON g.id = l.ancestor_id
+        WHERE g.parent_id IS NOT NULL
+          AND l.depth < (SELECT COUNT(*) FROM goals)
+    ),
+    subtree AS (
+        SELECT ancestor_id AS id, COUNT(*) AS total, SUM(done) AS done
+        FROM lineage
+        GROUP BY ancestor_id
+    ),
+    direct AS (
+        SELECT parent_id AS id,
+               COUNT(*) AS total,
+               SUM(CASE WHEN completed = 1 THEN 1 ELSE 0 END) AS done
+        FROM goals
+        WHERE parent_id IS NOT NULL
+        GROUP BY parent_id
+    ),
+    timing AS (
+        SELECT id,
+               julianday(due_date) - julianday(COALESCE(NULLIF(created_date, ''), date(due_date, '-14 days'))) AS total_days,
+               julianday(:today) - julianday(COALESCE(NULLIF(created_date, ''), date(due_date, '-14 days'))) AS elapsed_days
+        FROM goals
+    )
+    SELECT g.id, g.title, g.parent_id, g.created_date, g.due_date, g.due_time,
+           g.priority, g.color, g.completed,
+           COALESCE(d.total, 0), COALESCE(d.done, 0),
+           COALESCE(s.total, 0), COALESCE(s.done, 0),
+           CASE
+               WHEN t.total_days IS NULL OR t.elapsed_days IS NULL OR t.total_days <= 0 THEN 0
+               WHEN t.elapsed_days < 0 THEN 0
+               WHEN t.elapsed_days >= t.total_days THEN :overdue
+               ELSE CAST(t.elapsed_days * 100 / t.total_days AS INTEGER)
+           END
+    FROM goals g
+    LEFT JOIN direct d ON d.id = g.id
+    LEFT JOIN subtree s ON s.id = g.id
+    LEFT JOIN timing t ON t.id = g.id
+    ORDER BY g.due_date
+"""
+
+
+def _ratio(done: int, total: int) -> Optional[float]:
+    return done / total if total else None
+
+
+def fetch_goal_progress(cursor, today: Optional[date] = None, result_cache=None,
+                        stale_ok: bool = False) -> List[dict]:
+    """Return every goal with its progress figures, using one query.
+
+    Each goal dictionary has the usual goal columns plus:
+
+    - direct_total / direct_completed: immediate subgoals
+    - subtree_total / subtree_completed: all descendants
+    - direct_ratio / subtree_ratio: completed fraction, or None without subgoals
+    - time_progress: percentage of the created -> due window that has elapsed
+      (OVERDUE_PROGRESS once the due date has passed)
+    - progress: 100 when completed, else the direct subgoal percentage, else
+      time_progress; this matches the dashboard's progress wheels
+
+    Args:
+        cursor: SQLite cursor on the TaskTitan database
+        today: Reference date for time-based progress (defaults to today)
+        result_cache: Optional ResultCache to answer from while goals are unchanged
+        stale_ok: Let result_cache return the last known figures and
+            revalidate them in the background
+
+    Returns:
+        Goal dictionaries ordered by due date.
+    """
+    today = today or date.today()
+    params = {'today': today.isoformat(), 'overdue': OVERDUE_PROGRESS}
+    if result_cache is not None:
+        rows = result_cache.fetch_rows(GOAL_PROGRESS_SQL, params, tables=('goals',), stale_ok=stale_ok)
+    else:
+        cursor.execute(GOAL_PROGRESS_SQL, params)
+        rows = cursor.fetchall()
+
+    goals = []
+    for row in rows:
+        (goal_id, title, parent_id, created_date, due_date, due_time, priority, color,
+         completed, direct_total, direct_done, subtree_total, subtree_done, time_progress) = row
+        completed = bool(completed)
+        direct_ratio = _ratio(direct_done, direct_total)
+
+        if completed:
+            progress = 100
+        elif direct_ratio is not None:
+            progress = int(direct_ratio * 100)
+        else:
+            progress = time_progress
+
+        goals.append({
+            'id': goal_id,
+            'title': title,
+            'parent_id': parent_id,
+            'created_date': created_date,
+            'due_date': due_date,
+            'due_time': due_time,
+            'priority': priority,
+            'color': color,
+            'completed': completed,
+            'direct_total': direct_total,
+            'direct_completed': direct_done,
+            'subtree_total': subtree_total,
+            'subtree_completed': subtree_done,
+            'direct_ratio': direct_ratio,
+            'subtree_ratio': _ratio(subtree_done, subtree_total),
+            'time_progress': time_progress,
+            'progress': progress,
+        })
+    return goals
@@ -0,0 +1,184 @@
+"""
+Cached aggregate query results for TaskTitan.
+
+ResultCache answers read-only aggregate queries (chart data, goal progress,
+report figures) from two tiers: the in-memory CacheManager, then the
+persistent DiskCache in data/cache/. A result is current when it was computed
+at the present write versions of the tables it reads (see table_versions);
+since those versions are stored in the database, results computed in an
+earlier session stay valid until the tables are written again. The random
+database id kept with the versions is part of each result's version, so a
+new database at the same path never matches results of the old one.
+
+Callers that prefer a fast answer to a current one (a chart shown on
+startup) can accept a last-known-good result; it is then recomputed on a
+worker thread and result_refreshed is emitted if it changed.
+"""
+
+import os
+import sqlite3
+import threading
+from typing import Iterable, Optional
+
+from PyQt6.QtCore import QObject, pyqtSignal
+from app.utils.logger import get_logger
+from app.utils.cache import CacheManager
+from app.utils.disk_cache import get_disk_cache
+from app.models.archive import history_source
+from app.models.table_versions import TableVersions, VERSIONS_TABLE, DATABASE_ID_KEY
+
+logger = get_logger(__name__)
+
+
+def _main_database_path(conn) -> str:
+    return next((row[2] for row in conn.execute("PRAGMA database_list") if row[1] == 'main'), '')
+
+
+def clear_cached_results(db_path: str):
+    """Drop every cached result of a database, for example after it is replaced."""
+    db_path = os.path.abspath(db_path)
+    CacheManager.get_instance().invalidate_tags(f"db:{db_path}")
+    disk = get_disk_cache()
+    if disk is not None:
+        disk.clear(scope=db_path)
+
+
+def _version(database_id, versions: tuple) -> str:
+    return repr((database_id, versions))
+
+
+def _freeze_params(params):
+    """Turn query parameters into a hashable, stable part of a cache key."""
+    if isinstance(params, dict):
+        return tuple(sorted(params.items()))
+    return tuple(params or ())
+
+
+class ResultCache(QObject):
+    """Two-tier cache of query results for one database connection."""
+
+    result_refreshed = pyqtSignal(object)  # Emits the key of a result that changed when revalidated
+
+    def __init__(self, conn, disk_cache=None, parent=None):
+        """
+        Initialize the cache.
+
+        Args:
+            conn: Connection the queries run on
+            disk_cache: Persistent tier; defaults to the application's DiskCache
+            parent: Optional parent object
+        """
+        super().__init__(parent)
+        self.conn = conn
+        self.db_path = _main_database_path(conn)
+        self.versions = TableVersions(conn)
+        self.memory = CacheManager.get_instance()
+        self.disk = disk_cache if disk_cache is not None else get_disk_cache()
+        self._refreshing = {}
+        self._lock = threading.Lock()
+
+    def fetch_rows(self, sql: str, params=(), tables: Iterable[str] = (), stale_ok: bool = False) -> list:
+        """
+        Return the rows of a query, from the cache when they are current.
+
+        Args:
+            sql: Read-only query
+            params: Query parameters (sequence or mapping)
+            tables: Tables the query reads
+            stale_ok: Accept a cached result computed before the latest
+                writes; it is then revalidated in the background
+
+        Returns:
+            List of row tuples
+        """
+        tables = tuple(tables)
+        versions = self.versions.current(tables) if tables else None
+        if versions is None:
+            return self.conn.execute(sql, params).fetchall()
+
+        key = ('rows', self.db_path, sql, _freeze_params(params))
+        version = _version(self.versions.database_id, versions)
+        cached = self.memory.get(key)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+
+        stale = cached
+        if self.disk is not None:
+            stored = self.disk.get(repr(key))
+            if stored is not None:
+                if stored[0] == version:
+                    self._remember(key, version, stored[1], tables)
+                    return stored[1]
+                stale = stale or stored
+
+        if stale is not None and stale_ok:
+            self._refresh_in_background(key, sql, params, tables, stale[1])
+            return stale[1]
+
+        rows = self.conn.execute(sql, params).fetchall()
+        self._store(key, version, rows, tables)
+        return rows
+
+    def _remember(self, key, version: str, rows: list, tables: tuple):
+        """Keep a result in the memory tier."""
+        tags = (f"db:{self.db_path}",) + tuple(f"table:{table}" for table in tables)
+        self.memory.set(key, (version, rows), tags=tags)
+
+    def _store(self, key, version: str, rows: list, tables: tuple):
+        """Keep a result in both tiers."""
+        self._remember(key, version, rows, tables)
+        if self.disk is not None:
+            self.disk.set(repr(key), version, rows, scope=self.db_path)
+
+    def _refresh_in_background(self, key, sql: str, params, tables: tuple, stale_rows: list):
+        """Recompute a result on a worker thread unless that is already happening."""
+        with self._lock:
+            if key in self._refreshing:
+                return
+            thread = threading.Thread(
+                target=self._refresh, args=(key, sql, params, tables, stale_rows),
+                name="TaskTitanResultRefresh", daemon=True
+            )
+            self._refreshing[key] = thread
+        thread.start()
+
+    def _refresh(self, key, sql: str, params, tables: tuple, stale_rows: list):
+        """Recompute a result on its own connection, reading versions and rows in one snapshot."""
+        try:
+            conn = sqlite3.connect(f"file:{self.db_path}?mode=ro", uri=True, timeout=10, isolation_level=None)
+            try:
+                # Archived history is read through temporary views of the same names
+                for table in tables:
+                    history_source(conn, table)
+                conn.execute("BEGIN")
+                placeholders = ", ".join("?" for _ in tables + (DATABASE_ID_KEY,))
+                current = dict(conn.execute(
+                    f"SELECT name, version FROM {VERSIONS_TABLE} WHERE name IN ({placeholders})",
+                    tables + (DATABASE_ID_KEY,)
+                ))
+                rows = conn.execute(sql, params).fetchall()
+                conn.execute("COMMIT")
+            finally:
+                conn.close()
+            version = _version(current.get(DATABASE_ID_KEY), tuple(current.get(table, 0) for table in tables))
+            self._store(key, version, rows, tables)
+            if rows != stale_rows:
+                self.result_refreshed.emit(key)
+        except Exception as e:
+            logger.warning(f"Could not revalidate cached result: {e}")
+        finally:
+            with self._lock:
+                self._refreshing.pop(key, None)
+
+    def wait(self, timeout: Optional[float] = None):
+        """Wait for background refreshes to finish (used on shutdown and in tests)."""
+        with self._lock:
+            threads = list(self._refreshing.values())
+        for thread in threads:
+            thread.join(timeout)
+
+    def clear(self):
+        """Drop every cached result of this database from both tiers."""
+        self.memory.invalidate_tags(f"db:{self.db_path}")
+        if self.disk is not None:
+            self.disk.clear(scope=self.db_path)
@@ -0,0 +1,176 @@
+"""
+Per-table write versions for TaskTitan.
+
+Every insert, update or delete on a tracked table bumps that table's counter
+in the table_versions table, through triggers installed by
+ensure_version_triggers(). Because the triggers run inside the writing
+transaction, writes from any connection or process are counted, including
+views that keep their own cursor.
+
+TableVersions reads the counters for a connection. It only re-reads them when
+PRAGMA data_version (writes by other connections) or the connection's
+total_changes (its own writes) has moved, so checking whether a cached query
+result is still current costs two cheap calls in the common case.
+
+Counters start again at 0 in a new database, so table_versions also holds a
+random database id. Version checks compare it too, and a database copied over
+another (an import or a restored backup) is given a new one with
+renew_database_id().
+"""
+
+import sqlite3
+from typing import Dict, Iterable, Optional, Tuple
+
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+VERSIONS_TABLE = 'table_versions'
+
+# Row of table_versions holding the random database id instead of a counter
+DATABASE_ID_KEY = '__database_id__'
+
+_TRIGGER_EVENTS = ('INSERT', 'UPDATE', 'DELETE')
+
+
+def _trackable_tables(conn) -> list:
+    """Return the tables that can carry version triggers (not virtual or internal)."""
+    rows = conn.execute("SELECT name, sql FROM sqlite_master WHERE type = 'table'").fetchall()
+    virtual = [name for name, sql in rows if sql and sql.upper().startswith('CREATE VIRTUAL TABLE')]
+    return [
+        name for name, _ in rows
+        if name != VERSIONS_TABLE and not name.startswith('sqlite_') and name not in virtual
+        # Shadow tables of virtual tables such as FTS indexes
+        and not any(name.startswith(f"{table}_") for table in virtual)
+    ]
+
+
+def ensure_version_triggers(conn, tables: Optional[Iterable[str]] = None) -> list:
+    """
+    Create table_versions and the triggers that keep it current.
+
+    SQLite triggers run for each row, so a bulk write bumps the counter once
+    per row; the counter row is tiny and stays in cache, so this is cheap.
+
+    Args:
+        conn: Connection or cursor of the database
+        tables: Tables to track; defaults to every ordinary table
+
+    Returns:
+        Names of the tables that are tracked
+    """
+    conn.execute(f"""
+        CREATE TABLE IF NOT EXISTS {VERSIONS_TABLE} (
+            name TEXT PRIMARY KEY,
+            version INTEGER NOT NULL DEFAULT 0
+        )
+    """)
+    conn.execute(
+        f"INSERT OR IGNORE INTO {VERSIONS_TABLE} (name, version) VALUES (?, random())", (DATABASE_ID_KEY,)
+    )
+    existing = {row[0] for row in conn.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'table'"
+    )}
+    tables = _trackable_tables(conn) if tables is None else [t for t in tables if t in existing]
+
+    tracked = []
+    for table in tables:
+        try:
+            conn.execute(f"INSERT OR IGNORE INTO {VERSIONS_TABLE} (name, version) VALUES (?, 0)", (table,))
+            for event in _TRIGGER_EVENTS:
+                conn.execute(f"""
+                    CREATE TRIGGER IF NOT EXISTS "{table}_version_{event.lower()}"
+                    AFTER {event} ON "{table}"
+                    BEGIN
+                        UPDATE {VERSIONS_TABLE} SET version = version + 1 WHERE name = '{table}';
+                    END
+                """)
+            tracked.append(table)
+        except sqlite3.Error as e:
+            logger.warning(f"Could not track writes to {table}: {e}")
+    return tracked
+
+
+def renew_database_id(db_path: str) -> bool:
+    """
+    Give a database a new random id, so versions read from the file it
+    replaced are never taken for its own.
+
+    Args:
+        db_path: Path of the database
+
+    Returns:
+        True if the database tracks versions and got a new id
+    """
+    try:
+        conn = sqlite3.connect(db_path, timeout=30)
+        try:
+            if not conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (VERSIONS_TABLE,)
+            ).fetchone():
+                return False
+            conn.execute(
+                f"INSERT OR REPLACE INTO {VERSIONS_TABLE} (name, version) VALUES (?, random())", (DATABASE_ID_KEY,)
+            )
+            conn.commit()
+            return True
+        finally:
+            conn.close()
+    except sqlite3.Error as e:
+        logger.warning(f"Could not renew the database id of {db_path}: {e}")
+        return False
+
+
+class TableVersions:
+    """Current write versions of the tables of one connection."""
+
+    def __init__(self, conn):
+        """
+        Initialize version tracking.
+
+        Args:
+            conn: Connection the versions are read on
+        """
+        self.conn = conn
+        self._state: Optional[Tuple[int, int]] = None
+        self._versions: Dict[str, int] = {}
+        self._tracked = set()
+        # Random id of the database the versions belong to, read with them
+        self.database_id: Optional[int] = None
+
+    def current(self, tables: Iterable[str]) -> Optional[tuple]:
+        """
+        Return the write versions of the given tables.
+
+        Tables seen for the first time get their triggers installed; if that
+        is not possible (for example on a read-only database), None is
+        returned and results depending on the tables should not be cached.
+
+        Args:
+            tables: Table names
+
+        Returns:
+            Tuple of versions in the order given, or None
+        """
+        tables = tuple(tables)
+        try:
+            untracked = [table for table in tables if table not in self._tracked]
+            if untracked:
+                in_transaction = self.conn.in_transaction
+                self._tracked.update(ensure_version_triggers(self.conn, untracked))
+                # Leave a transaction the caller had open for the caller to commit
+                if not in_transaction and self.conn.in_transaction:
+                    self.conn.commit()
+                self._state = None
+                if any(table not in self._tracked for table in tables):
+                    return None
+
+            state = (self.conn.execute("PRAGMA data_version").fetchone()[0], self.conn.total_changes)
+            if state != self._state:
+                self._versions = dict(self.conn.execute(f"SELECT name, version FROM {VERSIONS_TABLE}"))
+                self.database_id = self._versions.pop(DATABASE_ID_KEY, None)
+                self._state = state
+        except sqlite3.Error as e:
+            logger.debug(f"Table versions unavailable: {e}")
+            return None
+        return tuple(self._versions.get(table, 0) for table in tables)
@@ -2,11 +2,16 @@
 Icon resources for TaskTitan.
 
 This module provides functions to access and load icons used throughout the application.
+
+Icons are rendered from their SVG files once per size, device pixel ratio
+and tint, and kept in a cache: views asking for the same icon again get the
+cached QIcon or QPixmap without touching the filesystem or parsing SVG.
 """
 
 import os
 import sys
-from PyQt6.QtGui import QIcon, QPixmap
+from PyQt6.QtCore import QSize
+from PyQt6.QtGui import QColor, QGuiApplication, QIcon, QPainter, QPixmap
 
 # The resources directory - Handle PyInstaller's frozen state
 if getattr(sys, 'frozen', False):
@@ -17,9 +22,21 @@ else:
     RESOURCES_DIR = os.path.dirname(os.path.abspath(__file__))
 ICONS_DIR = os.path.join(RESOURCES_DIR, 'icons')
 
-# Dictionary to cache loaded icons
+# Sizes (in device-independent pixels) every icon is rasterized at on first use
+ICON_SIZES = (16, 18, 20, 24, 32, 48, 64)
+
+# Dictionary to cache loaded icons, keyed by (path, device pixel ratio, tint)
 _icon_cache = {}
 
+# SVG-backed icons the pixmaps are rendered from, keyed by path
+_svg_icons = {}
+
+# Dictionary to cache rendered pixmaps, keyed by (path, size, device pixel ratio, tint)
+_pixmap_cache = {}
+
+# Icon files present on disk, listed once
+_available_files = None
+
 # Define icon paths
 ICON_PATHS = {
     'dashboard': os.path.join(ICONS_DIR, 'dashboard.svg'),
@@ -44,42 +61,93 @@ ICON_PATHS = {
     'weekly_plan': os.path.join(ICONS_DIR, 'weekly.svg'),
 }
 
-def get_icon(name, fallback=None):
+def _resolve_path(name, fallback=None):
+    """Return the file of an icon or of its fallback, or None if neither exists."""
+    global _available_files
+    if _available_files is None:
+        try:
+            _available_files = set(os.listdir(ICONS_DIR))
+        except OSError:
+            _available_files = set()
+    for candidate in (name, fallback):
+        path = ICON_PATHS.get(candidate)
+        if path and os.path.basename(path) in _available_files:
+            return path
+    return None
+
+def _device_pixel_ratio():
+    app = QGuiApplication.instance()
+    return app.devicePixelRatio() if app else 1.0
+
+def _render(path, size, dpr, tint=None):
+    """Rasterize an SVG at size x size device-independent pixels, optionally tinted."""
+    key = (path, size, dpr, tint)
+    pixmap = _pixmap_cache.get(key)
+    if pixmap is None:
+        if size is None:
+            pixmap = QPixmap(path)
+        else:
+            source = _svg_icons.get(path)
+            if source is None:
+                source = _svg_icons[path] = QIcon(path)
+            pixmap = source.pixmap(QSize(size, size), dpr)
+        if tint and not pixmap.isNull():
+            painter = QPainter(pixmap)
+            painter.setCompositionMode(QPainter.CompositionMode.CompositionMode_SourceIn)
+            painter.fillRect(pixmap.rect(), QColor(tint))
+            painter.end()
+        _pixmap_cache[key] = pixmap
+    return pixmap
+
+def get_icon(name, fallback=None, tint=None):
     """
     Get an icon by name.
-    
+
     Args:
         name: The name of the icon to get
         fallback: Fallback icon name if the requested icon doesn't exist
-        
+        tint: Optional color (e.g. "#FFFFFF") to draw the icon in
+
     Returns:
         A QIcon object, or an empty QIcon if the icon doesn't exist
     """
-    if name in ICON_PATHS and os.path.exists(ICON_PATHS[name]):
-        return QIcon(ICON_PATHS[name])
-    elif fallback in ICON_PATHS and os.path.exists(ICON_PATHS[fallback]):
-        return QIcon(ICON_PATHS[fallback])
-    else:
+    path = _resolve_path(name, fallback)
+    if path is None:
         return QIcon()
 
-def get_pixmap(name, fallback=None):
+    dpr = _device_pixel_ratio()
+    key = (path, dpr, tint)
+    icon = _icon_cache.get(key)
+    if icon is None:
+        # Pre-rasterized sizes, so painting the icon never parses the SVG
+        icon = QIcon()
+        for size in ICON_SIZES:
+            icon.addPixmap(_render(path, size, dpr, tint))
+        _icon_cache[key] = icon
+    return icon
+
+def get_pixmap(name, fallback=None, size=None, tint=None):
     """
     Get a pixmap by name.
-    
+
     Args:
         name: The name of the pixmap to get
         fallback: Fallback pixmap name if the requested pixmap doesn't exist
-        
+        size: Optional size in device-independent pixels; the SVG's own size if None
+        tint: Optional color (e.g. "#FFFFFF") to draw the pixmap in
+
     Returns:
         A QPixmap object, or an empty QPixmap if the pixmap doesn't exist
     """
-    if name in ICON_PATHS and os.path.exists(ICON_PATHS[name]):
-        return QPixmap(ICON_PATHS[name])
-    elif fallback in ICON_PATHS and os.path.exists(ICON_PATHS[fallback]):
-        return QPixmap(ICON_PATHS[fallback])
-    else:
+    path = _resolve_path(name, fallback)
+    if path is None:
         return QPixmap()
+    return _render(path, size, _device_pixel_ratio() if size is not None else None, tint)
 
 def clear_cache():
     """Clear the icon cache."""
-    _icon_cache.clear() 
\ No newline at end of file
+    global _available_files
+    _icon_cache.clear()
+    _svg_icons.clear()
+    _pixmap_cache.clear()
+    _available_files = None
@@ -1,7 +1,8 @@
 from __future__ import annotations
 
 import os
-from typing import Dict, Callable, Tuple
+from functools import lru_cache
+from typing import Dict, Callable, Optional, Tuple
 
 from PyQt6.QtCore import QSettings
 from PyQt6.QtWidgets import QApplication
@@ -551,6 +552,16 @@ def build_theme_qss(p: Dict[str, str]) -> str:
     """
 
 
+@lru_cache(maxsize=16)
+def _compile_theme_qss(palette_items: Tuple[Tuple[str, str], ...]) -> str:
+    return build_theme_qss(dict(palette_items))
+
+
+def compiled_theme_qss(p: Dict[str, str]) -> str:
+    """Return build_theme_qss(p), generated once per distinct palette."""
+    return _compile_theme_qss(tuple(sorted(p.items())))
+
+
 class ThemeManager:
     """Centralized theme management for TaskTitan with consistent QSS generator.
 
@@ -560,6 +571,13 @@ class ThemeManager:
     _THEMES: Dict[str, Callable[[], str]] = {}
     _PALETTES: Dict[str, Dict[str, str]] = {}
 
+    # Saved selection, resolved theme names and colors, kept until the theme
+    # changes so get_color() does not read QSettings or query the OS
+    _selection: Optional[Tuple[str, bool]] = None
+    _resolved_names: Dict[Optional[bool], str] = {}
+    _colors: Dict[Tuple[str, Optional[bool]], str] = {}
+    _watching_system = False
+
     @classmethod
     def _init_registry(cls) -> None:
         if cls._THEMES:
@@ -639,10 +657,10 @@ class ThemeManager:
             "success": "#50FA7B",
         }
 
-        cls._THEMES["Light"] = lambda: build_theme_qss(light)
-        cls._THEMES["Dark"] = lambda: build_theme_qss(dark)
-        cls._THEMES["Nord"] = lambda: build_theme_qss(nord)
-        cls._THEMES["Dracula"] = lambda: build_theme_qss(dracula)
+        cls._THEMES["Light"] = lambda: compiled_theme_qss(light)
+        cls._THEMES["Dark"] = lambda: compiled_theme_qss(dark)
+        cls._THEMES["Nord"] = lambda: compiled_theme_qss(nord)
+        cls._THEMES["Dracula"] = lambda: compiled_theme_qss(dracula)
         
         # Store palettes for programmatic access
         cls._PALETTES["Light"] = light
@@ -659,12 +677,21 @@ class ThemeManager:
     def _settings(cls) -> QSettings:
         return QSettings("TaskTitan", "TaskTitan")
 
+    @classmethod
+    def invalidate_cache(cls) -> None:
+        """Forget the cached selection, theme names and colors."""
+        cls._selection = None
+        cls._resolved_names = {}
+        cls._colors = {}
+
     @classmethod
     def get_saved_selection(cls) -> Tuple[str, bool]:
-        s = cls._settings()
-        theme = s.value("theme/name", "Light")
-        follow = s.value("theme/follow_system", True, type=bool)
-        return theme, follow
+        if cls._selection is None:
+            s = cls._settings()
+            theme = s.value("theme/name", "Light")
+            follow = s.value("theme/follow_system", True, type=bool)
+            cls._selection = (theme, follow)
+        return cls._selection
 
     @classmethod
     def save_selection(cls, theme_name: str, follow_system: bool) -> None:
@@ -672,6 +699,7 @@ class ThemeManager:
         s.setValue("theme/name", theme_name)
         s.setValue("theme/follow_system", follow_system)
         s.sync()
+        cls.invalidate_cache()
 
     @classmethod
     def apply_saved_theme(cls, app: QApplication) -> None:
@@ -688,20 +716,36 @@ class ThemeManager:
         else:
             chosen = theme_name
 
+        cls.invalidate_cache()
+        if follow_system or theme_name == "System (Auto)":
+            cls._watch_system_scheme(app)
+
         loader = cls._THEMES.get(chosen)
         qss = loader() if loader else ""
-        # Always reapply full stylesheet to ensure switching works even if the same theme is chosen twice
-        app.setStyleSheet("")
-        try:
-            app.setStyleSheet(qss)
-        except Exception:
-            app.setStyleSheet("")
+        # Setting the application stylesheet restyles every widget, so skip it
+        # when the theme is already applied; inline overrides are still cleared
+        restyled = app.styleSheet() != qss
+        if restyled:
+            try:
+                app.setStyleSheet(qss)
+            except Exception:
+                app.setStyleSheet("")
 
         try:
-            cls._normalize_and_repolish(app)
+            cls._normalize_and_repolish(app, restyled)
         except Exception:
             pass
 
+    @classmethod
+    def _watch_system_scheme(cls, app: QApplication) -> None:
+        """Re-apply the saved theme when the OS switches between light and dark."""
+        if cls._watching_system:
+            return
+        hints = app.styleHints()
+        if hasattr(hints, "colorSchemeChanged"):  # Qt 6.5+
+            hints.colorSchemeChanged.connect(lambda _scheme: cls.apply_saved_theme(app))
+            cls._watching_system = True
+
     @classmethod
     def toggle_dark_light(cls, app: QApplication) -> None:
         current, follow = cls.get_saved_selection()
@@ -715,17 +759,19 @@ class ThemeManager:
     def get_current_theme_name(cls, follow_system: bool = None) -> str:
         """Get the current active theme name."""
         cls._init_registry()
+        cached = cls._resolved_names.get(follow_system)
+        if cached is not None:
+            return cached
+        requested = follow_system
         if follow_system is None:
             _, follow_system = cls.get_saved_selection()
         
-        if follow_system:
-            use_dark = bool(darkdetect.isDark())
-            return "Dark" if use_dark else "Light"
-        
         theme_name, _ = cls.get_saved_selection()
-        if theme_name == "System (Auto)":
+        if follow_system or theme_name == "System (Auto)":
             use_dark = bool(darkdetect.isDark())
-            return "Dark" if use_dark else "Light"
+            theme_name = "Dark" if use_dark else "Light"
+        
+        cls._resolved_names[requested] = theme_name
         return theme_name
     
     @classmethod
@@ -748,11 +794,22 @@ class ThemeManager:
         Returns:
             Hex color string (e.g., "#FFFFFF")
         """
-        palette = cls.get_current_palette(follow_system)
-        return _hex(palette.get(color_key, palette.get("text", "#000000")))
+        cache_key = (color_key, follow_system)
+        color = cls._colors.get(cache_key)
+        if color is None:
+            cls._init_registry()
+            palette = cls._PALETTES.get(cls.get_current_theme_name(follow_system), cls._PALETTES["Light"])
+            color = cls._colors[cache_key] = _hex(palette.get(color_key, palette.get("text", "#000000")))
+        return color
     
     @classmethod
-    def _normalize_and_repolish(cls, app: QApplication) -> None:
+    def _normalize_and_repolish(cls, app: QApplication, restyled: bool = True) -> None:
+        """Clear inline color overrides and repolish what needs it.
+        
+        Setting the application stylesheet already repolishes every widget,
+        and so does clearing a widget's own stylesheet, so only top-level
+        windows are repolished explicitly (and only when nothing else did).
+        """
         from PyQt6.QtWidgets import QWidget
 
         clear_object_names = {
@@ -770,20 +827,20 @@ class ThemeManager:
             try:
                 if not isinstance(w, QWidget):
                     continue
-                obj = w.objectName() or ""
-                ss = w.styleSheet() if hasattr(w, "styleSheet") else ""
+                ss = w.styleSheet()
                 if not ss:
                     continue
+                obj = w.objectName() or ""
                 if (obj in clear_object_names) or ("background" in ss or "color:" in ss or "qlineargradient" in ss or "border:" in ss):
                     w.setStyleSheet("")
             except Exception:
                 continue
 
-        for w in app.allWidgets():
+        for w in app.topLevelWidgets():
             try:
-                w.style().unpolish(w)
-                w.style().polish(w)
+                if not restyled:
+                    w.style().unpolish(w)
+                    w.style().polish(w)
                 w.update()
             except Exception:
                 continue
-
@@ -2,7 +2,7 @@
 Utility modules for TaskTitan.
 """
 
-from app.utils.logger import get_logger, setup_logging, TaskTitanLogger
+from app.utils.logger import get_logger, setup_logging, TaskTitanLogger, log_duration
 from app.utils.error_handler import (
     GlobalExceptionHandler,
     ErrorReportDialog,
@@ -16,6 +16,7 @@ __all__ = [
     'get_logger',
     'setup_logging',
     'TaskTitanLogger',
+    'log_duration',
     'GlobalExceptionHandler',
     'ErrorReportDialog',
     'handle_database_error',
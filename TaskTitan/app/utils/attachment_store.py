@@ -0,0 +1,415 @@
+"""
+Content-addressed attachment store for TaskTitan.
+
+Journal attachments are stored once, under the SHA-256 of their contents:
+
+    data/attachments/store/<first two hex digits>/<sha256>
+
+The per-date and per-category folders hold hardlinks to the stored file, so
+attaching the same file twice, or showing it under a category, takes no extra
+space. Each journal_attachments row records the content hash of its file; the
+stored file is deleted once no row refers to it any more. Stored files are
+read-only, so editing an attachment in place cannot change every entry that
+shares its contents.
+
+Files are copied in large blocks and hashed in the same pass, on a worker
+thread when imported through AttachmentImport.
+"""
+
+import hashlib
+import mimetypes
+import os
+import re
+import shutil
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import datetime
+from typing import Callable, Dict, Optional
+
+from PyQt6.QtCore import QObject, pyqtSignal
+from PyQt6.QtGui import QImageReader
+from app.utils.logger import get_logger
+from app.utils.db_utils import get_attachments_dir, create_category_shortcut, remove_file
+
+logger = get_logger(__name__)
+
+# Read/write block size for copying attachments
+COPY_BUFFER_SIZE = 1024 * 1024
+
+# Progress is reported after every this many bytes copied
+PROGRESS_INTERVAL = 8 * COPY_BUFFER_SIZE
+
+_HASH_RE = re.compile(r'^[0-9a-f]{64}$')
+
+# Stored files younger than this are left alone by garbage collection; an
+# import in progress, or one whose row is not inserted yet, is not garbage
+GARBAGE_MIN_AGE_SECONDS = 24 * 60 * 60
+
+# Permissions of stored files
+READ_ONLY_MODE = 0o444
+
+
+class AttachmentCopyCancelled(Exception):
+    """Raised when an attachment import is cancelled."""
+
+
+def ensure_attachment_schema(cursor):
+    """Create journal_attachments with its content columns, adding any that are missing."""
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS journal_attachments (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            date TEXT NOT NULL,
+            file_path TEXT NOT NULL,
+            category TEXT,
+            shortcut_path TEXT,
+            content_hash TEXT,
+            size INTEGER,
+            mime_type TEXT,
+            width INTEGER,
+            height INTEGER
+        )
+    """)
+    cursor.execute("PRAGMA table_info(journal_attachments)")
+    columns = {row[1] for row in cursor.fetchall()}
+    for column, column_type in (('category', 'TEXT'), ('shortcut_path', 'TEXT'),
+                                ('content_hash', 'TEXT'), ('size', 'INTEGER'), ('mime_type', 'TEXT'),
+                                ('width', 'INTEGER'), ('height', 'INTEGER')):
+        if column not in columns:
+            cursor.execute(f"ALTER TABLE journal_attachments ADD COLUMN {column} {column_type}")
+    # Reference counts, day listings and category listings each use one of these
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_journal_attachments_hash ON journal_attachments(content_hash)"
+    )
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_journal_attachments_date ON journal_attachments(date)")
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_journal_attachments_category ON journal_attachments(category)"
+    )
+
+
+def describe_file(file_path: str) -> Dict:
+    """
+    Read the metadata indexed for an attachment.
+
+    Image dimensions come from the image header; the image is not decoded.
+
+    Returns:
+        Dictionary with mime_type, width and height (None when not an image)
+    """
+    mime_type = mimetypes.guess_type(file_path)[0] or 'application/octet-stream'
+    width = height = None
+    if mime_type.startswith('image/'):
+        size = QImageReader(file_path).size()
+        if size.isValid():
+            width, height = size.width(), size.height()
+    return {'mime_type': mime_type, 'width': width, 'height': height}
+
+
+def copy_and_hash(source: str, destination: str,
+                  progress: Optional[Callable[[int, int], None]] = None,
+                  should_stop: Optional[Callable[[], bool]] = None) -> tuple:
+    """
+    Copy a file in large blocks, hashing it in the same pass.
+
+    Args:
+        source: File to copy
+        destination: File to write
+        progress: Optional callable receiving (bytes copied, total bytes)
+        should_stop: Optional callable; returning True cancels the copy
+
+    Returns:
+        Tuple of (sha256 hex digest, size in bytes)
+    """
+    total = os.path.getsize(source)
+    file_hash = hashlib.sha256()
+    buffer = bytearray(COPY_BUFFER_SIZE)
+    view = memoryview(buffer)
+    copied = 0
+    next_report = PROGRESS_INTERVAL
+
+    with open(source, 'rb', buffering=0) as src, open(destination, 'wb') as dst:
+        while True:
+            if should_stop and should_stop():
+                raise AttachmentCopyCancelled(source)
+            read = src.readinto(buffer)
+            if not read:
+                break
+            block = view[:read]
+            file_hash.update(block)
+            dst.write(block)
+            copied += read
+            if progress and copied >= next_report:
+                progress(copied, total)
+                next_report = copied + PROGRESS_INTERVAL
+
+    if progress:
+        progress(copied, total)
+    return file_hash.hexdigest(), copied
+
+
+def link_file(source: str, link_path: str) -> str:
+    """
+    Make link_path refer to source: a hardlink where the file system allows
+    it, otherwise a symbolic link, otherwise a copy.
+
+    Returns:
+        link_path
+    """
+    try:
+        os.link(source, link_path)
+        return link_path
+    except OSError as e:
+        logger.debug(f"Hardlink not possible for {link_path}: {e}")
+    try:
+        os.symlink(source, link_path)
+    except OSError:
+        shutil.copy2(source, link_path)
+    return link_path
+
+
+class AttachmentStore:
+    """Stores attachment contents once per SHA-256 hash."""
+
+    def __init__(self, store_dir: Optional[str] = None):
+        """
+        Initialize the store.
+
+        Args:
+            store_dir: Directory holding the stored files; defaults to
+                data/attachments/store
+        """
+        self.store_dir = store_dir or os.path.join(get_attachments_dir(), 'store')
+        os.makedirs(self.store_dir, exist_ok=True)
+
+    def blob_path(self, digest: str) -> str:
+        """Return the path of the stored file for a content hash."""
+        return os.path.join(self.store_dir, digest[:2], digest)
+
+    def add_file(self, source: str, progress=None, should_stop=None) -> Dict:
+        """
+        Copy a file into the store unless its contents are already there.
+
+        Args:
+            source: File to add
+            progress: Optional callable receiving (bytes copied, total bytes)
+            should_stop: Optional callable; returning True cancels the copy
+
+        Returns:
+            Dictionary with content_hash, blob_path, size and deduplicated
+        """
+        temp_path = os.path.join(self.store_dir, f".incoming-{uuid.uuid4().hex}")
+        try:
+            digest, size = copy_and_hash(source, temp_path, progress, should_stop)
+            blob_path = self.blob_path(digest)
+            deduplicated = os.path.exists(blob_path)
+            if deduplicated:
+                os.remove(temp_path)
+            else:
+                os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+                os.replace(temp_path, blob_path)
+            # Hardlinks share the file, so an in-place edit of one link
+            # would change every attachment with these contents
+            os.chmod(blob_path, READ_ONLY_MODE)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+        return {
+            'content_hash': digest,
+            'blob_path': blob_path,
+            'size': size,
+            'deduplicated': deduplicated,
+        }
+
+    def release(self, cursor, digest: Optional[str]) -> bool:
+        """
+        Delete a stored file if no journal_attachments row refers to it.
+
+        Returns:
+            True if the stored file was deleted
+        """
+        if not digest:
+            return False
+        cursor.execute("SELECT COUNT(*) FROM journal_attachments WHERE content_hash = ?", (digest,))
+        if cursor.fetchone()[0] > 0:
+            return False
+        blob_path = self.blob_path(digest)
+        try:
+            remove_file(blob_path)
+            logger.debug(f"Removed unreferenced attachment {digest}")
+            return True
+        except FileNotFoundError:
+            return False
+        except OSError as e:
+            logger.warning(f"Could not remove stored attachment {digest}: {e}")
+            return False
+
+    def collect_garbage(self, cursor, other_databases=(),
+                        min_age_seconds: float = GARBAGE_MIN_AGE_SECONDS) -> int:
+        """
+        Delete stored files that no journal_attachments row refers to,
+        and leftovers of interrupted imports.
+
+        Args:
+            cursor: Cursor on the database whose attachments are kept
+            other_databases: Paths of other databases sharing the store;
+                their attachments are kept too
+            min_age_seconds: Files modified more recently than this are kept
+
+        Returns:
+            Number of files removed
+        """
+        cursor.execute("SELECT DISTINCT content_hash FROM journal_attachments WHERE content_hash IS NOT NULL")
+        referenced = {row[0] for row in cursor.fetchall()}
+        for db_path in other_databases:
+            if not os.path.exists(db_path):
+                continue
+            try:
+                conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+                try:
+                    referenced.update(row[0] for row in conn.execute(
+                        "SELECT DISTINCT content_hash FROM journal_attachments WHERE content_hash IS NOT NULL"
+                    ))
+                finally:
+                    conn.close()
+            except sqlite3.Error as e:
+                if 'no such table' in str(e):
+                    continue
+                # Without its references any file could still be in use
+                logger.warning(f"Skipping attachment garbage collection, could not read {db_path}: {e}")
+                return 0
+
+        cutoff = time.time() - min_age_seconds
+        removed = 0
+        for root, _, filenames in os.walk(self.store_dir):
+            for filename in filenames:
+                if filename in referenced or not (_HASH_RE.match(filename) or filename.startswith('.incoming-')):
+                    continue
+                file_path = os.path.join(root, filename)
+                try:
+                    if os.path.getmtime(file_path) > cutoff:
+                        continue
+                    remove_file(file_path)
+                    removed += 1
+                except OSError as e:
+                    logger.warning(f"Could not remove stored attachment {filename}: {e}")
+        if removed:
+            logger.info(f"Attachment store garbage collection removed {removed} files")
+        return removed
+
+
+def store_attachment(file_path: str, date_str: Optional[str] = None, category: Optional[str] = None,
+                     filename: Optional[str] = None, store: Optional[AttachmentStore] = None,
+                     progress=None, should_stop=None) -> Dict:
+    """
+    Add a file to the attachment store and link it into the date folder
+    and, if given, the category folder.
+
+    Args:
+        file_path: File to attach
+        date_str: Date string in 'yyyy-MM-dd' format for the date folder
+        category: Optional category for the category folder link
+        filename: Optional name for the links; defaults to a timestamped source name
+        store: Store to use; defaults to the application store
+        progress: Optional callable receiving (bytes copied, total bytes)
+        should_stop: Optional callable; returning True cancels the copy
+
+    Returns:
+        Dictionary with file_path (date folder link), shortcut_path,
+        content_hash, size, deduplicated, mime_type, width and height
+    """
+    store = store or AttachmentStore()
+    stored = store.add_file(file_path, progress, should_stop)
+
+    if not filename:
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        filename = f"{timestamp}_{os.path.basename(file_path)}"
+
+    date_dir = get_attachments_dir(date_str=date_str)
+    os.makedirs(date_dir, exist_ok=True)
+    date_path = os.path.join(date_dir, filename)
+    base, ext = os.path.splitext(filename)
+    counter = 1
+    while os.path.lexists(date_path):
+        date_path = os.path.join(date_dir, f"{base}_{counter}{ext}")
+        counter += 1
+    link_file(stored['blob_path'], date_path)
+
+    shortcut_path = None
+    if category and not re.match(r'^\d{4}$', category):
+        shortcut_path = create_category_shortcut(date_path, category, os.path.basename(date_path))
+
+    if stored['deduplicated']:
+        logger.info(f"Attachment {os.path.basename(file_path)} already stored as {stored['content_hash']}")
+    result = {
+        'file_path': date_path,
+        'shortcut_path': shortcut_path,
+        'content_hash': stored['content_hash'],
+        'size': stored['size'],
+        'deduplicated': stored['deduplicated'],
+    }
+    result.update(describe_file(date_path))
+    return result
+
+
+class AttachmentImport(QObject):
+    """Stores an attachment on a background thread, reporting progress."""
+
+    progress = pyqtSignal('qint64', 'qint64')  # Emits (bytes copied, total bytes)
+    finished = pyqtSignal(bool, dict)  # Emits (success, result of store_attachment or {'error': message})
+
+    def __init__(self, file_path: str, date_str: Optional[str] = None, category: Optional[str] = None,
+                 parent=None):
+        """Initialize the import of one file."""
+        super().__init__(parent)
+        self.file_path = file_path
+        self.date_str = date_str
+        self.category = category
+        self._cancelled = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> bool:
+        """
+        Start the import.
+
+        Returns:
+            True if started, False if it is already running
+        """
+        if self.is_running():
+            return False
+        self._cancelled.clear()
+        self._thread = threading.Thread(target=self.run, name="TaskTitanAttachmentImport", daemon=True)
+        self._thread.start()
+        return True
+
+    def cancel(self):
+        """Ask a running import to stop."""
+        self._cancelled.set()
+
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Wait for the import; returns True if it is no longer running."""
+        if self._thread is not None:
+            self._thread.join(timeout)
+        return not self.is_running()
+
+    def run(self) -> Dict:
+        """Run the import on the calling thread and emit finished."""
+        try:
+            result = store_attachment(
+                self.file_path, date_str=self.date_str, category=self.category,
+                progress=self.progress.emit, should_stop=self._cancelled.is_set
+            )
+        except AttachmentCopyCancelled:
+            logger.info(f"Attachment import cancelled: {self.file_path}")
+            result = {'error': 'cancelled'}
+        except Exception as e:
+            logger.error(f"Error importing attachment {self.file_path}: {e}", exc_info=True)
+            result = {'error': str(e)}
+
+        self.finished.emit('error' not in result, result)
+        return result
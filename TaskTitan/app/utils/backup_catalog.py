@@ -0,0 +1,147 @@
+"""
+Backup catalog for TaskTitan.
+
+Persistent JSON index of the backups in the backups directory. Size,
+timestamp, verification result and content hash are recorded when a backup
+is created or verified, so listing backups never has to open or hash them.
+"""
+
+import json
+import os
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+CATALOG_FILENAME = 'backup_catalog.json'
+CATALOG_VERSION = 1
+
+
+class BackupCatalog:
+    """Thread-safe catalog of backups keyed by backup path."""
+
+    def __init__(self, catalog_path: str):
+        """
+        Initialize the catalog.
+
+        Args:
+            catalog_path: JSON file holding the catalog
+        """
+        self.catalog_path = catalog_path
+        self._lock = threading.RLock()
+        self._entries: Dict[str, Dict] = {}
+        self.loaded_from_disk = False
+        # While batch() is active, changes are written once when it ends
+        self._batch_depth = 0
+        self._dirty = False
+        self._load()
+
+    def _load(self):
+        """Load entries from disk; a missing or unreadable catalog starts empty."""
+        if not os.path.exists(self.catalog_path):
+            return
+        try:
+            with open(self.catalog_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self._entries = {entry['path']: entry for entry in data.get('backups', [])}
+            self.loaded_from_disk = True
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Could not read backup catalog, rebuilding it: {e}")
+            self._entries = {}
+
+    @contextmanager
+    def batch(self):
+        """Group several changes into a single write of the catalog."""
+        with self._lock:
+            self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            with self._lock:
+                self._batch_depth -= 1
+                if self._batch_depth == 0 and self._dirty:
+                    self.save()
+
+    def _changed(self):
+        """Write the catalog now, or when the current batch ends."""
+        # Called with the lock held
+        if self._batch_depth:
+            self._dirty = True
+        else:
+            self.save()
+
+    def save(self):
+        """Write the catalog atomically."""
+        with self._lock:
+            self._dirty = False
+            data = {'version': CATALOG_VERSION, 'backups': list(self._entries.values())}
+            temp_path = f"{self.catalog_path}.tmp"
+            try:
+                with open(temp_path, 'w', encoding='utf-8') as f:
+                    json.dump(data, f, indent=2)
+                os.replace(temp_path, self.catalog_path)
+            except OSError as e:
+                logger.error(f"Could not save backup catalog: {e}", exc_info=True)
+
+    def record(self, path: str, size: int, created: datetime, verified: Optional[bool],
+               sha256: Optional[str] = None, backup_format: str = 'file'):
+        """
+        Add or replace the entry for a backup.
+
+        Args:
+            path: Backup file (or store manifest) path
+            size: Size of the backed-up database in bytes
+            created: Creation time
+            verified: Verification result, or None if not verified yet
+            sha256: Content hash of the backed-up database
+            backup_format: 'file' or 'chunked'
+        """
+        with self._lock:
+            self._entries[path] = {
+                'path': path,
+                'filename': os.path.basename(path),
+                'size': size,
+                'created': created.isoformat(timespec='seconds'),
+                'verified': verified,
+                'verified_at': datetime.now().isoformat(timespec='seconds') if verified is not None else None,
+                'sha256': sha256,
+                'format': backup_format,
+            }
+            self._changed()
+
+    def set_verified(self, path: str, verified: bool):
+        """Store the result of a re-verification."""
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is None:
+                return
+            entry['verified'] = verified
+            entry['verified_at'] = datetime.now().isoformat(timespec='seconds')
+            self._changed()
+
+    def remove(self, paths):
+        """Drop the entries for the given backup paths."""
+        with self._lock:
+            removed = [self._entries.pop(path, None) for path in paths]
+            if any(entry is not None for entry in removed):
+                self._changed()
+
+    def get(self, path: str) -> Optional[Dict]:
+        with self._lock:
+            entry = self._entries.get(path)
+            return dict(entry) if entry else None
+
+    def paths(self) -> List[str]:
+        with self._lock:
+            return list(self._entries)
+
+    def entries(self) -> List[Dict]:
+        """Return copies of all entries, newest first."""
+        with self._lock:
+            entries = [dict(entry) for entry in self._entries.values()]
+        entries.sort(key=lambda e: e['created'], reverse=True)
+        return entries
@@ -5,33 +5,74 @@ This module provides automatic backup scheduling, backup verification,
 retention policies, and recovery mechanisms.
 """
 
+import hashlib
 import os
-import shutil
 import sqlite3
+import threading
+import time
 from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Optional, List, Tuple, Dict
 from PyQt6.QtCore import QTimer, QObject, pyqtSignal
 from app.utils.logger import get_logger
 from app.models.database import get_db_path
+from app.models.archive import ArchiveManager, get_archive_path, history_lock
+from app.models.table_versions import renew_database_id
 from app.utils.db_utils import get_backups_dir
 from app.core.config import get_config
 from app.utils.security import get_file_hash
+from app.utils.backup_store import BackupStore, MANIFEST_SUFFIX
+from app.utils.backup_catalog import BackupCatalog, CATALOG_FILENAME
+from app.utils.cache import CacheManager
+from app.utils.disk_cache import get_disk_cache
 
 logger = get_logger(__name__)
 
+# Pages copied per step of the SQLite online backup. Between steps the source
+# database is unlocked, so writers are only ever held up for one batch.
+BACKUP_PAGES_PER_STEP = 1024
+
+# Pause between backup steps, giving other threads and writers a turn
+BACKUP_STEP_PAUSE = 0.001
+
+# Bytes hashed, and SQLite instructions run, between checks whether a
+# verification should stop
+VERIFY_READ_SIZE = 1024 * 1024
+VERIFY_PROGRESS_INSTRUCTIONS = 10000
+
+# A file backup's copy of the history archive is stored next to it under
+# the backup's name plus this suffix
+ARCHIVE_BACKUP_SUFFIX = '.archive'
+
+# Held while a backup is created, by any BackupManager: backups share the
+# catalog, the backup store and the retention cleanup
+_backup_lock = threading.Lock()
+
 
 class BackupManager(QObject):
     """Manages automatic backups and backup operations."""
     
     backup_completed = pyqtSignal(str)  # Emits backup path when completed
     backup_failed = pyqtSignal(str)  # Emits error message when failed
+    backup_progress = pyqtSignal(int, int)  # Emits (pages copied, total pages)
+    verification_finished = pyqtSignal(int, int)  # Emits (backups checked, backups failed)
     
-    def __init__(self, parent=None):
-        """Initialize backup manager."""
+    def __init__(self, parent=None, db_path: Optional[str] = None, backups_dir: Optional[str] = None):
+        """
+        Initialize backup manager.
+        
+        Args:
+            parent: Optional parent object
+            db_path: Database to back up; defaults to the application database
+            backups_dir: Directory holding the backups; defaults to the application's
+        """
         super().__init__(parent)
-        self.db_path = get_db_path()
-        self.backups_dir = get_backups_dir()
+        self.db_path = db_path or get_db_path()
+        self.backups_dir = backups_dir or get_backups_dir()
+        self._backup_thread: Optional[threading.Thread] = None
+        self._backup_store: Optional[BackupStore] = None
+        self._catalog: Optional[BackupCatalog] = None
+        self._verify_thread: Optional[threading.Thread] = None
         self.auto_backup_timer = QTimer(self)
         self.auto_backup_timer.timeout.connect(self.perform_auto_backup)
         self._setup_auto_backup()
@@ -49,12 +90,28 @@ class BackupManager(QObject):
         """
         Create a backup of the database.
         
+        The copy is taken with the SQLite online backup API, so it is a
+        consistent snapshot even while the database is in WAL mode and in use.
+        This call blocks; use create_backup_async from the UI thread.
+        
         Args:
             custom_name: Optional custom name for the backup
             
         Returns:
             Tuple of (success, backup_path_or_error_message)
         """
+        if not _backup_lock.acquire(blocking=False):
+            error = "Backup already in progress"
+            logger.warning(error)
+            self.backup_failed.emit(error)
+            return False, error
+        try:
+            return self._create_backup(custom_name)
+        finally:
+            _backup_lock.release()
+    
+    def _create_backup(self, custom_name: Optional[str]) -> Tuple[bool, Optional[str]]:
+        """Create a backup; the caller holds _backup_lock."""
         try:
             if not os.path.exists(self.db_path):
                 error = "Database file not found"
@@ -71,19 +128,41 @@ class BackupManager(QObject):
             
             backup_path = os.path.join(self.backups_dir, backup_filename)
             
-            # Create backup
-            shutil.copy2(self.db_path, backup_path)
-            
-            # Verify backup
-            if not self._verify_backup(backup_path):
+            # Create backup, together with the archive of old history
+            error, archive_backup = self._copy_with_archive(backup_path, self._emit_progress)
+            if error is None and not self._verify_backup(backup_path):
                 error = "Backup verification failed"
+                self._remove_backup_file(backup_path)
+            if error:
                 logger.error(error)
-                os.remove(backup_path)
                 self.backup_failed.emit(error)
                 return False, error
             
-            # Get backup metadata
-            backup_size = os.path.getsize(backup_path)
+            # In chunked mode the snapshot is folded into the backup store
+            # and the manifest becomes the backup
+            if self._use_backup_store():
+                snapshot_path = backup_path
+                backup_name = os.path.splitext(backup_filename)[0]
+                store = self.get_backup_store()
+                try:
+                    manifest = store.add_backup(snapshot_path, backup_name, archive_path=archive_backup)
+                finally:
+                    self._remove_backup_file(snapshot_path)
+                backup_path = store.manifest_path(backup_name)
+                backup_size = manifest['size']
+                backup_hash = manifest['sha256']
+                backup_format = 'chunked'
+            else:
+                backup_size = os.path.getsize(backup_path)
+                backup_hash = get_file_hash(backup_path, 'sha256')
+                backup_format = 'file'
+            
+            # The snapshot passed quick_check and the table check above, so
+            # it goes into the catalog as verified
+            self.get_catalog().record(
+                backup_path, backup_size, datetime.now(), True,
+                sha256=backup_hash, backup_format=backup_format
+            )
             logger.info(f"Created backup: {backup_path} ({backup_size} bytes)")
             
             self.backup_completed.emit(backup_path)
@@ -99,6 +178,149 @@ class BackupManager(QObject):
             self.backup_failed.emit(error)
             return False, error
     
+    def create_backup_async(self, custom_name: Optional[str] = None) -> bool:
+        """
+        Create a backup on a background thread.
+        
+        Progress is reported through backup_progress and the outcome through
+        backup_completed or backup_failed; Qt delivers these to receivers on
+        the UI thread.
+        
+        Args:
+            custom_name: Optional custom name for the backup
+            
+        Returns:
+            True if the backup was started, False if one is already running
+        """
+        if self.is_backup_running():
+            logger.warning("Backup already in progress")
+            return False
+        
+        self._backup_thread = threading.Thread(
+            target=self.create_backup,
+            args=(custom_name,),
+            name="TaskTitanBackup",
+            daemon=True
+        )
+        self._backup_thread.start()
+        return True
+    
+    def get_backup_store(self) -> BackupStore:
+        """Get the deduplicating backup store, creating it on first use."""
+        if self._backup_store is None:
+            self._backup_store = BackupStore(os.path.join(self.backups_dir, 'store'))
+        return self._backup_store
+    
+    def get_catalog(self) -> BackupCatalog:
+        """Get the backup catalog for the current backups directory."""
+        catalog_path = os.path.join(self.backups_dir, CATALOG_FILENAME)
+        if self._catalog is None or self._catalog.catalog_path != catalog_path:
+            self._catalog = BackupCatalog(catalog_path)
+        return self._catalog
+    
+    def _use_backup_store(self) -> bool:
+        """Check whether new backups go to the chunked backup store."""
+        return get_config('backup.backup_format', 'file') == 'chunked'
+    
+    @staticmethod
+    def _is_store_backup(backup_path: str) -> bool:
+        """Check whether a backup path refers to a backup store manifest."""
+        return backup_path.endswith(MANIFEST_SUFFIX)
+    
+    def is_backup_running(self) -> bool:
+        """Check whether a backup, in the background or not, is in progress."""
+        return _backup_lock.locked() or (self._backup_thread is not None and self._backup_thread.is_alive())
+    
+    def wait_for_backup(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait for a background backup to finish.
+        
+        Returns:
+            True if no backup is running when this returns
+        """
+        if self._backup_thread is not None:
+            self._backup_thread.join(timeout)
+        return not self.is_backup_running()
+    
+    def _emit_progress(self, remaining: int, total: int):
+        """Report backup progress as pages copied out of the total."""
+        self.backup_progress.emit(total - remaining, total)
+    
+    def _copy_database(self, source_path: str, target_path: str, progress=None) -> Optional[str]:
+        """
+        Copy a database with the SQLite online backup API.
+        
+        The copy is written to a temporary file and checked with
+        PRAGMA quick_check before it replaces target_path, so an interrupted
+        or damaged copy never appears under the target name.
+        
+        Args:
+            source_path: Database to copy
+            target_path: Destination file
+            progress: Optional callable(remaining_pages, total_pages)
+            
+        Returns:
+            None on success, otherwise an error message
+        """
+        temp_path = f"{target_path}.partial"
+        
+        def on_step(status, remaining, total):
+            if progress:
+                progress(remaining, total)
+            time.sleep(BACKUP_STEP_PAUSE)
+        
+        source = sqlite3.connect(source_path, timeout=30)
+        try:
+            target = sqlite3.connect(temp_path)
+            try:
+                source.backup(target, pages=BACKUP_PAGES_PER_STEP, progress=on_step)
+                result = target.execute("PRAGMA quick_check").fetchone()[0]
+            finally:
+                target.close()
+        except Exception:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        finally:
+            source.close()
+
+        if result != 'ok':
+            os.remove(temp_path)
+            return f"Backup quick_check failed: {result}"
+        
+        os.replace(temp_path, target_path)
+        return None
+    
+    def _copy_with_archive(self, backup_path: str, progress=None) -> Tuple[Optional[str], Optional[str]]:
+        """
+        Copy the database to backup_path and the history archive, if there
+        is one, next to it.
+        
+        Both are copied under history_lock, so no archiving batch runs
+        between the two copies.
+        
+        Returns:
+            Tuple of (error message or None, path of the archive copy or None)
+        """
+        archive_path = get_archive_path(self.db_path)
+        archive_backup = None
+        with history_lock:
+            error = self._copy_database(self.db_path, backup_path, progress)
+            if error is None and os.path.exists(archive_path):
+                archive_backup = f"{backup_path}{ARCHIVE_BACKUP_SUFFIX}"
+                error = self._copy_database(archive_path, archive_backup)
+                if error:
+                    self._remove_backup_file(backup_path)
+                    archive_backup = None
+        return error, archive_backup
+    
+    @staticmethod
+    def _remove_backup_file(backup_path: str):
+        """Delete a file backup and its copy of the history archive."""
+        for path in (backup_path, f"{backup_path}{ARCHIVE_BACKUP_SUFFIX}"):
+            if os.path.exists(path):
+                os.remove(path)
+    
     def _verify_backup(self, backup_path: str) -> bool:
         """
         Verify backup integrity.
@@ -137,24 +359,58 @@ class BackupManager(QObject):
         """
         Restore database from backup.
         
+        The history archive is restored along with the database. A backup
+        taken before anything was archived holds all history in the
+        database itself, so the current archive is emptied instead.
+        
         Args:
             backup_path: Path to backup file
             
         Returns:
             Tuple of (success, error_message)
         """
+        assembled_path = None
+        assembled_archive = None
+        archive_path = get_archive_path(self.db_path)
         try:
+            # Store backups are first reassembled (and integrity checked)
+            source_path = backup_path
+            if self._is_store_backup(backup_path):
+                assembled_path = os.path.join(self.backups_dir, 'restore_assembled.db')
+                assembled_archive = f"{assembled_path}{ARCHIVE_BACKUP_SUFFIX}"
+                success, error = self.get_backup_store().restore_backup(
+                    backup_path, assembled_path, archive_target=assembled_archive
+                )
+                if not success:
+                    return False, error
+                source_path = assembled_path
+                archive_source = assembled_archive if os.path.exists(assembled_archive) else None
+            else:
+                archive_source = f"{backup_path}{ARCHIVE_BACKUP_SUFFIX}"
+                if not os.path.exists(archive_source):
+                    archive_source = None
+            
             # Verify backup first
-            if not self._verify_backup(backup_path):
+            if not self._verify_backup(source_path):
                 error = "Invalid backup file"
                 logger.error(error)
                 return False, error
             
             # Create pre-restore backup
             pre_restore_backup = self._create_pre_restore_backup()
+            if pre_restore_backup is None and archive_source is None and os.path.exists(archive_path):
+                error = "Could not back up the history archive before emptying it"
+                logger.error(error)
+                return False, error
             
-            # Restore backup
-            shutil.copy2(backup_path, self.db_path)
+            # Restore backup through the backup API so the live database's
+            # WAL is handled by SQLite instead of being left stale on disk
+            with history_lock:
+                self._restore_database(source_path)
+                if archive_source:
+                    self._restore_database(archive_source, archive_path)
+            if archive_source is None:
+                ArchiveManager(self.db_path).clear()
             
             # Verify restored database
             if not self._verify_backup(self.db_path):
@@ -162,7 +418,11 @@ class BackupManager(QObject):
                 logger.error(error)
                 # Restore pre-restore backup
                 if pre_restore_backup:
-                    shutil.copy2(pre_restore_backup, self.db_path)
+                    pre_restore_archive = f"{pre_restore_backup}{ARCHIVE_BACKUP_SUFFIX}"
+                    with history_lock:
+                        self._restore_database(pre_restore_backup)
+                        if os.path.exists(pre_restore_archive):
+                            self._restore_database(pre_restore_archive, archive_path)
                 return False, error
             
             logger.info(f"Successfully restored backup from {backup_path}")
@@ -172,15 +432,42 @@ class BackupManager(QObject):
             error = f"Failed to restore backup: {e}"
             logger.error(error, exc_info=True)
             return False, error
+        finally:
+            for path in (assembled_path, assembled_archive):
+                if path and os.path.exists(path):
+                    os.remove(path)
+    
+    def _restore_database(self, backup_path: str, target_path: Optional[str] = None):
+        """Overwrite the live database (or target_path) with the contents of a backup."""
+        source = sqlite3.connect(backup_path)
+        try:
+            target = sqlite3.connect(target_path or self.db_path, timeout=30)
+            try:
+                source.backup(target, pages=BACKUP_PAGES_PER_STEP)
+            finally:
+                target.close()
+        finally:
+            source.close()
+        
+        # Write versions restart from the backup's, so cached results of the
+        # replaced contents could be mistaken for current ones
+        if target_path is None:
+            renew_database_id(self.db_path)
+        CacheManager.get_instance().clear()
+        disk_cache = get_disk_cache()
+        if disk_cache is not None:
+            disk_cache.clear()
     
     def _create_pre_restore_backup(self) -> Optional[str]:
-        """Create a backup before restoring."""
+        """Create a backup, with the history archive, before restoring."""
         if os.path.exists(self.db_path):
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             backup_filename = f"pre_restore_{timestamp}.db"
             backup_path = os.path.join(self.backups_dir, backup_filename)
             try:
-                shutil.copy2(self.db_path, backup_path)
+                error, _ = self._copy_with_archive(backup_path)
+                if error:
+                    raise RuntimeError(error)
                 logger.info(f"Created pre-restore backup: {backup_path}")
                 return backup_path
             except Exception as e:
@@ -197,25 +484,88 @@ class BackupManager(QObject):
             removed_count = 0
             
             for backup_path, backup_info in backups:
+                # Store backups are pruned below, together with their chunks
+                if self._is_store_backup(backup_path):
+                    continue
                 backup_date = backup_info.get('date')
                 if backup_date and backup_date < cutoff_date:
                     try:
-                        os.remove(backup_path)
+                        self._remove_backup_file(backup_path)
                         removed_count += 1
                         logger.debug(f"Removed old backup: {backup_path}")
                     except Exception as e:
                         logger.warning(f"Could not remove old backup {backup_path}: {e}")
             
+            if os.path.isdir(os.path.join(self.backups_dir, 'store')):
+                removed_count += self.get_backup_store().prune(cutoff_date)
+            
             if removed_count > 0:
+                self._reconcile_catalog()
                 logger.info(f"Cleaned up {removed_count} old backup(s)")
                 
         except Exception as e:
             logger.error(f"Error cleaning up old backups: {e}", exc_info=True)
     
+    def _backup_paths(self) -> List[str]:
+        """Return the paths of all backups on disk, without opening any of them."""
+        paths = [
+            os.path.join(self.backups_dir, filename)
+            for filename in os.listdir(self.backups_dir)
+            if filename.endswith('.db') and 'backup' in filename.lower()
+        ]
+        manifests_dir = os.path.join(self.backups_dir, 'store', 'manifests')
+        if os.path.isdir(manifests_dir):
+            paths.extend(
+                os.path.join(manifests_dir, filename)
+                for filename in os.listdir(manifests_dir)
+                if filename.endswith(MANIFEST_SUFFIX)
+            )
+        return paths
+    
+    def _reconcile_catalog(self) -> List[str]:
+        """
+        Bring the catalog in line with the backups directory.
+        
+        Entries for deleted backups are dropped. Backups the catalog does not
+        know yet (copied in by hand, or made before the catalog existed) are
+        added from their file metadata alone and left unverified.
+        
+        Returns:
+            Paths of the newly added, unverified backups
+        """
+        catalog = self.get_catalog()
+        on_disk = set(self._backup_paths())
+        known = set(catalog.paths())
+        with catalog.batch():
+            catalog.remove(known - on_disk)
+            
+            added = []
+            for backup_path in sorted(on_disk - known):
+                try:
+                    if self._is_store_backup(backup_path):
+                        # Manifests are written only after a verified snapshot
+                        manifest = self.get_backup_store().load_manifest(backup_path)
+                        catalog.record(
+                            backup_path, manifest.get('size', 0),
+                            datetime.fromisoformat(manifest['created']), True,
+                            sha256=manifest.get('sha256'), backup_format='chunked'
+                        )
+                    else:
+                        stat = os.stat(backup_path)
+                        catalog.record(backup_path, stat.st_size, datetime.fromtimestamp(stat.st_mtime), None)
+                        added.append(backup_path)
+                except Exception as e:
+                    logger.warning(f"Could not read backup info for {os.path.basename(backup_path)}: {e}")
+        return added
+    
     def list_backups(self) -> List[Tuple[str, Dict]]:
         """
         List all available backups.
         
+        Backups are listed from the catalog, so no backup file is opened.
+        Backups found on disk but missing from the catalog are checked once
+        in the background; until then their 'verified' value is None.
+        
         Returns:
             List of tuples (backup_path, backup_info_dict)
         """
@@ -225,22 +575,22 @@ class BackupManager(QObject):
             return backups
         
         try:
-            for filename in os.listdir(self.backups_dir):
-                if filename.endswith('.db') and 'backup' in filename.lower():
-                    backup_path = os.path.join(self.backups_dir, filename)
-                    
-                    try:
-                        stat = os.stat(backup_path)
-                        backup_info = {
-                            'filename': filename,
-                            'path': backup_path,
-                            'size': stat.st_size,
-                            'date': datetime.fromtimestamp(stat.st_mtime),
-                            'verified': self._verify_backup(backup_path)
-                        }
-                        backups.append((backup_path, backup_info))
-                    except Exception as e:
-                        logger.warning(f"Could not read backup info for {filename}: {e}")
+            unverified = self._reconcile_catalog()
+            if unverified:
+                self.verify_backups_async(unverified)
+            
+            for entry in self.get_catalog().entries():
+                backup_info = {
+                    'filename': entry['filename'],
+                    'path': entry['path'],
+                    'size': entry['size'],
+                    'date': datetime.fromisoformat(entry['created']),
+                    'verified': entry['verified'],
+                    'verified_at': entry.get('verified_at'),
+                    'sha256': entry.get('sha256'),
+                    'format': entry.get('format', 'file')
+                }
+                backups.append((entry['path'], backup_info))
             
             # Sort by date (newest first)
             backups.sort(key=lambda x: x[1]['date'], reverse=True)
@@ -250,6 +600,149 @@ class BackupManager(QObject):
         
         return backups
     
+    def verify_backups(self, backup_paths: Optional[List[str]] = None) -> Tuple[int, int]:
+        """
+        Fully re-verify backups and store the results in the catalog.
+        
+        File backups are hashed and checked with PRAGMA quick_check; store
+        backups have every chunk decompressed and checked against its hash.
+        This reads every byte of every backup, so run it through
+        verify_backups_async from the UI thread.
+        
+        Args:
+            backup_paths: Backups to check; defaults to every catalogued backup
+            
+        Returns:
+            Tuple of (backups checked, backups that failed)
+        """
+        catalog = self.get_catalog()
+        if backup_paths is None:
+            backup_paths = catalog.paths()
+        
+        checked = 0
+        failed = 0
+        with catalog.batch():
+            for backup_path in backup_paths:
+                verified = self.verify_backup(backup_path)
+                if verified is None:
+                    continue
+                checked += 1
+                if not verified:
+                    failed += 1
+        
+        logger.info(f"Verified {checked} backup(s), {failed} failed")
+        self.verification_finished.emit(checked, failed)
+        return checked, failed
+    
+    def verify_backup(self, backup_path: str, should_stop=None) -> Optional[bool]:
+        """
+        Fully re-verify one catalogued backup and store the result.
+        
+        Args:
+            backup_path: Backup to check
+            should_stop: Optional callable; returning True stops the check,
+                which is checked between chunks and during PRAGMA quick_check
+        
+        Returns:
+            True if the backup is intact, False if it failed, None if it is
+            not catalogued or the check was stopped (nothing is recorded then)
+        """
+        catalog = self.get_catalog()
+        entry = catalog.get(backup_path)
+        if entry is None:
+            return None
+        digest = None
+        if self._is_store_backup(backup_path):
+            verified = self.get_backup_store().verify_backup(backup_path, should_stop=should_stop)
+        else:
+            digest = self._hash_file(backup_path, should_stop)
+            if digest is None:
+                return None
+            if entry.get('sha256') and digest != entry['sha256']:
+                verified = False
+            else:
+                verified = self._verify_backup_file(backup_path, should_stop)
+        if verified is None:
+            return None
+        if verified and digest and not entry.get('sha256'):
+            # First check of a backup found on disk: record its hash
+            catalog.record(
+                backup_path, entry['size'], datetime.fromisoformat(entry['created']), True,
+                sha256=digest
+            )
+        catalog.set_verified(backup_path, verified)
+        if not verified:
+            logger.warning(f"Backup failed verification: {backup_path}")
+        return verified
+    
+    def verify_backups_async(self, backup_paths: Optional[List[str]] = None) -> bool:
+        """
+        Re-verify backups on a background thread.
+        
+        The result is reported through verification_finished.
+        
+        Returns:
+            True if verification was started, False if one is already running
+        """
+        if self._verify_thread is not None and self._verify_thread.is_alive():
+            return False
+        
+        self._verify_thread = threading.Thread(
+            target=self.verify_backups,
+            args=(backup_paths,),
+            name="TaskTitanBackupVerify",
+            daemon=True
+        )
+        self._verify_thread.start()
+        return True
+    
+    def wait_for_verification(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait for a background verification to finish.
+        
+        Returns:
+            True if no verification is running when this returns
+        """
+        if self._verify_thread is not None:
+            self._verify_thread.join(timeout)
+        return self._verify_thread is None or not self._verify_thread.is_alive()
+    
+    @staticmethod
+    def _hash_file(backup_path: str, should_stop=None) -> Optional[str]:
+        """Return the SHA-256 of a file, '' if it cannot be read, or None if stopped."""
+        file_hash = hashlib.sha256()
+        try:
+            with open(backup_path, 'rb') as f:
+                for data in iter(lambda: f.read(VERIFY_READ_SIZE), b""):
+                    if should_stop is not None and should_stop():
+                        return None
+                    file_hash.update(data)
+        except OSError as e:
+            logger.warning(f"Could not read backup {backup_path}: {e}")
+            return ''
+        return file_hash.hexdigest()
+    
+    def _verify_backup_file(self, backup_path: str, should_stop=None) -> Optional[bool]:
+        """Check a file backup's tables and PRAGMA quick_check; None if stopped."""
+        if not self._verify_backup(backup_path):
+            return False
+        try:
+            conn = sqlite3.connect(f"file:{backup_path}?mode=ro", uri=True)
+            try:
+                if should_stop is not None:
+                    conn.set_progress_handler(should_stop, VERIFY_PROGRESS_INSTRUCTIONS)
+                return conn.execute("PRAGMA quick_check").fetchone()[0] == 'ok'
+            finally:
+                conn.close()
+        except sqlite3.OperationalError as e:
+            if should_stop is not None and 'interrupt' in str(e):
+                return None
+            logger.error(f"Error verifying backup: {e}", exc_info=True)
+            return False
+        except Exception as e:
+            logger.error(f"Error verifying backup: {e}", exc_info=True)
+            return False
+    
     def start_auto_backup(self, interval: str = 'daily'):
         """
         Start automatic backup scheduling.
@@ -275,11 +768,10 @@ class BackupManager(QObject):
     def perform_auto_backup(self):
         """Perform automatic backup."""
         logger.info("Performing automatic backup...")
-        success, result = self.create_backup()
-        if success:
-            logger.info(f"Automatic backup completed: {result}")
-        else:
-            logger.error(f"Automatic backup failed: {result}")
+        # Runs on a worker thread; the result is logged by create_backup and
+        # reported through backup_completed / backup_failed
+        if not self.create_backup_async():
+            logger.info("Skipping automatic backup, a backup is already running")
 
 
 def get_backup_manager() -> BackupManager:
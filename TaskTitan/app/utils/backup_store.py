@@ -0,0 +1,351 @@
+"""
+Deduplicating backup store for TaskTitan.
+
+Backups are split into fixed-size chunks aligned to the SQLite page size.
+Each chunk is stored once, compressed, under the SHA-256 of its contents, and
+every backup is recorded as a manifest listing its chunk hashes. Pages that
+did not change between backups are therefore stored only once.
+
+Layout under the store directory:
+
+    chunks/<first two hex digits>/<sha256>   zlib-compressed chunk data
+    manifests/<name>.json                    one manifest per backup
+
+A backup can carry the history archive database as well; its chunks are
+listed under the manifest's 'archive' key.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import tempfile
+import zlib
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Chunks are at least this large; the SQLite page size is rounded up to it
+MIN_CHUNK_SIZE = 64 * 1024
+
+# zlib compression level for new chunks
+COMPRESSION_LEVEL = 6
+
+MANIFEST_SUFFIX = '.json'
+
+
+def _read_page_size(db_path: str) -> int:
+    """Read the page size from a SQLite database header."""
+    with open(db_path, 'rb') as f:
+        header = f.read(100)
+    if len(header) < 18 or not header.startswith(b'SQLite format 3\x00'):
+        raise ValueError(f"Not a SQLite database: {db_path}")
+    page_size = int.from_bytes(header[16:18], 'big')
+    # A stored value of 1 means 65536
+    return 65536 if page_size == 1 else page_size
+
+
+class BackupStore:
+    """Content-addressed, compressed store of database backups."""
+
+    def __init__(self, store_dir: str):
+        """
+        Initialize the store.
+
+        Args:
+            store_dir: Directory holding the chunks and manifests
+        """
+        self.store_dir = store_dir
+        self.chunks_dir = os.path.join(store_dir, 'chunks')
+        self.manifests_dir = os.path.join(store_dir, 'manifests')
+        os.makedirs(self.chunks_dir, exist_ok=True)
+        os.makedirs(self.manifests_dir, exist_ok=True)
+
+    # ---------- Paths ----------
+    def _chunk_path(self, digest: str) -> str:
+        return os.path.join(self.chunks_dir, digest[:2], digest)
+
+    def manifest_path(self, name: str) -> str:
+        """Return the path of the manifest for a backup name."""
+        return os.path.join(self.manifests_dir, f"{name}{MANIFEST_SUFFIX}")
+
+    @staticmethod
+    def _write_atomic(path: str, data: bytes):
+        """
+        Write a file so that readers never see a partial version.
+
+        Each writer gets its own temporary file, and the data reaches the disk
+        before the rename, so a manifest never outlives the chunks it lists.
+        """
+        fd, temp_path = tempfile.mkstemp(prefix=f".{os.path.basename(path)}.", suffix='.tmp',
+                                         dir=os.path.dirname(path))
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, path)
+        except BaseException:
+            try:
+                os.unlink(temp_path)
+            except OSError:
+                pass
+            raise
+
+    # ---------- Backup ----------
+    def add_backup(self, db_path: str, name: str, archive_path: Optional[str] = None) -> Dict:
+        """
+        Store a database snapshot as a new backup.
+
+        db_path must not change while it is read; pass a snapshot taken with
+        the SQLite backup API rather than the live database.
+
+        Args:
+            db_path: Database file to store
+            name: Backup name, used for the manifest file
+            archive_path: Optional snapshot of the history archive to store with it
+
+        Returns:
+            The manifest dictionary
+        """
+        manifest = {
+            'name': name,
+            'created': datetime.now().isoformat(timespec='seconds'),
+            **self._store_file(db_path),
+        }
+        if archive_path:
+            archive = self._store_file(archive_path)
+            manifest['new_chunks'] += archive.pop('new_chunks')
+            manifest['new_bytes'] += archive.pop('new_bytes')
+            manifest['archive'] = archive
+        self._write_atomic(self.manifest_path(name), json.dumps(manifest).encode('utf-8'))
+
+        logger.info(
+            f"Stored backup {name}: {len(manifest['chunks'])} chunks, {manifest['new_chunks']} new "
+            f"({manifest['new_bytes']} bytes written for {manifest['size']} bytes of data)"
+        )
+        return manifest
+
+    def _store_file(self, db_path: str) -> Dict:
+        """Store the chunks of one database file; return its manifest fields."""
+        page_size = _read_page_size(db_path)
+        chunk_size = max(MIN_CHUNK_SIZE, page_size)
+
+        chunks = []
+        new_chunks = 0
+        new_bytes = 0
+        file_hash = hashlib.sha256()
+        size = 0
+
+        with open(db_path, 'rb') as f:
+            for data in iter(lambda: f.read(chunk_size), b""):
+                size += len(data)
+                file_hash.update(data)
+                digest = hashlib.sha256(data).hexdigest()
+                chunks.append(digest)
+
+                chunk_path = self._chunk_path(digest)
+                if not os.path.exists(chunk_path):
+                    os.makedirs(os.path.dirname(chunk_path), exist_ok=True)
+                    compressed = zlib.compress(data, COMPRESSION_LEVEL)
+                    self._write_atomic(chunk_path, compressed)
+                    new_chunks += 1
+                    new_bytes += len(compressed)
+
+        return {
+            'size': size,
+            'page_size': page_size,
+            'chunk_size': chunk_size,
+            'sha256': file_hash.hexdigest(),
+            'chunks': chunks,
+            'new_chunks': new_chunks,
+            'new_bytes': new_bytes,
+        }
+
+    @staticmethod
+    def _stored_files(manifest: Dict) -> List[Dict]:
+        """Return the stored files of a backup: the database, then the archive if any."""
+        return [manifest] + ([manifest['archive']] if manifest.get('archive') else [])
+
+    # ---------- Manifests ----------
+    def load_manifest(self, name_or_path: str) -> Dict:
+        """Load a manifest by backup name or manifest path."""
+        path = name_or_path if name_or_path.endswith(MANIFEST_SUFFIX) else self.manifest_path(name_or_path)
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def list_manifests(self) -> List[Tuple[str, Dict]]:
+        """
+        List stored backups.
+
+        Returns:
+            List of tuples (manifest_path, manifest), newest first
+        """
+        manifests = []
+        for filename in os.listdir(self.manifests_dir):
+            if not filename.endswith(MANIFEST_SUFFIX):
+                continue
+            path = os.path.join(self.manifests_dir, filename)
+            try:
+                manifests.append((path, self.load_manifest(path)))
+            except (OSError, ValueError) as e:
+                logger.warning(f"Could not read backup manifest {filename}: {e}")
+        manifests.sort(key=lambda x: x[1].get('created', ''), reverse=True)
+        return manifests
+
+    def remove_backup(self, name_or_path: str):
+        """Delete a backup's manifest. Its chunks are freed by collect_garbage."""
+        path = name_or_path if name_or_path.endswith(MANIFEST_SUFFIX) else self.manifest_path(name_or_path)
+        os.remove(path)
+
+    def prune(self, cutoff: datetime) -> int:
+        """
+        Delete backups created before cutoff and collect unreferenced chunks.
+
+        Returns:
+            Number of backups removed
+        """
+        removed = 0
+        for path, manifest in self.list_manifests():
+            try:
+                created = datetime.fromisoformat(manifest['created'])
+            except (KeyError, ValueError):
+                continue
+            if created < cutoff:
+                try:
+                    self.remove_backup(path)
+                    removed += 1
+                except OSError as e:
+                    logger.warning(f"Could not remove backup manifest {path}: {e}")
+        if removed:
+            self.collect_garbage()
+        return removed
+
+    def collect_garbage(self) -> Tuple[int, int]:
+        """
+        Delete chunks that no manifest references.
+
+        Returns:
+            Tuple of (chunks removed, bytes freed)
+        """
+        referenced = set()
+        for _, manifest in self.list_manifests():
+            for stored in self._stored_files(manifest):
+                referenced.update(stored.get('chunks', ()))
+
+        removed = 0
+        freed = 0
+        for prefix in os.listdir(self.chunks_dir):
+            prefix_dir = os.path.join(self.chunks_dir, prefix)
+            if not os.path.isdir(prefix_dir):
+                continue
+            for digest in os.listdir(prefix_dir):
+                if digest in referenced:
+                    continue
+                chunk_path = os.path.join(prefix_dir, digest)
+                try:
+                    freed += os.path.getsize(chunk_path)
+                    os.remove(chunk_path)
+                    removed += 1
+                except OSError as e:
+                    logger.warning(f"Could not remove backup chunk {digest}: {e}")
+
+        if removed:
+            logger.info(f"Backup store garbage collection removed {removed} chunks ({freed} bytes)")
+        return removed, freed
+
+    def verify_backup(self, name_or_path: str, should_stop=None) -> Optional[bool]:
+        """
+        Check that every chunk of a backup is present and matches its hashes.
+
+        Args:
+            name_or_path: Backup name or manifest path
+            should_stop: Optional callable, checked between chunks; returning
+                True stops the check
+
+        Returns:
+            Whether the backup is intact, or None if the check was stopped
+        """
+        try:
+            manifest = self.load_manifest(name_or_path)
+            for stored in self._stored_files(manifest):
+                file_hash = hashlib.sha256()
+                for digest in stored['chunks']:
+                    if should_stop is not None and should_stop():
+                        return None
+                    with open(self._chunk_path(digest), 'rb') as f:
+                        data = zlib.decompress(f.read())
+                    if hashlib.sha256(data).hexdigest() != digest:
+                        logger.warning(f"Backup {name_or_path}: chunk {digest} is corrupted")
+                        return False
+                    file_hash.update(data)
+                if file_hash.hexdigest() != stored['sha256']:
+                    return False
+            return True
+        except Exception as e:
+            logger.warning(f"Could not verify backup {name_or_path}: {e}")
+            return False
+
+    # ---------- Restore ----------
+    def restore_backup(self, name_or_path: str, target_path: str,
+                       archive_target: Optional[str] = None) -> Tuple[bool, Optional[str]]:
+        """
+        Reassemble a backup into a database file.
+
+        The file is rebuilt next to target_path, checked against the manifest
+        hash and with PRAGMA integrity_check, and only then moved into place.
+
+        Args:
+            name_or_path: Backup name or manifest path
+            target_path: File to write the restored database to
+            archive_target: File to write the backup's history archive to,
+                if it has one
+
+        Returns:
+            Tuple of (success, error_message)
+        """
+        try:
+            manifest = self.load_manifest(name_or_path)
+            self._assemble(manifest, target_path)
+            if archive_target and manifest.get('archive'):
+                self._assemble(manifest['archive'], archive_target)
+            return True, None
+
+        except Exception as e:
+            error = f"Failed to restore backup {name_or_path}: {e}"
+            logger.error(error, exc_info=True)
+            return False, error
+
+    def _assemble(self, stored: Dict, target_path: str):
+        """Rebuild one stored database file, checked, at target_path."""
+        temp_path = f"{target_path}.partial"
+        try:
+            file_hash = hashlib.sha256()
+            with open(temp_path, 'wb') as out:
+                for digest in stored['chunks']:
+                    with open(self._chunk_path(digest), 'rb') as f:
+                        data = zlib.decompress(f.read())
+                    if hashlib.sha256(data).hexdigest() != digest:
+                        raise ValueError(f"Chunk {digest} is corrupted")
+                    file_hash.update(data)
+                    out.write(data)
+
+            if file_hash.hexdigest() != stored['sha256']:
+                raise ValueError("Restored file does not match the backup checksum")
+
+            conn = sqlite3.connect(temp_path)
+            try:
+                result = conn.execute("PRAGMA integrity_check").fetchone()[0]
+            finally:
+                conn.close()
+            if result != 'ok':
+                raise ValueError(f"Restored database failed integrity_check: {result}")
+
+            os.replace(temp_path, target_path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
@@ -5,15 +5,72 @@ This module provides a memory-efficient caching layer for frequently
 accessed data to improve application performance.
 """
 
+import sys
 import time
-from typing import Any, Optional, Dict, Callable
-from collections import OrderedDict
-from threading import Lock
+import heapq
+import functools
+import itertools
+from typing import Any, Optional, Dict, Callable, Hashable, Iterable
+from collections import OrderedDict, defaultdict
+from threading import Condition, Lock, RLock, Thread
 from app.utils.logger import get_logger
 from app.core.config import get_config
 
 logger = get_logger(__name__)
 
+# Containers are measured this many levels deep
+SIZE_ESTIMATE_DEPTH = 4
+
+# Longer containers are measured from a sample of this many items
+SIZE_ESTIMATE_SAMPLE = 100
+
+# Entries a TimedCache keeps at most
+TIMED_CACHE_MAX_ENTRIES = 10000
+
+# The sweeper wakes this long after an expiry, so entries expiring close
+# together are freed in one pass
+SWEEP_SLACK = 0.05
+
+_MISSING = object()
+
+
+def estimate_size(value: Any, _depth: int = 0) -> int:
+    """
+    Estimate the memory used by a value and what it contains, in bytes.
+    
+    Containers are measured a few levels deep; long ones are measured from
+    a sample of their items and scaled up.
+    """
+    size = sys.getsizeof(value)
+    if _depth >= SIZE_ESTIMATE_DEPTH or isinstance(value, (str, bytes, bytearray, int, float, bool)):
+        return size
+    
+    if isinstance(value, dict):
+        items = list(value.items()) if len(value) <= SIZE_ESTIMATE_SAMPLE else \
+            [item for _, item in zip(range(SIZE_ESTIMATE_SAMPLE), value.items())]
+        measured = sum(estimate_size(k, _depth + 1) + estimate_size(v, _depth + 1) for k, v in items)
+        count = len(value)
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        items = list(value) if len(value) <= SIZE_ESTIMATE_SAMPLE else \
+            [item for _, item in zip(range(SIZE_ESTIMATE_SAMPLE), value)]
+        measured = sum(estimate_size(item, _depth + 1) for item in items)
+        count = len(value)
+    elif hasattr(value, '__dict__'):
+        return size + estimate_size(vars(value), _depth + 1)
+    else:
+        return size
+    
+    if items and count > len(items):
+        measured = measured * count // len(items)
+    return size + measured
+
+
+def cache_namespace(key: Hashable) -> str:
+    """Return the namespace of a cache key: its first element or the text before the first ':'."""
+    if isinstance(key, tuple):
+        return str(key[0]) if key else ''
+    return str(key).split(':', 1)[0]
+
 
 class LRUCache:
     """Least Recently Used cache implementation."""
@@ -83,41 +140,66 @@ class LRUCache:
 
 
 class TimedCache:
-    """Cache with time-based expiration."""
+    """
+    Cache with time-based expiration.
     
-    def __init__(self, default_ttl: int = 300):
+    Expiry times are kept in a min-heap next to the entries. Replacing or
+    removing an entry leaves its old heap item behind; such stale items are
+    recognised by their sequence number and skipped when popped. A daemon
+    sweeper thread wakes at the next expiry and pops only the expired items,
+    so expired entries are freed even if nobody reads them again; it exits
+    when the cache is empty and is restarted by the next set().
+    """
+    
+    def __init__(self, default_ttl: int = 300, max_entries: int = TIMED_CACHE_MAX_ENTRIES,
+                 sweep: bool = True):
         """
         Initialize timed cache.
         
         Args:
             default_ttl: Default time-to-live in seconds
+            max_entries: Entries kept at most; the ones expiring soonest are
+                dropped first when the cache is full
+            sweep: Whether to free expired entries on a background thread
         """
         self.default_ttl = default_ttl
-        self.cache: Dict[str, tuple[Any, float]] = {}
+        self.max_entries = max_entries
+        # key -> (value, expiry, sequence number of its heap item)
+        self.cache: Dict[Hashable, tuple] = {}
+        self._heap: list = []
+        self._sequence = itertools.count()
         self.lock = Lock()
+        self._condition = Condition(self.lock)
+        self._sweep = sweep
+        self._sweeper: Optional[Thread] = None
     
-    def get(self, key: str, ttl: Optional[int] = None) -> Optional[Any]:
+    def __len__(self) -> int:
+        with self.lock:
+            return len(self.cache)
+    
+    def get(self, key: Hashable, ttl: Optional[int] = None, default: Any = None) -> Any:
         """
         Get item from cache.
         
         Args:
             key: Cache key
-            ttl: Time-to-live override
+            ttl: Unused; the time-to-live is fixed when the item is set
+            default: Value returned if the key is missing or expired
             
         Returns:
-            Cached value or None if expired
+            Cached value or default if expired
         """
         with self.lock:
-            if key in self.cache:
-                value, expiry = self.cache[key]
-                if time.time() < expiry:
-                    return value
-                else:
-                    # Expired, remove it
-                    del self.cache[key]
-            return None
+            entry = self.cache.get(key)
+            if entry is None:
+                return default
+            if time.monotonic() < entry[1]:
+                return entry[0]
+            # Expired; its heap item is skipped when the sweeper reaches it
+            del self.cache[key]
+            return default
     
-    def set(self, key: str, value: Any, ttl: Optional[int] = None):
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
         """
         Set item in cache.
         
@@ -126,38 +208,107 @@ class TimedCache:
             value: Value to cache
             ttl: Time-to-live in seconds (uses default if None)
         """
+        expiry = time.monotonic() + (ttl or self.default_ttl)
         with self.lock:
-            expiry = time.time() + (ttl or self.default_ttl)
-            self.cache[key] = (value, expiry)
+            sequence = next(self._sequence)
+            self.cache[key] = (value, expiry, sequence)
+            wakes_sweeper = not self._heap or expiry < self._heap[0][0]
+            heapq.heappush(self._heap, (expiry, sequence, key))
+            
+            if len(self.cache) > self.max_entries:
+                self._evict(len(self.cache) - self.max_entries)
+            # Replaced entries leave stale heap items; rebuild before they pile up
+            if len(self._heap) > 2 * len(self.cache) + 64:
+                self._compact()
+            
+            if self._sweep:
+                if self._sweeper is None or not self._sweeper.is_alive():
+                    self._sweeper = Thread(target=self._run_sweeper, name="TaskTitanCacheSweeper", daemon=True)
+                    self._sweeper.start()
+                elif wakes_sweeper:
+                    self._condition.notify()
     
-    def remove(self, key: str):
+    def remove(self, key: Hashable):
         """Remove item from cache."""
         with self.lock:
-            if key in self.cache:
-                del self.cache[key]
+            self.cache.pop(key, None)
     
     def clear(self):
         """Clear all cached items."""
         with self.lock:
             self.cache.clear()
+            self._heap.clear()
+            self._condition.notify()
+    
+    def _is_current(self, item: tuple) -> bool:
+        """Check whether a heap item still belongs to its entry; the lock must be held."""
+        entry = self.cache.get(item[2])
+        return entry is not None and entry[2] == item[1]
+    
+    def _evict(self, count: int):
+        """Drop the entries that expire soonest; the lock must be held."""
+        while count > 0 and self._heap:
+            item = heapq.heappop(self._heap)
+            if self._is_current(item):
+                del self.cache[item[2]]
+                count -= 1
+    
+    def _compact(self):
+        """Rebuild the heap from the current entries; the lock must be held."""
+        self._heap = [(expiry, sequence, key) for key, (_, expiry, sequence) in self.cache.items()]
+        heapq.heapify(self._heap)
     
-    def cleanup_expired(self):
-        """Remove expired items."""
+    def _pop_expired(self, now: float) -> int:
+        """Pop every expired heap item; the lock must be held."""
+        removed = 0
+        heap = self._heap
+        while heap and heap[0][0] <= now:
+            item = heapq.heappop(heap)
+            if self._is_current(item):
+                del self.cache[item[2]]
+                removed += 1
+        return removed
+    
+    def cleanup_expired(self) -> int:
+        """
+        Remove expired items.
+        
+        Only expired heap items are visited, so this costs
+        O(expired * log n) rather than a scan of the cache.
+        
+        Returns:
+            Number of entries removed
+        """
         with self.lock:
-            current_time = time.time()
-            expired_keys = [
-                key for key, (_, expiry) in self.cache.items()
-                if current_time >= expiry
-            ]
-            for key in expired_keys:
-                del self.cache[key]
-            
-            if expired_keys:
-                logger.debug(f"Cleaned up {len(expired_keys)} expired cache entries")
+            removed = self._pop_expired(time.monotonic())
+        if removed:
+            logger.debug(f"Cleaned up {removed} expired cache entries")
+        return removed
+    
+    def _run_sweeper(self):
+        """Sleep until the next expiry and free expired entries, until the cache is empty."""
+        with self.lock:
+            while True:
+                self._pop_expired(time.monotonic())
+                if not self.cache:
+                    self._heap.clear()
+                    self._sweeper = None
+                    return
+                # Woken early by set() when a sooner expiry is added
+                self._condition.wait(max(self._heap[0][0] - time.monotonic(), 0) + SWEEP_SLACK)
 
 
 class CacheManager:
-    """Centralized cache manager."""
+    """
+    Centralized cache manager.
+    
+    Entries are accounted by their estimated size in bytes and evicted least
+    recently used first once the performance.cache_size_mb budget is spent.
+    Each entry can carry dependency tags (for example 'table:goals' or
+    'date:2026-10-16'); invalidate_tags() drops every entry with one of the
+    given tags without scanning the cache. Hits, misses and evictions are
+    counted per key namespace (see cache_namespace).
+    """
     
     _instance: Optional['CacheManager'] = None
     
@@ -169,16 +320,21 @@ class CacheManager:
         cache_enabled = get_config('performance.cache_enabled', True)
         cache_size = get_config('performance.cache_size_mb', 100)
         
-        # Convert MB to approximate item count (assuming avg 1KB per item)
-        max_items = (cache_size * 1024 * 1024) // 1024
-        
         self.enabled = cache_enabled
-        self.lru_cache = LRUCache(max_items) if cache_enabled else None
+        self.max_bytes = cache_size * 1024 * 1024
+        self.current_bytes = 0
+        # key -> (value, size in bytes, tags)
+        self.entries: OrderedDict = OrderedDict()
+        self.tag_index: Dict[str, set] = defaultdict(set)
+        self.stats: Dict[str, Dict[str, int]] = defaultdict(
+            lambda: {'hits': 0, 'misses': 0, 'evictions': 0, 'invalidations': 0}
+        )
         self.timed_cache = TimedCache() if cache_enabled else None
+        self.lock = RLock()
         
         CacheManager._instance = self
     
-    def get(self, key: str, default: Any = None) -> Any:
+    def get(self, key: Hashable, default: Any = None) -> Any:
         """
         Get item from cache.
         
@@ -187,58 +343,147 @@ class CacheManager:
             default: Default value if not found
             
         Returns:
-            Cached value or default
+            Cached value (which may be falsy, such as 0) or default
         """
-        if not self.enabled or not self.lru_cache:
+        if not self.enabled:
             return default
         
-        return self.lru_cache.get(key) or default
+        with self.lock:
+            entry = self.entries.get(key, _MISSING)
+            stats = self.stats[cache_namespace(key)]
+            if entry is _MISSING:
+                stats['misses'] += 1
+                return default
+            stats['hits'] += 1
+            self.entries.move_to_end(key)
+            return entry[0]
     
-    def set(self, key: str, value: Any):
+    def contains(self, key: Hashable) -> bool:
+        """Check whether a key is cached, without counting a hit or miss."""
+        with self.lock:
+            return key in self.entries
+    
+    def set(self, key: Hashable, value: Any, tags: Iterable[str] = (), size: Optional[int] = None):
         """
         Set item in cache.
         
         Args:
             key: Cache key
             value: Value to cache
+            tags: Dependency tags; invalidating any of them drops the entry
+            size: Size in bytes, if known; estimated otherwise
         """
-        if not self.enabled or not self.lru_cache:
+        if not self.enabled:
             return
         
-        self.lru_cache.set(key, value)
+        if size is None:
+            size = estimate_size(value) + sys.getsizeof(key)
+        tags = frozenset(tags)
+        
+        with self.lock:
+            self._remove(key)
+            if size > self.max_bytes:
+                logger.debug(f"Not caching {key!r}: {size} bytes exceeds the cache budget")
+                return
+            
+            # Evict least recently used entries until the new one fits
+            while self.entries and self.current_bytes + size > self.max_bytes:
+                evicted_key = next(iter(self.entries))
+                self._remove(evicted_key)
+                self.stats[cache_namespace(evicted_key)]['evictions'] += 1
+            
+            self.entries[key] = (value, size, tags)
+            self.current_bytes += size
+            for tag in tags:
+                self.tag_index[tag].add(key)
+    
+    def _remove(self, key: Hashable) -> bool:
+        """Remove an entry and its tag references; the lock must be held."""
+        entry = self.entries.pop(key, None)
+        if entry is None:
+            return False
+        self.current_bytes -= entry[1]
+        for tag in entry[2]:
+            keys = self.tag_index.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self.tag_index[tag]
+        return True
     
-    def invalidate(self, key: str):
+    def invalidate(self, key: Hashable):
         """Invalidate cache entry."""
-        if self.lru_cache:
-            self.lru_cache.remove(key)
+        with self.lock:
+            if self._remove(key):
+                self.stats[cache_namespace(key)]['invalidations'] += 1
         if self.timed_cache:
             self.timed_cache.remove(key)
     
+    def invalidate_tags(self, *tags: str) -> int:
+        """
+        Invalidate every entry carrying any of the given tags.
+        
+        Returns:
+            Number of entries removed
+        """
+        removed = 0
+        with self.lock:
+            for tag in tags:
+                for key in list(self.tag_index.get(tag, ())):
+                    if self._remove(key):
+                        self.stats[cache_namespace(key)]['invalidations'] += 1
+                        removed += 1
+        return removed
+    
     def invalidate_pattern(self, pattern: str):
         """
         Invalidate all cache entries matching pattern.
         
+        This scans every key; prefer tagging entries and invalidate_tags().
+        
         Args:
             pattern: Pattern to match (simple substring match)
         """
-        if not self.lru_cache:
-            return
-        
-        keys_to_remove = [
-            key for key in self.lru_cache.cache.keys()
-            if pattern in key
-        ]
+        with self.lock:
+            keys_to_remove = [key for key in self.entries if pattern in str(key)]
         
         for key in keys_to_remove:
             self.invalidate(key)
     
     def clear(self):
         """Clear all caches."""
-        if self.lru_cache:
-            self.lru_cache.clear()
+        with self.lock:
+            self.entries.clear()
+            self.tag_index.clear()
+            self.current_bytes = 0
         if self.timed_cache:
             self.timed_cache.clear()
     
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get cache usage and counters.
+        
+        Returns:
+            Dictionary with entries, bytes, max_bytes and per-namespace
+            hits, misses, evictions, invalidations and hit_rate
+        """
+        with self.lock:
+            namespaces = {}
+            for namespace, counters in self.stats.items():
+                lookups = counters['hits'] + counters['misses']
+                namespaces[namespace] = dict(counters, hit_rate=counters['hits'] / lookups if lookups else 0.0)
+            return {
+                'entries': len(self.entries),
+                'bytes': self.current_bytes,
+                'max_bytes': self.max_bytes,
+                'namespaces': namespaces,
+            }
+    
+    def reset_stats(self):
+        """Reset the hit, miss, eviction and invalidation counters."""
+        with self.lock:
+            self.stats.clear()
+    
     @classmethod
     def get_instance(cls) -> 'CacheManager':
         """Get singleton instance."""
@@ -247,15 +492,35 @@ class CacheManager:
         return cls._instance
 
 
-def cached(key_prefix: str = "", ttl: Optional[int] = None):
+def make_cache_key(namespace: str, func: Callable, args: tuple, kwargs: dict) -> Hashable:
+    """
+    Build a cache key for a function call.
+    
+    Arguments are kept as a tuple, so equal arguments give equal keys and
+    keyword order does not matter; unhashable arguments fall back to repr().
+    """
+    key = (namespace, func.__qualname__, args, tuple(sorted(kwargs.items())))
+    try:
+        hash(key)
+    except TypeError:
+        key = (namespace, func.__qualname__, repr(args), repr(sorted(kwargs.items())))
+    return key
+
+
+def cached(key_prefix: str = "", ttl: Optional[int] = None, tags=None):
     """
     Decorator for caching function results.
     
     Args:
-        key_prefix: Prefix for cache key
+        key_prefix: Namespace for the cache keys; defaults to the function's module
         ttl: Time-to-live in seconds (uses timed cache if provided)
+        tags: Dependency tags for the cached results, or a callable that
+            receives the call's arguments and returns them
     """
     def decorator(func: Callable):
+        namespace = key_prefix or func.__module__
+        
+        @functools.wraps(func)
         def wrapper(*args, **kwargs):
             cache_manager = CacheManager.get_instance()
             
@@ -263,30 +528,29 @@ def cached(key_prefix: str = "", ttl: Optional[int] = None):
                 return func(*args, **kwargs)
             
             # Generate cache key
-            cache_key = f"{key_prefix}:{func.__name__}:{str(args)}:{str(kwargs)}"
+            cache_key = make_cache_key(namespace, func, args, kwargs)
             
-            # Try to get from cache
+            # Try to get from cache; None and other falsy results are cached too
             if ttl:
-                result = cache_manager.timed_cache.get(cache_key, ttl)
+                result = cache_manager.timed_cache.get(cache_key, default=_MISSING)
+                cache_manager.stats[namespace]['hits' if result is not _MISSING else 'misses'] += 1
             else:
-                result = cache_manager.lru_cache.get(cache_key)
+                result = cache_manager.get(cache_key, _MISSING)
             
-            if result is not None:
-                logger.debug(f"Cache hit: {cache_key}")
+            if result is not _MISSING:
                 return result
             
             # Cache miss, compute result
-            logger.debug(f"Cache miss: {cache_key}")
             result = func(*args, **kwargs)
             
             # Store in cache
             if ttl:
                 cache_manager.timed_cache.set(cache_key, result, ttl)
             else:
-                cache_manager.lru_cache.set(cache_key, result)
+                entry_tags = tags(*args, **kwargs) if callable(tags) else (tags or ())
+                cache_manager.set(cache_key, result, tags=entry_tags)
             
             return result
         
         return wrapper
     return decorator
-
@@ -6,14 +6,63 @@ Handles database export, import, merge, and validation operations.
 import os
 import shutil
 import sqlite3
+import threading
 from typing import Optional, Tuple, List, Dict, Any
 from pathlib import Path
 from datetime import datetime
+from PyQt6.QtCore import QObject, pyqtSignal
 from app.utils.logger import get_logger
 from app.models.database import get_db_path
 
 logger = get_logger(__name__)
 
+# db_path -> cached statistics and the file fingerprint they were read at
+_stats_cache: Dict[str, Dict[str, Any]] = {}
+
+# Databases whose statistics are kept; the least recently read is dropped first
+STATS_CACHE_SIZE = 8
+
+# Instructions between cancellation checks while a table is being checked
+INTEGRITY_PROGRESS_INSTRUCTIONS = 100000
+
+MERGE_STRATEGIES = ('skip', 'replace', 'rename')
+
+# Tables copied by merge_databases, in dependency order. id_column names an
+# integer primary key that may be renamed on conflict; references maps columns
+# to the table whose ids they hold; unique_keys identify the same record in
+# tables without an integer id.
+MERGE_TABLES = (
+    {'name': 'goals', 'id_column': 'id', 'references': {'parent_id': 'goals'}, 'unique_keys': ()},
+    {'name': 'activities', 'id_column': 'id', 'references': {'goal_id': 'goals'}, 'unique_keys': ()},
+    {'name': 'activity_completions', 'id_column': None, 'references': {'activity_id': 'activities'},
+     'unique_keys': (('activity_id', 'completion_date'),)},
+    {'name': 'todo_items', 'id_column': 'id', 'references': {'activity_id': 'activities'}, 'unique_keys': ()},
+    {'name': 'time_categories', 'id_column': None, 'references': {}, 'unique_keys': (('name',),)},
+    {'name': 'time_entries', 'id_column': None, 'references': {}, 'unique_keys': (('id',),)},
+    {'name': 'journal_entries', 'id_column': None, 'references': {}, 'unique_keys': (('id',), ('date',))},
+    {'name': 'journal_attachments', 'id_column': 'id', 'references': {}, 'unique_keys': ()},
+)
+
+
+def _stats_fingerprint(db_path: str) -> Tuple:
+    """
+    Identify the current contents of a database without opening it in SQLite.
+    
+    Combines size, mtime and inode of the database and its WAL file with the
+    header's file change counter (bumped by every commit in rollback journal
+    mode) and the WAL header, whose salts change when the WAL restarts.
+    """
+    fingerprint = []
+    for path, header in ((db_path, slice(24, 28)), (db_path + '-wal', slice(0, 32))):
+        try:
+            with open(path, 'rb') as f:
+                file_stat = os.fstat(f.fileno())
+                data = f.read(header.stop)[header]
+            fingerprint.append((file_stat.st_mtime_ns, file_stat.st_size, file_stat.st_ino, data))
+        except OSError:
+            fingerprint.append(None)
+    return tuple(fingerprint)
+
 
 class DatabaseOperations:
     """Utility class for database operations."""
@@ -95,6 +144,12 @@ class DatabaseOperations:
             # Copy database
             shutil.copy2(source_path, destination_path)
             
+            # Write versions restart in the copy; drop results cached for the old file
+            from app.models.table_versions import renew_database_id
+            from app.models.result_cache import clear_cached_results
+            renew_database_id(destination_path)
+            clear_cached_results(destination_path)
+            
             logger.info(f"Imported database from {source_path} to {destination_path}")
             return True, None
             
@@ -108,6 +163,20 @@ class DatabaseOperations:
         """
         Merge two databases.
         
+        The source is attached to the destination connection and every table
+        in MERGE_TABLES is copied with one INSERT ... SELECT, all in a single
+        transaction. Columns are matched by name, so the two databases may
+        come from different schema versions.
+        
+        Integer ids that already exist in the destination are conflicts:
+        'skip' keeps the destination row, 'replace' overwrites it with the
+        source row and 'rename' inserts the source row under a new id. New ids
+        are staged in temporary remap tables and applied to every reference
+        (goal parent_id, activity goal_id, todo and completion activity_id).
+        Rows keyed by a UUID or a natural key (journal date, completion date,
+        category name) describe the same record on both sides, so 'rename'
+        behaves like 'skip' for them.
+        
         Args:
             source_path: Path to source database to merge from
             destination_path: Path to destination database to merge into
@@ -123,73 +192,44 @@ class DatabaseOperations:
             'goals_skipped': 0
         }
         
+        if merge_conflict_strategy not in MERGE_STRATEGIES:
+            return False, f"Unknown merge conflict strategy: {merge_conflict_strategy}", stats
+        
+        if not os.path.exists(source_path):
+            return False, "Source database not found", stats
+        
+        if not os.path.exists(destination_path):
+            return False, "Destination database not found", stats
+        
+        conn = None
         try:
-            if not os.path.exists(source_path):
-                return False, "Source database not found", stats
-            
-            if not os.path.exists(destination_path):
-                return False, "Destination database not found", stats
-            
-            # Connect to both databases
-            source_conn = sqlite3.connect(source_path)
-            source_cursor = source_conn.cursor()
-            
-            dest_conn = sqlite3.connect(destination_path)
-            dest_cursor = dest_conn.cursor()
-            
-            # Merge activities
-            source_cursor.execute("SELECT * FROM activities")
-            activities = source_cursor.fetchall()
-            
-            dest_cursor.execute("SELECT id FROM activities")
-            existing_ids = {row[0] for row in dest_cursor.fetchall()}
-            
-            for activity in activities:
-                activity_id = activity[0]
-                if activity_id in existing_ids:
-                    if merge_conflict_strategy == 'skip':
-                        stats['activities_skipped'] += 1
-                        continue
-                    elif merge_conflict_strategy == 'replace':
-                        # Delete existing and insert new
-                        dest_cursor.execute("DELETE FROM activities WHERE id = ?", (activity_id,))
-                
-                # Insert activity
-                dest_cursor.execute("""
-                    INSERT INTO activities 
-                    (title, date, start_time, end_time, completed, type, priority, category, 
-                     days_of_week, goal_id, created_at, updated_at, color)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """, activity[1:])
-                stats['activities_added'] += 1
-            
-            # Merge goals
-            source_cursor.execute("SELECT * FROM goals")
-            goals = source_cursor.fetchall()
-            
-            dest_cursor.execute("SELECT id FROM goals")
-            existing_goal_ids = {row[0] for row in dest_cursor.fetchall()}
-            
-            for goal in goals:
-                goal_id = goal[0]
-                if goal_id in existing_goal_ids:
-                    if merge_conflict_strategy == 'skip':
-                        stats['goals_skipped'] += 1
+            # Autocommit mode so the transaction boundaries below are explicit
+            conn = sqlite3.connect(destination_path, isolation_level=None)
+            cursor = conn.cursor()
+            cursor.execute("ATTACH DATABASE ? AS src", (source_path,))
+            
+            cursor.execute("BEGIN IMMEDIATE")
+            try:
+                # Tables whose id remap table has been staged
+                mapped = set()
+                for table in MERGE_TABLES:
+                    columns = DatabaseOperations._merge_columns(cursor, table['name'])
+                    if not columns:
                         continue
-                    elif merge_conflict_strategy == 'replace':
-                        dest_cursor.execute("DELETE FROM goals WHERE id = ?", (goal_id,))
-                
-                # Insert goal
-                dest_cursor.execute("""
-                    INSERT INTO goals 
-                    (parent_id, title, created_date, due_date, due_time, completed, priority, color)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                """, goal[1:])
-                stats['goals_added'] += 1
-            
-            dest_conn.commit()
-            source_conn.close()
-            dest_conn.close()
+                    if table['id_column']:
+                        DatabaseOperations._merge_id_table(
+                            cursor, table, columns, merge_conflict_strategy, mapped, stats)
+                        mapped.add(table['name'])
+                    else:
+                        DatabaseOperations._merge_keyed_table(
+                            cursor, table, columns, merge_conflict_strategy, mapped, stats)
+                cursor.execute("COMMIT")
+            except Exception:
+                cursor.execute("ROLLBACK")
+                raise
+            finally:
+                for table in MERGE_TABLES:
+                    cursor.execute(f"DROP TABLE IF EXISTS temp.merge_map_{table['name']}")
             
             logger.info(f"Merged database: {stats}")
             return True, None, stats
@@ -197,14 +237,152 @@ class DatabaseOperations:
         except Exception as e:
             logger.error(f"Error merging databases: {e}", exc_info=True)
             return False, str(e), stats
+        finally:
+            if conn is not None:
+                conn.close()
+    
+    @staticmethod
+    def _merge_columns(cursor, table_name: str) -> List[str]:
+        """Return the columns a table has in both databases, or [] if either lacks it."""
+        cursor.execute(f"PRAGMA main.table_info({table_name})")
+        dest_columns = [row[1] for row in cursor.fetchall()]
+        cursor.execute(f"PRAGMA src.table_info({table_name})")
+        source_columns = {row[1] for row in cursor.fetchall()}
+        return [column for column in dest_columns if column in source_columns]
+    
+    @staticmethod
+    def _merge_select_list(table: Dict, columns: List[str], mapped: set) -> Tuple[str, str]:
+        """
+        Build the SELECT list and joins that read a source table with its
+        references remapped to destination ids.
+        
+        Returns:
+            Tuple of (select_list, joins)
+        """
+        select_list = []
+        joins = []
+        for column in columns:
+            if column == table['id_column']:
+                select_list.append("m.new_id")
+            elif table['references'].get(column) in mapped:
+                alias = f"ref_{column}"
+                joins.append(
+                    f"LEFT JOIN temp.merge_map_{table['references'][column]} {alias} "
+                    f"ON {alias}.old_id = s.{column}"
+                )
+                # References to rows missing from the source are kept as they are
+                select_list.append(f"COALESCE({alias}.new_id, s.{column})")
+            else:
+                select_list.append(f"s.{column}")
+        return ", ".join(select_list), " ".join(joins)
+    
+    @staticmethod
+    def _merge_id_table(cursor, table: Dict, columns: List[str], strategy: str,
+                        mapped: set, stats: Dict[str, int]):
+        """Merge a table with an integer primary key, staging an id remap table."""
+        name = table['name']
+        id_column = table['id_column']
+        map_table = f"temp.merge_map_{name}"
+        
+        # Renamed rows are numbered after every id either database has used
+        cursor.execute(f"SELECT MAX(id) FROM (SELECT MAX({id_column}) AS id FROM main.{name} "
+                       f"UNION ALL SELECT MAX({id_column}) FROM src.{name})")
+        base_id = cursor.fetchone()[0] or 0
+        cursor.execute("SELECT 1 FROM main.sqlite_master WHERE name = 'sqlite_sequence'")
+        if cursor.fetchone():
+            cursor.execute("SELECT seq FROM main.sqlite_sequence WHERE name = ?", (name,))
+            row = cursor.fetchone()
+            if row and row[0] > base_id:
+                base_id = row[0]
+        
+        cursor.execute(f"DROP TABLE IF EXISTS {map_table}")
+        cursor.execute(f"""
+            CREATE TABLE {map_table} (
+                old_id INTEGER PRIMARY KEY,
+                new_id INTEGER NOT NULL,
+                action TEXT NOT NULL
+            )
+        """)
+        cursor.execute(f"""
+            INSERT INTO {map_table} (old_id, new_id, action)
+            SELECT s.{id_column},
+                   CASE WHEN d.{id_column} IS NULL OR :strategy != 'rename' THEN s.{id_column}
+                        ELSE :base_id + ROW_NUMBER() OVER (
+                            PARTITION BY d.{id_column} IS NULL ORDER BY s.{id_column})
+                   END,
+                   CASE WHEN d.{id_column} IS NULL THEN 'insert' ELSE :strategy END
+            FROM src.{name} s
+            LEFT JOIN main.{name} d ON d.{id_column} = s.{id_column}
+        """, {'strategy': strategy, 'base_id': base_id})
+        
+        if strategy == 'replace':
+            cursor.execute(f"""
+                DELETE FROM main.{name}
+                WHERE {id_column} IN (SELECT old_id FROM {map_table} WHERE action = 'replace')
+            """)
+        
+        # A self-referencing table (goal parent_id) uses its own remap table
+        select_list, joins = DatabaseOperations._merge_select_list(table, columns, mapped | {name})
+        column_list = ", ".join(columns)
+        cursor.execute(f"""
+            INSERT INTO main.{name} ({column_list})
+            SELECT {select_list}
+            FROM src.{name} s
+            JOIN {map_table} m ON m.old_id = s.{id_column}
+            {joins}
+            WHERE m.action != 'skip'
+        """)
+        
+        cursor.execute(f"SELECT action, COUNT(*) FROM {map_table} GROUP BY action")
+        counts = dict(cursor.fetchall())
+        stats[f'{name}_added'] = counts.get('insert', 0) + counts.get('rename', 0) + counts.get('replace', 0)
+        stats[f'{name}_skipped'] = counts.get('skip', 0)
+        stats[f'{name}_replaced'] = counts.get('replace', 0)
+        stats[f'{name}_renamed'] = counts.get('rename', 0)
+    
+    @staticmethod
+    def _merge_keyed_table(cursor, table: Dict, columns: List[str], strategy: str,
+                           mapped: set, stats: Dict[str, int]):
+        """Merge a table whose rows are identified by UUIDs or natural keys."""
+        name = table['name']
+        select_list, joins = DatabaseOperations._merge_select_list(table, columns, mapped)
+        column_list = ", ".join(columns)
+        source_rows = f"SELECT {select_list} FROM src.{name} s {joins}"
+        
+        replaced = 0
+        if strategy == 'replace':
+            for key in table['unique_keys']:
+                if not all(column in columns for column in key):
+                    continue
+                key_list = ", ".join(key)
+                cursor.execute(f"""
+                    WITH incoming({column_list}) AS ({source_rows})
+                    DELETE FROM main.{name}
+                    WHERE ({key_list}) IN (SELECT {key_list} FROM incoming)
+                """)
+                replaced += cursor.rowcount
+        
+        cursor.execute(f"INSERT OR IGNORE INTO main.{name} ({column_list}) {source_rows}")
+        added = cursor.rowcount
+        cursor.execute(f"SELECT COUNT(*) FROM src.{name}")
+        total = cursor.fetchone()[0]
+        
+        stats[f'{name}_added'] = added
+        stats[f'{name}_skipped'] = total - added
+        stats[f'{name}_replaced'] = replaced
     
     @staticmethod
-    def validate_database(db_path: str) -> Tuple[bool, Optional[str], List[str]]:
+    def validate_database(db_path: str, check_integrity: bool = False) -> Tuple[bool, Optional[str], List[str]]:
         """
-        Validate database integrity.
+        Validate database structure.
+        
+        The full PRAGMA integrity_check reads every page, so it only runs when
+        check_integrity is True; interactive code should use IntegrityCheck,
+        which runs it in the background with progress and cancellation.
         
         Args:
             db_path: Path to database file
+            check_integrity: Also run PRAGMA integrity_check
             
         Returns:
             Tuple of (is_valid, error_message, warnings)
@@ -226,14 +404,16 @@ class DatabaseOperations:
             missing_tables = [table for table in required_tables if table not in tables]
             
             if missing_tables:
+                conn.close()
                 return False, f"Missing required tables: {', '.join(missing_tables)}", warnings
             
             # Check database integrity
-            cursor.execute("PRAGMA integrity_check")
-            integrity_result = cursor.fetchone()
-            
-            if integrity_result and integrity_result[0] != 'ok':
-                warnings.append(f"Integrity check issue: {integrity_result[0]}")
+            if check_integrity:
+                cursor.execute("PRAGMA integrity_check")
+                integrity_result = cursor.fetchone()
+                
+                if integrity_result and integrity_result[0] != 'ok':
+                    warnings.append(f"Integrity check issue: {integrity_result[0]}")
             
             # Check foreign key constraints
             cursor.execute("PRAGMA foreign_key_check")
@@ -253,51 +433,212 @@ class DatabaseOperations:
             return False, str(e), warnings
     
     @staticmethod
-    def get_database_stats(db_path: str) -> Dict[str, Any]:
+    def get_database_stats(db_path: str, exact_counts: bool = False,
+                           include_sizes: bool = False) -> Dict[str, Any]:
         """
         Get statistics about a database.
         
+        Row counts are estimated from sqlite_stat1 (kept current by idle
+        maintenance), falling back to the highest rowid, so no table is
+        scanned. Full-text index shadow tables are left out. Results are
+        cached until the database or its WAL file changes on disk.
+        
         Args:
             db_path: Path to database file
+            exact_counts: Count every row with COUNT(*) instead of estimating
+            include_sizes: Add per-table disk usage from the dbstat table,
+                which reads every page
             
         Returns:
-            Dictionary with database statistics
+            Dictionary with database statistics; 'counts_exact' tells whether
+            the table counts are exact
         """
         stats = {
             'file_size': 0,
             'file_size_mb': 0,
             'last_modified': None,
+            'page_size': 0,
+            'page_count': 0,
+            'freelist_count': 0,
             'tables': {},
-            'total_records': 0
+            'table_sizes': {},
+            'total_records': 0,
+            'counts_exact': exact_counts
         }
         
         try:
             if not os.path.exists(db_path):
                 return stats
             
+            fingerprint = _stats_fingerprint(db_path)
+            cached = _stats_cache.pop(db_path, None)
+            if cached is not None:
+                cached_stats = cached['stats']
+                if (cached['fingerprint'] == fingerprint
+                        and (cached_stats['counts_exact'] or not exact_counts)
+                        and (cached_stats['table_sizes'] or not include_sizes)):
+                    _stats_cache[db_path] = cached
+                    return dict(cached_stats)
+            
             # File stats
             file_stat = os.stat(db_path)
             stats['file_size'] = file_stat.st_size
             stats['file_size_mb'] = file_stat.st_size / (1024 * 1024)
             stats['last_modified'] = datetime.fromtimestamp(file_stat.st_mtime).isoformat()
             
-            # Database stats
             conn = sqlite3.connect(db_path)
             cursor = conn.cursor()
             
-            cursor.execute("SELECT name FROM sqlite_master WHERE type='table'")
-            tables = [row[0] for row in cursor.fetchall()]
+            stats['page_size'] = cursor.execute("PRAGMA page_size").fetchone()[0]
+            stats['page_count'] = cursor.execute("PRAGMA page_count").fetchone()[0]
+            stats['freelist_count'] = cursor.execute("PRAGMA freelist_count").fetchone()[0]
+            
+            cursor.execute("SELECT name, sql FROM sqlite_master WHERE type='table'")
+            schema = cursor.fetchall()
+            virtual_tables = [name for name, sql in schema if sql and sql.upper().startswith('CREATE VIRTUAL TABLE')]
+            tables = [
+                name for name, _ in schema
+                if not name.startswith('sqlite_')
+                and name not in virtual_tables
+                and not any(name.startswith(f"{vtab}_") for vtab in virtual_tables)
+            ]
+            
+            estimates = {}
+            if not exact_counts and any(name == 'sqlite_stat1' for name, _ in schema):
+                cursor.execute("SELECT tbl, stat FROM sqlite_stat1")
+                for table, stat in cursor.fetchall():
+                    try:
+                        rows = int(str(stat).split()[0])
+                    except (ValueError, IndexError):
+                        continue
+                    estimates[table] = max(estimates.get(table, 0), rows)
             
             for table in tables:
-                cursor.execute(f"SELECT COUNT(*) FROM {table}")
-                count = cursor.fetchone()[0]
+                if exact_counts:
+                    count = cursor.execute(f'SELECT COUNT(*) FROM "{table}"').fetchone()[0]
+                elif table in estimates:
+                    count = estimates[table]
+                else:
+                    try:
+                        count = cursor.execute(f'SELECT MAX(rowid) FROM "{table}"').fetchone()[0] or 0
+                    except sqlite3.OperationalError:
+                        # WITHOUT ROWID table
+                        count = cursor.execute(f'SELECT COUNT(*) FROM "{table}"').fetchone()[0]
                 stats['tables'][table] = count
                 stats['total_records'] += count
             
+            if include_sizes:
+                try:
+                    cursor.execute("SELECT name, SUM(pgsize) FROM dbstat WHERE aggregate = 1 GROUP BY name")
+                    stats['table_sizes'] = dict(cursor.fetchall())
+                except sqlite3.OperationalError as e:
+                    logger.debug(f"dbstat is not available: {e}")
+            
             conn.close()
             
+            _stats_cache[db_path] = {
+                'fingerprint': fingerprint,
+                'stats': dict(stats)
+            }
+            while len(_stats_cache) > STATS_CACHE_SIZE:
+                del _stats_cache[next(iter(_stats_cache))]
+            
         except Exception as e:
             logger.error(f"Error getting database stats: {e}", exc_info=True)
         
         return stats
+    
+    @staticmethod
+    def clear_stats_cache(db_path: Optional[str] = None):
+        """Drop cached statistics for one database, or for all of them."""
+        if db_path:
+            _stats_cache.pop(db_path, None)
+        else:
+            _stats_cache.clear()
+
 
+class IntegrityCheck(QObject):
+    """
+    Runs PRAGMA integrity_check on a background thread.
+    
+    The check goes table by table (each table with its indexes), so progress
+    can be reported and cancel() takes effect quickly; a progress handler
+    also interrupts the table being checked. A last whole-file pass covers
+    what the per-table checks skip, such as the freelist and unused pages.
+    """
+    
+    progress = pyqtSignal(int, int)  # Emits (steps done, total steps): one per table, plus the whole-file pass
+    finished = pyqtSignal(bool, list)  # Emits (is_valid, problems); problems is ['cancelled'] if cancelled
+    
+    def __init__(self, db_path: str, parent=None):
+        """Initialize the check for a database."""
+        super().__init__(parent)
+        self.db_path = db_path
+        self._cancelled = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+    
+    def start(self) -> bool:
+        """
+        Start the check.
+        
+        Returns:
+            True if started, False if a check is already running
+        """
+        if self.is_running():
+            return False
+        self._cancelled.clear()
+        self._thread = threading.Thread(target=self.run, name="TaskTitanIntegrityCheck", daemon=True)
+        self._thread.start()
+        return True
+    
+    def cancel(self):
+        """Ask a running check to stop."""
+        self._cancelled.set()
+    
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+    
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Wait for the check; returns True if it is no longer running."""
+        if self._thread is not None:
+            self._thread.join(timeout)
+        return not self.is_running()
+    
+    def run(self) -> Tuple[bool, List[str]]:
+        """Run the check on the calling thread and emit finished."""
+        problems = []
+        try:
+            conn = sqlite3.connect(f"file:{self.db_path}?mode=ro", uri=True)
+            try:
+                conn.set_progress_handler(self._cancelled.is_set, INTEGRITY_PROGRESS_INSTRUCTIONS)
+                tables = [row[0] for row in conn.execute(
+                    "SELECT name FROM sqlite_master WHERE type = 'table' ORDER BY name"
+                )]
+                steps = [f'PRAGMA integrity_check("{table}")' for table in tables]
+                steps.append("PRAGMA integrity_check")
+                self.progress.emit(0, len(steps))
+                for done, step in enumerate(steps, start=1):
+                    if self._cancelled.is_set():
+                        break
+                    for (result,) in conn.execute(step):
+                        if result != 'ok' and result not in problems:
+                            problems.append(result)
+                    self.progress.emit(done, len(steps))
+            finally:
+                conn.close()
+        except sqlite3.OperationalError as e:
+            if not self._cancelled.is_set():
+                problems.append(str(e))
+        except Exception as e:
+            logger.error(f"Error checking database integrity: {e}", exc_info=True)
+            problems.append(str(e))
+        
+        if self._cancelled.is_set():
+            logger.info("Integrity check cancelled")
+            self.finished.emit(False, ['cancelled'])
+            return False, ['cancelled']
+        
+        if problems:
+            logger.warning(f"Integrity check found {len(problems)} problem(s) in {self.db_path}")
+        self.finished.emit(not problems, problems)
+        return not problems, problems
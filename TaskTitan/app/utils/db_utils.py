@@ -2,6 +2,7 @@ import os
 import sys
 import sqlite3
 import shutil
+import stat
 from datetime import datetime
 import re
 from app.utils.logger import get_logger
@@ -114,10 +115,21 @@ def get_backups_dir():
         
     return backups_dir
 
+def get_cache_dir():
+    """Get the path to the directory of persistent caches."""
+    base_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    cache_dir = os.path.join(base_dir, 'data', 'cache')
+    
+    # Create directory if it doesn't exist
+    if not os.path.exists(cache_dir):
+        os.makedirs(cache_dir)
+        
+    return cache_dir
+
 def save_attachment(file_path, date_str=None, category=None, filename=None):
     """
-    Save an attachment file to the date-based directory structure and optionally
-    create a shortcut in the category folder.
+    Save an attachment in the content-addressed store, link it into the
+    date-based directory structure and optionally into the category folder.
     
     Args:
         file_path: Path to the file to be saved
@@ -128,37 +140,16 @@ def save_attachment(file_path, date_str=None, category=None, filename=None):
     Returns:
         A tuple of (original_path, category_shortcut_path) where category_shortcut_path may be None
     """
-    # Generate unique filename if not provided
-    if not filename:
-        # Use original name but add timestamp to avoid overwriting
-        original_name = os.path.basename(file_path)
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"{timestamp}_{original_name}"
-    
-    # First, save in date directory (main storage)
-    date_dir = get_attachments_dir(date_str=date_str)
-    
-    # Create date directory if it doesn't exist
-    if not os.path.exists(date_dir):
-        os.makedirs(date_dir, exist_ok=True)
+    from app.utils.attachment_store import store_attachment
     
-    # Path in the date directory
-    date_path = os.path.join(date_dir, filename)
-    
-    # Copy the file to date directory
     try:
-        shutil.copy2(file_path, date_path)
-        logger.info(f"Copied file to date directory: {date_path}")
+        stored = store_attachment(file_path, date_str=date_str, category=category, filename=filename)
+        logger.info(f"Stored attachment as {stored['file_path']}")
     except Exception as e:
-        logger.error(f"Error copying file to date directory: {e}", exc_info=True)
+        logger.error(f"Error storing attachment: {e}", exc_info=True)
         return (None, None)
     
-    # If category provided and it's not just a year, create a shortcut in category directory
-    category_path = None
-    if category and not re.match(r'^\d{4}$', category):
-        category_path = create_category_shortcut(date_path, category, filename)
-    
-    return (date_path, category_path)
+    return (stored['file_path'], stored['shortcut_path'])
 
 def create_category_shortcut(source_path, category, filename=None):
     """
@@ -190,6 +181,17 @@ def create_category_shortcut(source_path, category, filename=None):
     # Path for the shortcut
     shortcut_path = None
     
+    # A hardlink shares the stored file's data and works on NTFS as well
+    link_path = os.path.join(category_dir, filename)
+    try:
+        if os.path.lexists(link_path):
+            os.remove(link_path)
+        os.link(source_path, link_path)
+        logger.debug(f"Created hardlink: {link_path}")
+        return link_path
+    except OSError as e:
+        logger.debug(f"Hardlink not possible, falling back to a shortcut: {e}")
+    
     try:
         # Determine platform and create appropriate link type
         if os.name == 'nt':  # Windows
@@ -251,6 +253,22 @@ def create_category_shortcut(source_path, category, filename=None):
     
     return shortcut_path
 
+def remove_file(path):
+    """
+    Remove a file even if it is read-only.
+    
+    Stored attachments are read-only, and Windows refuses to delete
+    read-only files.
+    
+    Args:
+        path: Path to the file to remove
+    """
+    try:
+        os.remove(path)
+    except PermissionError:
+        os.chmod(path, stat.S_IREAD | stat.S_IWRITE)
+        os.remove(path)
+
 def remove_attachment(file_path, shortcut_path=None):
     """
     Remove an attachment file and its shortcut if present.
@@ -266,35 +284,61 @@ def remove_attachment(file_path, shortcut_path=None):
     try:
         # Remove main file first
         if file_path and os.path.exists(file_path):
-            os.remove(file_path)
+            remove_file(file_path)
         else:
             success = False
         
         # Remove shortcut if provided
         if shortcut_path and os.path.exists(shortcut_path):
-            os.remove(shortcut_path)
+            remove_file(shortcut_path)
     except Exception as e:
         logger.error(f"Error removing attachment: {e}", exc_info=True)
         success = False
     
     return success
 
-def list_attachment_categories():
+def list_attachment_categories(connection=None):
     """
     List all existing attachment categories.
     
+    Categories come from the indexed category column of journal_attachments;
+    the category folders are only listed if the table cannot be read.
+    
+    Args:
+        connection: Optional database connection
+    
     Returns:
-        List of category names (folder names)
+        List of category names
     """
-    attachments_dir = get_attachments_dir()
+    close_conn = False
+    try:
+        if not connection:
+            connection = sqlite3.connect(get_db_path())
+            close_conn = True
+        cursor = connection.cursor()
+        cursor.execute(
+            "SELECT DISTINCT category FROM journal_attachments "
+            "WHERE category IS NOT NULL AND category != '' ORDER BY category"
+        )
+        return [
+            row[0] for row in cursor.fetchall()
+            # Skip categories that are just 4-digit numbers (years)
+            if not re.match(r'^\d{4}$', row[0])
+        ]
+    except sqlite3.Error as e:
+        logger.debug(f"Listing attachment categories from folders: {e}")
+    finally:
+        if close_conn:
+            connection.close()
     
-    if not os.path.exists(attachments_dir):
+    category_dir = os.path.join(get_attachments_dir(), 'by_category')
+    if not os.path.exists(category_dir):
         return []
     
-    # Get only directories in the attachments folder
+    # Get only directories in the category folder
     categories = []
-    for name in os.listdir(attachments_dir):
-        if os.path.isdir(os.path.join(attachments_dir, name)):
+    for name in os.listdir(category_dir):
+        if os.path.isdir(os.path.join(category_dir, name)):
             # Skip directories that are just 4-digit numbers (years)
             if not re.match(r'^\d{4}$', name):
                 categories.append(name)
@@ -340,7 +384,7 @@ def update_attachment_category(file_id, old_category, new_category, connection=N
         # Remove old shortcut if it exists
         if old_shortcut_path and os.path.exists(old_shortcut_path):
             try:
-                os.remove(old_shortcut_path)
+                remove_file(old_shortcut_path)
                 logger.debug(f"Removed old shortcut: {old_shortcut_path}")
             except Exception as e:
                 logger.warning(f"Could not remove old shortcut: {e}", exc_info=True)
@@ -0,0 +1,189 @@
+"""
+Persistent result cache for TaskTitan.
+
+Aggregate query results (analytics chart data, dashboard goal progress,
+report figures) are kept across restarts in a small SQLite key-value
+database, data/cache/results.db. Each entry records the data version it was
+computed at, so a reader can tell a current result from a last-known-good
+one. Entries are evicted least recently used first once the total size
+passes performance.disk_cache_size_mb.
+
+This tier sits behind the in-memory CacheManager; see app.models.result_cache.
+"""
+
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from typing import Any, Optional, Tuple
+
+from app.utils.logger import get_logger
+from app.utils.db_utils import get_cache_dir
+from app.core.config import get_config
+
+logger = get_logger(__name__)
+
+CACHE_FILENAME = 'results.db'
+
+# Reading an entry refreshes its LRU timestamp at most this often, so warm
+# reads rarely write
+ACCESS_UPDATE_INTERVAL = 60
+
+_disk_cache = None
+
+
+class DiskCache:
+    """Size-bounded LRU key-value store in an SQLite file."""
+
+    def __init__(self, path: Optional[str] = None, max_bytes: Optional[int] = None):
+        """
+        Open or create the cache.
+
+        Args:
+            path: Cache database; defaults to data/cache/results.db
+            max_bytes: Size budget; defaults to performance.disk_cache_size_mb
+        """
+        self.path = path or os.path.join(get_cache_dir(), CACHE_FILENAME)
+        if max_bytes is None:
+            max_bytes = get_config('performance.disk_cache_size_mb', 50) * 1024 * 1024
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(self.path, timeout=5, check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode = WAL")
+        self.conn.execute("PRAGMA synchronous = NORMAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS results (
+                key TEXT PRIMARY KEY,
+                scope TEXT,
+                version TEXT,
+                value BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                accessed REAL NOT NULL
+            )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_results_accessed ON results(accessed)")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_results_scope ON results(scope)")
+        self.total_bytes = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+
+    def get(self, key: str) -> Optional[Tuple[str, Any]]:
+        """
+        Read an entry.
+
+        Returns:
+            Tuple of (version, value), or None if the key is not cached
+        """
+        try:
+            with self.lock:
+                row = self.conn.execute(
+                    "SELECT version, value, accessed FROM results WHERE key = ?", (key,)
+                ).fetchone()
+                if row is None:
+                    return None
+                now = time.time()
+                if now - row[2] > ACCESS_UPDATE_INTERVAL:
+                    self.conn.execute("UPDATE results SET accessed = ? WHERE key = ?", (now, key))
+            return row[0], pickle.loads(row[1])
+        except (sqlite3.Error, pickle.UnpicklingError, EOFError, AttributeError, ImportError) as e:
+            logger.warning(f"Discarding unreadable cached result {key!r}: {e}")
+            self.remove(key)
+            return None
+
+    def set(self, key: str, version: str, value: Any, scope: Optional[str] = None) -> bool:
+        """
+        Store an entry, evicting least recently used entries to stay within budget.
+
+        Args:
+            key: Query signature
+            version: Data version the value was computed at
+            value: Picklable value
+            scope: Optional group the entry belongs to, such as a database path
+
+        Returns:
+            True if stored
+        """
+        try:
+            blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        except (pickle.PicklingError, TypeError, AttributeError) as e:
+            logger.debug(f"Not caching {key!r} on disk: {e}")
+            return False
+        size = len(blob) + len(key)
+        if size > self.max_bytes:
+            return False
+
+        try:
+            with self.lock:
+                self.conn.execute("BEGIN IMMEDIATE")
+                try:
+                    old = self.conn.execute("SELECT size FROM results WHERE key = ?", (key,)).fetchone()
+                    self.conn.execute(
+                        "INSERT OR REPLACE INTO results (key, scope, version, value, size, accessed) "
+                        "VALUES (?, ?, ?, ?, ?, ?)",
+                        (key, scope, version, blob, size, time.time())
+                    )
+                    total = self.total_bytes + size - (old[0] if old else 0)
+                    if total > self.max_bytes:
+                        total -= self._evict(total - self.max_bytes, key)
+                    self.conn.execute("COMMIT")
+                    self.total_bytes = total
+                except BaseException:
+                    self.conn.execute("ROLLBACK")
+                    raise
+            return True
+        except sqlite3.Error as e:
+            logger.warning(f"Could not write cached result {key!r}: {e}")
+            return False
+
+    def _evict(self, needed: int, keep: str) -> int:
+        """Delete least recently used entries until needed bytes are freed; the lock must be held."""
+        freed = 0
+        evicted = []
+        for key, size in self.conn.execute(
+            "SELECT key, size FROM results WHERE key != ? ORDER BY accessed", (keep,)
+        ):
+            if freed >= needed:
+                break
+            evicted.append((key,))
+            freed += size
+        self.conn.executemany("DELETE FROM results WHERE key = ?", evicted)
+        logger.debug(f"Evicted {len(evicted)} cached results ({freed} bytes)")
+        return freed
+
+    def remove(self, key: str):
+        """Delete an entry."""
+        try:
+            with self.lock:
+                row = self.conn.execute("SELECT size FROM results WHERE key = ?", (key,)).fetchone()
+                if row:
+                    self.conn.execute("DELETE FROM results WHERE key = ?", (key,))
+                    self.total_bytes -= row[0]
+        except sqlite3.Error as e:
+            logger.warning(f"Could not remove cached result {key!r}: {e}")
+
+    def clear(self, scope: Optional[str] = None):
+        """Delete every entry, or only the entries of one scope."""
+        with self.lock:
+            if scope is None:
+                self.conn.execute("DELETE FROM results")
+            else:
+                self.conn.execute("DELETE FROM results WHERE scope = ?", (scope,))
+            self.total_bytes = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+
+    def close(self):
+        """Close the cache database."""
+        with self.lock:
+            self.conn.close()
+
+
+def get_disk_cache() -> Optional[DiskCache]:
+    """Return the application's persistent result cache, or None if it is disabled or unavailable."""
+    global _disk_cache
+    if _disk_cache is None:
+        if not get_config('performance.disk_cache_enabled', True):
+            return None
+        try:
+            _disk_cache = DiskCache()
+        except (OSError, sqlite3.Error) as e:
+            logger.warning(f"Persistent result cache unavailable: {e}")
+            return None
+    return _disk_cache
@@ -0,0 +1,274 @@
+"""
+Journal editing support for TaskTitan.
+
+- ensure_journal_schema() brings the journal_entries table up to date once,
+  when the database is opened, instead of on every save.
+- JournalAutosaver is a write-behind queue: the editor hands it snapshots of
+  the entry being edited, and a worker thread writes them with one upsert
+  per entry. Snapshots of the same entry queued before the worker gets to
+  them are coalesced, so only the latest is written.
+- TextStatsCounter keeps the word and character counts of a QTextDocument
+  up to date from the document's change notifications, recounting only the
+  paragraphs that changed.
+"""
+
+import sqlite3
+import threading
+from typing import Dict, List, Optional
+
+from PyQt6.QtCore import QObject, pyqtSignal
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Delay after the last keystroke before an entry is autosaved
+AUTOSAVE_DELAY_MS = 1500
+
+# Columns written by the autosaver, besides id and date
+JOURNAL_TEXT_COLUMNS = ('wins', 'challenges', 'learnings', 'tomorrow', 'gratitude',
+                        'free_writing', 'timestamp', 'name')
+
+# How long an idle autosave worker waits for more work before exiting
+_IDLE_TIMEOUT = 5
+
+
+def ensure_journal_schema(cursor):
+    """
+    Create journal_entries or bring an existing table up to date.
+
+    Adds missing columns, and rebuilds the table if an old schema still has
+    a UNIQUE constraint on date (several entries per day are allowed).
+    """
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS journal_entries (
+            id TEXT PRIMARY KEY,
+            date TEXT,
+            wins TEXT,
+            challenges TEXT,
+            learnings TEXT,
+            tomorrow TEXT,
+            gratitude TEXT,
+            free_writing TEXT,
+            timestamp TEXT,
+            name TEXT
+        )
+    """)
+    cursor.execute("PRAGMA table_info(journal_entries)")
+    columns = {row[1] for row in cursor.fetchall()}
+    for column in ('free_writing', 'timestamp', 'name'):
+        if column not in columns:
+            cursor.execute(f"ALTER TABLE journal_entries ADD COLUMN {column} TEXT")
+            logger.info(f"Added {column} column to journal_entries table")
+
+    if _has_unique_date(cursor):
+        logger.info("Recreating journal_entries table to remove UNIQUE constraint on date")
+        cursor.execute("""
+            CREATE TABLE journal_entries_new (
+                id TEXT PRIMARY KEY,
+                date TEXT,
+                wins TEXT,
+                challenges TEXT,
+                learnings TEXT,
+                tomorrow TEXT,
+                gratitude TEXT,
+                free_writing TEXT,
+                timestamp TEXT,
+                name TEXT
+            )
+        """)
+        cursor.execute("""
+            INSERT INTO journal_entries_new
+            SELECT id, date, wins, challenges, learnings, tomorrow, gratitude,
+                   free_writing, timestamp, name
+            FROM journal_entries
+        """)
+        cursor.execute("DROP TABLE journal_entries")
+        cursor.execute("ALTER TABLE journal_entries_new RENAME TO journal_entries")
+
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_journal_entries_date ON journal_entries(date)")
+
+
+def _has_unique_date(cursor) -> bool:
+    """Check whether journal_entries has a UNIQUE index on date alone."""
+    cursor.execute("PRAGMA index_list(journal_entries)")
+    for index in cursor.fetchall():
+        name, unique = index[1], index[2]
+        if not unique:
+            continue
+        cursor.execute(f'PRAGMA index_info("{name}")')
+        if [row[2] for row in cursor.fetchall()] == ['date']:
+            return True
+    return False
+
+
+class JournalAutosaver(QObject):
+    """Writes journal entry snapshots on a worker thread, latest snapshot per entry wins."""
+
+    entry_saved = pyqtSignal(str, str, bool)  # Emits (entry id, date, whether the entry was new)
+    save_failed = pyqtSignal(str)  # Emits the error message
+
+    def __init__(self, db_path: str, parent=None):
+        """
+        Initialize the autosaver.
+
+        Args:
+            db_path: Database holding journal_entries
+            parent: Optional parent object
+        """
+        super().__init__(parent)
+        self.db_path = db_path
+        self.last_error: Optional[str] = None
+        self._pending: Dict[str, Dict] = {}
+        self._writing = False
+        self._condition = threading.Condition()
+        self._worker: Optional[threading.Thread] = None
+
+    def save(self, entry: Dict):
+        """
+        Queue an entry snapshot for writing.
+
+        Args:
+            entry: Dictionary with id, date and the JOURNAL_TEXT_COLUMNS values
+        """
+        with self._condition:
+            # Replaces an older snapshot of the same entry that is still waiting
+            self._pending[entry['id']] = dict(entry)
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name="TaskTitanJournalAutosave", daemon=True)
+                self._worker.start()
+            self._condition.notify_all()
+
+    def has_pending(self) -> bool:
+        """Check whether snapshots are waiting to be written or being written."""
+        with self._condition:
+            return bool(self._pending) or self._writing
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until every queued snapshot is written.
+
+        Returns:
+            True if nothing is left to write
+        """
+        with self._condition:
+            return self._condition.wait_for(lambda: not self._pending and not self._writing, timeout)
+
+    def _run(self):
+        """Write queued snapshots until the autosaver has been idle for a while."""
+        conn = None
+        try:
+            while True:
+                with self._condition:
+                    if not self._condition.wait_for(lambda: self._pending, _IDLE_TIMEOUT):
+                        self._worker = None
+                        return
+                    batch = list(self._pending.values())
+                    self._pending.clear()
+                    self._writing = True
+                try:
+                    if conn is None:
+                        conn = sqlite3.connect(self.db_path, timeout=10)
+                    saved = self._write(conn, batch)
+                    self.last_error = None
+                except sqlite3.Error as e:
+                    saved = []
+                    self.last_error = str(e)
+                    logger.error(f"Error autosaving journal entries: {e}", exc_info=True)
+                    self.save_failed.emit(str(e))
+                finally:
+                    with self._condition:
+                        self._writing = False
+                        self._condition.notify_all()
+                for entry_id, date_str, created in saved:
+                    self.entry_saved.emit(entry_id, date_str, created)
+        finally:
+            if conn is not None:
+                conn.close()
+
+    @staticmethod
+    def _write(conn, batch: List[Dict]) -> List[tuple]:
+        """Upsert a batch of snapshots in one transaction."""
+        columns = ('id', 'date') + JOURNAL_TEXT_COLUMNS
+        updates = ", ".join(f"{column} = excluded.{column}" for column in JOURNAL_TEXT_COLUMNS)
+        saved = []
+        with conn:
+            for entry in batch:
+                created = conn.execute(
+                    "SELECT 1 FROM journal_entries WHERE id = ?", (entry['id'],)
+                ).fetchone() is None
+                conn.execute(
+                    f"INSERT INTO journal_entries ({', '.join(columns)}) "
+                    f"VALUES ({', '.join('?' for _ in columns)}) "
+                    f"ON CONFLICT(id) DO UPDATE SET {updates}",
+                    tuple(entry.get(column) for column in columns)
+                )
+                saved.append((entry['id'], entry['date'], created))
+        return saved
+
+
+class TextStatsCounter(QObject):
+    """Incrementally maintained word and character counts of a QTextDocument."""
+
+    counts_changed = pyqtSignal(int, int)  # Emits (words, characters)
+
+    def __init__(self, document, parent=None):
+        """
+        Start tracking a document.
+
+        Args:
+            document: QTextDocument to count; it must have a layout (as the
+                document of a text edit does), or no changes are reported
+            parent: Optional parent object
+        """
+        super().__init__(parent)
+        self.document = document
+        self.words = 0
+        self.characters = 0
+        self._block_words: List[int] = []
+        self.recount()
+        document.contentsChange.connect(self.on_contents_change)
+
+    @staticmethod
+    def _count_block(block) -> int:
+        # Words never span paragraphs, so paragraph counts add up to the total
+        return len(block.text().split())
+
+    def recount(self):
+        """Count the whole document."""
+        self._block_words = []
+        block = self.document.firstBlock()
+        while block.isValid():
+            self._block_words.append(self._count_block(block))
+            block = block.next()
+        self._update_totals(sum(self._block_words))
+
+    def on_contents_change(self, position: int, chars_removed: int, chars_added: int):
+        """Recount only the paragraphs touched by a change."""
+        document = self.document
+        end = min(position + chars_added, max(document.characterCount() - 1, 0))
+        first = document.findBlock(position).blockNumber()
+        last = document.findBlock(end).blockNumber()
+        if first < 0 or last < first:
+            self.recount()
+            return
+
+        # Paragraphs inserted or removed by the change shift the ones after it
+        blocks_added = document.blockCount() - len(self._block_words)
+        old_span = (last - first + 1) - blocks_added
+        if old_span < 0 or first + old_span > len(self._block_words):
+            self.recount()
+            return
+
+        new_counts = []
+        block = document.findBlockByNumber(first)
+        for _ in range(last - first + 1):
+            new_counts.append(self._count_block(block))
+            block = block.next()
+        removed = sum(self._block_words[first:first + old_span])
+        self._block_words[first:first + old_span] = new_counts
+        self._update_totals(self.words - removed + sum(new_counts))
+
+    def _update_totals(self, words: int):
+        self.words = words
+        self.characters = max(self.document.characterCount() - 1, 0)
+        self.counts_changed.emit(self.words, self.characters)
@@ -3,14 +3,222 @@ Centralized logging system for TaskTitan.
 
 This module provides a structured logging system with rotation,
 multiple handlers, and configurable log levels.
+
+Loggers only put records on a queue; a QueueListener thread formats them
+and writes the log file and console, so logging never does file I/O on
+the thread that logs. Rotated log files are gzip-compressed in the
+background, chatty call sites are rate limited, and the file can be
+written as JSON lines. Output of print() can be routed through the
+logger as well, when the logging.route_print setting is on.
 """
 
+import atexit
+import copy
+import gzip
+import json
 import logging
 import logging.handlers
 import os
+import queue
+import shutil
 import sys
+import threading
+import time
 from pathlib import Path
-from typing import Optional
+from typing import Dict, Optional
+
+
+# Records a single call site may log per RATE_LIMIT_INTERVAL before the
+# rest are dropped (warnings and errors are never dropped)
+RATE_LIMIT_BURST = 20
+RATE_LIMIT_INTERVAL = 60.0
+
+
+class TextFormatter(logging.Formatter):
+    """Plain text formatter that notes how many similar records were suppressed."""
+    
+    def formatMessage(self, record: logging.LogRecord) -> str:
+        text = super().formatMessage(record)
+        # Set by RateLimitFilter on the first record let through again
+        suppressed = getattr(record, 'suppressed', 0)
+        if suppressed:
+            text = f"{text} ({suppressed} similar messages suppressed)"
+        return text
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """Formats records as one JSON object per line, with timing fields."""
+    
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'time': self.formatTime(record, '%Y-%m-%dT%H:%M:%S') + f".{int(record.msecs):03d}",
+            'level': record.levelname,
+            'logger': record.name,
+            'location': f"{record.filename}:{record.lineno}",
+            'thread': record.threadName,
+            'message': record.getMessage(),
+            # Milliseconds since logging started, for ordering and spacing events
+            'elapsed_ms': round(record.relativeCreated, 1),
+        }
+        # Timings passed with extra={'duration_ms': ...}
+        duration = getattr(record, 'duration_ms', None)
+        if duration is not None:
+            entry['duration_ms'] = duration
+        suppressed = getattr(record, 'suppressed', 0)
+        if suppressed:
+            entry['suppressed'] = suppressed
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry['exception'] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Drops DEBUG and INFO records from a call site that logs more than
+    burst records per interval; the next record let through carries the
+    number suppressed as record.suppressed, which the formatters render.
+    """
+    
+    def __init__(self, burst: int = RATE_LIMIT_BURST, interval: float = RATE_LIMIT_INTERVAL):
+        super().__init__()
+        self.burst = burst
+        self.interval = interval
+        # (pathname, lineno) -> [window start, records in window, suppressed]
+        self._sites: Dict[tuple, list] = {}
+        self._lock = threading.Lock()
+        
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        now = record.created
+        site = (record.pathname, record.lineno)
+        with self._lock:
+            state = self._sites.get(site)
+            if state is None or now - state[0] >= self.interval:
+                suppressed = state[2] if state else 0
+                self._sites[site] = [now, 1, 0]
+            elif state[1] < self.burst:
+                state[1] += 1
+                suppressed = 0
+            else:
+                state[2] += 1
+                return False
+        if suppressed:
+            record.suppressed = suppressed
+        return True
+
+
+class CompressingRotatingFileHandler(logging.handlers.RotatingFileHandler):
+    """Rotating file handler that gzips rotated files on a background thread."""
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.namer = lambda name: f"{name}.gz"
+        self.rotator = self._rotate
+        self._compressor: Optional[threading.Thread] = None
+        
+    def doRollover(self):
+        # The previous file must be compressed before rollover shifts the
+        # numbered files, or it would be written after the shift and lost
+        if self._compressor is not None:
+            self._compressor.join()
+            self._compressor = None
+        super().doRollover()
+        
+    def _rotate(self, source: str, dest: str):
+        pending = f"{dest}.pending"
+        os.replace(source, pending)
+        self._compressor = threading.Thread(
+            target=self._compress, args=(pending, dest), name="TaskTitanLogCompress", daemon=True
+        )
+        self._compressor.start()
+        
+    @staticmethod
+    def _compress(source: str, dest: str):
+        try:
+            with open(source, 'rb') as src, gzip.open(dest, 'wb') as dst:
+                shutil.copyfileobj(src, dst, 1024 * 1024)
+            os.remove(source)
+        except OSError as e:
+            sys.__stderr__.write(f"Could not compress rotated log {source}: {e}\n")
+            
+    def close(self):
+        if self._compressor is not None:
+            self._compressor.join()
+        super().close()
+
+
+class RecordQueueHandler(logging.handlers.QueueHandler):
+    """
+    Queue handler that leaves formatting to the listener thread.
+    
+    The stock prepare() formats the message on the logging thread and folds
+    the traceback into msg, so the formatters never see exc_info. Here a copy
+    of the record is queued as it is, with only the traceback text filled in
+    while its frames are still current.
+    """
+    
+    _traceback_formatter = logging.Formatter()
+    
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self._traceback_formatter.formatException(record.exc_info)
+        return record
+
+
+class PrintToLogger:
+    """
+    File-like object that logs each printed line, for use as sys.stdout.
+    
+    Lines are logged under the module that printed them; lines starting
+    with "Error" or "Warning" keep that severity.
+    """
+    
+    def __init__(self, stream):
+        self.stream = stream
+        self._local = threading.local()
+        
+    def write(self, text: str) -> int:
+        buffer = getattr(self._local, 'buffer', '') + text
+        *lines, self._local.buffer = buffer.split('\n')
+        if lines:
+            # print() calls write() directly, so the frame above is the printer
+            module = sys._getframe(1).f_globals.get('__name__', 'stdout')
+            for line in lines:
+                if line.strip():
+                    self._log(module, line, stacklevel=3)
+        return len(text)
+        
+    @staticmethod
+    def _log(module: str, line: str, stacklevel: int = 1):
+        lowered = line.lstrip().lower()
+        if lowered.startswith('error') or lowered.startswith('critical'):
+            level = logging.ERROR
+        elif lowered.startswith('warning'):
+            level = logging.WARNING
+        else:
+            level = logging.INFO
+        # stacklevel points the record's location at the print() call
+        logging.getLogger(f'TaskTitan.{module}').log(level, line, stacklevel=stacklevel)
+        
+    def flush(self):
+        buffer = getattr(self._local, 'buffer', '')
+        if buffer.strip():
+            self._local.buffer = ''
+            self._log('stdout', buffer, stacklevel=3)
+            
+    def isatty(self) -> bool:
+        return False
+        
+    def fileno(self) -> int:
+        return self.stream.fileno()
+        
+    @property
+    def encoding(self) -> str:
+        return getattr(self.stream, 'encoding', 'utf-8')
 
 
 class TaskTitanLogger:
@@ -19,13 +227,22 @@ class TaskTitanLogger:
     _instance: Optional['TaskTitanLogger'] = None
     _initialized = False
     
-    def __init__(self):
-        """Initialize the logger with file and console handlers."""
+    def __init__(self, json_format: bool = False, rate_limit: bool = True, compress_rotated: bool = True):
+        """
+        Initialize the logger with file and console handlers.
+        
+        Args:
+            json_format: Write the log file as JSON lines
+            rate_limit: Drop DEBUG and INFO records from call sites that log
+                more than RATE_LIMIT_BURST times per RATE_LIMIT_INTERVAL
+            compress_rotated: Gzip rotated log files
+        """
         if TaskTitanLogger._initialized:
             return
             
         self.logger = logging.getLogger('TaskTitan')
         self.logger.setLevel(logging.DEBUG)
+        self.listener: Optional[logging.handlers.QueueListener] = None
         
         # Prevent duplicate handlers
         if self.logger.handlers:
@@ -35,9 +252,19 @@ class TaskTitanLogger:
         self.log_dir = self._get_log_directory()
         os.makedirs(self.log_dir, exist_ok=True)
         
-        # Setup handlers
-        self._setup_file_handler()
-        self._setup_console_handler()
+        # Setup handlers; they run on the listener thread
+        self.handlers = [
+            self._setup_file_handler(json_format, compress_rotated),
+            self._setup_console_handler(),
+        ]
+        log_queue = queue.SimpleQueue()
+        queue_handler = RecordQueueHandler(log_queue)
+        if rate_limit:
+            queue_handler.addFilter(RateLimitFilter())
+        self.logger.addHandler(queue_handler)
+        self.listener = logging.handlers.QueueListener(log_queue, *self.handlers, respect_handler_level=True)
+        self.listener.start()
+        atexit.register(self.shutdown)
         
         TaskTitanLogger._initialized = True
         
@@ -49,16 +276,17 @@ class TaskTitanLogger:
         else:
             # Running as script
             base_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-        
+            
         log_dir = os.path.join(base_dir, 'data', 'logs')
         return log_dir
-    
-    def _setup_file_handler(self):
+        
+    def _setup_file_handler(self, json_format: bool = False, compress_rotated: bool = True) -> logging.Handler:
         """Setup rotating file handler."""
-        log_file = os.path.join(self.log_dir, 'tasktitan.log')
+        log_file = os.path.join(self.log_dir, 'tasktitan.jsonl' if json_format else 'tasktitan.log')
+        handler_class = CompressingRotatingFileHandler if compress_rotated else logging.handlers.RotatingFileHandler
         
         # Rotating file handler: 10MB max, keep 5 backup files
-        file_handler = logging.handlers.RotatingFileHandler(
+        file_handler = handler_class(
             log_file,
             maxBytes=10 * 1024 * 1024,  # 10MB
             backupCount=5,
@@ -67,39 +295,51 @@ class TaskTitanLogger:
         
         file_handler.setLevel(logging.DEBUG)
         
-        # Detailed format for file logs
-        file_formatter = logging.Formatter(
-            '%(asctime)s - %(name)s - %(levelname)s - %(filename)s:%(lineno)d - %(message)s',
-            datefmt='%Y-%m-%d %H:%M:%S'
-        )
-        
+        if json_format:
+            file_formatter = JsonLinesFormatter()
+        else:
+            # Detailed format for file logs
+            file_formatter = TextFormatter(
+                '%(asctime)s - %(name)s - %(levelname)s - %(filename)s:%(lineno)d - %(message)s',
+                datefmt='%Y-%m-%d %H:%M:%S'
+            )
+            
         file_handler.setFormatter(file_formatter)
-        self.logger.addHandler(file_handler)
-    
-    def _setup_console_handler(self):
+        return file_handler
+        
+    def _setup_console_handler(self) -> logging.Handler:
         """Setup console handler."""
-        console_handler = logging.StreamHandler(sys.stdout)
+        # The real stdout, so printed output routed to the logger cannot loop back
+        console_handler = logging.StreamHandler(sys.__stdout__ or sys.stdout)
         console_handler.setLevel(logging.INFO)  # Less verbose for console
         
         # Simpler format for console
-        console_formatter = logging.Formatter(
+        console_formatter = TextFormatter(
             '%(levelname)s - %(message)s'
         )
         
         console_handler.setFormatter(console_formatter)
-        self.logger.addHandler(console_handler)
-    
+        return console_handler
+        
     def get_logger(self) -> logging.Logger:
         """Get the configured logger instance."""
         return self.logger
-    
+        
+    def shutdown(self):
+        """Write out queued records and stop the listener thread."""
+        if self.listener is not None:
+            self.listener.stop()
+            self.listener = None
+            for handler in self.handlers:
+                handler.close()
+                
     @classmethod
-    def get_instance(cls) -> 'TaskTitanLogger':
+    def get_instance(cls, **options) -> 'TaskTitanLogger':
         """Get singleton instance of TaskTitanLogger."""
         if cls._instance is None:
-            cls._instance = cls()
+            cls._instance = cls(**options)
         return cls._instance
-    
+        
     @classmethod
     def get_logger_instance(cls) -> logging.Logger:
         """Get the logger instance (convenience classmethod)."""
@@ -122,20 +362,62 @@ def get_logger(name: Optional[str] = None) -> logging.Logger:
     return TaskTitanLogger.get_logger_instance()
 
 
+def route_print_to_logging():
+    """Send print() output through the TaskTitan logger instead of straight to stdout."""
+    if not isinstance(sys.stdout, PrintToLogger):
+        sys.stdout = PrintToLogger(sys.stdout)
+
+
+class log_duration:
+    """
+    Context manager that logs how long a block took, as duration_ms.
+    
+    Example:
+        with log_duration(logger, "Loaded analytics"):
+            ...
+    """
+    
+    def __init__(self, logger: logging.Logger, message: str, level: int = logging.DEBUG):
+        self.logger = logger
+        self.message = message
+        self.level = level
+        
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+        
+    def __exit__(self, *exc_info):
+        duration_ms = round((time.perf_counter() - self.start) * 1000, 2)
+        self.logger.log(self.level, f"{self.message} in {duration_ms} ms", extra={'duration_ms': duration_ms})
+        return False
+
+
 def setup_logging(level: int = logging.INFO):
     """
     Setup logging with the specified level.
     
+    The logging section of the configuration selects the file format
+    ('text' or 'json'), rate limiting, compression of rotated files and
+    whether print() output is routed through the logger.
+    
     Args:
         level: Logging level (DEBUG, INFO, WARNING, ERROR, CRITICAL).
     """
+    from app.core.config import get_config
+    
     # Get instance first to ensure initialization
-    logger_instance = TaskTitanLogger.get_instance()
+    logger_instance = TaskTitanLogger.get_instance(
+        json_format=get_config('logging.format', 'text') == 'json',
+        rate_limit=get_config('logging.rate_limit', True),
+        compress_rotated=get_config('logging.compress_rotated', True),
+    )
     logger = logger_instance.get_logger()
     logger.setLevel(level)
     
     # Update console handler level
-    for handler in logger.handlers:
+    for handler in getattr(logger_instance, 'handlers', []):
         if isinstance(handler, logging.StreamHandler) and not isinstance(handler, logging.handlers.RotatingFileHandler):
             handler.setLevel(level)
-
+            
+    if get_config('logging.route_print', False):
+        route_print_to_logging()
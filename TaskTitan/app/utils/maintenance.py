@@ -0,0 +1,422 @@
+"""
+Idle-time database maintenance for TaskTitan.
+
+Runs housekeeping SQLite otherwise never gets: WAL checkpoints, planner
+statistics (PRAGMA optimize / ANALYZE), incremental vacuum, full-text
+index merges, re-verification of backups and removal of attachment files
+nothing refers to any more. Work only starts after the user has been idle for a while, is
+done on a worker connection in small time-boxed steps, and stops as soon as
+the user touches the mouse or keyboard again. Every run is recorded in the
+maintenance_log table.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+from PyQt6.QtCore import QTimer, QObject, QEvent, pyqtSignal
+from PyQt6.QtWidgets import QApplication
+from app.utils.logger import get_logger
+from app.models.database import get_db_path
+from app.core.config import get_config
+from app.models.archive import ArchiveManager
+
+logger = get_logger(__name__)
+
+# How often the idle state is checked
+IDLE_CHECK_INTERVAL_MS = 30 * 1000
+
+# SQLite calls the progress handler every this many virtual machine
+# instructions; it is where running statements get interrupted
+PROGRESS_HANDLER_INSTRUCTIONS = 10000
+
+# Row budget per index for ANALYZE and PRAGMA optimize
+ANALYSIS_LIMIT = 1000
+
+# Pages freed per incremental_vacuum step
+VACUUM_PAGES_PER_STEP = 256
+
+# Segments merged per FTS5 'merge' step
+FTS_MERGE_PAGES_PER_STEP = 500
+
+# A task that failed or found the database busy is retried after this,
+# doubling with every further failure, but never later than its interval
+FAILURE_RETRY_DELAY = timedelta(minutes=30)
+
+# maintenance_log rows older than this are deleted
+LOG_RETENTION = timedelta(days=30)
+
+# Longest stop() waits for a running pass at shutdown, in seconds
+STOP_TIMEOUT = 5
+
+# Minimum time between runs of each task, in the order they run. The WAL
+# checkpoint goes last so it also folds in what the other tasks wrote.
+TASK_INTERVALS = {
+    'optimize': timedelta(hours=6),
+    'analyze': timedelta(days=7),
+    'incremental_vacuum': timedelta(days=1),
+    'fts_optimize': timedelta(days=7),
+    'archive_history': timedelta(days=1),
+    'attachment_gc': timedelta(days=7),
+    'verify_backups': timedelta(days=7),
+    'wal_checkpoint': timedelta(minutes=15),
+}
+
+_USER_INPUT_EVENTS = {
+    QEvent.Type.KeyPress,
+    QEvent.Type.MouseButtonPress,
+    QEvent.Type.MouseMove,
+    QEvent.Type.Wheel,
+    QEvent.Type.TouchBegin,
+}
+
+
+class MaintenanceInterrupted(Exception):
+    """Raised inside a task when the user became active or the run ran out of time."""
+
+
+class MaintenanceScheduler(QObject):
+    """Runs database maintenance while the user is idle."""
+
+    maintenance_finished = pyqtSignal(list)  # Emits the records of the run
+
+    def __init__(self, db_path: Optional[str] = None, backup_manager=None, attachment_store=None,
+                 parent=None):
+        """
+        Initialize the scheduler.
+
+        Args:
+            db_path: Database to maintain; defaults to the application database
+            backup_manager: BackupManager whose backups are re-verified; backups
+                are not checked without one
+            attachment_store: AttachmentStore to remove unreferenced files
+                from; skipped without one
+            parent: Optional parent object
+        """
+        super().__init__(parent)
+        self.db_path = db_path or get_db_path()
+        self.backup_manager = backup_manager
+        self.attachment_store = attachment_store
+        self.idle_minutes = get_config('maintenance.idle_minutes', 5)
+        self.step_budget = get_config('maintenance.step_budget_ms', 200) / 1000
+        self.run_budget = get_config('maintenance.run_budget_seconds', 5)
+        self.history: List[Dict] = []
+        self._last_input = time.monotonic()
+        self._user_active = threading.Event()
+        self._deadline = 0.0
+        self._worker: Optional[threading.Thread] = None
+        self._history_lock = threading.Lock()
+
+        self.idle_timer = QTimer(self)
+        self.idle_timer.timeout.connect(self.check_idle)
+
+        if get_config('maintenance.enabled', True):
+            self.start()
+
+    # ---------- Idle detection ----------
+    def start(self):
+        """Start watching for user input and checking for idle time."""
+        app = QApplication.instance()
+        if app is not None:
+            app.installEventFilter(self)
+        self.idle_timer.start(IDLE_CHECK_INTERVAL_MS)
+        logger.info(f"Idle maintenance enabled (after {self.idle_minutes} idle minutes)")
+
+    def stop(self):
+        """Stop scheduling maintenance and interrupt a running pass."""
+        self.idle_timer.stop()
+        app = QApplication.instance()
+        if app is not None:
+            app.removeEventFilter(self)
+        self._user_active.set()
+        if self._worker is not None:
+            # Tasks stop at their next step or progress callback; the worker
+            # is a daemon thread, so a slow one cannot hold up quitting
+            self._worker.join(STOP_TIMEOUT)
+            if self._worker.is_alive():
+                logger.warning("Maintenance pass did not stop in time")
+
+    def eventFilter(self, obj, event):
+        if event.type() in _USER_INPUT_EVENTS:
+            self._last_input = time.monotonic()
+            # Makes a running pass stop at its next progress callback
+            self._user_active.set()
+        return False
+
+    def idle_seconds(self) -> float:
+        """Seconds since the last user input."""
+        return time.monotonic() - self._last_input
+
+    def is_running(self) -> bool:
+        """Check whether a maintenance pass is in progress."""
+        return self._worker is not None and self._worker.is_alive()
+
+    def check_idle(self):
+        """Start a maintenance pass on a worker thread if the user is idle and work is due."""
+        if self.is_running() or self.idle_seconds() < self.idle_minutes * 60:
+            return
+        self._worker = threading.Thread(target=self.run_maintenance, name="TaskTitanMaintenance", daemon=True)
+        self._worker.start()
+
+    # ---------- Running ----------
+    def run_maintenance(self, tasks: Optional[List[str]] = None) -> List[Dict]:
+        """
+        Run the due maintenance tasks until they finish, the run budget is
+        spent or the user becomes active.
+
+        Args:
+            tasks: Task names to run regardless of when they last ran;
+                defaults to the tasks that are due
+
+        Returns:
+            List of records, one per task started
+        """
+        self._user_active.clear()
+        self._deadline = time.monotonic() + self.run_budget
+        records = []
+
+        try:
+            conn = sqlite3.connect(self.db_path, timeout=1)
+        except sqlite3.Error as e:
+            logger.warning(f"Could not open database for maintenance: {e}")
+            return records
+
+        try:
+            self._ensure_log_table(conn)
+            if tasks is None:
+                tasks = self._due_tasks(conn)
+
+            step_deadline = [0.0]
+
+            def on_progress():
+                # Non-zero aborts the running statement with "interrupted"
+                return self._user_active.is_set() or time.monotonic() > step_deadline[0]
+
+            conn.set_progress_handler(on_progress, PROGRESS_HANDLER_INSTRUCTIONS)
+
+            for task in tasks:
+                if self._user_active.is_set() or time.monotonic() > self._deadline:
+                    break
+                records.append(self._run_task(conn, task, step_deadline))
+
+            conn.set_progress_handler(None, 0)
+            self._log_records(conn, records)
+        finally:
+            conn.close()
+
+        with self._history_lock:
+            self.history.extend(records)
+        if records:
+            summary = ", ".join(f"{r['task']} {r['status']} ({r['duration_ms']} ms)" for r in records)
+            logger.info(f"Idle maintenance: {summary}")
+        self.maintenance_finished.emit(records)
+        return records
+
+    def _run_task(self, conn, task: str, step_deadline: list) -> Dict:
+        """Run one task step by step, giving each step its own time box."""
+        started_at = datetime.now()
+        start = time.monotonic()
+        status = 'done'
+        detail = ''
+        steps = getattr(self, f"_task_{task}")(conn)
+        try:
+            while True:
+                if self._user_active.is_set():
+                    raise MaintenanceInterrupted("user became active")
+                if time.monotonic() > self._deadline:
+                    raise MaintenanceInterrupted("run budget spent")
+                step_deadline[0] = min(time.monotonic() + self.step_budget, self._deadline)
+                try:
+                    next(steps)
+                except StopIteration as result:
+                    detail = result.value or ''
+                    break
+        except MaintenanceInterrupted as e:
+            status, detail = 'interrupted', str(e)
+        except sqlite3.OperationalError as e:
+            # Interrupted by the progress handler, or the database was busy
+            status = 'interrupted' if 'interrupt' in str(e) else 'busy'
+            detail = str(e)
+        except sqlite3.Error as e:
+            status, detail = 'failed', str(e)
+            logger.warning(f"Maintenance task {task} failed: {e}")
+        finally:
+            steps.close()
+            if conn.in_transaction:
+                conn.rollback()
+
+        return {
+            'task': task,
+            'started_at': started_at.isoformat(timespec='seconds'),
+            'duration_ms': int((time.monotonic() - start) * 1000),
+            'status': status,
+            'detail': detail,
+        }
+
+    # ---------- Tasks ----------
+    # Each task is a generator; every yield ends one time-boxed step
+
+    def _task_wal_checkpoint(self, conn):
+        busy, log_pages, checkpointed = conn.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchone()
+        yield
+        if busy:
+            raise sqlite3.OperationalError("database busy, WAL not truncated")
+        return f"{checkpointed} of {log_pages} WAL pages checkpointed" if log_pages >= 0 else "not in WAL mode"
+
+    def _task_optimize(self, conn):
+        conn.execute(f"PRAGMA analysis_limit = {ANALYSIS_LIMIT}")
+        conn.execute("PRAGMA optimize")
+        yield
+        return ''
+
+    def _task_analyze(self, conn):
+        conn.execute(f"PRAGMA analysis_limit = {ANALYSIS_LIMIT}")
+        tables = [row[0] for row in conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%'"
+        )]
+        for table in tables:
+            conn.execute(f'ANALYZE "{table}"')
+            yield
+        return f"{len(tables)} tables analyzed"
+
+    def _task_incremental_vacuum(self, conn):
+        if conn.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+            return "skipped, auto_vacuum is not INCREMENTAL"
+        freed = 0
+        while True:
+            free_pages = conn.execute("PRAGMA freelist_count").fetchone()[0]
+            if free_pages == 0:
+                break
+            conn.execute(f"PRAGMA incremental_vacuum({VACUUM_PAGES_PER_STEP})").fetchall()
+            freed += min(free_pages, VACUUM_PAGES_PER_STEP)
+            yield
+        return f"{freed} pages freed"
+
+    def _task_fts_optimize(self, conn):
+        tables = [row[0] for row in conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table' AND sql LIKE '%USING fts5%'"
+        )]
+        for table in tables:
+            # Each merge does a bounded amount of work; a change count below 2
+            # means there was nothing left to merge
+            while True:
+                before = conn.total_changes
+                conn.execute(f'INSERT INTO "{table}"("{table}", rank) VALUES (\'merge\', ?)',
+                             (FTS_MERGE_PAGES_PER_STEP,))
+                conn.commit()
+                yield
+                if conn.total_changes - before < 2:
+                    break
+        return f"{len(tables)} full-text indexes merged"
+
+    def _task_archive_history(self, conn):
+        if not get_config('archive.enabled', True):
+            return "skipped, archiving is disabled"
+
+        def should_stop():
+            return self._user_active.is_set() or time.monotonic() > self._deadline
+
+        # Runs on its own connection, one batch per transaction
+        counts = ArchiveManager(self.db_path).archive_old_history(should_stop=should_stop)
+        yield
+        if should_stop():
+            raise MaintenanceInterrupted(f"stopped after archiving {sum(counts.values())} rows")
+        return f"{sum(counts.values())} rows archived"
+
+    def _task_attachment_gc(self, conn):
+        if self.attachment_store is None:
+            return "skipped, no attachment store"
+        if conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'journal_attachments'"
+        ).fetchone() is None:
+            return "skipped, no attachments table"
+        # The store is shared by every database the user has saved
+        current = os.path.abspath(self.db_path)
+        others = [
+            info['path'] for info in get_config('database.saved_databases', {}).values()
+            if info.get('path') and os.path.abspath(info['path']) != current
+        ]
+        removed = self.attachment_store.collect_garbage(conn.cursor(), others)
+        yield
+        return f"{removed} unreferenced files removed"
+
+    def _task_verify_backups(self, conn):
+        if self.backup_manager is None:
+            return "skipped, no backup manager"
+        catalog = self.backup_manager.get_catalog()
+        # Least recently verified first, so interrupted runs still get round
+        # to every backup
+        entries = sorted(catalog.entries(), key=lambda entry: entry.get('verified_at') or '')
+
+        def should_stop():
+            return self._user_active.is_set() or time.monotonic() > self._deadline
+
+        failed = 0
+        for entry in entries:
+            verified = self.backup_manager.verify_backup(entry['path'], should_stop=should_stop)
+            if verified is None and should_stop():
+                raise MaintenanceInterrupted(f"stopped while verifying {entry['filename']}")
+            if verified is False:
+                failed += 1
+            yield
+        return f"{len(entries)} backups verified, {failed} failed"
+
+    # ---------- Log ----------
+    @staticmethod
+    def _ensure_log_table(conn):
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS maintenance_log (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                task TEXT NOT NULL,
+                started_at TEXT NOT NULL,
+                duration_ms INTEGER NOT NULL,
+                status TEXT NOT NULL,
+                detail TEXT
+            )
+        """)
+        conn.commit()
+
+    @staticmethod
+    def _due_tasks(conn) -> List[str]:
+        """
+        Return the tasks whose interval has passed since they last completed.
+
+        A task whose latest attempts failed or found the database busy waits
+        FAILURE_RETRY_DELAY, doubled for each further failure, before it is
+        tried again.
+        """
+        now = datetime.now()
+        due = []
+        for task, interval in TASK_INTERVALS.items():
+            last_done = conn.execute(
+                "SELECT MAX(started_at) FROM maintenance_log WHERE task = ? AND status = 'done'", (task,)
+            ).fetchone()[0]
+            if last_done is not None and now - datetime.fromisoformat(last_done) < interval:
+                continue
+            failures, last_failure = conn.execute(
+                "SELECT COUNT(*), MAX(started_at) FROM maintenance_log "
+                "WHERE task = ? AND status IN ('failed', 'busy') AND started_at >= ?",
+                (task, last_done or '')
+            ).fetchone()
+            if failures:
+                retry_delay = min(interval, FAILURE_RETRY_DELAY * 2 ** min(failures - 1, 16))
+                if now - datetime.fromisoformat(last_failure) < retry_delay:
+                    continue
+            due.append(task)
+        return due
+
+    @staticmethod
+    def _log_records(conn, records: List[Dict]):
+        try:
+            conn.executemany(
+                "INSERT INTO maintenance_log (task, started_at, duration_ms, status, detail) "
+                "VALUES (:task, :started_at, :duration_ms, :status, :detail)",
+                records
+            )
+            cutoff = (datetime.now() - LOG_RETENTION).isoformat(timespec='seconds')
+            conn.execute("DELETE FROM maintenance_log WHERE started_at < ?", (cutoff,))
+            conn.commit()
+        except sqlite3.Error as e:
+            logger.warning(f"Could not record maintenance run: {e}")
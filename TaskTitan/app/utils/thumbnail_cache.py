@@ -0,0 +1,153 @@
+"""
+Thumbnail cache for journal attachments.
+
+Small scaled copies of image attachments are kept on disk, keyed by the
+content hash of the attachment:
+
+    data/attachments/thumbnails/<first two hex digits>/<sha256>.png
+
+Thumbnails are generated lazily on a background thread the first time an
+attachment list asks for them; after that, listing a day's attachments only
+reads the small cached files, never the originals.
+"""
+
+import os
+import queue
+import threading
+from typing import Optional
+
+from PyQt6.QtCore import QObject, QSize, Qt, pyqtSignal
+from PyQt6.QtGui import QImageReader
+from app.utils.logger import get_logger
+from app.utils.db_utils import get_attachments_dir
+
+logger = get_logger(__name__)
+
+# Longest side of a thumbnail, in pixels
+THUMBNAIL_SIZE = 64
+
+_thumbnail_cache = None
+
+
+class ThumbnailCache(QObject):
+    """Disk cache of attachment thumbnails generated on a worker thread."""
+
+    thumbnail_ready = pyqtSignal(str, str)  # Emits (content hash, thumbnail path)
+
+    def __init__(self, cache_dir: Optional[str] = None, size: int = THUMBNAIL_SIZE, parent=None):
+        """
+        Initialize the cache.
+
+        Args:
+            cache_dir: Directory holding the thumbnails; defaults to
+                data/attachments/thumbnails
+            size: Longest side of a thumbnail, in pixels
+            parent: Optional parent object
+        """
+        super().__init__(parent)
+        self.cache_dir = cache_dir or os.path.join(get_attachments_dir(), 'thumbnails')
+        self.size = size
+        self._queue = queue.Queue()
+        self._pending = set()
+        self._lock = threading.Lock()
+        self._worker: Optional[threading.Thread] = None
+
+    def thumbnail_path(self, content_hash: str) -> str:
+        """Return where the thumbnail for a content hash is stored."""
+        return os.path.join(self.cache_dir, content_hash[:2], f"{content_hash}.png")
+
+    def get(self, content_hash: str, source_path: Optional[str] = None) -> Optional[str]:
+        """
+        Return the cached thumbnail path, or None if it does not exist yet.
+
+        If it does not exist and source_path is given, the thumbnail is
+        generated in the background and thumbnail_ready is emitted when done.
+        """
+        path = self.thumbnail_path(content_hash)
+        if os.path.exists(path):
+            return path
+        if source_path:
+            self.request(content_hash, source_path)
+        return None
+
+    def request(self, content_hash: str, source_path: str):
+        """Queue a thumbnail for generation unless it is already queued."""
+        with self._lock:
+            if content_hash in self._pending:
+                return
+            self._pending.add(content_hash)
+            self._queue.put((content_hash, source_path))
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name="TaskTitanThumbnails", daemon=True)
+                self._worker.start()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Wait until all queued thumbnails are generated; returns True if none are left."""
+        worker = self._worker
+        if worker is not None:
+            worker.join(timeout)
+        with self._lock:
+            return not self._pending
+
+    def generate(self, content_hash: str, source_path: str) -> Optional[str]:
+        """Generate and store the thumbnail for an image on the calling thread."""
+        reader = QImageReader(source_path)
+        reader.setAutoTransform(True)
+        original = reader.size()
+        if original.isValid() and (original.width() > self.size or original.height() > self.size):
+            # Lets formats like JPEG decode at reduced size instead of full resolution
+            reader.setScaledSize(original.scaled(QSize(self.size, self.size), Qt.AspectRatioMode.KeepAspectRatio))
+        image = reader.read()
+        if image.isNull():
+            logger.debug(f"Could not read image for thumbnail {source_path}: {reader.errorString()}")
+            return None
+        if image.width() > self.size or image.height() > self.size:
+            image = image.scaled(self.size, self.size, Qt.AspectRatioMode.KeepAspectRatio,
+                                 Qt.TransformationMode.SmoothTransformation)
+
+        path = self.thumbnail_path(content_hash)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = f"{path}.tmp"
+        if not image.save(temp_path, 'PNG'):
+            logger.warning(f"Could not save thumbnail {path}")
+            return None
+        os.replace(temp_path, path)
+        return path
+
+    def _run(self):
+        """Generate queued thumbnails until the queue is empty."""
+        while True:
+            try:
+                content_hash, source_path = self._queue.get(timeout=1)
+            except queue.Empty:
+                with self._lock:
+                    if self._queue.empty():
+                        self._worker = None
+                        return
+                continue
+            try:
+                path = self.generate(content_hash, source_path)
+            except Exception as e:
+                logger.warning(f"Error generating thumbnail for {source_path}: {e}")
+                path = None
+            with self._lock:
+                self._pending.discard(content_hash)
+            if path:
+                self.thumbnail_ready.emit(content_hash, path)
+
+    def remove(self, content_hash: str):
+        """Delete the cached thumbnail for a content hash."""
+        try:
+            os.remove(self.thumbnail_path(content_hash))
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.warning(f"Could not remove thumbnail {content_hash}: {e}")
+
+
+def get_thumbnail_cache() -> ThumbnailCache:
+    """Return the application's thumbnail cache."""
+    global _thumbnail_cache
+    if _thumbnail_cache is None:
+        _thumbnail_cache = ThumbnailCache()
+    return _thumbnail_cache
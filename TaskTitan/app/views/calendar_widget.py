@@ -1,14 +1,31 @@
 from PyQt6.QtWidgets import (QCalendarWidget, QWidget, QVBoxLayout, QLabel, QGridLayout, 
                           QSizePolicy, QScrollArea, QFrame, QHBoxLayout, QApplication, QToolButton)
 from PyQt6.QtWidgets import QDialog, QPushButton, QLineEdit, QComboBox, QTimeEdit, QDialogButtonBox, QFormLayout, QColorDialog
-from PyQt6.QtCore import Qt, QDate, QSize, pyqtSignal, QPointF, QTime, QRect
-from PyQt6.QtGui import QColor, QPainter, QPen, QBrush, QPalette, QLinearGradient, QFont, QRadialGradient, QFontDatabase
+from PyQt6.QtCore import Qt, QDate, QSize, pyqtSignal, QPointF, QTime, QRect, QTimer, QEvent
+from PyQt6.QtGui import QColor, QPainter, QPen, QBrush, QPalette, QLinearGradient, QFont, QRadialGradient, QFontDatabase, QPixmap
 import datetime
 import math
 import sys
+from functools import lru_cache
 
 # Import ActivityAddEditDialog for consistency across the application
 from app.views.unified_activities_widget import ActivityAddEditDialog
+from app.utils.cache import LRUCache
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Persian calendar names, built once at import time
+PERSIAN_MONTH_NAMES = (
+    "فروردین", "اردیبهشت", "خرداد", 
+    "تیر", "مرداد", "شهریور", 
+    "مهر", "آبان", "آذر", 
+    "دی", "بهمن", "اسفند"
+)
+PERSIAN_SHORT_MONTH_NAMES = tuple(name[:3] for name in PERSIAN_MONTH_NAMES)
+# Week starts on Saturday in the Persian calendar
+PERSIAN_DAY_NAMES = ("شنبه", "یکشنبه", "دوشنبه", "سه‌شنبه", "چهارشنبه", "پنجشنبه", "جمعه")
+PERSIAN_SHORT_DAY_NAMES = ("ش", "ی", "د", "س", "چ", "پ", "ج")
 
 # Corrected Persian Date Conversion
 class PersianDate:
@@ -17,10 +34,12 @@ class PersianDate:
     @staticmethod
     def gregorian_to_persian(date):
         """Convert Gregorian date to Persian date using the official Iranian calendar algorithm."""
-        year = date.year()
-        month = date.month()
-        day = date.day()
-        
+        return PersianDate._gregorian_to_persian(date.year(), date.month(), date.day())
+    
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def _gregorian_to_persian(year, month, day):
+        """Memoized conversion backing gregorian_to_persian."""
         # Convert Gregorian to Julian Day Number using correct algorithm
         # Using the standard algorithm (more accurate formula)
         a = math.floor((14 - month) / 12)
@@ -127,21 +146,16 @@ class PersianDate:
     @staticmethod
     def get_persian_month_name(month):
         """Get Persian month name."""
-        months = [
-            "فروردین", "اردیبهشت", "خرداد", 
-            "تیر", "مرداد", "شهریور", 
-            "مهر", "آبان", "آذر", 
-            "دی", "بهمن", "اسفند"
-        ]
         if 1 <= month <= 12:
-            return months[month-1]
+            return PERSIAN_MONTH_NAMES[month-1]
         return ""
     
     @staticmethod
     def get_persian_short_month_name(month):
         """Get Persian month short name (first 3 characters)."""
-        full_name = PersianDate.get_persian_month_name(month)
-        return full_name[:3] if full_name else ""
+        if 1 <= month <= 12:
+            return PERSIAN_SHORT_MONTH_NAMES[month-1]
+        return ""
     
     @staticmethod
     def get_persian_day_of_week(date):
@@ -152,8 +166,7 @@ class PersianDate:
         # Convert to Persian day of week (0=Saturday to 6=Friday)
         persian_day_of_week = (gregorian_day_of_week + 1) % 7
         
-        days = ["شنبه", "یکشنبه", "دوشنبه", "سه‌شنبه", "چهارشنبه", "پنجشنبه", "جمعه"]
-        return days[persian_day_of_week]
+        return PERSIAN_DAY_NAMES[persian_day_of_week]
     
     @staticmethod
     def get_persian_short_day_of_week(date):
@@ -161,8 +174,7 @@ class PersianDate:
         gregorian_day_of_week = date.dayOfWeek()
         persian_day_of_week = (gregorian_day_of_week + 1) % 7
         
-        days = ["ش", "ی", "د", "س", "چ", "پ", "ج"]
-        return days[persian_day_of_week]
+        return PERSIAN_SHORT_DAY_NAMES[persian_day_of_week]
 
 class EventDialog(QDialog):
     """Dialog for adding or editing calendar events."""
@@ -379,6 +391,20 @@ class DualCalendarWidget(QCalendarWidget):
             QColor("#A78BFA")   # Purple
         ]
         
+        # Pens, brushes and colors reused by every cell render
+        self._cell_clear_color = QColor(255, 255, 255)
+        self._cell_border_pen = QPen(QColor("#E2E8F0"), 0.5)
+        self._in_month_brush = QBrush(QColor("#FFFFFF"))
+        self._out_of_month_brush = QBrush(QColor("#F9FAFB"))
+        self._weekend_brush = QBrush(self.weekend_color)
+        self._divider_pen = QPen(self.divider_color, 0.8, Qt.PenStyle.SolidLine)
+        self._highlight_gregorian_color = QColor("#4338CA")  # Darker indigo for Gregorian
+        self._highlight_persian_color = QColor("#FB8C00")    # Orange for Persian
+        
+        # Rendered cells keyed by (date, state flags, events, theme, size, dpr)
+        self._cell_cache = LRUCache(512)
+        self._theme_generation = 0
+        
         # Add a Persian font
         # QFontDatabase.addApplicationFont("path/to/persian-font.ttf")  # Could add a Persian font
         self.persian_font = QFont("Arial", 9)  # Fallback
@@ -422,6 +448,7 @@ class DualCalendarWidget(QCalendarWidget):
             self.events[date_str] = []
             
         self.events[date_str].append(event_data)
+        self.invalidateCellCache()
         self.updateCells()
     
     def generateSampleEvents(self):
@@ -604,55 +631,103 @@ class DualCalendarWidget(QCalendarWidget):
         """)
     
     def paintCell(self, painter, rect, date):
+        """Paint a cell from the pixmap cache, rendering it on a cache miss."""
+        in_month = date.month() == self.monthShown()
+        is_today = date == QDate.currentDate()
+        is_selected = date == self.selectedDate()
+        event_list = self.events.get(date.toString("yyyy-MM-dd"), [])
+        dpr = painter.device().devicePixelRatioF()
+        
+        key = (
+            date.toJulianDay(), in_month, is_today, is_selected,
+            self._eventSignature(event_list), self._theme_generation,
+            rect.width(), rect.height(), dpr
+        )
+        pixmap = self._cell_cache.get(key)
+        if pixmap is None:
+            pixmap = QPixmap(math.ceil(rect.width() * dpr), math.ceil(rect.height() * dpr))
+            pixmap.setDevicePixelRatio(dpr)
+            pixmap.fill(self._cell_clear_color)
+            
+            cell_painter = QPainter(pixmap)
+            cell_painter.setRenderHints(painter.renderHints())
+            cell_painter.setFont(painter.font())
+            self._renderCell(
+                cell_painter, QRect(0, 0, rect.width(), rect.height()), date,
+                event_list, in_month, is_today, is_selected
+            )
+            cell_painter.end()
+            self._cell_cache.set(key, pixmap)
+        
+        painter.drawPixmap(rect.topLeft(), pixmap)
+    
+    def _eventSignature(self, event_list):
+        """Summarize what the event markers of a cell depend on."""
+        return (len(event_list),) + tuple(
+            QColor(event.get("color", self.event_colors[i % len(self.event_colors)])).rgba()
+            for i, event in enumerate(event_list[:5])
+        )
+    
+    def invalidateCellCache(self):
+        """Drop all cached cell pixmaps."""
+        self._cell_cache.clear()
+    
+    def changeEvent(self, event):
+        """Invalidate cached cells when the theme, palette or font changes."""
+        if event.type() in (QEvent.Type.StyleChange, QEvent.Type.PaletteChange, QEvent.Type.FontChange):
+            self._theme_generation += 1
+            self.invalidateCellCache()
+        super().changeEvent(event)
+    
+    def resizeEvent(self, event):
+        """Invalidate cached cells when the cell size changes."""
+        self.invalidateCellCache()
+        super().resizeEvent(event)
+    
+    def _renderCell(self, painter, rect, date, event_list, in_month, is_today, is_selected):
         """Paint cell with both Gregorian and Persian calendars with elegant design."""
         painter.save()
         
-        # Get current date for comparison
-        current_date = QDate.currentDate()
-        selected_date = self.selectedDate()
-        
-        # First clear the cell background
+        # The pixmap is pre-filled with the cell background colour
         cell_rect = rect.adjusted(1, 1, -1, -1)
-        painter.fillRect(rect, QColor(255, 255, 255))
         
         # Create a rounded rectangle for the cell with shadow effect
-        if date.month() == self.monthShown():
+        painter.setPen(self._cell_border_pen)
+        if in_month:
             # Current month cells are white with a subtle border
-            painter.setPen(QPen(QColor("#E2E8F0"), 0.5))
-            painter.setBrush(QBrush(QColor("#FFFFFF")))
+            painter.setBrush(self._in_month_brush)
         else:
             # Out-of-month cells are slightly grayed out
-            painter.setPen(QPen(QColor("#E2E8F0"), 0.5))
-            painter.setBrush(QBrush(QColor("#F9FAFB")))
+            painter.setBrush(self._out_of_month_brush)
         
         # Handle weekends with lighter background
         if date.dayOfWeek() >= 6:  # Saturday or Sunday
-            painter.setBrush(QBrush(self.weekend_color))
+            painter.setBrush(self._weekend_brush)
         
         # Draw the cell background
         painter.drawRoundedRect(cell_rect, 6, 6)
         
         # Special styling for today's date
-        if date == current_date:
+        if is_today:
             today_rect = rect.adjusted(3, 3, -3, -3)
             painter.setPen(QPen(self.today_color, 0.7))
             painter.setBrush(QBrush(self.today_color.lighter(160)))
             painter.drawRoundedRect(today_rect, 6, 6)
             
             # Set text colors for today
-            g_text_color = QColor("#4338CA")  # Darker indigo for Gregorian
-            p_text_color = QColor("#FB8C00")  # Orange for Persian
+            g_text_color = self._highlight_gregorian_color
+            p_text_color = self._highlight_persian_color
         
         # Special styling for selected date
-        elif date == selected_date:
+        elif is_selected:
             select_rect = rect.adjusted(3, 3, -3, -3)
             painter.setPen(QPen(self.selection_color, 0.7))
             painter.setBrush(QBrush(self.selection_color.lighter(160)))
             painter.drawRoundedRect(select_rect, 6, 6)
             
             # Set text colors for selected date
-            g_text_color = QColor("#4338CA")  # Darker indigo for Gregorian
-            p_text_color = QColor("#FB8C00")  # Orange for Persian
+            g_text_color = self._highlight_gregorian_color
+            p_text_color = self._highlight_persian_color
         else:
             # Default text colors
             g_text_color = self.gregorian_text_color
@@ -662,7 +737,7 @@ class DualCalendarWidget(QCalendarWidget):
         persian_year, persian_month, persian_day = PersianDate.gregorian_to_persian(date)
         
         # Draw divider between Gregorian and Persian dates
-        painter.setPen(QPen(self.divider_color, 0.8, Qt.PenStyle.SolidLine))
+        painter.setPen(self._divider_pen)
         painter.drawLine(
             int(rect.left() + 5), 
             int(rect.top() + rect.height() * 0.5), 
@@ -673,7 +748,7 @@ class DualCalendarWidget(QCalendarWidget):
         # Draw Gregorian date
         gregorian_font = painter.font()
         gregorian_font.setPointSize(11)
-        gregorian_font.setBold(date == current_date or date == selected_date)
+        gregorian_font.setBold(is_today or is_selected)
         painter.setFont(gregorian_font)
         painter.setPen(g_text_color)
         
@@ -686,7 +761,7 @@ class DualCalendarWidget(QCalendarWidget):
         )
         
         # Draw Gregorian date
-        if date.month() == self.monthShown():
+        if in_month:
             # Current month days are shown normally
             painter.drawText(g_text_rect, Qt.AlignmentFlag.AlignCenter, str(date.day()))
         else:
@@ -697,7 +772,7 @@ class DualCalendarWidget(QCalendarWidget):
         # Draw Persian date
         persian_font = self.persian_font
         persian_font.setPointSize(9)
-        persian_font.setBold(date == current_date or date == selected_date)
+        persian_font.setBold(is_today or is_selected)
         painter.setFont(persian_font)
         painter.setPen(p_text_color)
         
@@ -710,7 +785,7 @@ class DualCalendarWidget(QCalendarWidget):
         )
         
         # Draw Persian date
-        if date.month() == self.monthShown():
+        if in_month:
             # Current month days are shown normally
             painter.drawText(p_text_rect, Qt.AlignmentFlag.AlignCenter, str(persian_day))
         else:
@@ -719,9 +794,7 @@ class DualCalendarWidget(QCalendarWidget):
             painter.drawText(p_text_rect, Qt.AlignmentFlag.AlignCenter, str(persian_day))
         
         # Check if this date has events
-        date_str = date.toString("yyyy-MM-dd")
-        if date_str in self.events:
-            event_list = self.events[date_str]
+        if event_list:
             event_count = len(event_list)
             
             # Draw elegant event indicators
@@ -768,6 +841,7 @@ class DualCalendarWidget(QCalendarWidget):
     def setEvents(self, events_data):
         """Set events data for the calendar."""
         self.events = events_data
+        self.invalidateCellCache()
         self.updateCells()
         
     def getEvents(self, date):
@@ -790,12 +864,20 @@ ModernCalendarWidget = DualCalendarWidget
 class CalendarWithEventList(QWidget):
     """Widget combining a calendar with an event list display."""
     
+    # Number of months of event buckets kept in memory
+    MONTH_CACHE_SIZE = 12
+    
     def __init__(self, parent=None):
         super().__init__(parent)
         
         # Store reference to main window (if available through parent chain)
         self.main_window = self.findMainWindow()
         
+        # Month window state: "yyyy-MM" -> {"yyyy-MM-dd": [events]}
+        self.activities_manager = None
+        self._month_cache = LRUCache(self.MONTH_CACHE_SIZE)
+        self._shown_page = None
+        
         # Main layout - change to horizontal layout for side-by-side
         layout = QHBoxLayout(self)
         layout.setContentsMargins(0, 0, 0, 0)
@@ -892,7 +974,9 @@ class CalendarWithEventList(QWidget):
         # Connect signals
         self.calendar.selectionChanged.connect(self.updateEventsList)
         self.calendar.dateDoubleClicked.connect(self.addEvent)
+        self.calendar.currentPageChanged.connect(self.onCalendarPageChanged)
         self.activities_shortcut.clicked.connect(self.openActivitiesView)
+        self._shown_page = QDate(self.calendar.yearShown(), self.calendar.monthShown(), 1)
         
         # Load synchronized activities initially
         self.syncWithActivitiesManager()
@@ -915,105 +999,123 @@ class CalendarWithEventList(QWidget):
             # Use sample events in standalone mode
             return
         
-        try:
-            # Clear existing events first
-            self.calendar.events = {}
-
-            # Get activities from the UnifiedActivitiesWidget
-            activities_view = getattr(self.main_window, 'activities_view', None)
-
-            if not activities_view or not hasattr(activities_view, 'activities'):
-                print("No activities found in the main system")
-                return
-                
-            # Iterate through all activities
-            for activity_type in activities_view.activities:
-                for activity in activities_view.activities[activity_type]:
-                    # Only process events (type 'event')
-                    if activity_type == 'event':
-                        # Extract date and convert to QDate
-                        if 'date' in activity:
-                            # Handle different date formats
-                            if isinstance(activity['date'], QDate):
-                                date = activity['date']
-                            elif isinstance(activity['date'], str):
-                                date = QDate.fromString(activity['date'], "yyyy-MM-dd")
-                            else:
-                                # Skip if date format is unknown
-                                continue
-                                
-                            # Create the calendar event
-                            event_data = {
-                                "id": activity.get('id', None),
-                                "title": activity.get('title', 'Untitled'),
-                                "date": date,
-                                "time": activity.get('start_time', QTime(0, 0)),
-                                "category": activity.get('category', 'Other'),
-                                "color": self.getCategoryColor(activity.get('category', 'Other')),
-                                "activity_data": activity  # Store original activity data
-                            }
-                            
-                            # Add to the calendar
-                            date_str = date.toString("yyyy-MM-dd")
-                            if date_str not in self.calendar.events:
-                                self.calendar.events[date_str] = []
-                            
-                            self.calendar.events[date_str].append(event_data)
-            
-            # Update the calendar display
-            self.calendar.updateCells()
-
-        except Exception as e:
-            print(f"Error syncing with activities manager: {e}")
+        activities_manager = getattr(self.main_window, 'activities_manager', None)
+        if activities_manager:
+            self.sync_with_activities(activities_manager)
             
     def sync_with_activities(self, activities_manager):
         """Sync calendar with activities from the provided activities manager.
         
+        Only the visible month and its neighbours are loaded; any cached
+        months are dropped because the underlying activities changed.
+        
         Args:
             activities_manager: An instance of ActivitiesManager 
         """
         try:
-            # Clear existing events first
-            self.calendar.events = {}
+            self.activities_manager = activities_manager
+            self._month_cache.clear()
             
-            # Get all activities
             if activities_manager:
-                activities = activities_manager.get_all_activities()
-                
-                # Process activities and add events to calendar
-                for activity in activities:
-                    # Only process events
-                    if activity.get('type') == 'event':
-                        # Extract date
-                        date = activity.get('date')
-                        if isinstance(date, str):
-                            date = QDate.fromString(date, "yyyy-MM-dd")
-                            
-                        # Create calendar event object
-                        event_data = {
-                            "id": activity.get('id'),
-                            "title": activity.get('title', 'Untitled'),
-                            "date": date,
-                            "time": activity.get('start_time', QTime(0, 0)),
-                            "category": activity.get('category', 'Other'),
-                            "color": self.getCategoryColor(activity.get('category', 'Other')),
-                            "activity_data": activity  # Store original data
-                        }
-                        
-                        # Add to calendar events
-                        date_str = date.toString("yyyy-MM-dd")
-                        if date_str not in self.calendar.events:
-                            self.calendar.events[date_str] = []
-                        
-                        self.calendar.events[date_str].append(event_data)
+                self.refreshVisibleEvents()
+            else:
+                self.calendar.events = {}
+                self.calendar.updateCells()
             
-            # Update calendar display
-            self.calendar.updateCells()
             # Update events list if a date is selected
             self.updateEventsList()
             
         except Exception as e:
-            print(f"Error syncing calendar with activities: {e}")
+            logger.error(f"Error syncing calendar with activities: {e}", exc_info=True)
+    
+    def refreshVisibleEvents(self):
+        """Rebuild the calendar events from the cached month window."""
+        events = {}
+        for year, month in self._visibleMonths():
+            events.update(self._loadMonth(year, month))
+        
+        self.calendar.events = events
+        self.calendar.updateCells()
+    
+    def onCalendarPageChanged(self, year, month):
+        """Swap in the event window for the newly shown month."""
+        previous_page = self._shown_page
+        self._shown_page = QDate(year, month, 1)
+        
+        if not self.activities_manager:
+            return
+        
+        try:
+            self.refreshVisibleEvents()
+            
+            # Prefetch the month that enters the window on the next step
+            # in the same direction, after this page has been painted
+            step = 1 if previous_page is None or self._shown_page >= previous_page else -1
+            ahead = self._shown_page.addMonths(2 * step)
+            QTimer.singleShot(0, lambda: self._prefetchMonth(ahead.year(), ahead.month()))
+        except Exception as e:
+            logger.error(f"Error loading calendar month: {e}", exc_info=True)
+    
+    def invalidateMonth(self, date):
+        """Drop the cached events for the month containing a date."""
+        self._month_cache.remove(self._monthKey(date.year(), date.month()))
+    
+    def _visibleMonths(self):
+        """Return (year, month) for the shown month and its neighbours."""
+        page = QDate(self.calendar.yearShown(), self.calendar.monthShown(), 1)
+        return [(d.year(), d.month()) for d in (page.addMonths(-1), page, page.addMonths(1))]
+    
+    @staticmethod
+    def _monthKey(year, month):
+        """Build the month cache key."""
+        return f"{year:04d}-{month:02d}"
+    
+    def _loadMonth(self, year, month):
+        """Return the events of a month bucketed by yyyy-MM-dd.
+        
+        Buckets come from the month LRU; a miss runs one indexed range query.
+        """
+        key = self._monthKey(year, month)
+        buckets = self._month_cache.get(key)
+        if buckets is not None:
+            return buckets
+        
+        first_day = QDate(year, month, 1)
+        last_day = first_day.addDays(first_day.daysInMonth() - 1)
+        
+        buckets = {}
+        for activity in self.activities_manager.get_activities_in_range(first_day, last_day, 'event'):
+            event_data = self._activityToEvent(activity)
+            date_str = event_data["date"].toString("yyyy-MM-dd")
+            buckets.setdefault(date_str, []).append(event_data)
+        
+        self._month_cache.set(key, buckets)
+        return buckets
+    
+    def _prefetchMonth(self, year, month):
+        """Warm the month cache without touching the displayed events."""
+        if not self.activities_manager:
+            return
+        try:
+            self._loadMonth(year, month)
+        except Exception as e:
+            logger.error(f"Error prefetching calendar month: {e}", exc_info=True)
+    
+    def _activityToEvent(self, activity):
+        """Convert an activity dictionary into a calendar event."""
+        date = activity.get('date')
+        if isinstance(date, str):
+            date = QDate.fromString(date, "yyyy-MM-dd")
+        
+        return {
+            "id": activity.get('id'),
+            "title": activity.get('title', 'Untitled'),
+            "date": date,
+            "time": activity.get('start_time', QTime(0, 0)),
+            "category": activity.get('category', 'Other'),
+            "color": self.getCategoryColor(activity.get('category', 'Other')),
+            "activity_data": activity  # Store original data
+        }
     
     def getCategoryColor(self, category):
         """Get color for a specific category."""
@@ -1256,6 +1358,8 @@ class CalendarWithEventList(QWidget):
                     if date_str not in self.calendar.events:
                         self.calendar.events[date_str] = []
                     self.calendar.events[date_str].append(calendar_event)
+                    # Drop the cached month so later page changes reload it
+                    self.invalidateMonth(date)
                     
                     # 3. Update the activities view if it exists
                     if hasattr(self.main_window, 'activitiesView'):
@@ -1305,7 +1409,7 @@ class CalendarWithEventList(QWidget):
                             # Emit the signal
                             self.main_window.onActivityAdded(activity_data)
                     except Exception as e:
-                        print(f"Error adding event to activities manager: {e}")
+                        logger.error(f"Error adding event to activities manager: {e}", exc_info=True)
                 
                 # Update the events list display
                 self.updateEventsList()
@@ -1355,6 +1459,8 @@ class CalendarWithEventList(QWidget):
                         try:
                             # Update in activities manager
                             self.main_window.activities_manager.update_activity(activity_id, updated_data)
+                            self.invalidateMonth(event['date'])
+                            self.invalidateMonth(updated_data['date'])
                             
                             # Also update in activities view if it exists
                             if hasattr(self.main_window, 'activitiesView'):
@@ -1362,7 +1468,7 @@ class CalendarWithEventList(QWidget):
                                 if hasattr(self.main_window.activitiesView, 'syncWithCalendar'):
                                     self.main_window.activitiesView.syncWithCalendar()
                         except Exception as e:
-                            print(f"Error updating event in activities manager: {e}")
+                            logger.error(f"Error updating event in activities manager: {e}", exc_info=True)
                     
                     # Update the events list display
                     self.updateEventsList()
@@ -9,6 +9,9 @@ from PyQt6.QtGui import QFont, QColor, QPen, QBrush, QPainter, QPainterPath
 from app.resources import get_icon
 from app.models.activities_manager import ActivitiesManager
 from .todo_item_dialog import TodoItemDialog
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
 
 class DailyPlanView(QWidget):
     activityClicked = pyqtSignal(dict)
@@ -758,7 +761,7 @@ class DailyPlanView(QWidget):
             
             event.accept()
         except Exception as e:
-            print(f"Error handling scene click: {e}")
+            logger.error(f"Error handling scene click: {e}", exc_info=True)
             import traceback
             traceback.print_exc()
             event.accept()
@@ -6,7 +6,8 @@ Allows users to create, load, save, and switch between multiple databases.
 from PyQt6.QtWidgets import (
     QDialog, QVBoxLayout, QHBoxLayout, QLabel, QPushButton,
     QListWidget, QListWidgetItem, QLineEdit, QFileDialog,
-    QMessageBox, QFormLayout, QGroupBox, QDialogButtonBox, QInputDialog
+    QMessageBox, QFormLayout, QGroupBox, QDialogButtonBox, QInputDialog,
+    QProgressBar, QApplication
 )
 from PyQt6.QtCore import Qt, pyqtSignal
 from pathlib import Path
@@ -17,6 +18,7 @@ from datetime import datetime
 from app.utils.logger import get_logger
 from app.models.database import get_db_path, initialize_db
 from app.models.database_manager import DatabaseManager
+from app.utils.db_operations import DatabaseOperations, IntegrityCheck
 
 logger = get_logger(__name__)
 
@@ -31,6 +33,7 @@ class DatabaseManagerDialog(QDialog):
         super().__init__(parent)
         self.current_db_path = get_db_path()
         self.databases_config = self._load_databases_config()
+        self.integrity_check = None
         self.setupUI()
         self.load_databases_list()
     
@@ -58,9 +61,31 @@ class DatabaseManagerDialog(QDialog):
         
         # Database info
         db_info = self._get_database_info(self.current_db_path)
-        info_label = QLabel(db_info)
-        info_label.setWordWrap(True)
-        current_layout.addWidget(info_label)
+        self.info_label = QLabel(db_info)
+        self.info_label.setWordWrap(True)
+        current_layout.addWidget(self.info_label)
+        
+        # Exact counts and integrity checks are on request only
+        check_buttons = QHBoxLayout()
+        
+        self.count_btn = QPushButton("Count Rows Exactly")
+        self.count_btn.clicked.connect(self.count_rows_exactly)
+        check_buttons.addWidget(self.count_btn)
+        
+        self.integrity_btn = QPushButton("Check Integrity")
+        self.integrity_btn.clicked.connect(self.toggle_integrity_check)
+        check_buttons.addWidget(self.integrity_btn)
+        check_buttons.addStretch()
+        current_layout.addLayout(check_buttons)
+        
+        self.integrity_progress = QProgressBar()
+        self.integrity_progress.setVisible(False)
+        current_layout.addWidget(self.integrity_progress)
+        
+        self.integrity_label = QLabel()
+        self.integrity_label.setWordWrap(True)
+        self.integrity_label.setVisible(False)
+        current_layout.addWidget(self.integrity_label)
         
         current_group.setLayout(current_layout)
         layout.addWidget(current_group)
@@ -146,40 +171,80 @@ class DatabaseManagerDialog(QDialog):
         from app.core.config import set_config
         set_config('database.saved_databases', config)
     
-    def _get_database_info(self, db_path: str) -> str:
+    def _get_database_info(self, db_path: str, exact_counts: bool = False) -> str:
         """Get information about a database."""
         if not os.path.exists(db_path):
             return "Database file does not exist"
         
         try:
-            size = os.path.getsize(db_path)
-            size_mb = size / (1024 * 1024)
-            modified = datetime.fromtimestamp(os.path.getmtime(db_path))
-            
-            # Get database stats
-            import sqlite3
-            conn = sqlite3.connect(db_path)
-            cursor = conn.cursor()
-            
-            # Count records
-            cursor.execute("SELECT COUNT(*) FROM activities")
-            activity_count = cursor.fetchone()[0]
-            
-            cursor.execute("SELECT COUNT(*) FROM goals")
-            goal_count = cursor.fetchone()[0]
-            
-            conn.close()
+            # Estimated from SQLite's own statistics unless exact counts are asked for
+            stats = DatabaseOperations.get_database_stats(db_path, exact_counts=exact_counts)
+            modified = datetime.fromisoformat(stats['last_modified'])
+            approx = "" if stats['counts_exact'] else "~"
+            free_mb = stats['freelist_count'] * stats['page_size'] / (1024 * 1024)
             
             return (
-                f"Size: {size_mb:.2f} MB\n"
+                f"Size: {stats['file_size_mb']:.2f} MB ({free_mb:.2f} MB free)\n"
                 f"Modified: {modified.strftime('%Y-%m-%d %H:%M:%S')}\n"
-                f"Activities: {activity_count}\n"
-                f"Goals: {goal_count}"
+                f"Activities: {approx}{stats['tables'].get('activities', 0)}\n"
+                f"Goals: {approx}{stats['tables'].get('goals', 0)}"
             )
         except Exception as e:
             logger.error(f"Error getting database info: {e}", exc_info=True)
             return f"Error: {str(e)}"
     
+    def count_rows_exactly(self):
+        """Replace the estimated row counts with exact ones."""
+        QApplication.setOverrideCursor(Qt.CursorShape.WaitCursor)
+        try:
+            self.info_label.setText(self._get_database_info(self.current_db_path, exact_counts=True))
+        finally:
+            QApplication.restoreOverrideCursor()
+    
+    def toggle_integrity_check(self):
+        """Start a background integrity check, or cancel the running one."""
+        if self.integrity_check is not None and self.integrity_check.is_running():
+            self.integrity_check.cancel()
+            self.integrity_btn.setEnabled(False)
+            return
+        
+        self.integrity_check = IntegrityCheck(self.current_db_path, self)
+        self.integrity_check.progress.connect(self.on_integrity_progress)
+        self.integrity_check.finished.connect(self.on_integrity_finished)
+        self.integrity_progress.setValue(0)
+        self.integrity_progress.setVisible(True)
+        self.integrity_label.setVisible(False)
+        self.integrity_btn.setText("Cancel Check")
+        self.integrity_check.start()
+    
+    def on_integrity_progress(self, done: int, total: int):
+        """Show integrity check progress."""
+        self.integrity_progress.setMaximum(max(total, 1))
+        self.integrity_progress.setValue(done)
+    
+    def on_integrity_finished(self, is_valid: bool, problems: list):
+        """Show the integrity check result."""
+        self.integrity_progress.setVisible(False)
+        self.integrity_btn.setText("Check Integrity")
+        self.integrity_btn.setEnabled(True)
+        if problems == ['cancelled']:
+            self.integrity_label.setText("Integrity check cancelled")
+        elif is_valid:
+            self.integrity_label.setText("Integrity check passed")
+        else:
+            shown = "\n".join(problems[:5])
+            more = f"\n... and {len(problems) - 5} more" if len(problems) > 5 else ""
+            self.integrity_label.setText(f"Integrity check found problems:\n{shown}{more}")
+        self.integrity_label.setVisible(True)
+    
+    def done(self, result):
+        """Stop a running integrity check and drop cached stats when the dialog closes."""
+        if self.integrity_check is not None and self.integrity_check.is_running():
+            self.integrity_check.cancel()
+            self.integrity_check.wait(5)
+        DatabaseOperations.clear_stats_cache()
+        super().done(result)
+    
     def load_databases_list(self):
         """Load saved databases into the list."""
         self.databases_list.clear()
@@ -373,6 +438,7 @@ class DatabaseManagerDialog(QDialog):
         if reply == QMessageBox.StandardButton.Yes:
             del self.databases_config[db_name]
             self._save_databases_config(self.databases_config)
+            DatabaseOperations.clear_stats_cache(db_path)
             self.load_databases_list()
     
     def switch_to_database(self, db_path: str):
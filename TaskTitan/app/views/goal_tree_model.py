@@ -0,0 +1,291 @@
+"""
+Goal tree model for TaskTitan.
+
+Item model, filter proxy and progress delegate used by the goal list view.
+The model reads goals straight from a GoalIndex, so filtering and progress
+updates never rebuild any widgets.
+"""
+from PyQt6.QtWidgets import QStyledItemDelegate, QStyleOptionViewItem, QStyle, QApplication
+from PyQt6.QtCore import Qt, QAbstractItemModel, QSortFilterProxyModel, QModelIndex, QRectF, pyqtSignal
+from PyQt6.QtGui import QColor, QFont
+
+
+# (track, chunk) colors for low, medium and high progress
+_LOW_PROGRESS_COLORS = (QColor("#FEE2E2"), QColor("#EF4444"))
+_MEDIUM_PROGRESS_COLORS = (QColor("#FEF3C7"), QColor("#F59E0B"))
+_HIGH_PROGRESS_COLORS = (QColor("#D1FAE5"), QColor("#10B981"))
+
+
+def progress_colors(progress):
+    """Return the (track, chunk) colors used to show a progress percentage."""
+    if progress < 30:
+        return _LOW_PROGRESS_COLORS
+    elif progress < 70:
+        return _MEDIUM_PROGRESS_COLORS
+    return _HIGH_PROGRESS_COLORS
+
+
+class GoalTreeModel(QAbstractItemModel):
+    """Tree model over a GoalIndex.
+
+    Root goals keep the order of the index; subgoals are sorted by due date.
+    Structural changes (add, delete, re-parent) go through reload(); completion
+    changes only emit dataChanged for the affected rows via goalsChanged().
+    """
+
+    TITLE_COLUMN = 0
+    DUE_DATE_COLUMN = 1
+    DUE_TIME_COLUMN = 2
+    PROGRESS_COLUMN = 3
+    STATUS_COLUMN = 4
+    HEADERS = ("Goal", "Due Date", "Due Time", "Progress", "Status")
+
+    GoalIdRole = Qt.ItemDataRole.UserRole
+    ProgressRole = Qt.ItemDataRole.UserRole + 1
+
+    # Emitted when the user toggles a status checkbox: (goal_id, completed)
+    completionToggled = pyqtSignal(int, bool)
+
+    def __init__(self, goal_index, parent=None):
+        super().__init__(parent)
+        self.goal_index = goal_index
+        self._child_ids = {}  # parent id (None for roots) -> ordered child ids
+        self._rows = {}       # goal id -> row under its parent
+        self._buildRows()
+
+    def _buildRows(self):
+        """Compute the row layout of every goal reachable from the roots."""
+        self._child_ids = {}
+        self._rows = {}
+        pending = [None]
+        while pending:
+            parent_id = pending.pop()
+            children = self.goal_index.children(parent_id)
+            if parent_id is not None:
+                children.sort(key=lambda g: g.get('due_date') or '')
+            if not children:
+                continue
+            child_ids = [g['id'] for g in children]
+            self._child_ids[parent_id] = child_ids
+            for row, child_id in enumerate(child_ids):
+                self._rows[child_id] = row
+            pending.extend(child_ids)
+
+    def reload(self):
+        """Reset the model after goals were added, removed or re-parented."""
+        self.beginResetModel()
+        self._buildRows()
+        self.endResetModel()
+
+    def goalsChanged(self, goal_ids):
+        """Notify views that the given goals changed completion or progress."""
+        last_column = len(self.HEADERS) - 1
+        for goal_id in goal_ids:
+            if goal_id in self._rows:
+                self.dataChanged.emit(self.indexForGoal(goal_id), self.indexForGoal(goal_id, last_column))
+
+    # ---------- Lookup ----------
+    def goal(self, index):
+        """Return the goal dictionary for a model index, or None."""
+        if not index.isValid():
+            return None
+        return index.internalPointer()
+
+    def goalAt(self, row, parent=QModelIndex()):
+        """Return the goal at a row under parent without creating an index."""
+        parent_goal = self.goal(parent)
+        child_ids = self._child_ids.get(parent_goal['id'] if parent_goal else None, ())
+        if 0 <= row < len(child_ids):
+            return self.goal_index.get(child_ids[row])
+        return None
+
+    def indexForGoal(self, goal_id, column=0):
+        """Return the model index of a goal, or an invalid index."""
+        goal = self.goal_index.get(goal_id)
+        if goal is None or goal_id not in self._rows:
+            return QModelIndex()
+        return self.createIndex(self._rows[goal_id], column, goal)
+
+    # ---------- QAbstractItemModel ----------
+    def index(self, row, column, parent=QModelIndex()):
+        if not self.hasIndex(row, column, parent):
+            return QModelIndex()
+        goal = self.goalAt(row, parent)
+        if goal is None:
+            return QModelIndex()
+        return self.createIndex(row, column, goal)
+
+    def parent(self, child):
+        goal = self.goal(child)
+        if goal is None or goal.get('parent_id') is None:
+            return QModelIndex()
+        return self.indexForGoal(goal['parent_id'])
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.column() > 0:
+            return 0
+        parent_goal = self.goal(parent)
+        return len(self._child_ids.get(parent_goal['id'] if parent_goal else None, ()))
+
+    def columnCount(self, parent=QModelIndex()):
+        return len(self.HEADERS)
+
+    def hasChildren(self, parent=QModelIndex()):
+        return self.rowCount(parent) > 0
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if orientation == Qt.Orientation.Horizontal and role == Qt.ItemDataRole.DisplayRole:
+            return self.HEADERS[section]
+        return None
+
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.ItemFlag.NoItemFlags
+        flags = Qt.ItemFlag.ItemIsEnabled | Qt.ItemFlag.ItemIsSelectable
+        if index.column() == self.STATUS_COLUMN:
+            flags |= Qt.ItemFlag.ItemIsUserCheckable
+        return flags
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        goal = self.goal(index)
+        if goal is None:
+            return None
+        column = index.column()
+
+        if role == self.GoalIdRole:
+            return goal['id']
+
+        if role == self.ProgressRole:
+            if column == self.PROGRESS_COLUMN:
+                return self.goal_index.progress(goal['id'])
+            return None
+
+        if role == Qt.ItemDataRole.DisplayRole:
+            if column == self.TITLE_COLUMN:
+                return goal['title']
+            elif column == self.DUE_DATE_COLUMN:
+                return goal.get('due_date') or ''
+            elif column == self.DUE_TIME_COLUMN:
+                return goal.get('due_time') or ''
+            elif column == self.PROGRESS_COLUMN:
+                return f"{self.goal_index.progress(goal['id'])}%"
+            return None
+
+        if role == Qt.ItemDataRole.CheckStateRole and column == self.STATUS_COLUMN:
+            return Qt.CheckState.Checked if goal['completed'] else Qt.CheckState.Unchecked
+
+        if role == Qt.ItemDataRole.ForegroundRole:
+            if column == self.TITLE_COLUMN and goal['completed']:
+                return QColor("#047857")  # Dark green text
+            elif column == self.PROGRESS_COLUMN:
+                return progress_colors(self.goal_index.progress(goal['id']))[1]
+            return None
+
+        if role == Qt.ItemDataRole.BackgroundRole and column == self.TITLE_COLUMN:
+            if goal['completed']:
+                # Completed goals are always green
+                return QColor("#D1FAE5")
+            elif goal.get('color'):
+                # Use custom color with transparency
+                background_color = QColor(goal['color'])
+                background_color.setAlpha(40)
+                return background_color
+            elif goal['priority'] == 0:  # Low
+                return QColor("#DBEAFE")
+            elif goal['priority'] == 1:  # Medium
+                return QColor("#FEF3C7")
+            return QColor("#FEE2E2")  # High
+
+        return None
+
+    def setData(self, index, value, role=Qt.ItemDataRole.EditRole):
+        goal = self.goal(index)
+        if goal is None or index.column() != self.STATUS_COLUMN or role != Qt.ItemDataRole.CheckStateRole:
+            return False
+        # The owner applies the change (database, cascades) and calls goalsChanged
+        self.completionToggled.emit(goal['id'], Qt.CheckState(value) == Qt.CheckState.Checked)
+        return True
+
+
+class GoalFilterProxyModel(QSortFilterProxyModel):
+    """Filters goals by search text, completion and priority.
+
+    Recursive filtering keeps the ancestors of every matching goal visible, so
+    matches are always shown in context.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setRecursiveFilteringEnabled(True)
+        self.search_text = ""
+        self.completion_filter = None
+        self.priority_filter = None
+
+    def setFilters(self, search_text="", completion_filter=None, priority_filter=None):
+        """Set all filter criteria and re-run the filter once."""
+        self.search_text = search_text.lower().strip()
+        self.completion_filter = completion_filter
+        self.priority_filter = priority_filter
+        self.invalidateFilter()
+
+    def hasFilters(self):
+        return bool(self.search_text) or self.completion_filter is not None or self.priority_filter is not None
+
+    def filterAcceptsRow(self, source_row, source_parent):
+        if not self.hasFilters():
+            return True
+        goal = self.sourceModel().goalAt(source_row, source_parent)
+        if goal is None:
+            return False
+        if self.search_text and self.search_text not in goal['title'].lower():
+            return False
+        if self.completion_filter is not None and goal['completed'] != self.completion_filter:
+            return False
+        if self.priority_filter is not None and goal['priority'] != self.priority_filter:
+            return False
+        return True
+
+
+class GoalProgressDelegate(QStyledItemDelegate):
+    """Paints the progress column as a rounded bar followed by the percentage."""
+
+    BAR_HEIGHT = 12
+
+    def paint(self, painter, option, index):
+        progress = index.data(GoalTreeModel.ProgressRole)
+        if progress is None:
+            super().paint(painter, option, index)
+            return
+
+        # Let the style draw selection and hover backgrounds without text
+        opt = QStyleOptionViewItem(option)
+        self.initStyleOption(opt, index)
+        opt.text = ""
+        style = opt.widget.style() if opt.widget else QApplication.style()
+        style.drawControl(QStyle.ControlElement.CE_ItemViewItem, opt, painter, opt.widget)
+
+        track_color, chunk_color = progress_colors(progress)
+        rect = QRectF(option.rect).adjusted(4, 2, -4, -2)
+
+        font = QFont(option.font)
+        font.setBold(True)
+        text_width = max(rect.width() * 0.3, option.fontMetrics.horizontalAdvance("100%") + 8)
+        bar_width = max(rect.width() - text_width - 8, 0)
+        bar_rect = QRectF(rect.left(), rect.center().y() - self.BAR_HEIGHT / 2, bar_width, self.BAR_HEIGHT)
+        text_rect = QRectF(bar_rect.right() + 8, rect.top(), text_width, rect.height())
+        radius = self.BAR_HEIGHT / 2
+
+        painter.save()
+        painter.setRenderHint(painter.RenderHint.Antialiasing)
+        painter.setPen(Qt.PenStyle.NoPen)
+        painter.setBrush(track_color)
+        painter.drawRoundedRect(bar_rect, radius, radius)
+        if progress > 0:
+            chunk_rect = QRectF(bar_rect)
+            chunk_rect.setWidth(bar_rect.width() * min(progress, 100) / 100)
+            painter.setBrush(chunk_color)
+            painter.drawRoundedRect(chunk_rect, radius, radius)
+        painter.setPen(chunk_color)
+        painter.setFont(font)
+        painter.drawText(text_rect, Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter, f"{int(progress)}%")
+        painter.restore()
@@ -2,19 +2,24 @@
 Goal widget for TaskTitan.
 """
 from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, 
-                           QPushButton, QScrollArea, QFrame, QTreeWidget, 
-                           QTreeWidgetItem, QDialog, QLineEdit, QDateEdit, 
+                           QPushButton, QScrollArea, QFrame, QTreeView, 
+                           QDialog, QLineEdit, QDateEdit, 
                            QTimeEdit, QComboBox, QDialogButtonBox, QMessageBox, QMenu,
                            QTabWidget, QGraphicsView, QGraphicsScene, QGraphicsRectItem, 
                            QGraphicsTextItem, QGraphicsLineItem, QSlider, QGraphicsItem,
                            QGraphicsSceneWheelEvent, QGraphicsPathItem, QGraphicsEllipseItem,
-                           QGraphicsDropShadowEffect, QProgressBar, QColorDialog)
+                           QGraphicsDropShadowEffect, QColorDialog)
 from PyQt6.QtCore import Qt, QDate, QTime, pyqtSignal, QRectF, QPointF, QTimer, QEvent, QPoint
 from PyQt6.QtGui import QIcon, QFont, QColor, QPen, QBrush, QWheelEvent, QPainter, QPainterPath, QAction, QFontMetrics
 from datetime import datetime, timedelta
 import random
 
 from app.resources import get_icon
+from app.models.goal_index import GoalIndex
+from app.views.goal_tree_model import GoalTreeModel, GoalFilterProxyModel, GoalProgressDelegate
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
 
 # Add import for circular progress chart if we're in a different file
 try:
@@ -410,6 +415,7 @@ class GoalTimelineWidget(QWidget):
     def __init__(self, parent=None):
         super().__init__(parent)
         self.parent = parent
+        self.goal_index = GoalIndex()
         
         # Timeline view settings
         self.zoom_factor = 1.0
@@ -810,7 +816,8 @@ class GoalTimelineWidget(QWidget):
             return
         
         # Group goals by parent_id
-        root_goals = [g for g in goals if g['parent_id'] is None]
+        self.goal_index = GoalIndex(goals)
+        root_goals = self.goal_index.roots()
         
         # Place root goals first
         y_offset = 50
@@ -1032,7 +1039,7 @@ class GoalTimelineWidget(QWidget):
             self.goal_items[goal['id']] = rect
             
             # Find sub-goals
-            sub_goals = [g for g in all_goals if g['parent_id'] == goal['id']]
+            sub_goals = self.goal_index.children(goal['id'])
             
             if sub_goals:
                 # Calculate positions for sub-goals layout
@@ -1064,7 +1071,7 @@ class GoalTimelineWidget(QWidget):
             else:
                 return y_pos + rect_height
         except Exception as e:
-            print(f"Error adding goal to timeline: {e}")
+            logger.error(f"Error adding goal to timeline: {e}", exc_info=True)
             import traceback
             traceback.print_exc()
             return y_pos + 30
@@ -1084,7 +1091,7 @@ class GoalTimelineWidget(QWidget):
         base_height = 40  # Standard rect height
         
         # Find all direct subgoals
-        sub_goals = [g for g in all_goals if g['parent_id'] == goal['id']]
+        sub_goals = self.goal_index.children(goal['id'])
         if not sub_goals:
             return base_height
             
@@ -1150,8 +1157,15 @@ class GoalWidget(QWidget):
         super().__init__(parent)
         self.parent = parent  # Store parent to access database
         
-        # Goals data
+        # Goals data; goal_index shares the same dictionaries
         self.goals = []
+        self.goal_index = GoalIndex()
+        
+        # Tree model over the goal index, filtered through a proxy
+        self.goal_model = GoalTreeModel(self.goal_index, self)
+        self.goal_model.completionToggled.connect(self.handleCompletionToggled)
+        self.goal_proxy = GoalFilterProxyModel(self)
+        self.goal_proxy.setSourceModel(self.goal_model)
         
         # Setup UI
         self.setupUI()
@@ -1406,45 +1420,48 @@ class GoalWidget(QWidget):
         self.filter_status_label.setStyleSheet("color: #4B5563; font-style: italic;")
         tree_layout.addWidget(self.filter_status_label)
         
-        # Goal tree widget with modern styling
-        self.goal_tree = QTreeWidget()
+        # Goal tree view with modern styling; columns come from GoalTreeModel
+        self.goal_tree = QTreeView()
         self.goal_tree.setObjectName("goalTree")
-        self.goal_tree.setColumnCount(5)  # Goal, Due Date, Due Time, Progress, Status
-        self.goal_tree.setHeaderLabels(["Goal", "Due Date", "Due Time", "Progress", "Status"])
+        self.goal_tree.setModel(self.goal_proxy)
         self.goal_tree.setAlternatingRowColors(False)  # Disable alternating row colors
-        self.goal_tree.setSelectionMode(QTreeWidget.SelectionMode.SingleSelection)
+        self.goal_tree.setSelectionMode(QTreeView.SelectionMode.SingleSelection)
         self.goal_tree.setAnimated(True)
         self.goal_tree.setIndentation(24)
+        self.goal_tree.setUniformRowHeights(True)
         self.goal_tree.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
         self.goal_tree.customContextMenuRequested.connect(self.showContextMenu)
-        self.goal_tree.itemChanged.connect(self.handleItemStatusChanged)
         
-        # Apply modern styling to the tree widget
+        # Progress bars are painted by a delegate instead of per-row widgets
+        self.progress_delegate = GoalProgressDelegate(self.goal_tree)
+        self.goal_tree.setItemDelegateForColumn(GoalTreeModel.PROGRESS_COLUMN, self.progress_delegate)
+        
+        # Apply modern styling to the tree view
         self.goal_tree.setStyleSheet("""
-            QTreeWidget {
+            QTreeView {
                 background-color: white;
                 border: 1px solid #E2E8F0;
                 border-radius: 10px;
                 padding: 8px;
                 font-size: 13px;
             }
-            QTreeWidget::item {
+            QTreeView::item {
                 border-bottom: 1px solid #F1F5F9;
                 padding: 10px 2px;
                 margin: 2px 0;
                 background-color: transparent;
             }
-            QTreeWidget::item:selected {
+            QTreeView::item:selected {
                 background-color: rgba(235, 244, 255, 0.7);
                 color: #1E293B;
                 border: none;
                 border-radius: 6px;
             }
-            QTreeWidget::item:hover {
+            QTreeView::item:hover {
                 background-color: rgba(247, 250, 252, 0.7);
                 border-radius: 6px;
             }
-            QTreeWidget::item:alternate {
+            QTreeView::item:alternate {
                 background-color: transparent;
             }
             QHeaderView::section {
@@ -1455,7 +1472,7 @@ class GoalWidget(QWidget):
                 color: #334155;
                 font-size: 13px;
             }
-            QTreeWidget::item:focus {
+            QTreeView::item:focus {
                 border: none;
                 outline: none;
             }
@@ -1578,7 +1595,7 @@ class GoalWidget(QWidget):
                 self.parent.conn.commit()
                 goal_id = self.parent.cursor.lastrowid
             except Exception as e:
-                print(f"Error saving goal to database: {e}")
+                logger.error(f"Error saving goal to database: {e}", exc_info=True)
                 # Fall back to random ID
                 goal_id = random.randint(1000, 9999)
         else:
@@ -1600,6 +1617,7 @@ class GoalWidget(QWidget):
         
         # Add to our list
         self.goals.append(goal)
+        self.goal_index.add(goal)
         
         # Refresh the entire tree to ensure proper parent-child relationships
         self.refreshGoalTree()
@@ -1607,65 +1625,6 @@ class GoalWidget(QWidget):
         # Emit signal
         self.goalAdded.emit(goal)
     
-    def addGoalToTree(self, goal, parent_item=None):
-        """Add a goal to the tree widget.
-        
-        Args:
-            goal: Dictionary with goal data
-            parent_item: Parent QTreeWidgetItem or None if this is a top-level item
-            
-        Returns:
-            The created QTreeWidgetItem
-        """
-        # Create a new tree item
-        item = QTreeWidgetItem()
-        item.setText(0, goal['title'])
-        item.setText(1, goal['due_date'])
-        item.setText(2, goal['due_time'])
-        item.setData(0, Qt.ItemDataRole.UserRole, goal['id'])
-        
-        # Calculate progress percentage
-        progress = self.calculateGoalProgress(goal)
-        progress_text = f"{progress}%"
-        item.setText(3, progress_text)
-        
-        # Set the status checkbox
-        item.setFlags(item.flags() | Qt.ItemFlag.ItemIsUserCheckable)
-        status = Qt.CheckState.Checked if goal['completed'] else Qt.CheckState.Unchecked
-        item.setCheckState(4, status)
-        
-        # Set progress text color based on percentage
-        if progress < 30:
-            item.setForeground(3, QColor("#EF4444"))  # Red for low progress
-        elif progress < 70:
-            item.setForeground(3, QColor("#F59E0B"))  # Orange/Yellow for medium progress
-        else:
-            item.setForeground(3, QColor("#10B981"))  # Green for high progress
-        
-        # Set priority color
-        if goal['priority'] == 0:  # Low
-            item.setBackground(0, QColor("#D1FAE5"))  # Light green
-        elif goal['priority'] == 1:  # Medium
-            item.setBackground(0, QColor("#FEF3C7"))  # Light yellow
-        else:  # High
-            item.setBackground(0, QColor("#FEE2E2"))  # Light red
-        
-        # Add to parent or root
-        if parent_item:
-            # If parent is provided, add as child of parent
-            parent_item.addChild(item)
-        else:
-            # No parent item provided, add at top level
-            self.goal_tree.addTopLevelItem(item)
-        
-        # Apply visual indication for a goal with subgoals
-        font = item.font(0)
-        if any(g['parent_id'] == goal['id'] for g in self.goals):
-            font.setBold(True)
-            item.setFont(0, font)
-        
-        return item
-    
     def calculateGoalProgress(self, goal):
         """Calculate the progress percentage for a goal based only on subgoals completion.
         
@@ -1675,363 +1634,97 @@ class GoalWidget(QWidget):
         Returns:
             int: Progress percentage (0-100)
         """
-        # If goal is completed, return 100%
+        # Completed goals are 100%; otherwise the index keeps completed
+        # subgoal counts up to date, so this is O(1)
         if goal['completed']:
             return 100
-        
-        # Find all subgoals for this goal
-        subgoals = [g for g in self.goals if g['parent_id'] == goal['id']]
-        
-        # If there are no subgoals, return 0 unless completed
-        if not subgoals:
-            return 0
-        
-        # Calculate based on number of completed subgoals
-        completed_subgoals = len([g for g in subgoals if g['completed']])
-        total_subgoals = len(subgoals)
-        
-        return int((completed_subgoals / total_subgoals) * 100)
-
-    def handleItemStatusChanged(self, item, column):
-        """Handle when a goal's status is changed."""
-        if column == 4:  # Status column
-            try:
-                # Temporarily block signals to prevent recursion
-                self.goal_tree.blockSignals(True)
-                
-                goal_id = item.data(0, Qt.ItemDataRole.UserRole)
-                if goal_id is None:
-                    return  # No goal ID associated with this item
-                    
-                completed = item.checkState(4) == Qt.CheckState.Checked
-                
-                # Update database if connection exists
-                if hasattr(self.parent, 'conn') and self.parent.conn:
-                    try:
-                        self.parent.cursor.execute("""
-                            UPDATE goals
-                            SET completed = ?
-                            WHERE id = ?
-                        """, (1 if completed else 0, goal_id))
-                        self.parent.conn.commit()
-                    except Exception as e:
-                        print(f"Error updating goal status in database: {e}")
-                
-                # Update our data
-                for goal in self.goals:
-                    if goal['id'] == goal_id:
-                        goal['completed'] = completed
-                        break
-                
-                # Emit signal
-                self.goalCompleted.emit(goal_id, completed)
-                
-                # If parent is completed, complete all children
-                if completed:
-                    self.updateChildrenStatus(item, Qt.CheckState.Checked)
-                    
-                # Check if this is a subgoal and determine what to do with the parent
-                parent_item = item.parent()
-                if parent_item:
-                    if completed:
-                        # If completed, check if all siblings are completed too
-                        self.checkParentIfAllChildrenCompleted(parent_item)
-                    else:
-                        # If unchecked, ensure parent is unchecked too
-                        self.uncheckParent(parent_item)
-                
-                # Unblock signals
-                self.goal_tree.blockSignals(False)
-                
-                # Update visual appearance of this item and its progress
-                self.updateItemAppearance(item, completed)
-                
-                # Update the progress indicators
-                self.updateAffectedProgressBars(goal_id)
-                
-                # Also update timeline if it's active
-                if self.tab_widget.currentIndex() == 1:
-                    self.timeline_widget.updateTimeline(self.goals)
-                    
-            except Exception as e:
-                # Re-enable signals in case of exception
-                self.goal_tree.blockSignals(False)
-                print(f"Error in handleItemStatusChanged: {e}")
-                import traceback
-                traceback.print_exc()
+        return self.goal_index.progress(goal['id'])
 
-    def updateItemAppearance(self, item, completed):
-        """Update the visual appearance of an item after status change."""
+    def handleCompletionToggled(self, goal_id, completed):
+        """Handle when a goal's status checkbox is toggled in the tree."""
         try:
-            # Get goal ID
-            goal_id = item.data(0, Qt.ItemDataRole.UserRole)
-            
-            # Find goal data
-            goal = None
-            for g in self.goals:
-                if g['id'] == goal_id:
-                    goal = g
-                    break
-                    
-            if not goal:
-                return
-                
-            # Update text color based on completion status
+            # Goal id -> new completion state for every goal that changed
+            changes = {}
+            if self.goal_index.set_completed(goal_id, completed):
+                changes[goal_id] = completed
+            
+            # If parent is completed, complete all children
             if completed:
-                item.setForeground(0, QColor("#047857"))  # Dark green text
-                
-                # Add checkmark icon
-                check_icon = QIcon.fromTheme("emblem-ok", QIcon())
-                if not check_icon.isNull():
-                    item.setIcon(0, check_icon)
+                self.updateChildrenStatus(goal_id, True, changes)
+                # If completed, check if all siblings are completed too
+                self.checkParentIfAllChildrenCompleted(goal_id, changes)
             else:
-                # Reset to black text
-                item.setForeground(0, QColor("#000000"))  # Black text
-                item.setIcon(0, QIcon())  # Remove icon
-            
-            # Recalculate progress
-            progress = self.calculateGoalProgress(goal)
-            
-            # Store progress for the progress bar
-            item.setData(3, Qt.ItemDataRole.UserRole, progress)
+                # If unchecked, ensure parents are unchecked too
+                self.uncheckParent(goal_id, changes)
             
-            # Update the progress text
-            item.setText(3, f"{progress}%")
-            
-            # Re-create the progress bar widget
-            self._processTreeItemProgress(item)
-        except Exception as e:
-            print(f"Error updating item appearance: {e}")
-
-    def updateAffectedProgressBars(self, goal_id):
-        """Update progress bars for a goal and its parents."""
-        try:
-            # First find the goal
-            goal = None
-            for g in self.goals:
-                if g['id'] == goal_id:
-                    goal = g
-                    break
-                    
-            if not goal:
+            if not changes:
                 return
-                
-            # If it has a parent, update parent progress bars recursively
-            if goal['parent_id'] is not None:
-                parent_item = self.findParentItem(goal['parent_id'])
-                if parent_item:
-                    self.updateItemProgressBar(parent_item)
-                    self.updateAffectedProgressBars(goal['parent_id'])
-        except Exception as e:
-            print(f"Error updating affected progress bars: {e}")
-
-    def updateItemProgressBar(self, item):
-        """Update the progress bar for a specific item."""
-        try:
-            goal_id = item.data(0, Qt.ItemDataRole.UserRole)
             
-            # Find goal
-            goal = None
-            for g in self.goals:
-                if g['id'] == goal_id:
-                    goal = g
-                    break
-                    
-            if not goal:
-                return
-                
-            # Recalculate progress
-            progress = self.calculateGoalProgress(goal)
+            # Update database if connection exists
+            self.saveGoalCompletion(changes)
             
-            # Store progress for the progress bar
-            item.setData(3, Qt.ItemDataRole.UserRole, progress)
+            # Repaint the changed rows and every ancestor whose progress moved
+            affected_ids = set(changes)
+            for changed_id in changes:
+                affected_ids.update(a['id'] for a in self.goal_index.ancestors(changed_id))
+            self.goal_model.goalsChanged(affected_ids)
             
-            # Update the progress text
-            item.setText(3, f"{progress}%")
+            # Emit signals
+            for changed_id, changed_completed in changes.items():
+                self.goalCompleted.emit(changed_id, changed_completed)
             
-            # Re-create the progress bar widget
-            self._processTreeItemProgress(item)
-        except Exception as e:
-            print(f"Error updating item progress bar: {e}")
-    
-    def uncheckParent(self, parent_item):
-        """Uncheck parent and propagate up the hierarchy when a child is unchecked."""
-        try:
-            # Only need to uncheck if parent is currently checked
-            if parent_item.checkState(4) == Qt.CheckState.Checked:
-                # Set parent to unchecked
-                parent_item.setCheckState(4, Qt.CheckState.Unchecked)
-                
-                # Update the parent goal in our data
-                parent_id = parent_item.data(0, Qt.ItemDataRole.UserRole)
-                for goal in self.goals:
-                    if goal['id'] == parent_id:
-                        goal['completed'] = False
-                        break
-                
-                # Update parent in database
-                if hasattr(self.parent, 'conn') and self.parent.conn:
-                    try:
-                        self.parent.cursor.execute("""
-                            UPDATE goals
-                            SET completed = 0
-                            WHERE id = ?
-                        """, (parent_id,))
-                        self.parent.conn.commit()
-                    except Exception as e:
-                        print(f"Error updating parent goal status in database: {e}")
-                
-                # Recursively uncheck grandparent if needed
-                grandparent_item = parent_item.parent()
-                if grandparent_item:
-                    self.uncheckParent(grandparent_item)
-        except Exception as e:
-            print(f"Error in uncheckParent: {e}")
-    
-    def checkParentIfAllChildrenCompleted(self, parent_item):
-        """Check parent item if all children are checked."""
-        try:
-            # Check if all children are completed
-            all_children_completed = True
-            for i in range(parent_item.childCount()):
-                if parent_item.child(i).checkState(4) != Qt.CheckState.Checked:
-                    all_children_completed = False
-                    break
-            
-            # If all children are completed, check the parent
-            if all_children_completed:
-                parent_item.setCheckState(4, Qt.CheckState.Checked)
-                
-                # Update the parent goal in our data
-                parent_id = parent_item.data(0, Qt.ItemDataRole.UserRole)
-                for goal in self.goals:
-                    if goal['id'] == parent_id:
-                        goal['completed'] = True
-                        break
-                
-                # Update parent in database
-                if hasattr(self.parent, 'conn') and self.parent.conn:
-                    try:
-                        self.parent.cursor.execute("""
-                            UPDATE goals
-                            SET completed = 1
-                            WHERE id = ?
-                        """, (parent_id,))
-                        self.parent.conn.commit()
-                    except Exception as e:
-                        print(f"Error updating parent goal status in database: {e}")
-                
-                # Recursively check grandparent if needed
-                grandparent_item = parent_item.parent()
-                if grandparent_item:
-                    self.checkParentIfAllChildrenCompleted(grandparent_item)
-        except Exception as e:
-            print(f"Error in checkParentIfAllChildrenCompleted: {e}")
-    
-    def updateChildrenStatus(self, parent_item, status):
-        """Update the status of all children when parent status changes."""
-        try:
-            # Collect all goal IDs to update
-            updated_goal_ids = []
-            
-            def collectChildrenIds(item, child_ids):
-                try:
-                    for i in range(item.childCount()):
-                        child = item.child(i)
-                        child.setCheckState(4, status)
-                        
-                        # Get goal ID
-                        goal_id = child.data(0, Qt.ItemDataRole.UserRole)
-                        if goal_id:
-                            child_ids.append(goal_id)
-                        
-                        # Recurse for sub-goals
-                        if child.childCount() > 0:
-                            collectChildrenIds(child, child_ids)
-                except Exception as e:
-                    print(f"Error collecting child IDs: {e}")
+            # Also update timeline if it's active
+            if self.tab_widget.currentIndex() == 1:
+                self.timeline_widget.updateTimeline(self.goals)
                 
-            # Collect all goal IDs to update
-            collectChildrenIds(parent_item, updated_goal_ids)
-            
-            if not updated_goal_ids:
-                return  # No children to update
-            
-            # Batch update goals in memory
-            completed_value = (status == Qt.CheckState.Checked)
-            for goal_id in updated_goal_ids:
-                for goal in self.goals:
-                    if goal['id'] == goal_id:
-                        goal['completed'] = completed_value
-                        # Emit signal
-                        self.goalCompleted.emit(goal_id, completed_value)
-                        break
-            
-            # Batch update database if connection exists
-            if updated_goal_ids and hasattr(self.parent, 'conn') and self.parent.conn:
-                try:
-                    # Use a parameterized query with multiple value sets
-                    completed_int = 1 if completed_value else 0
-                    for goal_id in updated_goal_ids:
-                        self.parent.cursor.execute("""
-                            UPDATE goals
-                            SET completed = ?
-                            WHERE id = ?
-                        """, (completed_int, goal_id))
-                    self.parent.conn.commit()
-                except Exception as e:
-                    print(f"Error batch updating goal statuses in database: {e}")
         except Exception as e:
-            print(f"Error in updateChildrenStatus: {e}")
+            logger.error(f"Error in handleCompletionToggled: {e}", exc_info=True)
+            import traceback
+            traceback.print_exc()
+
+    def saveGoalCompletion(self, changes):
+        """Write completion changes ({goal_id: completed}) to the database."""
+        if hasattr(self.parent, 'conn') and self.parent.conn:
+            try:
+                self.parent.cursor.executemany("""
+                    UPDATE goals
+                    SET completed = ?
+                    WHERE id = ?
+                """, [(1 if completed else 0, goal_id) for goal_id, completed in changes.items()])
+                self.parent.conn.commit()
+            except Exception as e:
+                logger.error(f"Error updating goal status in database: {e}", exc_info=True)
     
-    def updateParentProgress(self, goal_id):
-        """Update the parent goal's progress when a subgoal status changes."""
-        # Find the goal
-        goal = None
-        for g in self.goals:
-            if g['id'] == goal_id:
-                goal = g
+    def uncheckParent(self, goal_id, changes):
+        """Uncheck completed ancestors when a goal is unchecked."""
+        for ancestor in self.goal_index.ancestors(goal_id):
+            # Stop at the first ancestor that is not completed
+            if not ancestor['completed']:
                 break
-        
-        if not goal or goal['parent_id'] is None:
-            return
-            
-        # Find the parent goal
-        parent_id = goal['parent_id']
-        parent_goal = None
-        for g in self.goals:
-            if g['id'] == parent_id:
-                parent_goal = g
+            self.goal_index.set_completed(ancestor['id'], False)
+            changes[ancestor['id']] = False
+    
+    def checkParentIfAllChildrenCompleted(self, goal_id, changes):
+        """Check ancestors whose subgoals are now all completed."""
+        for ancestor in self.goal_index.ancestors(goal_id):
+            if not all(child['completed'] for child in self.goal_index.children(ancestor['id'])):
                 break
-                
-        if not parent_goal:
-            return
-        
-        # Find parent item in the tree
-        parent_item = self.findParentItem(parent_id)
-        if parent_item:
-            # Recalculate parent progress
-            parent_progress = self.calculateGoalProgress(parent_goal)
-            parent_item.setText(3, f"{parent_progress}%")
-            
-            # Update color based on progress
-            if parent_progress < 30:
-                parent_item.setForeground(3, QColor("#EF4444"))  # Red for low progress
-            elif parent_progress < 70:
-                parent_item.setForeground(3, QColor("#F59E0B"))  # Orange/Yellow for medium progress
-            else:
-                parent_item.setForeground(3, QColor("#10B981"))  # Green for high progress
-            
-            # Recursively update grandparent if needed
-            self.updateParentProgress(parent_id)
+            if self.goal_index.set_completed(ancestor['id'], True):
+                changes[ancestor['id']] = True
+    
+    def updateChildrenStatus(self, goal_id, completed, changes):
+        """Apply a goal's completion status to all of its descendants."""
+        for child_id in self.goal_index.descendant_ids(goal_id):
+            if self.goal_index.set_completed(child_id, completed):
+                changes[child_id] = completed
     
     def showContextMenu(self, position):
         """Show a context menu for the selected goal."""
-        item = self.goal_tree.itemAt(position)
-        if not item:
+        index = self.goal_tree.indexAt(position)
+        if not index.isValid():
             return
             
-        goal_id = item.data(0, Qt.ItemDataRole.UserRole)
+        goal_id = index.data(GoalTreeModel.GoalIdRole)
         
         menu = QMenu(self)
         
@@ -2049,20 +1742,17 @@ class GoalWidget(QWidget):
     def showEditGoalDialog(self, goal_id):
         """Show dialog to edit an existing goal."""
         # Find the goal
-        goal = None
-        for g in self.goals:
-            if g['id'] == goal_id:
-                goal = g
-                break
-        
+        goal = self.goal_index.get(goal_id)
         if not goal:
             return
         
         dialog = AddGoalDialog(self, f"Edit Goal: {goal['title']}", goal)
         
         # Add existing goals as potential parents (except self and descendants)
+        excluded_ids = {goal_id}
+        excluded_ids.update(self.findSubGoalIds(goal_id))
         for g in self.goals:
-            if g['id'] != goal_id and g['id'] not in self.findSubGoalIds(goal_id):
+            if g['id'] not in excluded_ids:
                 dialog.parent_input.addItem(g['title'], g['id'])
         
         # Set current parent
@@ -2111,19 +1801,21 @@ class GoalWidget(QWidget):
                 """, (title, parent_id, created_date, due_date, due_time, priority, color, goal_id))
                 self.parent.conn.commit()
             except Exception as e:
-                print(f"Error updating goal in database: {e}")
+                logger.error(f"Error updating goal in database: {e}", exc_info=True)
                 
         # Update the goal in our list
-        for goal in self.goals:
-            if goal['id'] == goal_id:
-                goal['title'] = title
-                goal['parent_id'] = parent_id
-                goal['created_date'] = created_date
-                goal['due_date'] = due_date
-                goal['due_time'] = due_time
-                goal['priority'] = priority
-                goal['color'] = color
-                break
+        goal = self.goal_index.get(goal_id)
+        if goal:
+            goal['title'] = title
+            try:
+                self.goal_index.move(goal_id, parent_id)
+            except ValueError as e:
+                logger.error(f"Error moving goal: {e}", exc_info=True)
+            goal['created_date'] = created_date
+            goal['due_date'] = due_date
+            goal['due_time'] = due_time
+            goal['priority'] = priority
+            goal['color'] = color
         
         # Refresh the tree
         self.refreshGoalTree()
@@ -2148,6 +1840,7 @@ class GoalWidget(QWidget):
         # Find all sub-goals
         sub_goal_ids = self.findSubGoalIds(goal_id)
         all_ids = [goal_id] + sub_goal_ids
+        removed_ids = set(all_ids)
         
         # Delete from database if connection exists
         if hasattr(self.parent, 'conn') and self.parent.conn:
@@ -2157,10 +1850,11 @@ class GoalWidget(QWidget):
                     self.parent.cursor.execute("DELETE FROM goals WHERE id = ?", (gid,))
                 self.parent.conn.commit()
             except Exception as e:
-                print(f"Error deleting goals from database: {e}")
+                logger.error(f"Error deleting goals from database: {e}", exc_info=True)
         
         # Delete the goal and sub-goals from our list
-        self.goals = [g for g in self.goals if g['id'] not in all_ids]
+        self.goal_index.remove(goal_id)
+        self.goals = [g for g in self.goals if g['id'] not in removed_ids]
         
         # Refresh the tree
         self.refreshGoalTree()
@@ -2170,25 +1864,12 @@ class GoalWidget(QWidget):
     
     def findSubGoalIds(self, parent_id):
         """Find all sub-goal IDs for a given parent ID."""
-        sub_goal_ids = []
-        
-        for goal in self.goals:
-            if goal['parent_id'] == parent_id:
-                sub_goal_ids.append(goal['id'])
-                # Recursively find sub-sub-goals
-                sub_goal_ids.extend(self.findSubGoalIds(goal['id']))
-        
-        return sub_goal_ids
+        return self.goal_index.descendant_ids(parent_id)
     
     def showAddSubGoalDialog(self, parent_id):
         """Show dialog to add a sub-goal."""
         # Find parent goal to get defaults
-        parent_goal = None
-        for g in self.goals:
-            if g['id'] == parent_id:
-                parent_goal = g
-                break
-
+        parent_goal = self.goal_index.get(parent_id)
         if not parent_goal:
             return
         
@@ -2196,7 +1877,7 @@ class GoalWidget(QWidget):
         parent_due_date = QDate.fromString(parent_goal['due_date'], "yyyy-MM-dd")
         
         # Default created_date based on existing subgoals
-        sub_goals = [g for g in self.goals if g['parent_id'] == parent_id]
+        sub_goals = self.goal_index.children(parent_id)
         
         if sub_goals:
             # Start after the last subgoal ends
@@ -2232,283 +1913,42 @@ class GoalWidget(QWidget):
             self.addGoal(dialog.getGoalData())
     
     def refreshGoalTree(self):
-        """Refresh the entire goal tree."""
+        """Refresh the goal tree after goals were added, removed or moved."""
         try:
-            # Block signals temporarily while rebuilding the tree
-            self.goal_tree.blockSignals(True)
-            
-            # Store current expanded state if needed
-            expanded_items = {}
-            selection = self.goal_tree.selectedItems()
+            # Remember the selection across the model reset
             selected_id = None
-            if selection:
-                selected_id = selection[0].data(0, Qt.ItemDataRole.UserRole)
-            
-            # Clear existing items
-            self.goal_tree.clear()
-            
-            # Pre-calculate progress for all goals to avoid redundant calculations
-            goal_progress = {}
-            try:
-                for goal in self.goals:
-                    goal_progress[goal['id']] = self.calculateGoalProgress(goal)
-            except Exception as e:
-                print(f"Error calculating goal progress: {e}")
-            
-            # Keep track of already added goals to prevent duplicates
-            added_goal_ids = set()
+            current = self.goal_tree.currentIndex()
+            if current.isValid():
+                selected_id = current.data(GoalTreeModel.GoalIdRole)
             
-            # First add all root goals
-            root_goals = [g for g in self.goals if g['parent_id'] is None]
-            for goal in root_goals:
-                try:
-                    item = self.addGoalToTreeOptimized(goal, None, goal_progress)
-                    added_goal_ids.add(goal['id'])
-                    
-                    # Then add their sub-goals recursively (tracking added IDs)
-                    self.addSubGoalsToTreeOptimized(goal['id'], item, added_goal_ids, goal_progress)
-                except Exception as e:
-                    print(f"Error adding root goal {goal['id']} to tree: {e}")
-            
-            # Create progress bar widgets for all items
-            self.postProcessTreeItems()
+            self.goal_model.reload()
                 
             # Reselect previously selected item if it exists
-            if selected_id:
+            if selected_id is not None:
                 self.selectGoalItemById(selected_id)
             
-            # Restore expanded state if needed
-            
             # Finally, ensure everything is visible
             self.goal_tree.expandAll()
             
         except Exception as e:
-            print(f"Error refreshing goal tree: {e}")
-        finally:
-            # Unblock signals
-            self.goal_tree.blockSignals(False)
+            logger.error(f"Error refreshing goal tree: {e}", exc_info=True)
 
-    def postProcessTreeItems(self):
-        """Process all tree items to add custom widgets for progress."""
-        # Create a custom progress widget for each item
-        for i in range(self.goal_tree.topLevelItemCount()):
-            top_item = self.goal_tree.topLevelItem(i)
-            self._processTreeItemProgress(top_item)
-            
-    def _processTreeItemProgress(self, item):
-        """Recursively process tree items to add progress bars."""
-        try:
-            # Get the progress value stored in the item data
-            progress = item.data(3, Qt.ItemDataRole.UserRole)
-            
-            if progress is not None:
-                # Create a progress bar widget
-                progress_widget = QWidget()
-                progress_layout = QHBoxLayout(progress_widget)
-                progress_layout.setContentsMargins(4, 2, 4, 2)
-                progress_layout.setSpacing(8)
-                
-                # Create the progress bar using QProgressBar
-                progress_bar = QProgressBar(progress_widget)
-                progress_bar.setFixedHeight(12)
-                progress_bar.setTextVisible(False)
-                progress_bar.setMinimumWidth(60)
-                progress_bar.setValue(int(progress))
-                
-                # Set color based on progress
-                if progress < 30:
-                    # Red for low progress
-                    style_color = """
-                        QProgressBar {
-                            background-color: #FEE2E2;
-                            border-radius: 6px;
-                            border: none;
-                        }
-                        QProgressBar::chunk {
-                            background-color: #EF4444;
-                            border-radius: 6px;
-                        }
-                    """
-                    text_color = "#EF4444"
-                elif progress < 70:
-                    # Yellow/Orange for medium progress
-                    style_color = """
-                        QProgressBar {
-                            background-color: #FEF3C7;
-                            border-radius: 6px;
-                            border: none;
-                        }
-                        QProgressBar::chunk {
-                            background-color: #F59E0B;
-                            border-radius: 6px;
-                        }
-                    """
-                    text_color = "#F59E0B"
-                else:
-                    # Green for high progress
-                    style_color = """
-                        QProgressBar {
-                            background-color: #D1FAE5;
-                            border-radius: 6px;
-                            border: none;
-                        }
-                        QProgressBar::chunk {
-                            background-color: #10B981;
-                            border-radius: 6px;
-                        }
-                    """
-                    text_color = "#10B981"
-                    
-                # Apply styling
-                progress_bar.setStyleSheet(style_color)
-                
-                # Add progress bar to layout
-                progress_layout.addWidget(progress_bar, 7)  # 70% width for bar
-                
-                # Add text label
-                text_label = QLabel(f"{int(progress)}%")
-                text_label.setStyleSheet(f"color: {text_color}; font-weight: bold;")
-                progress_layout.addWidget(text_label, 3)  # 30% width for text
-                
-                # Set the widget in the tree
-                self.goal_tree.setItemWidget(item, 3, progress_widget)
-            
-            # Process children recursively
-            for i in range(item.childCount()):
-                child = item.child(i)
-                self._processTreeItemProgress(child)
-        except Exception as e:
-            print(f"Error processing tree item progress: {e}")
-    
     def selectGoalItemById(self, goal_id):
-        """Find and select a goal item by ID."""
-        try:
-            # Search in all top-level items
-            for i in range(self.goal_tree.topLevelItemCount()):
-                top_item = self.goal_tree.topLevelItem(i)
-                if self.findAndSelectItem(top_item, goal_id):
-                    return True
-            return False
-        except Exception as e:
-            print(f"Error selecting goal item: {e}")
-            return False
-    
-    def findAndSelectItem(self, item, goal_id):
-        """Recursively search for and select an item by goal ID."""
-        try:
-            # Check if this is the item we're looking for
-            if item.data(0, Qt.ItemDataRole.UserRole) == goal_id:
-                self.goal_tree.setCurrentItem(item)
-                return True
-                
-            # Search children
-            for i in range(item.childCount()):
-                if self.findAndSelectItem(item.child(i), goal_id):
-                    return True
-                    
-            return False
-        except Exception as e:
-            print(f"Error finding item: {e}")
-            return False
-
-    def addGoalToTreeOptimized(self, goal, parent_item=None, goal_progress=None):
-        """Add a goal to the tree widget with optimized progress calculation.
+        """Select a goal in the tree if it is currently visible.
         
-        Args:
-            goal: The goal to add
-            parent_item: The parent tree item (if any)
-            goal_progress: Pre-calculated progress values (optimization)
-            
         Returns:
-            QTreeWidgetItem: The created tree item
+            The selected proxy index, or None if the goal is not shown
         """
-        # Create item
-        item = QTreeWidgetItem()
-        
-        # Get progress
-        progress = goal_progress.get(goal['id']) if goal_progress is not None else self.calculateGoalProgress(goal)
-        
-        # Set item data
-        item.setData(0, Qt.ItemDataRole.UserRole, goal['id'])
-        item.setText(0, goal['title'])
-        item.setText(1, goal.get('due_date', ''))
-        item.setText(2, goal.get('due_time', ''))
-        
-        # Create a custom progress display with visual indicator and text
-        progress_text = f"{progress}%"
-        item.setText(3, progress_text)
-        
-        # Create status checkbox (column 4)
-        item.setFlags(item.flags() | Qt.ItemFlag.ItemIsUserCheckable)
-        check_state = Qt.CheckState.Checked if goal['completed'] else Qt.CheckState.Unchecked
-        item.setCheckState(4, check_state)
-        
-        # Set progress text color based on percentage
-        if progress < 30:
-            progress_color = QColor("#EF4444")  # Red for low progress
-        elif progress < 70:
-            progress_color = QColor("#F59E0B")  # Orange/Yellow for medium progress
-        else:
-            progress_color = QColor("#10B981")  # Green for high progress
-        
-        item.setForeground(3, progress_color)
-        
-        # Set goal color
-        if goal['completed']:
-            # Completed goals are always green
-            background_color = QColor("#D1FAE5")  # Light green background
-            item.setBackground(0, background_color)
-        elif 'color' in goal and goal['color']:
-            # Use custom color with transparency
-            background_color = QColor(goal['color'])
-            background_color.setAlpha(40)  # Make it very light
-            item.setBackground(0, background_color)
-        else:
-            # Fallback to priority-based colors
-            if goal['priority'] == 0:  # Low
-                item.setBackground(0, QColor("#DBEAFE"))  # Light blue
-            elif goal['priority'] == 1:  # Medium
-                item.setBackground(0, QColor("#FEF3C7"))  # Light yellow
-            else:  # High
-                item.setBackground(0, QColor("#FEE2E2"))  # Light red
-        
-        # Create and set a custom progress widget for the progress column
-        # (This will be created when item is added to tree in postProcessTreeItems)
-        item.setData(3, Qt.ItemDataRole.UserRole, progress)
-        
-        # Add to parent or root
-        if parent_item:
-            parent_item.addChild(item)
-        else:
-            self.goal_tree.addTopLevelItem(item)
-            
-        return item
-        
-    def addSubGoalsToTreeOptimized(self, parent_id, parent_item, added_goal_ids=None, goal_progress=None):
-        """Optimized version of addSubGoalsToTree using pre-calculated progress."""
-        # Initialize tracking set if not provided
-        if added_goal_ids is None:
-            added_goal_ids = set()
-        
-        # Get all direct sub-goals of the parent
-        sub_goals = [g for g in self.goals if g['parent_id'] == parent_id]
-        
-        # Sort by due date
-        sub_goals.sort(key=lambda g: g['due_date'])
-        
-        # Add each sub-goal to the tree (if not already added)
-        for goal in sub_goals:
-            if goal['id'] in added_goal_ids:
-                print(f"Warning: Skipping duplicate goal: {goal['title']} (ID: {goal['id']})")
-                continue
-            
-            # Add the sub-goal as a child of the parent item
-            item = self.addGoalToTreeOptimized(goal, parent_item, goal_progress)
-            added_goal_ids.add(goal['id'])
-            
-            # Recursively add this goal's sub-goals
-            self.addSubGoalsToTreeOptimized(goal['id'], item, added_goal_ids, goal_progress)
-            
+        try:
+            index = self.goal_proxy.mapFromSource(self.goal_model.indexForGoal(goal_id))
+            if not index.isValid():
+                return None
+            self.goal_tree.setCurrentIndex(index)
+            return index
+        except Exception as e:
+            logger.error(f"Error selecting goal item: {e}", exc_info=True)
+            return None
+
     def loadGoals(self):
         """Load goals from the database."""
         if hasattr(self.parent, 'cursor') and self.parent.cursor:
@@ -2554,11 +1994,12 @@ class GoalWidget(QWidget):
                         'completed': bool(row[8])
                     }
                     self.goals.append(goal)
+                self.goal_index.rebuild(self.goals)
                 
                 # Refresh the tree
                 self.refreshGoalTree()
             except Exception as e:
-                print(f"Error loading goals: {e}")
+                logger.error(f"Error loading goals: {e}", exc_info=True)
                 # Add some sample goals for testing
                 self.addSampleGoals()
         else:
@@ -2685,6 +2126,7 @@ class GoalWidget(QWidget):
             main_goal_1, main_goal_2, main_goal_3,
             sub_goal_1, sub_goal_2, sub_goal_3, sub_goal_4, sub_goal_5
         ])
+        self.goal_index.rebuild(self.goals)
         
         # Refresh the tree
         self.refreshGoalTree()
@@ -2701,21 +2143,11 @@ class GoalWidget(QWidget):
         # Switch to the tree tab first
         self.tab_widget.setCurrentIndex(0)
         
-        # Iterate through top-level items
-        for i in range(self.goal_tree.topLevelItemCount()):
-            top_item = self.goal_tree.topLevelItem(i)
-            item_id = top_item.data(0, Qt.ItemDataRole.UserRole)
-            
-            if item_id == goal_id:
-                self.goal_tree.setCurrentItem(top_item)
-                self.goal_tree.scrollToItem(top_item)
-                return True
-            
-            # Check children recursively
-            if self.findAndSelectItem(top_item, goal_id):
-                return True
-                
-        return False
+        index = self.selectGoalItemById(goal_id)
+        if index is None:
+            return False
+        self.goal_tree.scrollTo(index)
+        return True
     
     def refresh(self):
         """Refresh the widget's data."""
@@ -2729,51 +2161,6 @@ class GoalWidget(QWidget):
         if self.tab_widget.currentIndex() == 1:
             self.timeline_widget.updateTimeline(self.goals) 
 
-    def findParentItem(self, parent_id):
-        """Find a parent item by ID in the entire tree.
-        
-        Args:
-            parent_id: The ID of the parent goal to find
-            
-        Returns:
-            The QTreeWidgetItem if found, or None
-        """
-        # Search in all top level items
-        for i in range(self.goal_tree.topLevelItemCount()):
-            top_item = self.goal_tree.topLevelItem(i)
-            if top_item.data(0, Qt.ItemDataRole.UserRole) == parent_id:
-                return top_item
-            
-            # Search in children recursively
-            found_item = self._findParentItemRecursive(top_item, parent_id)
-            if found_item:
-                return found_item
-            
-        return None
-
-    def _findParentItemRecursive(self, item, parent_id):
-        """Recursively search for parent item by ID.
-        
-        Args:
-            item: The QTreeWidgetItem to search in
-            parent_id: The ID of the parent goal to find
-            
-        Returns:
-            The QTreeWidgetItem if found, or None
-        """
-        # Check if this item is the parent
-        if item.data(0, Qt.ItemDataRole.UserRole) == parent_id:
-            return item
-        
-        # Search in children
-        for i in range(item.childCount()):
-            child = item.child(i)
-            found_item = self._findParentItemRecursive(child, parent_id)
-            if found_item:
-                return found_item
-        
-        return None
-
     def addSubGoal(self, dialog, parent_id):
         """Add a sub-goal."""
         title = self.subgoal_title_input.text().strip()
@@ -2796,7 +2183,7 @@ class GoalWidget(QWidget):
                 self.parent.conn.commit()
                 goal_id = self.parent.cursor.lastrowid
             except Exception as e:
-                print(f"Error saving subgoal to database: {e}")
+                logger.error(f"Error saving subgoal to database: {e}", exc_info=True)
                 # Fall back to random ID
                 goal_id = random.randint(1000, 9999)
         else:
@@ -2816,6 +2203,7 @@ class GoalWidget(QWidget):
         
         # Add to our list
         self.goals.append(goal)
+        self.goal_index.add(goal)
         
         # Refresh the tree
         self.refreshGoalTree()
@@ -2905,8 +2293,9 @@ class GoalWidget(QWidget):
         self.clear_filters_btn.setVisible(False)
         self.filter_status_label.setVisible(False)
         
-        # Refresh the tree with all goals
-        self.refreshGoalTree()
+        # Show all goals again
+        self.goal_proxy.setFilters()
+        self.goal_tree.expandAll()
         
     def hasActiveFilters(self):
         """Check if any filters are currently active."""
@@ -2951,11 +2340,14 @@ class GoalWidget(QWidget):
             # Update filter status UI
             self.updateFilterStatusUI(search_text, completion_filter, priority_filter)
             
-            # Filter the goals
-            self.filterGoalTree(search_text, completion_filter, priority_filter)
+            # Re-run the proxy filter; the model and view are left intact
+            self.goal_proxy.setFilters(search_text, completion_filter, priority_filter)
+            
+            # Expand all to show filtered results
+            self.goal_tree.expandAll()
             
         except Exception as e:
-            print(f"Error applying filters: {e}")
+            logger.error(f"Error applying filters: {e}", exc_info=True)
             import traceback
             traceback.print_exc()
             
@@ -2989,115 +2381,3 @@ class GoalWidget(QWidget):
         else:
             self.clear_filters_btn.setVisible(False)
             self.filter_status_label.setVisible(False)
-            
-    def filterGoalTree(self, search_text, completion_filter, priority_filter):
-        """Filter the goal tree based on the given criteria."""
-        try:
-            # Block signals temporarily while rebuilding the tree
-            self.goal_tree.blockSignals(True)
-            
-            # Store current expanded state if needed
-            expanded_items = {}
-            selection = self.goal_tree.selectedItems()
-            selected_id = None
-            if selection:
-                selected_id = selection[0].data(0, Qt.ItemDataRole.UserRole)
-            
-            # Clear existing items
-            self.goal_tree.clear()
-            
-            # Filter goals based on criteria
-            filtered_goals = self.filterGoals(search_text, completion_filter, priority_filter)
-            
-            # Find root goals after filtering (those with parent_id None or parent not in filtered list)
-            root_goals = [g for g in filtered_goals if g['parent_id'] is None]
-            
-            # Also include goals whose parents aren't in the filtered list as roots
-            parent_ids = {g['id'] for g in filtered_goals}
-            orphaned_goals = [g for g in filtered_goals 
-                             if g['parent_id'] is not None and g['parent_id'] not in parent_ids]
-            root_goals.extend(orphaned_goals)
-            
-            # Pre-calculate progress for all filtered goals
-            goal_progress = {}
-            for goal in filtered_goals:
-                goal_progress[goal['id']] = self.calculateGoalProgress(goal)
-            
-            # Add root goals to tree
-            added_goal_ids = set()
-            for goal in root_goals:
-                try:
-                    item = self.addGoalToTreeOptimized(goal, None, goal_progress)
-                    added_goal_ids.add(goal['id'])
-                    
-                    # Find all children for this goal that are in the filtered list
-                    children = [g for g in filtered_goals if g['parent_id'] == goal['id']]
-                    
-                    # Add children recursively
-                    for child in children:
-                        self.addFilteredSubGoals(child, item, filtered_goals, added_goal_ids, goal_progress)
-                except Exception as e:
-                    print(f"Error adding root goal {goal['id']} to tree: {e}")
-                    
-            # Create progress bar widgets for all items
-            self.postProcessTreeItems()
-                    
-            # Reselect previously selected item if it exists
-            if selected_id:
-                self.selectGoalItemById(selected_id)
-            
-            # Expand all to show filtered results
-            self.goal_tree.expandAll()
-            
-        except Exception as e:
-            print(f"Error filtering goal tree: {e}")
-        finally:
-            # Unblock signals
-            self.goal_tree.blockSignals(False)
-            
-    def addFilteredSubGoals(self, goal, parent_item, filtered_goals, added_goal_ids, goal_progress):
-        """Add filtered subgoals to the tree."""
-        try:
-            # Add this goal as a child of parent_item
-            if goal['id'] not in added_goal_ids:
-                item = self.addGoalToTreeOptimized(goal, parent_item, goal_progress)
-                added_goal_ids.add(goal['id'])
-                
-                # Find all children for this goal that are in the filtered list
-                children = [g for g in filtered_goals if g['parent_id'] == goal['id']]
-                
-                # Add each child and its descendants
-                for child in children:
-                    self.addFilteredSubGoals(child, item, filtered_goals, added_goal_ids, goal_progress)
-        except Exception as e:
-            print(f"Error adding filtered subgoal {goal['id']}: {e}")
-            
-    def filterGoals(self, search_text, completion_filter, priority_filter):
-        """Filter goals based on search text, completion status, and priority."""
-        filtered_goals = []
-        
-        for goal in self.goals:
-            # Apply search filter
-            passes_search = True
-            if search_text:
-                # Search in title (could expand to search in description, etc.)
-                if search_text not in goal['title'].lower():
-                    passes_search = False
-                    
-            # Apply completion filter
-            passes_completion = True
-            if completion_filter is not None:
-                if goal['completed'] != completion_filter:
-                    passes_completion = False
-                    
-            # Apply priority filter
-            passes_priority = True
-            if priority_filter is not None:
-                if goal['priority'] != priority_filter:
-                    passes_priority = False
-                    
-            # Add to filtered list if passes all filters
-            if passes_search and passes_completion and passes_priority:
-                filtered_goals.append(goal)
-                
-        return filtered_goals
\ No newline at end of file
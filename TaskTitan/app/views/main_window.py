@@ -9,20 +9,15 @@ from PyQt6.QtWidgets import (
 )
 from PyQt6.QtCore import Qt, QSize, QDate, QTime, QTimer, pyqtSignal, QPropertyAnimation, QRect, QRectF, QEasingCurve, QPoint
 from PyQt6.QtGui import QIcon, QAction, QPixmap, QColor, QFont, QPainter, QBrush, QPen, QShortcut, QKeySequence
-import darkdetect
-import pyqtgraph as pg
 import sqlite3
 
 from app.models.database import initialize_db
 from app.models.database_manager import get_manager, close_connection
+from app.models.goal_progress import fetch_goal_progress
+from app.models.result_cache import ResultCache
 from app.controllers.search_manager import SearchManager, SearchResult
 from app.views.calendar_widget import ModernCalendarWidget, CalendarWithEventList
 from app.views.unified_activities_widget import UnifiedActivitiesWidget
-from app.views.goal_widget import GoalWidget
-from app.views.productivity_view import DailyTrackerView
-from app.views.pomodoro_widget import PomodoroWidget
-from app.views.settings_dialog import SettingsDialog
-from app.views.weekly_plan_view import WeeklyPlanView
 from app.views.search_results_widget import SearchResultsWidget
 from app.views.toast_notification import ToastManager, ToastType, show_toast
 from app.views.custom_progress import CircularProgressChart
@@ -61,6 +56,10 @@ class TaskTitanApp(QMainWindow):
         # Get the database manager for direct access
         self.db_manager = get_manager()
         
+        # Dashboard figures are shown from the last session's results until recomputed
+        self.result_cache = ResultCache(self.conn, parent=self)
+        self.result_cache.result_refreshed.connect(lambda key: self.loadDashboardGoals())
+        
         # Initialize activities manager
         from app.models.activities_manager import ActivitiesManager
         self.activities_manager = ActivitiesManager()
@@ -257,21 +256,17 @@ class TaskTitanApp(QMainWindow):
         self.activities_view = UnifiedActivitiesWidget(self)
         self.content_stack.addWidget(self.activities_view)
         
-        # Create goals page
-        self.goals_view = GoalWidget(self)
-        self.content_stack.addWidget(self.goals_view)
-        
-        # Create productivity page
-        self.productivity_view = DailyTrackerView(self)
-        self.content_stack.addWidget(self.productivity_view)
-        
-        # Create pomodoro page
-        self.pomodoro_view = PomodoroWidget(self)
-        self.content_stack.addWidget(self.pomodoro_view)
-        
-        # Create weekly plan page
-        self.weekly_plan_view = WeeklyPlanView(self)
-        self.content_stack.addWidget(self.weekly_plan_view)
+        # Goals, productivity, pomodoro and weekly plan pages are built the
+        # first time they are shown (see ensurePage); until then the stack
+        # holds empty placeholders, and their modules are not imported
+        self._lazy_pages = {
+            GOALS_VIEW: ('goals_view', self.createGoalsView),
+            PRODUCTIVITY_VIEW: ('productivity_view', self.createProductivityView),
+            POMODORO_VIEW: ('pomodoro_view', self.createPomodoroView),
+            WEEKLY_PLAN_VIEW: ('weekly_plan_view', self.createWeeklyPlanView),
+        }
+        for index in sorted(self._lazy_pages):
+            self.content_stack.insertWidget(index, QWidget())
         
         # Create settings page
         self.settings_widget = QWidget()
@@ -639,8 +634,47 @@ class TaskTitanApp(QMainWindow):
         """Show an info toast notification."""
         show_toast(self, message, ToastType.INFO)
 
+    def createGoalsView(self):
+        """Create the goals page."""
+        from app.views.goal_widget import GoalWidget
+        return GoalWidget(self)
+    
+    def createProductivityView(self):
+        """Create the daily tracker page."""
+        from app.views.productivity_view import DailyTrackerView
+        return DailyTrackerView(self)
+    
+    def createPomodoroView(self):
+        """Create the pomodoro page."""
+        from app.views.pomodoro_widget import PomodoroWidget
+        return PomodoroWidget(self)
+    
+    def createWeeklyPlanView(self):
+        """Create the weekly plan page."""
+        from app.views.weekly_plan_view import WeeklyPlanView
+        return WeeklyPlanView(self)
+    
+    def ensurePage(self, index):
+        """Build a lazily created page in place of its placeholder, if not built yet."""
+        if index not in self._lazy_pages:
+            return
+        attribute, factory = self._lazy_pages[index]
+        try:
+            page = factory()
+        except Exception as e:
+            # The placeholder stays, so the page is built again on the next visit
+            logger.error(f"Error creating page {VIEW_NAMES.get(index, index)}: {e}", exc_info=True)
+            return
+        placeholder = self.content_stack.widget(index)
+        self.content_stack.insertWidget(index, page)
+        self.content_stack.removeWidget(placeholder)
+        placeholder.deleteLater()
+        setattr(self, attribute, page)
+        del self._lazy_pages[index]
+    
     def changePage(self, index):
         """Change the current page and update selection styling."""
+        self.ensurePage(index)
         self.content_stack.setCurrentIndex(index)
         self.current_page = index
 
@@ -839,31 +873,19 @@ class TaskTitanApp(QMainWindow):
             # Clear existing items in the goals container
             self.clearLayout(self.goals_wheels_container)
             
-            # First, get all parent goals (top-level goals)
-            self.cursor.execute("""
-                SELECT id, title, due_date, created_date, parent_id, completed, priority
-            FROM goals 
-                WHERE parent_id IS NULL AND completed = 0
-                ORDER BY priority DESC, due_date ASC
-                LIMIT 10
-            """)
-            
-            parent_goals = self.cursor.fetchall()
+            # Load every goal with its progress in a single query
+            parent_goals, subgoals_by_parent = self.selectDashboardGoals(
+                fetch_goal_progress(self.cursor, result_cache=self.result_cache, stale_ok=True)
+            )
             
             if not parent_goals:
                 # No goals found, add sample goals and reload
                 self.addSampleGoals()
                 
                 # Try fetching goals again
-                self.cursor.execute("""
-                    SELECT id, title, due_date, created_date, parent_id, completed, priority
-                    FROM goals
-                    WHERE parent_id IS NULL AND completed = 0
-                    ORDER BY priority DESC, due_date ASC
-                    LIMIT 10
-                """)
-                
-                parent_goals = self.cursor.fetchall()
+                parent_goals, subgoals_by_parent = self.selectDashboardGoals(
+                    fetch_goal_progress(self.cursor, result_cache=self.result_cache)
+                )
                 
                 # If still no goals, show the message
                 if not parent_goals:
@@ -885,7 +907,10 @@ class TaskTitanApp(QMainWindow):
             
             # Process each parent goal
             for parent_goal in parent_goals:
-                parent_id, parent_title, parent_due_date, parent_created_date, _, parent_completed, parent_priority = parent_goal
+                parent_id = parent_goal['id']
+                parent_title = parent_goal['title']
+                parent_due_date = parent_goal['due_date']
+                parent_priority = parent_goal['priority']
                 
                 # Get priority color
                 priority_color = priority_colors.get(parent_priority, "#6366F1")
@@ -948,19 +973,8 @@ class TaskTitanApp(QMainWindow):
                 wheels_layout = QGridLayout(wheels_frame)
                 wheels_layout.setSpacing(20)
                 
-                # Parent goal as dictionary
-                parent_goal_dict = {
-                    'id': parent_id,
-                    'title': parent_title,
-                    'due_date': parent_due_date,
-                    'created_date': parent_created_date,
-                    'parent_id': None,
-                    'completed': parent_completed == 1,
-                    'priority': parent_priority
-                }
-                
-                # Calculate parent goal progress
-                parent_progress = self.calculateGoalProgress(parent_goal_dict)
+                # Parent goal progress was computed by the goal progress query
+                parent_progress = parent_goal['progress']
                 
                 # Create parent goal chart - make it larger than subgoals
                 parent_chart = CircularProgressChart("Overall Progress", parent_progress)
@@ -971,15 +985,7 @@ class TaskTitanApp(QMainWindow):
                 wheels_layout.addWidget(parent_chart, 0, 0)
                 
                 # Get subgoals for this parent
-                self.cursor.execute("""
-                    SELECT id, title, due_date, created_date, parent_id, completed
-                    FROM goals
-                    WHERE parent_id = ? AND completed = 0
-                    ORDER BY due_date ASC
-                    LIMIT 5
-                """, (parent_id,))
-                
-                subgoals = self.cursor.fetchall()
+                subgoals = subgoals_by_parent.get(parent_id, [])
                 
                 # Column counter for subgoals in current row
                 col = 1
@@ -987,20 +993,9 @@ class TaskTitanApp(QMainWindow):
                 
                 # Process each subgoal
                 for subgoal in subgoals:
-                    subgoal_id, subgoal_title, subgoal_due_date, subgoal_created_date, subgoal_parent_id, subgoal_completed = subgoal
-                    
-                    # Convert to dictionary
-                    subgoal_dict = {
-                        'id': subgoal_id,
-                        'title': subgoal_title,
-                        'due_date': subgoal_due_date,
-                        'created_date': subgoal_created_date,
-                        'parent_id': subgoal_parent_id,
-                        'completed': subgoal_completed == 1
-                    }
-                    
-                    # Calculate progress
-                    subgoal_progress = self.calculateGoalProgress(subgoal_dict)
+                    subgoal_id = subgoal['id']
+                    subgoal_title = subgoal['title']
+                    subgoal_progress = subgoal['progress']
                     
                     # Create progress wheel
                     subgoal_chart = CircularProgressChart(subgoal_title, subgoal_progress)
@@ -1035,6 +1030,36 @@ class TaskTitanApp(QMainWindow):
             error_label.setStyleSheet("color: #EF4444; padding: 20px;")
             self.goals_wheels_container.addWidget(error_label, 0, 0, 1, 3)
             
+    def selectDashboardGoals(self, goals, max_parents=10, max_subgoals=5):
+        """Pick the goals shown on the dashboard from fetch_goal_progress results.
+        
+        Args:
+            goals: Goal dictionaries ordered by due date
+            max_parents: Number of open top-level goals to show
+            max_subgoals: Number of open subgoals to show per parent
+            
+        Returns:
+            tuple: (parent goals, {parent_id: subgoals})
+        """
+        open_goals = [g for g in goals if not g['completed']]
+        
+        # Highest priority first; the sort is stable so due dates stay ascending
+        parent_goals = sorted(
+            (g for g in open_goals if g['parent_id'] is None),
+            key=lambda g: g['priority'] if g['priority'] is not None else float('-inf'),
+            reverse=True
+        )[:max_parents]
+        
+        shown_ids = {g['id'] for g in parent_goals}
+        subgoals_by_parent = {}
+        for goal in open_goals:
+            if goal['parent_id'] in shown_ids:
+                subgoals = subgoals_by_parent.setdefault(goal['parent_id'], [])
+                if len(subgoals) < max_subgoals:
+                    subgoals.append(goal)
+        
+        return parent_goals, subgoals_by_parent
+    
     def calculateGoalProgress(self, goal):
         """Calculate the progress percentage for a goal based on time.
         
@@ -1122,7 +1147,7 @@ class TaskTitanApp(QMainWindow):
         self.changePage(2)
         
         # Locate and select the goal in the goals view
-        if hasattr(self.goals_view, 'selectGoalById'):
+        if hasattr(self, 'goals_view') and hasattr(self.goals_view, 'selectGoalById'):
             self.goals_view.selectGoalById(goal_id)
 
     def loadStatistics(self):
@@ -1200,6 +1225,7 @@ class TaskTitanApp(QMainWindow):
     def openSettingsDialog(self):
         """Open the settings dialog (theme selection, etc.)."""
         try:
+            from app.views.settings_dialog import SettingsDialog
             dlg = SettingsDialog(self)
             dlg.exec()
         except Exception as e:
@@ -11,6 +11,9 @@ from datetime import datetime, timedelta
 import random
 
 from app.resources import get_icon
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
 
 class PomodoroWidget(QWidget):
     """Widget for using the Pomodoro Technique to manage work sessions."""
@@ -625,7 +628,7 @@ class PomodoroWidget(QWidget):
                     self.focus_time_label.setText(f"{focus_minutes} minutes")
                 
             except Exception as e:
-                print(f"Error loading Pomodoro statistics: {e}")
+                logger.error(f"Error loading Pomodoro statistics: {e}", exc_info=True)
     
     def saveSessionToDatabase(self, session):
         """Save a completed session to the database."""
@@ -654,7 +657,7 @@ class PomodoroWidget(QWidget):
                 self.parent.conn.commit()
                 
             except Exception as e:
-                print(f"Error saving Pomodoro session: {e}")
+                logger.error(f"Error saving Pomodoro session: {e}", exc_info=True)
     
     def refresh(self):
         """Refresh the widget data."""
@@ -679,7 +682,7 @@ class PomodoroWidget(QWidget):
                     self.task_combo.addItem(title, task_id)
                 
             except Exception as e:
-                print(f"Error loading tasks for Pomodoro: {e}")
+                logger.error(f"Error loading tasks for Pomodoro: {e}", exc_info=True)
                 # Add some sample tasks
                 self.task_combo.addItem("Sample Task 1", 1001)
                 self.task_combo.addItem("Sample Task 2", 1002)
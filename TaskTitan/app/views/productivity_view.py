@@ -17,7 +17,7 @@ from PyQt6.QtWidgets import (
     QTextEdit, QDialog, QDialogButtonBox, QSpinBox, QGroupBox, QColorDialog,
     QTableWidget, QTableWidgetItem, QHeaderView, QCheckBox, QListWidget,
     QListWidgetItem, QSizePolicy, QMenu, QCalendarWidget, QGraphicsDropShadowEffect,
-    QFileDialog, QProgressBar, QFormLayout, QInputDialog
+    QFileDialog, QProgressBar, QFormLayout, QInputDialog, QProgressDialog, QApplication
 )
 from PyQt6.QtCore import (
     Qt, QSize, QDate, QTime, QDateTime, pyqtSignal, QTimer,
@@ -43,6 +43,7 @@ except ImportError:
 
 from app.resources import get_icon, ColorPalette
 from app.utils.logger import get_logger
+from app.models.archive import history_source
 from app.utils.error_handler import handle_database_error, handle_file_error
 
 logger = get_logger(__name__)
@@ -111,6 +112,7 @@ class DailyTrackerView(QWidget):
         # Initialize database
         self.connection = None
         self.cursor = None
+        self.result_cache = None
         self.open_database()
         
         # Initialize UI
@@ -127,24 +129,22 @@ class DailyTrackerView(QWidget):
             self.connection = sqlite3.connect(db_path)
             self.cursor = self.connection.cursor()
             
-            # Create journal entries table if it doesn't exist
-            self.cursor.execute("""
-                CREATE TABLE IF NOT EXISTS journal_entries (
-                    id TEXT PRIMARY KEY,
-                    date TEXT UNIQUE,
-                    wins TEXT,
-                    challenges TEXT,
-                    learnings TEXT,
-                    tomorrow TEXT,
-                    gratitude TEXT,
-                    timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
-                    name TEXT
-                )
-            """)
+            self.db_path = db_path
+            
+            # Journal tables are checked once here rather than on every save or listing
+            from app.utils.journal_autosave import ensure_journal_schema
+            from app.utils.attachment_store import ensure_attachment_schema
+            ensure_journal_schema(self.cursor)
+            ensure_attachment_schema(self.cursor)
             
             # Make sure to commit the changes
             self.connection.commit()
             
+            # Chart and report data come from cached results while time entries are unchanged
+            from app.models.result_cache import ResultCache
+            self.result_cache = ResultCache(self.connection, parent=self)
+            self.result_cache.result_refreshed.connect(lambda key: self.update_analytics())
+            
             logger.info(f"Connected to database: {db_path.split('/')[-1]}")
             
         except Exception as e:
@@ -844,7 +844,7 @@ class DailyTrackerView(QWidget):
         
         # Load existing categories
         from app.utils.db_utils import list_attachment_categories
-        categories = list_attachment_categories()
+        categories = list_attachment_categories(self.connection)
         default_categories = ["Journal", "Images", "Documents", "Notes", "Reference"]
         
         # Combine existing and default categories
@@ -1042,7 +1042,6 @@ class DailyTrackerView(QWidget):
         """)
         self.free_writing_edit.setPlaceholderText("Start writing here...")
         self.free_writing_edit.setMinimumHeight(400)
-        self.free_writing_edit.textChanged.connect(self.update_word_count)
         
         freeform_layout.addWidget(self.free_writing_edit)
         journal_tabs.addTab(freeform_tab, "Free Writing")
@@ -1191,6 +1190,8 @@ class DailyTrackerView(QWidget):
         
         # Update date label
         self.update_journal_date_label()
+        # Autosave edits and keep the word count current without work per keystroke
+        self.setup_journal_autosave()
         # Load journal entry for current date
         self.load_journal_entry(self.current_date)
         # Update journal stats
@@ -1206,28 +1207,18 @@ class DailyTrackerView(QWidget):
             # Get category from the dropdown
             category = self.attachment_category.currentText() if self.attachment_category.currentText() else None
             
-            # Save attachment to DB with the selected category
+            # Save attachment to DB with the selected category; the list refreshes when it is stored
             self.save_journal_attachment(self.current_date, file_path, category)
-            self.load_journal_attachments(self.current_date)
         else:
             self.attached_file_label.setText("")
             self.attached_file_path = None
 
     def save_journal_attachment(self, date, file_path, category=None):
-        """Save the attached file path for the given date in the database."""
+        """Store the attached file in the background and record it for the given date when done."""
         if not self.cursor:
             return
         try:
-            # Create journal_attachments table if it doesn't exist (with category and shortcut_path fields)
-            self.cursor.execute("""
-                CREATE TABLE IF NOT EXISTS journal_attachments (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    date TEXT NOT NULL,
-                    file_path TEXT NOT NULL,
-                    category TEXT,
-                    shortcut_path TEXT
-                )
-            """)
+            from app.utils.attachment_store import AttachmentImport
             
             # Format date string
             date_str = date.toString("yyyy-MM-dd")
@@ -1235,26 +1226,67 @@ class DailyTrackerView(QWidget):
             # Use the category from the dropdown if not provided
             if not category and hasattr(self, 'attachment_category'):
                 category = self.attachment_category.currentText()
-                
-            # Copy the file to the attachments directory
-            from app.utils.db_utils import save_attachment
-            date_path, shortcut_path = save_attachment(file_path, date_str=date_str, category=category)
-            
-            if date_path:
-                # Store the paths and category in the database
-                self.cursor.execute(
-                    "INSERT INTO journal_attachments (date, file_path, category, shortcut_path) VALUES (?, ?, ?, ?)",
-                    (date_str, date_path, category, shortcut_path)
-                )
-                self.connection.commit()
-                print(f"Successfully saved attachment to {date_path}")
-                if shortcut_path:
-                    print(f"Created shortcut at {shortcut_path}")
-            else:
-                print("Failed to save attachment: Could not copy file to date directory")
+            
+            # Large files are copied and hashed on a worker thread
+            attachment_import = AttachmentImport(file_path, date_str=date_str, category=category, parent=self)
+            progress_dialog = QProgressDialog(
+                f"Attaching {os.path.basename(file_path)}...", "Cancel", 0, 100, self
+            )
+            progress_dialog.setWindowTitle("Attach File")
+            progress_dialog.setMinimumDuration(500)
+            progress_dialog.setAutoClose(False)
+            progress_dialog.setAutoReset(False)
+            progress_dialog.canceled.connect(attachment_import.cancel)
+            attachment_import.progress_dialog = progress_dialog
+            
+            attachment_import.progress.connect(
+                partial(self.on_attachment_import_progress, attachment_import)
+            )
+            attachment_import.finished.connect(
+                partial(self.on_attachment_imported, attachment_import)
+            )
+            self.attachment_imports = getattr(self, 'attachment_imports', [])
+            self.attachment_imports.append(attachment_import)
+            attachment_import.start()
+        except Exception as e:
+            logger.error(f"Error saving journal attachment: {e}", exc_info=True)
+            QMessageBox.warning(self, "Error", f"Could not save attachment: {e}")
+    
+    def on_attachment_import_progress(self, attachment_import, copied, total):
+        """Show how much of an attachment has been copied."""
+        attachment_import.progress_dialog.setValue(int(copied * 100 / total) if total else 100)
+    
+    def on_attachment_imported(self, attachment_import, success, result):
+        """Record a stored attachment in the database and refresh the list."""
+        attachment_import.progress_dialog.close()
+        if attachment_import in self.attachment_imports:
+            self.attachment_imports.remove(attachment_import)
+        attachment_import.deleteLater()
+        
+        if not success:
+            if result.get('error') != 'cancelled':
+                QMessageBox.warning(self, "Error", f"Could not save attachment: {result.get('error')}")
+            return
+        
+        try:
+            # Store the paths, category and content hash in the database
+            self.cursor.execute(
+                "INSERT INTO journal_attachments (date, file_path, category, shortcut_path, "
+                "content_hash, size, mime_type, width, height) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (attachment_import.date_str, result['file_path'], attachment_import.category,
+                 result['shortcut_path'], result['content_hash'], result['size'],
+                 result['mime_type'], result['width'], result['height'])
+            )
+            self.connection.commit()
+            logger.info(f"Saved attachment to {result['file_path']}")
+            if result['shortcut_path']:
+                logger.debug(f"Created shortcut at {result['shortcut_path']}")
         except Exception as e:
-            print(f"Error saving journal attachment: {e}")
+            logger.error(f"Error saving journal attachment: {e}", exc_info=True)
             QMessageBox.warning(self, "Error", f"Could not save attachment: {e}")
+        
+        if attachment_import.date_str == self.current_date.toString("yyyy-MM-dd"):
+            self.load_journal_attachments(self.current_date)
 
     def load_journal_attachments(self, date):
         """Load and display the list of attached files for the given date."""
@@ -1266,46 +1298,25 @@ class DailyTrackerView(QWidget):
         try:
             date_str = date.toString("yyyy-MM-dd") if isinstance(date, QDate) else date
             
-            # Check if shortcut_path column exists
-            try:
-                self.cursor.execute(
-                    "SELECT id, file_path, category, shortcut_path FROM journal_attachments WHERE date = ?",
-                    (date_str,)
-                )
-                files = self.cursor.fetchall()
-                
-                shortcut_path_exists = True
-            except sqlite3.OperationalError as e:
-                if "no such column: shortcut_path" in str(e):
-                    # Shortcut_path column doesn't exist, use query without it
-                    self.cursor.execute(
-                        "SELECT id, file_path, category FROM journal_attachments WHERE date = ?",
-                        (date_str,)
-                    )
-                    files = self.cursor.fetchall()
-                    
-                    # Add the missing column to the table
-                    try:
-                        self.cursor.execute("ALTER TABLE journal_attachments ADD COLUMN shortcut_path TEXT")
-                        self.connection.commit()
-                        print("Added shortcut_path column to journal_attachments table")
-                    except Exception as alter_error:
-                        print(f"Error adding shortcut_path column: {alter_error}")
-                    
-                    shortcut_path_exists = False
-                else:
-                    # Re-raise if it's a different error
-                    raise
-            
-            for file_data in files:
-                file_id = file_data[0]
-                file_path = file_data[1]
-                category = file_data[2]
-                shortcut_path = file_data[3] if shortcut_path_exists and len(file_data) > 3 else None
-                
-                # Check if file exists and determine which path to use for display
+            # Everything shown comes from the indexed metadata; original files are not opened
+            self.cursor.execute(
+                "SELECT id, file_path, category, shortcut_path, content_hash, size, mime_type, width, height "
+                "FROM journal_attachments WHERE date = ? ORDER BY id",
+                (date_str,)
+            )
+            files = self.cursor.fetchall()
+            
+            from app.resources import get_icon
+            from app.utils.thumbnail_cache import get_thumbnail_cache
+            thumbnails = get_thumbnail_cache()
+            if not getattr(self, 'thumbnail_cache_connected', False):
+                thumbnails.thumbnail_ready.connect(self.on_attachment_thumbnail_ready)
+                self.thumbnail_cache_connected = True
+            
+            for file_id, file_path, category, shortcut_path, content_hash, size, mime_type, width, height in files:
+                # Attachments saved before content hashes were recorded may only exist as a shortcut
                 display_path = file_path
-                if not os.path.exists(file_path) and shortcut_path and os.path.exists(shortcut_path):
+                if not content_hash and not os.path.exists(file_path) and shortcut_path and os.path.exists(shortcut_path):
                     display_path = shortcut_path
                 
                 # Create an item with more detailed display including category
@@ -1319,7 +1330,8 @@ class DailyTrackerView(QWidget):
                 
                 # Add an icon based on file type
                 file_ext = os.path.splitext(item_name)[1].lower()
-                if file_ext in ['.jpg', '.jpeg', '.png', '.gif', '.bmp']:
+                is_image = (mime_type or '').startswith('image/') or file_ext in ['.jpg', '.jpeg', '.png', '.gif', '.bmp']
+                if is_image:
                     icon_name = "image"
                 elif file_ext in ['.pdf']:
                     icon_name = "pdf"
@@ -1330,9 +1342,9 @@ class DailyTrackerView(QWidget):
                 else:
                     icon_name = "attachment"
                 
-                # Try to get icon
-                from app.resources import get_icon
-                icon = get_icon(icon_name)
+                # Images show their cached thumbnail; a missing one is generated in the background
+                thumbnail_path = thumbnails.get(content_hash, file_path) if is_image and content_hash else None
+                icon = QIcon(thumbnail_path) if thumbnail_path else get_icon(icon_name)
                 if not icon.isNull():
                     item.setIcon(icon)
                 
@@ -1340,6 +1352,10 @@ class DailyTrackerView(QWidget):
                 tooltip = f"File: {display_path}"
                 if category:
                     tooltip += f"\nCategory: {category}"
+                if size is not None:
+                    tooltip += f"\nSize: {size / 1024:.1f} KB"
+                if width and height:
+                    tooltip += f"\nDimensions: {width} x {height}"
                 tooltip += f"\nDate: {date_str}"
                 item.setToolTip(tooltip)
                 
@@ -1348,11 +1364,19 @@ class DailyTrackerView(QWidget):
                 item.setData(Qt.ItemDataRole.UserRole + 1, file_id)
                 item.setData(Qt.ItemDataRole.UserRole + 2, category)
                 item.setData(Qt.ItemDataRole.UserRole + 3, shortcut_path)
+                item.setData(Qt.ItemDataRole.UserRole + 4, content_hash)
                 
                 # Add to list
                 self.attachments_list.addItem(item)
         except Exception as e:
-            print(f"Error loading journal attachments: {e}")
+            logger.error(f"Error loading journal attachments: {e}", exc_info=True)
+    
+    def on_attachment_thumbnail_ready(self, content_hash, thumbnail_path):
+        """Show a thumbnail that finished generating on the items of that file."""
+        for row in range(self.attachments_list.count()):
+            item = self.attachments_list.item(row)
+            if item.data(Qt.ItemDataRole.UserRole + 4) == content_hash:
+                item.setIcon(QIcon(thumbnail_path))
 
     def open_attached_file(self, item):
         """Open the attached file using the default system application."""
@@ -1411,7 +1435,7 @@ class DailyTrackerView(QWidget):
             self.journal_stats_label.setText(stats_text)
             
         except Exception as e:
-            print(f"Error updating journal stats: {e}")
+            logger.error(f"Error updating journal stats: {e}", exc_info=True)
             self.journal_stats_label.setText("Unable to load journal statistics.")
     
     def update_journal_date_label(self):
@@ -1425,179 +1449,121 @@ class DailyTrackerView(QWidget):
         self.update_journal_date_label()
         self.load_journal_entry(new_date)
         
+    def setup_journal_autosave(self):
+        """Autosave journal edits shortly after typing stops and track free writing counts."""
+        from app.utils.journal_autosave import JournalAutosaver, TextStatsCounter, AUTOSAVE_DELAY_MS
+        
+        self.journal_dirty = False
+        self.journal_loading = False
+        self.journal_autosave_date = None
+        
+        # Restarted on every edit, so rapid edits end up in one save
+        self.journal_autosave_timer = QTimer(self)
+        self.journal_autosave_timer.setSingleShot(True)
+        self.journal_autosave_timer.setInterval(AUTOSAVE_DELAY_MS)
+        self.journal_autosave_timer.timeout.connect(self.autosave_journal_entry)
+        
+        self.journal_autosaver = None
+        if getattr(self, 'db_path', None):
+            self.journal_autosaver = JournalAutosaver(self.db_path, self)
+            self.journal_autosaver.entry_saved.connect(self.on_journal_entry_autosaved)
+        
+        for edit in (self.wins_edit, self.challenges_edit, self.learnings_edit,
+                     self.tomorrow_edit, self.gratitude_edit, self.free_writing_edit):
+            edit.textChanged.connect(self.schedule_journal_autosave)
+        self.name_edit.textChanged.connect(self.schedule_journal_autosave)
+        
+        self.free_writing_stats = TextStatsCounter(self.free_writing_edit.document(), self)
+        self.free_writing_stats.counts_changed.connect(self.update_word_count)
+        self.update_word_count()
+        
+        app = QApplication.instance()
+        if app is not None:
+            app.aboutToQuit.connect(self.flush_journal_autosave)
+    
+    def schedule_journal_autosave(self):
+        """Mark the journal entry as edited and restart the autosave delay."""
+        if self.journal_loading:
+            return
+        if not self.journal_dirty:
+            self.journal_dirty = True
+            self.journal_autosave_date = self.current_date.toString("yyyy-MM-dd")
+        self.journal_autosave_timer.start()
+    
+    def autosave_journal_entry(self):
+        """Hand a snapshot of the edited entry to the autosaver."""
+        self.journal_autosave_timer.stop()
+        if not self.journal_dirty or self.journal_autosaver is None:
+            return
+        self.journal_dirty = False
+        
+        # A new entry gets its id on the first save; later saves update it
+        if not self.current_entry_id:
+            if not self.has_journal_content():
+                return
+            self.current_entry_id = str(uuid.uuid4())
+        
+        self.journal_autosaver.save({
+            'id': self.current_entry_id,
+            'date': self.journal_autosave_date or self.current_date.toString("yyyy-MM-dd"),
+            'wins': self.wins_edit.toPlainText(),
+            'challenges': self.challenges_edit.toPlainText(),
+            'learnings': self.learnings_edit.toPlainText(),
+            'tomorrow': self.tomorrow_edit.toPlainText(),
+            'gratitude': self.gratitude_edit.toPlainText(),
+            'free_writing': self.free_writing_edit.toPlainText(),
+            'timestamp': self.current_entry_timestamp or datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            'name': self.name_edit.text(),
+        })
+    
+    def flush_journal_autosave(self) -> bool:
+        """Write any pending journal edits now and wait for them to reach the database."""
+        if not hasattr(self, 'journal_autosave_timer'):
+            return True
+        self.autosave_journal_entry()
+        if self.journal_autosaver is None:
+            return True
+        return self.journal_autosaver.flush(timeout=10)
+    
+    def on_journal_entry_autosaved(self, entry_id, date_str, created):
+        """Show a newly created entry in the entry list and the calendar."""
+        if not created:
+            return
+        if date_str == self.current_date.toString("yyyy-MM-dd"):
+            self.entry_selector.blockSignals(True)
+            try:
+                self.load_journal_entries_for_date(self.current_date)
+                index = self.entry_selector.findData(self.current_entry_id)
+                if index >= 0:
+                    self.entry_selector.setCurrentIndex(index)
+            finally:
+                self.entry_selector.blockSignals(False)
+        self.update_journal_calendar()
+    
     def save_journal_entry(self):
         """Save the current journal entry to the database."""
-        if not self.cursor:
+        if not self.cursor or getattr(self, 'journal_autosaver', None) is None:
             QMessageBox.warning(self, "Database Error", "Cannot save journal entry: Database not connected.")
             return
-            
-        try:
-            # Generate a unique ID for new entries
-            entry_id = str(uuid.uuid4())
-            
-            # Prepare data
-            date_str = self.current_date.toString("yyyy-MM-dd")
-            timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            
-            # Check if journal_entries table exists
-            self.cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='journal_entries'")
-            if not self.cursor.fetchone():
-                # Create the table if it doesn't exist
-                self.cursor.execute("""
-                    CREATE TABLE journal_entries (
-                        id TEXT PRIMARY KEY,
-                        date TEXT,
-                        wins TEXT,
-                        challenges TEXT,
-                        learnings TEXT,
-                        tomorrow TEXT,
-                        gratitude TEXT,
-                        free_writing TEXT,
-                        timestamp TEXT,
-                        name TEXT
-                    )
-                """)
-            else:
-                # Check if journal_entries table has required columns
-                try:
-                    self.cursor.execute("SELECT free_writing, name FROM journal_entries LIMIT 1")
-                except sqlite3.OperationalError:
-                    # Add missing columns if they don't exist
-                    try:
-                        # Check and add free_writing column
-                        try:
-                            self.cursor.execute("SELECT free_writing FROM journal_entries LIMIT 1")
-                        except sqlite3.OperationalError:
-                            self.cursor.execute("ALTER TABLE journal_entries ADD COLUMN free_writing TEXT")
-                            print("Added free_writing column to journal_entries table")
-                            
-                        # Check and add name column
-                        try:
-                            self.cursor.execute("SELECT name FROM journal_entries LIMIT 1")
-                        except sqlite3.OperationalError:
-                            self.cursor.execute("ALTER TABLE journal_entries ADD COLUMN name TEXT")
-                            print("Added name column to journal_entries table")
-                            
-                    except Exception as alter_error:
-                        print(f"Error adding columns: {alter_error}")
-                
-                # Also check for timestamp column
-                try:
-                    self.cursor.execute("SELECT timestamp FROM journal_entries LIMIT 1")
-                except sqlite3.OperationalError:
-                    # Add timestamp column if it doesn't exist
-                    try:
-                        self.cursor.execute("ALTER TABLE journal_entries ADD COLUMN timestamp TEXT")
-                        print("Added timestamp column to journal_entries table")
-                    except Exception as alter_error:
-                        print(f"Error adding timestamp column: {alter_error}")
-                        
-                # Remove UNIQUE constraint from date column by recreating the table if needed
-                has_unique_constraint = False
-                try:
-                    self.cursor.execute("INSERT INTO journal_entries (id, date) VALUES (?, ?)", 
-                                       (str(uuid.uuid4()), date_str))
-                    self.cursor.execute("INSERT INTO journal_entries (id, date) VALUES (?, ?)", 
-                                       (str(uuid.uuid4()), date_str))
-                    self.connection.rollback()  # Don't actually insert test entries
-                except sqlite3.IntegrityError:
-                    # UNIQUE constraint exists
-                    has_unique_constraint = True
-                except Exception as e:
-                    print(f"Error testing for UNIQUE constraint: {e}")
-                
-                if has_unique_constraint:
-                    print("Recreating journal_entries table to remove UNIQUE constraint on date...")
-                    # Create new table without the UNIQUE constraint
-                    self.cursor.execute("""
-                        CREATE TABLE IF NOT EXISTS journal_entries_new (
-                            id TEXT PRIMARY KEY,
-                            date TEXT,
-                            wins TEXT,
-                            challenges TEXT,
-                            learnings TEXT,
-                            tomorrow TEXT,
-                            gratitude TEXT,
-                            free_writing TEXT,
-                            timestamp TEXT,
-                            name TEXT
-                        )
-                    """)
-                    
-                    # Copy data from old table to new table
-                    self.cursor.execute("""
-                        INSERT INTO journal_entries_new 
-                        SELECT id, date, wins, challenges, learnings, tomorrow, gratitude, 
-                               free_writing, timestamp, name
-                        FROM journal_entries
-                    """)
-                    
-                    # Drop old table and rename new table
-                    self.cursor.execute("DROP TABLE journal_entries")
-                    self.cursor.execute("ALTER TABLE journal_entries_new RENAME TO journal_entries")
-                    
-                    self.connection.commit()
-                    print("Successfully recreated journal_entries table without UNIQUE constraint")
-            
-            # Check if this is a new entry or if we're updating an existing one
-            if hasattr(self, 'current_entry_id') and self.current_entry_id:
-                # Update existing entry
-                self.cursor.execute("""
-                    UPDATE journal_entries 
-                    SET wins = ?, challenges = ?, learnings = ?, tomorrow = ?, 
-                        gratitude = ?, free_writing = ?, timestamp = ?, name = ?
-                    WHERE id = ?
-                """, (
-                    self.wins_edit.toPlainText(),
-                    self.challenges_edit.toPlainText(),
-                    self.learnings_edit.toPlainText(),
-                    self.tomorrow_edit.toPlainText(),
-                    self.gratitude_edit.toPlainText(),
-                    self.free_writing_edit.toPlainText() if hasattr(self, 'free_writing_edit') else None,
-                    timestamp,
-                    self.name_edit.text() if hasattr(self, 'name_edit') else None,
-                    self.current_entry_id
-                ))
-                entry_id = self.current_entry_id
-            else:
-                # Insert new entry
-                self.cursor.execute("""
-                    INSERT INTO journal_entries 
-                    (id, date, wins, challenges, learnings, tomorrow, gratitude, free_writing, timestamp, name)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """, (
-                    entry_id,
-                    date_str,
-                    self.wins_edit.toPlainText(),
-                    self.challenges_edit.toPlainText(),
-                    self.learnings_edit.toPlainText(),
-                    self.tomorrow_edit.toPlainText(),
-                    self.gratitude_edit.toPlainText(),
-                    self.free_writing_edit.toPlainText() if hasattr(self, 'free_writing_edit') else None,
-                    timestamp,
-                    self.name_edit.text() if hasattr(self, 'name_edit') else None
-                ))
-            
-            # Commit changes
-            self.connection.commit()
-            
-            # Update current entry ID
-            self.current_entry_id = entry_id
-            
-            # Highlight the date in the calendar
-            self.update_journal_calendar()
-            
+        
+        # Saving now just skips the autosave delay
+        self.journal_dirty = True
+        self.journal_autosave_date = self.journal_autosave_date or self.current_date.toString("yyyy-MM-dd")
+        if not self.flush_journal_autosave():
+            QMessageBox.warning(self, "Error", "Could not save journal entry: the database is busy.")
+        elif self.journal_autosaver.last_error:
+            QMessageBox.warning(self, "Error", f"Could not save journal entry: {self.journal_autosaver.last_error}")
+        elif self.current_entry_id:
             QMessageBox.information(self, "Success", "Journal entry saved successfully!")
-            
-        except Exception as e:
-            print(f"Error saving journal entry: {e}")
-            QMessageBox.warning(self, "Error", f"Could not save journal entry: {e}")
     
     def load_journal_entry(self, date):
         """Load journal entries for the specified date."""
         if not self.cursor:
             return
         
+        # Edits to the entry being left are written before another one is shown
+        self.flush_journal_autosave()
+        
         try:
             # Convert QDate to string
             if isinstance(date, QDate):
@@ -1623,7 +1589,7 @@ class DailyTrackerView(QWidget):
             self.load_journal_attachments(date)
             
         except Exception as e:
-            print(f"Error loading journal entry: {e}")
+            logger.error(f"Error loading journal entry: {e}", exc_info=True)
     
     def update_journal_calendar(self):
         """Update the journal calendar to highlight dates with entries."""
@@ -1665,7 +1631,7 @@ class DailyTrackerView(QWidget):
             old_calendar.deleteLater()
             
         except Exception as e:
-            print(f"Error updating journal calendar: {e}")
+            logger.error(f"Error updating journal calendar: {e}", exc_info=True)
         
     def setup_analytics_tab(self):
         """Set up the analytics tab with charts and insights."""
@@ -2665,7 +2631,7 @@ class DailyTrackerView(QWidget):
             self.connection.commit()
             
         except Exception as e:
-            print(f"Error saving time entry: {e}")
+            logger.error(f"Error saving time entry: {e}", exc_info=True)
             
     def update_entry(self, entry):
         """Update an existing time entry in the database."""
@@ -2693,7 +2659,7 @@ class DailyTrackerView(QWidget):
             self.connection.commit()
             
         except Exception as e:
-            print(f"Error updating time entry: {e}")
+            logger.error(f"Error updating time entry: {e}", exc_info=True)
             
     def delete_entry(self, entry_id):
         """Delete a time entry from the database."""
@@ -2705,7 +2671,7 @@ class DailyTrackerView(QWidget):
             self.connection.commit()
             
         except Exception as e:
-            print(f"Error deleting time entry: {e}")
+            logger.error(f"Error deleting time entry: {e}", exc_info=True)
             
     def load_entries(self, date):
         """Load time entries for the given date."""
@@ -2717,9 +2683,9 @@ class DailyTrackerView(QWidget):
             self.time_entries = []
             
             # Query database
-            self.cursor.execute("""
+            self.cursor.execute(f"""
                 SELECT id, date, start_time, end_time, category, description, energy_level, mood_level 
-                FROM time_entries 
+                FROM {history_source(self.connection, 'time_entries', date)} 
                 WHERE date = ?
                 ORDER BY start_time
             """, (date.toString("yyyy-MM-dd"),))
@@ -2744,7 +2710,7 @@ class DailyTrackerView(QWidget):
             self.update_summary()
             
         except Exception as e:
-            print(f"Error loading time entries: {e}")
+            logger.error(f"Error loading time entries: {e}", exc_info=True)
             
     def refresh_entries_table(self):
         """Refresh the time entries table with current data."""
@@ -3002,7 +2968,7 @@ class DailyTrackerView(QWidget):
             QMessageBox.information(self, "Success", "Energy and mood recorded successfully!")
             
         except Exception as e:
-            print(f"Error logging energy and mood: {e}")
+            logger.error(f"Error logging energy and mood: {e}", exc_info=True)
             QMessageBox.warning(self, "Error", f"Could not save energy and mood data: {e}")
             
     def set_date_range(self, range_type):
@@ -3054,6 +3020,19 @@ class DailyTrackerView(QWidget):
             elif tab_name == "Trend Analysis":
                 self.update_trend_analysis_chart(start_date, end_date)
     
+    def fetch_time_entry_rows(self, sql, params, stale_ok=False):
+        """
+        Run an aggregate query over time entries, answering from cached
+        results while the time entries are unchanged.
+        
+        With stale_ok, the last known result may be returned; it is then
+        recomputed in the background and the charts are updated if it changed.
+        """
+        if self.result_cache is None:
+            self.cursor.execute(sql, params)
+            return self.cursor.fetchall()
+        return self.result_cache.fetch_rows(sql, params, tables=('time_entries',), stale_ok=stale_ok)
+    
     def update_category_pie_chart(self, start_date, end_date):
         """Update the category distribution pie chart."""
         if not HAS_MATPLOTLIB or not self.cursor:
@@ -3076,18 +3055,16 @@ class DailyTrackerView(QWidget):
             else:  # Alphabetical
                 order_clause = "ORDER BY category"
                 
-            self.cursor.execute(f"""
+            results = self.fetch_time_entry_rows(f"""
                 SELECT category, SUM((strftime('%s', end_time) - strftime('%s', start_time)) / 60) as duration
-                FROM time_entries
+                FROM {history_source(self.connection, 'time_entries', start_date)}
                 WHERE date BETWEEN ? AND ? AND end_time IS NOT NULL
                 GROUP BY category
                 {order_clause}
             """, (
                 start_date.toString("yyyy-MM-dd"),
                 end_date.toString("yyyy-MM-dd")
-            ))
-            
-            results = self.cursor.fetchall()
+            ), stale_ok=True)
             
             if not results:
                 ax.text(0.5, 0.5, "No data available for selected period",
@@ -3211,7 +3188,7 @@ class DailyTrackerView(QWidget):
             self.category_canvas.draw()
             
         except Exception as e:
-            print(f"Error updating category pie chart: {e}")
+            logger.error(f"Error updating category pie chart: {e}", exc_info=True)
     
     def format_duration(self, minutes):
         """Format duration in minutes to hours and minutes."""
@@ -3257,21 +3234,19 @@ class DailyTrackerView(QWidget):
             
             if show_categories:
                 # Query time entries by category
-                self.cursor.execute(f"""
+                category_results = self.fetch_time_entry_rows(f"""
                     SELECT 
                         {group_sql} as time_period,
                         category,
                         SUM((strftime('%s', end_time) - strftime('%s', start_time)) / 60) as duration
-                    FROM time_entries
+                    FROM {history_source(self.connection, 'time_entries', start_date)}
                     WHERE date BETWEEN ? AND ? AND end_time IS NOT NULL
                     GROUP BY time_period, category
                     ORDER BY time_period, category
                 """, (
                     start_date.toString("yyyy-MM-dd"),
                     end_date.toString("yyyy-MM-dd")
-                ))
-                
-                category_results = self.cursor.fetchall()
+                ), stale_ok=True)
                 
                 if not category_results:
                     ax.text(0.5, 0.5, "No data available for selected period",
@@ -3364,20 +3339,18 @@ class DailyTrackerView(QWidget):
                 
             else:
                 # Query time entries grouped by the selected time period
-                self.cursor.execute(f"""
+                results = self.fetch_time_entry_rows(f"""
                     SELECT 
                         {group_sql} as time_period,
                         SUM((strftime('%s', end_time) - strftime('%s', start_time)) / 60) as duration
-                    FROM time_entries
+                    FROM {history_source(self.connection, 'time_entries', start_date)}
                     WHERE date BETWEEN ? AND ? AND end_time IS NOT NULL
                     GROUP BY time_period
                     ORDER BY time_period
                 """, (
                     start_date.toString("yyyy-MM-dd"),
                     end_date.toString("yyyy-MM-dd")
-                ))
-                
-                results = self.cursor.fetchall()
+                ), stale_ok=True)
                 
                 if not results:
                     ax.text(0.5, 0.5, "No data available for selected period",
@@ -3460,7 +3433,7 @@ class DailyTrackerView(QWidget):
             self.daily_canvas.draw()
             
         except Exception as e:
-            print(f"Error updating daily distribution chart: {e}")
+            logger.error(f"Error updating daily distribution chart: {e}", exc_info=True)
     
     def update_productivity_patterns_chart(self, start_date, end_date):
         """Update the productivity patterns chart."""
@@ -3475,22 +3448,20 @@ class DailyTrackerView(QWidget):
             ax = self.patterns_figure.add_subplot(111)
             
             # Query time entries with energy and mood levels
-            self.cursor.execute("""
+            results = self.fetch_time_entry_rows(f"""
                 SELECT 
                     time_entries.date, 
                     AVG(time_entries.energy_level) as avg_energy,
                     AVG(time_entries.mood_level) as avg_mood,
                     SUM((strftime('%s', end_time) - strftime('%s', start_time)) / 60) as duration
-                FROM time_entries
+                FROM {history_source(self.connection, 'time_entries', start_date)} AS time_entries
                 WHERE date BETWEEN ? AND ? AND end_time IS NOT NULL
                 GROUP BY time_entries.date
                 ORDER BY time_entries.date
             """, (
                 start_date.toString("yyyy-MM-dd"),
                 end_date.toString("yyyy-MM-dd")
-            ))
-            
-            results = self.cursor.fetchall()
+            ), stale_ok=True)
             
             if not results:
                 ax.text(0.5, 0.5, "No data available for selected period",
@@ -3557,7 +3528,7 @@ class DailyTrackerView(QWidget):
             self.patterns_canvas.draw()
             
         except Exception as e:
-            print(f"Error updating productivity patterns chart: {e}")
+            logger.error(f"Error updating productivity patterns chart: {e}", exc_info=True)
             
     def change_report_type(self, index):
         """Change the report type."""
@@ -3626,7 +3597,7 @@ class DailyTrackerView(QWidget):
             self.report_content.setHtml(html)
             
         except Exception as e:
-            print(f"Error generating report: {e}")
+            logger.error(f"Error generating report: {e}", exc_info=True)
             self.report_content.setHtml(f"<p>Error generating report: {e}</p>")
             
     def generate_daily_summary_report(self, start_date, end_date):
@@ -3634,12 +3605,12 @@ class DailyTrackerView(QWidget):
         html = "<h2>Time Entries by Day</h2>"
         
         # Query daily totals
-        self.cursor.execute("""
+        daily_results = self.fetch_time_entry_rows(f"""
             SELECT 
                 date, 
                 COUNT(*) as entry_count,
                 SUM((strftime('%s', end_time) - strftime('%s', start_time)) / 60) as total_minutes
-            FROM time_entries
+            FROM {history_source(self.connection, 'time_entries', start_date)}
             WHERE date BETWEEN ? AND ? AND end_time IS NOT NULL
             GROUP BY date
             ORDER BY date
@@ -3648,8 +3619,6 @@ class DailyTrackerView(QWidget):
             end_date.toString("yyyy-MM-dd")
         ))
         
-        daily_results = self.cursor.fetchall()
-        
         if not daily_results:
             return "<p>No data available for the selected period.</p>"
             
@@ -3677,9 +3646,9 @@ class DailyTrackerView(QWidget):
             duration_str = f"{hours}h {mins}m"
             
             # Get categories for this day
-            self.cursor.execute("""
+            self.cursor.execute(f"""
                 SELECT DISTINCT category
-                FROM time_entries
+                FROM {history_source(self.connection, 'time_entries', date_str)}
                 WHERE date = ?
             """, (date_str,))
             
@@ -3719,13 +3688,13 @@ class DailyTrackerView(QWidget):
         html = "<h2>Time by Week</h2>"
         
         # Query data grouped by week
-        self.cursor.execute("""
+        weekly_results = self.fetch_time_entry_rows(f"""
             SELECT 
                 strftime('%W', date) as week_num,
                 MIN(date) as week_start,
                 COUNT(*) as entry_count,
                 SUM((strftime('%s', end_time) - strftime('%s', start_time)) / 60) as total_minutes
-            FROM time_entries
+            FROM {history_source(self.connection, 'time_entries', start_date)}
             WHERE date BETWEEN ? AND ? AND end_time IS NOT NULL
             GROUP BY week_num
             ORDER BY week_num
@@ -3734,8 +3703,6 @@ class DailyTrackerView(QWidget):
             end_date.toString("yyyy-MM-dd")
         ))
         
-        weekly_results = self.cursor.fetchall()
-        
         if not weekly_results:
             return "<p>No data available for the selected period.</p>"
             
@@ -3770,11 +3737,11 @@ class DailyTrackerView(QWidget):
             duration_str = f"{hours}h {mins}m"
             
             # Find most tracked category for this week
-            self.cursor.execute("""
+            self.cursor.execute(f"""
                 SELECT 
                     category, 
                     SUM((strftime('%s', end_time) - strftime('%s', start_time)) / 60) as cat_minutes
-                FROM time_entries
+                FROM {history_source(self.connection, 'time_entries', start_date)}
                 WHERE strftime('%W', date) = ? AND date BETWEEN ? AND ? AND end_time IS NOT NULL
                 GROUP BY category
                 ORDER BY cat_minutes DESC
@@ -3808,12 +3775,12 @@ class DailyTrackerView(QWidget):
         html = "<h2>Time by Category</h2>"
         
         # Query data grouped by category
-        self.cursor.execute("""
+        category_results = self.fetch_time_entry_rows(f"""
             SELECT 
                 category,
                 COUNT(*) as entry_count,
                 SUM((strftime('%s', end_time) - strftime('%s', start_time)) / 60) as total_minutes
-            FROM time_entries
+            FROM {history_source(self.connection, 'time_entries', start_date)}
             WHERE date BETWEEN ? AND ? AND end_time IS NOT NULL
             GROUP BY category
             ORDER BY total_minutes DESC
@@ -3822,8 +3789,6 @@ class DailyTrackerView(QWidget):
             end_date.toString("yyyy-MM-dd")
         ))
         
-        category_results = self.cursor.fetchall()
-        
         if not category_results:
             return "<p>No data available for the selected period.</p>"
             
@@ -3886,13 +3851,13 @@ class DailyTrackerView(QWidget):
         html = "<h2>Energy and Mood Patterns</h2>"
         
         # Query energy and mood data
-        self.cursor.execute("""
+        pattern_results = self.fetch_time_entry_rows(f"""
             SELECT 
                 date,
                 AVG(energy_level) as avg_energy,
                 AVG(mood_level) as avg_mood,
                 SUM((strftime('%s', end_time) - strftime('%s', start_time)) / 60) as total_minutes
-            FROM time_entries
+            FROM {history_source(self.connection, 'time_entries', start_date)}
             WHERE date BETWEEN ? AND ? AND end_time IS NOT NULL
             GROUP BY date
             ORDER BY date
@@ -3901,8 +3866,6 @@ class DailyTrackerView(QWidget):
             end_date.toString("yyyy-MM-dd")
         ))
         
-        pattern_results = self.cursor.fetchall()
-        
         if not pattern_results:
             return "<p>No data available for the selected period.</p>"
             
@@ -3999,12 +3962,12 @@ class DailyTrackerView(QWidget):
         html = "<h2>Time Distribution by Hour</h2>"
         
         # Query data grouped by hour
-        self.cursor.execute("""
+        hour_results = self.fetch_time_entry_rows(f"""
             SELECT 
                 substr(start_time, 1, 2) as hour,
                 COUNT(*) as entry_count,
                 SUM((strftime('%s', end_time) - strftime('%s', start_time)) / 60) as total_minutes
-            FROM time_entries
+            FROM {history_source(self.connection, 'time_entries', start_date)}
             WHERE date BETWEEN ? AND ? AND end_time IS NOT NULL
             GROUP BY hour
             ORDER BY hour
@@ -4013,8 +3976,6 @@ class DailyTrackerView(QWidget):
             end_date.toString("yyyy-MM-dd")
         ))
         
-        hour_results = self.cursor.fetchall()
-        
         if not hour_results:
             return "<p>No data available for the selected period.</p>"
             
@@ -4332,12 +4293,12 @@ class DailyTrackerView(QWidget):
                     writer.writerow(["Date", "Number of Entries", "Total Hours", "Total Minutes", "Categories"])
                     
                     # Query data
-                    self.cursor.execute("""
+                    self.cursor.execute(f"""
                         SELECT 
                             date, 
                             COUNT(*) as entry_count,
                             SUM((strftime('%s', end_time) - strftime('%s', start_time)) / 60) as total_minutes
-                        FROM time_entries
+                        FROM {history_source(self.connection, 'time_entries', start_date)}
                         WHERE date BETWEEN ? AND ? AND end_time IS NOT NULL
                         GROUP BY date
                         ORDER BY date
@@ -4355,9 +4316,9 @@ class DailyTrackerView(QWidget):
                         minutes = int(total_minutes) % 60
                         
                         # Get categories for this day
-                        self.cursor.execute("""
+                        self.cursor.execute(f"""
                             SELECT GROUP_CONCAT(DISTINCT category, ', ')
-                            FROM time_entries
+                            FROM {history_source(self.connection, 'time_entries', date_str)}
                             WHERE date = ?
                         """, (date_str,))
                         
@@ -4371,12 +4332,12 @@ class DailyTrackerView(QWidget):
                     writer.writerow(["Category", "Number of Entries", "Total Hours", "Total Minutes", "Percentage"])
                     
                     # Query data
-                    self.cursor.execute("""
+                    self.cursor.execute(f"""
                         SELECT 
                             category,
                             COUNT(*) as entry_count,
                             SUM((strftime('%s', end_time) - strftime('%s', start_time)) / 60) as total_minutes
-                        FROM time_entries
+                        FROM {history_source(self.connection, 'time_entries', start_date)}
                         WHERE date BETWEEN ? AND ? AND end_time IS NOT NULL
                         GROUP BY category
                         ORDER BY total_minutes DESC
@@ -4526,7 +4487,7 @@ class DailyTrackerView(QWidget):
                     categories_table.setCellWidget(i, 2, actions_widget)
                     
             except Exception as e:
-                print(f"Error loading categories: {e}")
+                logger.error(f"Error loading categories: {e}", exc_info=True)
         
         # Add category button
         add_category_layout = QHBoxLayout()
@@ -4584,7 +4545,7 @@ class DailyTrackerView(QWidget):
                     self.categories = [cat[0] for cat in categories]
                     
                 except Exception as e:
-                    print(f"Error adding category: {e}")
+                    logger.error(f"Error adding category: {e}", exc_info=True)
                     QMessageBox.critical(dialog, "Error", f"Could not add category: {e}")
         
         add_btn.clicked.connect(add_new_category)
@@ -4681,7 +4642,7 @@ class DailyTrackerView(QWidget):
                     self.load_entries(self.current_date)
                     
                 except Exception as e:
-                    print(f"Error updating category: {e}")
+                    logger.error(f"Error updating category: {e}", exc_info=True)
                     QMessageBox.critical(self, "Error", f"Could not update category: {e}")
     
     def update_trend_analysis_chart(self, start_date, end_date):
@@ -4702,20 +4663,18 @@ class DailyTrackerView(QWidget):
             
             if metric == "Daily Time":
                 # Query total time per day
-                self.cursor.execute("""
+                results = self.fetch_time_entry_rows(f"""
                     SELECT 
                         date,
                         SUM((strftime('%s', end_time) - strftime('%s', start_time)) / 60) as duration
-                    FROM time_entries
+                    FROM {history_source(self.connection, 'time_entries', start_date)}
                     WHERE date BETWEEN ? AND ? AND end_time IS NOT NULL
                     GROUP BY date
                     ORDER BY date
                 """, (
                     start_date.toString("yyyy-MM-dd"),
                     end_date.toString("yyyy-MM-dd")
-                ))
-                
-                results = self.cursor.fetchall()
+                ), stale_ok=True)
                 
                 if not results:
                     ax.text(0.5, 0.5, "No data available for selected period",
@@ -4751,20 +4710,18 @@ class DailyTrackerView(QWidget):
                 # Query daily average energy or mood
                 field = "energy_level" if metric == "Energy Level" else "mood_level"
                 
-                self.cursor.execute(f"""
+                results = self.fetch_time_entry_rows(f"""
                     SELECT 
                         date,
                         AVG({field}) as avg_level
-                    FROM time_entries
+                    FROM {history_source(self.connection, 'time_entries', start_date)}
                     WHERE date BETWEEN ? AND ? AND end_time IS NOT NULL
                     GROUP BY date
                     ORDER BY date
                 """, (
                     start_date.toString("yyyy-MM-dd"),
                     end_date.toString("yyyy-MM-dd")
-                ))
-                
-                results = self.cursor.fetchall()
+                ), stale_ok=True)
                 
                 if not results:
                     ax.text(0.5, 0.5, "No data available for selected period",
@@ -4799,21 +4756,19 @@ class DailyTrackerView(QWidget):
                 
             else:  # Category Balance
                 # Query time by category by day
-                self.cursor.execute("""
+                results = self.fetch_time_entry_rows(f"""
                     SELECT 
                         date,
                         category,
                         SUM((strftime('%s', end_time) - strftime('%s', start_time)) / 60) as duration
-                    FROM time_entries
+                    FROM {history_source(self.connection, 'time_entries', start_date)}
                     WHERE date BETWEEN ? AND ? AND end_time IS NOT NULL
                     GROUP BY date, category
                     ORDER BY date, category
                 """, (
                     start_date.toString("yyyy-MM-dd"),
                     end_date.toString("yyyy-MM-dd")
-                ))
-                
-                results = self.cursor.fetchall()
+                ), stale_ok=True)
                 
                 if not results:
                     ax.text(0.5, 0.5, "No data available for selected period",
@@ -4888,7 +4843,7 @@ class DailyTrackerView(QWidget):
             self.trend_canvas.draw()
             
         except Exception as e:
-            print(f"Error updating trend analysis chart: {e}")
+            logger.error(f"Error updating trend analysis chart: {e}", exc_info=True)
     
     def manage_attachment_categories(self):
         """Open a dialog to manage attachment categories."""
@@ -4987,7 +4942,7 @@ class DailyTrackerView(QWidget):
         
         # Load existing categories
         from app.utils.db_utils import list_attachment_categories
-        categories = list_attachment_categories()
+        categories = list_attachment_categories(self.connection)
         
         # Add default categories if empty
         if not categories:
@@ -5209,7 +5164,7 @@ class DailyTrackerView(QWidget):
             
             # Get all available categories
             from app.utils.db_utils import list_attachment_categories
-            categories = list_attachment_categories()
+            categories = list_attachment_categories(self.connection)
             
             if not categories:
                 categories = ["Journal", "Images", "Documents", "Notes", "Reference"]
@@ -5254,9 +5209,10 @@ class DailyTrackerView(QWidget):
                         # Remove old shortcut if it exists
                         if shortcut_path and os.path.exists(shortcut_path):
                             try:
-                                os.remove(shortcut_path)
+                                from app.utils.db_utils import remove_file
+                                remove_file(shortcut_path)
                             except Exception as e:
-                                print(f"Failed to remove old shortcut: {e}")
+                                logger.error(f"Failed to remove old shortcut: {e}", exc_info=True)
                         
                         # Create new shortcut with the new category
                         new_shortcut_path = None
@@ -5265,7 +5221,7 @@ class DailyTrackerView(QWidget):
                                 from app.utils.db_utils import create_category_shortcut
                                 new_shortcut_path = create_category_shortcut(file_path, new_category)
                             except Exception as e:
-                                print(f"Failed to create new shortcut: {e}")
+                                logger.error(f"Failed to create new shortcut: {e}", exc_info=True)
                         
                         # Update the database
                         self.cursor.execute(
@@ -5340,17 +5296,32 @@ class DailyTrackerView(QWidget):
         
         try:
             # Remove from database
+            content_hash = None
             if self.cursor:
+                try:
+                    self.cursor.execute("SELECT content_hash FROM journal_attachments WHERE id = ?", (file_id,))
+                    row = self.cursor.fetchone()
+                    content_hash = row[0] if row else None
+                except sqlite3.OperationalError:
+                    pass  # Attachment saved before content hashes were recorded
                 self.cursor.execute("DELETE FROM journal_attachments WHERE id = ?", (file_id,))
                 self.connection.commit()
             
             # Delete file from disk if requested
+            from app.utils.db_utils import remove_file
             if delete_file and os.path.exists(file_path):
-                os.remove(file_path)
+                remove_file(file_path)
+            
+            # Free the stored contents once no attachment refers to them
+            if content_hash and (delete_file or not os.path.islink(file_path)):
+                from app.utils.attachment_store import AttachmentStore
+                from app.utils.thumbnail_cache import get_thumbnail_cache
+                if AttachmentStore().release(self.cursor, content_hash):
+                    get_thumbnail_cache().remove(content_hash)
             
             # Delete shortcut if it exists
             if shortcut_path and os.path.exists(shortcut_path):
-                os.remove(shortcut_path)
+                remove_file(shortcut_path)
             
             # Remove from list
             row = self.attachments_list.row(item)
@@ -5361,7 +5332,7 @@ class DailyTrackerView(QWidget):
             
         except Exception as e:
             QMessageBox.warning(self, "Error", f"Could not remove attachment: {e}")
-            print(f"Error removing attachment: {e}")
+            logger.error(f"Error removing attachment: {e}", exc_info=True)
 
     def load_activities(self):
         """Load time tracking activities for the current date."""
@@ -5417,16 +5388,25 @@ class DailyTrackerView(QWidget):
             self.load_entries(self.current_date)
         
         except Exception as e:
-            print(f"Error loading activities: {e}")
+            logger.error(f"Error loading activities: {e}", exc_info=True)
 
-    def update_word_count(self):
-        """Update the word count for the free writing text area."""
-        text = self.free_writing_edit.toPlainText()
-        word_count = len(text.split()) if text.strip() else 0
-        self.word_count_label.setText(f"{word_count} words")
+    def update_word_count(self, words=None, characters=None):
+        """Update the word and character count for the free writing text area."""
+        if words is None:
+            words, characters = self.free_writing_stats.words, self.free_writing_stats.characters
+        self.word_count_label.setText(f"{words} words, {characters} characters")
 
     def journal_entry_selected(self, index):
         """Handle selection of a journal entry from the dropdown."""
+        self.flush_journal_autosave()
+        self.journal_loading = True
+        try:
+            self.show_journal_entry(index)
+        finally:
+            self.journal_loading = False
+    
+    def show_journal_entry(self, index):
+        """Fill the form with the entry at index in the dropdown."""
         if index == 0:  # New Entry
             # Clear all fields and set a new timestamp
             self.clear_journal_entry_fields()
@@ -5464,7 +5444,6 @@ class DailyTrackerView(QWidget):
                 # Set free writing text if it exists
                 if entry[7]:
                     self.free_writing_edit.setPlainText(entry[7])
-                    self.update_word_count()
                 else:
                     self.free_writing_edit.clear()
                 
@@ -5480,10 +5459,11 @@ class DailyTrackerView(QWidget):
                         self.name_edit.clear()
                 
         except Exception as e:
-            print(f"Error loading journal entry: {e}")
+            logger.error(f"Error loading journal entry: {e}", exc_info=True)
             
     def clear_journal_entry_fields(self):
         """Clear all journal entry fields."""
+        loading, self.journal_loading = self.journal_loading, True
         self.wins_edit.clear()
         self.challenges_edit.clear()
         self.learnings_edit.clear()
@@ -5494,7 +5474,7 @@ class DailyTrackerView(QWidget):
         if hasattr(self, 'name_edit'):
             self.name_edit.clear()
         self.free_writing_edit.clear()
-        self.update_word_count()
+        self.journal_loading = loading
         
         # Reset mood and rating to defaults
         if hasattr(self, 'mood_combo'):
@@ -5503,7 +5483,13 @@ class DailyTrackerView(QWidget):
             self.rating_slider.setValue(5)
 
     def has_unsaved_changes(self):
-        """Check if there are unsaved changes in the current entry."""
+        """Check if there are edits that have not been written to the database yet."""
+        if self.journal_dirty:
+            return self.has_journal_content() or bool(self.current_entry_id)
+        return self.journal_autosaver is not None and self.journal_autosaver.has_pending()
+    
+    def has_journal_content(self):
+        """Check if any journal entry field has text."""
         # If the form is empty, there are no changes
         if (not self.wins_edit.toPlainText().strip() and
             not self.challenges_edit.toPlainText().strip() and
@@ -5573,34 +5559,26 @@ class DailyTrackerView(QWidget):
                     self.entry_selector.addItem(f"Entry {entry_id[:8]}", entry_id)
             
         except Exception as e:
-            print(f"Error loading journal entries: {e}")
+            logger.error(f"Error loading journal entries: {e}", exc_info=True)
 
     def add_new_journal_entry(self):
         """Create a new journal entry."""
-        # Check if there are unsaved changes in the current entry
-        if self.has_unsaved_changes():
-            confirm = QMessageBox.question(
-                self, 
-                "Unsaved Changes", 
-                "You have unsaved changes in the current entry. Save before creating a new one?",
-                QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No | QMessageBox.StandardButton.Cancel,
-                QMessageBox.StandardButton.Yes
-            )
-            
-            if confirm == QMessageBox.StandardButton.Cancel:
-                return
-            elif confirm == QMessageBox.StandardButton.Yes:
-                self.save_journal_entry()
+        # Edits to the current entry are autosaved before it is left
+        self.flush_journal_autosave()
         
         # Clear the fields and select "New Entry" in the dropdown
         self.clear_journal_entry_fields()
         self.current_entry_id = None
+        self.entry_selector.blockSignals(True)
         self.entry_selector.setCurrentIndex(0)
+        self.entry_selector.blockSignals(False)
         self.current_entry_timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         self.entry_timestamp.setText(f"Created: {self.current_entry_timestamp}")
 
     def delete_journal_entry(self):
         """Delete the current journal entry."""
+        # A pending autosave must not bring the entry back after it is deleted
+        self.flush_journal_autosave()
         index = self.entry_selector.currentIndex()
         
         # Can't delete "New Entry"
@@ -5634,5 +5612,5 @@ class DailyTrackerView(QWidget):
                 QMessageBox.information(self, "Success", "Journal entry deleted successfully.")
                 
             except Exception as e:
-                print(f"Error deleting journal entry: {e}")
+                logger.error(f"Error deleting journal entry: {e}", exc_info=True)
                 QMessageBox.warning(self, "Error", f"Could not delete journal entry: {e}")
\ No newline at end of file
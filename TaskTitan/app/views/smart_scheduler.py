@@ -21,6 +21,9 @@ from app.views.calendar_widget import CustomCalendarWidget
 from app.views.daily_planner import DailyPlanner
 from app.views.weekly_planner import WeeklyPlanner
 from app.themes.dark_theme import get_dark_stylesheet
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
 
 class SmartScheduler(QMainWindow):
     """Main application window for the TaskTitan Smart Scheduler."""
@@ -57,7 +60,7 @@ class SmartScheduler(QMainWindow):
             self.future_week_color = colors.get("future_week_color", "#FFFFFF")
             self.weekly_planner_color = colors.get("weekly_planner_color", "#FFFFFF")
         except Exception as e:
-            print(f"Error loading colors: {e}")
+            logger.error(f"Error loading colors: {e}", exc_info=True)
             # Use default colors
 
     def save_colors(self):
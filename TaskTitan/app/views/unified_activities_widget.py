@@ -19,6 +19,9 @@ from app.resources import get_icon
 from app.models.activities_manager import ActivitiesManager
 from app.models.template_manager import TemplateManager
 from app.views.todo_item_dialog import TodoItemDialog
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
 
 class ActivityItemWidget(QWidget):
     """A unified widget for displaying activities (events, tasks, habits)."""
@@ -933,7 +936,7 @@ class ActivityAddEditDialog(QDialog):
             self.todo_items = list(todo_items)  # Store as list of tuples
             self.refreshTodoList()
         except Exception as e:
-            print(f"Error loading todo items: {e}")
+            logger.error(f"Error loading todo items: {e}", exc_info=True)
     
     def refreshTodoList(self):
         """Refresh the todo list display."""
@@ -1529,7 +1532,7 @@ class ActivityDetailsDialog(QDialog):
                     break
                     
         except Exception as e:
-            print(f"Error marking activity complete: {e}")
+            logger.error(f"Error marking activity complete: {e}", exc_info=True)
             # At least close the dialog even if operation failed
             self.close()
     
@@ -1555,7 +1558,7 @@ class ActivityDetailsDialog(QDialog):
                     break
                     
         except Exception as e:
-            print(f"Error editing activity: {e}")
+            logger.error(f"Error editing activity: {e}", exc_info=True)
             # At least close the dialog even if operation failed
             self.close()
     
@@ -1587,7 +1590,7 @@ class ActivityDetailsDialog(QDialog):
                     break
                     
         except Exception as e:
-            print(f"Error deleting activity: {e}")
+            logger.error(f"Error deleting activity: {e}", exc_info=True)
             # At least close the dialog even if operation failed
             self.close()
 
@@ -1616,7 +1619,7 @@ class UnifiedActivitiesWidget(QWidget):
             # Ensure tables exist
             self.activities_manager.create_tables()
         except Exception as e:
-            print(f"UnifiedActivitiesWidget init error: {e}")
+            logger.error(f"UnifiedActivitiesWidget init error: {e}", exc_info=True)
         self.parent = parent  # Store parent to access database
         
         # Initialize activities manager
@@ -1978,7 +1981,7 @@ class UnifiedActivitiesWidget(QWidget):
             # Refresh the activities list - this will use get_activities_for_date for proper completion status
             self.refreshActivitiesList()
         except Exception as e:
-            print(f"Error loading activities: {e}")
+            logger.error(f"Error loading activities: {e}", exc_info=True)
 
     # ---------- Template integration ----------
     def _reload_templates_into_combo(self):
@@ -2020,7 +2023,7 @@ class UnifiedActivitiesWidget(QWidget):
                 except Exception:
                     pass
         except Exception as e:
-            print(f"Failed to apply template: {e}")
+            logger.error(f"Failed to apply template: {e}", exc_info=True)
 
     def _save_current_habits_as_template(self):
         if not getattr(self, 'template_manager', None):
@@ -2037,7 +2040,7 @@ class UnifiedActivitiesWidget(QWidget):
             if idx >= 0:
                 self.template_combo.setCurrentIndex(idx)
         except Exception as e:
-            print(f"Failed to save template: {e}")
+            logger.error(f"Failed to save template: {e}", exc_info=True)
     
     def refresh(self):
         """Refresh the activities list."""
@@ -2400,7 +2403,7 @@ class UnifiedActivitiesWidget(QWidget):
                     self.activityAdded.emit(activity_id, activity_data['type'])
                     
         except Exception as e:
-            print(f"Error adding activity: {e}")
+            logger.error(f"Error adding activity: {e}", exc_info=True)
     
     def updateActivity(self, activity_id, activity_type, updated_data):
         """Update an existing activity in the database and list."""
@@ -2433,7 +2436,7 @@ class UnifiedActivitiesWidget(QWidget):
                     self.activityUpdated.emit(activity_id, activity_type)
                             
         except Exception as e:
-            print(f"Error updating activity: {e}")
+            logger.error(f"Error updating activity: {e}", exc_info=True)
     
     def deleteActivity(self, activity_id, activity_type):
         """Delete an activity from the database and list."""
@@ -2466,12 +2469,12 @@ class UnifiedActivitiesWidget(QWidget):
                         try:
                             parent.dashboard_calendar.sync_with_activities(parent.activities_manager)
                         except Exception as e:
-                            print(f"Error syncing calendar after event deletion: {e}")
+                            logger.error(f"Error syncing calendar after event deletion: {e}", exc_info=True)
                 
                 # Emit the signal
                 self.activityDeleted.emit(activity_id, activity_type)
         except Exception as e:
-            print(f"Error deleting activity: {e}")
+            logger.error(f"Error deleting activity: {e}", exc_info=True)
             # At least close the dialog even if operation failed
             self.close()
     
@@ -2501,7 +2504,7 @@ class UnifiedActivitiesWidget(QWidget):
                     try:
                         self.activities_manager.conn.commit()
                     except Exception as e:
-                        print(f"Error committing completion change: {e}")
+                        logger.error(f"Error committing completion change: {e}", exc_info=True)
                 
                 if success:
                     # Update our local data
@@ -2594,7 +2597,7 @@ class UnifiedActivitiesWidget(QWidget):
         try:
             date_activities = self.activities_manager.get_activities_for_date(self.current_date)
         except Exception as e:
-            print(f"Error getting activities for date: {e}")
+            logger.error(f"Error getting activities for date: {e}", exc_info=True)
             date_activities = []
         
         # Filter activities by type (get_activities_for_date already filtered by date)
@@ -2775,7 +2778,7 @@ class UnifiedActivitiesWidget(QWidget):
             self.activity_widgets[widget_key] = widget
             
         except Exception as e:
-            print(f"Error adding activity widget: {e}")
+            logger.error(f"Error adding activity widget: {e}", exc_info=True)
 
     def showActivityDetails(self, activity_data):
         """Show activity details dialog when an activity is clicked."""
@@ -2783,7 +2786,7 @@ class UnifiedActivitiesWidget(QWidget):
             dialog = ActivityDetailsDialog(activity_data, self)
             dialog.show()
         except Exception as e:
-            print(f"Error showing activity details: {e}")
+            logger.error(f"Error showing activity details: {e}", exc_info=True)
     
     def saveChanges(self):
         """Save any pending changes to the database."""
@@ -2791,9 +2794,9 @@ class UnifiedActivitiesWidget(QWidget):
             try:
                 # Ensure all changes are committed
                 self.activities_manager.conn.commit()
-                print("Activities saved successfully")
+                logger.info("Activities saved successfully")
             except Exception as e:
-                print(f"Error saving activities: {e}")
+                logger.error(f"Error saving activities: {e}", exc_info=True)
                 
     def closeEvent(self, event):
         """Handle the widget close event."""
@@ -2808,7 +2811,7 @@ class UnifiedActivitiesWidget(QWidget):
             try:
                 parent.dashboard_calendar.sync_with_activities(parent.activities_manager)
             except Exception as e:
-                print(f"Error syncing with calendar: {e}")
+                logger.error(f"Error syncing with calendar: {e}", exc_info=True)
                 
     def showAddActivityDialog(self, activity_type=None):
         """Show the dialog to add a new activity."""
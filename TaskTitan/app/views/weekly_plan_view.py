@@ -16,6 +16,9 @@ import random
 from app.resources import get_icon
 from app.models.activities_manager import ActivitiesManager
 from .daily_plan_view import DailyPlanView
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
 
 
 class ActivityDetailsDialog(QDialog):
@@ -59,7 +62,7 @@ class ActivityDetailsDialog(QDialog):
                 if db_activity:
                     self.activity['completed'] = db_activity.get('completed', self.activity.get('completed', False))
         except Exception as e:
-            print(f"Error updating completion status: {e}")
+            logger.error(f"Error updating completion status: {e}", exc_info=True)
             # Continue anyway
             pass
     
@@ -295,7 +298,7 @@ class ActivityDetailsDialog(QDialog):
                     return
                 
         except Exception as e:
-            print(f"Error marking activity complete: {e}")
+            logger.error(f"Error marking activity complete: {e}", exc_info=True)
             # At least close the dialog even if operation failed
             self.close()
     
@@ -355,7 +358,7 @@ class ActivityDetailsDialog(QDialog):
                     break
                     
         except Exception as e:
-            print(f"Error editing activity: {e}")
+            logger.error(f"Error editing activity: {e}", exc_info=True)
             # At least close the dialog even if operation failed
             self.close()
     
@@ -399,7 +402,7 @@ class ActivityDetailsDialog(QDialog):
                     break
                     
         except Exception as e:
-            print(f"Error deleting activity: {e}")
+            logger.error(f"Error deleting activity: {e}", exc_info=True)
             # At least close the dialog even if operation failed
             self.close()
 
@@ -431,14 +434,14 @@ class WeeklyPlanView(QWidget):
         
         # Get activities manager from parent or create new one
         if hasattr(parent, 'activities_manager'):
-            print("Using parent's activities_manager")
+            logger.debug("Using parent's activities_manager")
             self.activities_manager = parent.activities_manager
         else:
-            print("Creating new ActivitiesManager instance")
+            logger.debug("Creating new ActivitiesManager instance")
             # Create our own manager if needed
             self.activities_manager = ActivitiesManager()
             if hasattr(parent, 'conn') and hasattr(parent, 'cursor'):
-                print("Setting connection from parent")
+                logger.debug("Setting connection from parent")
                 self.activities_manager.set_connection(parent.conn, parent.cursor)
         
         # Set up the UI
@@ -668,10 +671,10 @@ class WeeklyPlanView(QWidget):
         
         # Check if we have an activities manager
         if not hasattr(self, 'activities_manager') or not self.activities_manager:
-            print("ERROR: Activities manager not available")
+            logger.error("Activities manager not available")
             return
         
-        print(f"Loading activities for week starting {self.current_week_start.toString()}")
+        logger.debug(f"Loading activities for week starting {self.current_week_start.toString()}")
         
         # Loop through each day of the week
         for day in range(7):
@@ -688,19 +691,19 @@ class WeeklyPlanView(QWidget):
                 db_activity = self.activities_manager.get_activity_by_id(activity_id)
                 if db_activity and 'completed' in db_activity:
                     activity['completed'] = db_activity.get('completed', False)
-                    print(f"Activity {activity_id} completion status: {activity['completed']}")
+                    logger.debug(f"Activity {activity_id} completion status: {activity['completed']}")
                 
                 activity['day_index'] = day
                 self.activities.append(activity)
         
-        print(f"Loaded {len(self.activities)} activities")
+        logger.debug(f"Loaded {len(self.activities)} activities")
         
         # Update the view
         self.updateWeekView()
     
     def updateWeekView(self):
         """Update the weekly view with current activities."""
-        print("Updating week view...")
+        logger.debug("Updating week view...")
         
         # Clear current scene
         self.scene.clear()
@@ -731,7 +734,7 @@ class WeeklyPlanView(QWidget):
             combined_rect = scene_rect.united(items_rect)
             self.view.setSceneRect(combined_rect.adjusted(-20, -20, 20, 20))
             
-        print("Week view updated")
+        logger.debug("Week view updated")
     
     def drawWeekGrid(self):
         """Draw the weekly grid with day columns and hour rows."""
@@ -1193,7 +1196,7 @@ class WeeklyPlanView(QWidget):
                     }
                     
                 except Exception as e:
-                    print(f"Error adding activity to grid: {e}")
+                    logger.error(f"Error adding activity to grid: {e}", exc_info=True)
         
         # Set scene event handler
         self.scene.mousePressEvent = self.handleSceneClick
@@ -1224,7 +1227,7 @@ class WeeklyPlanView(QWidget):
                             activity = self.activity_items[activity_id]['activity']
                             # Toggle completion state
                             is_completed = not bool(activity.get('completed', False))
-                            print(f"Alt+click detected: Toggling activity {activity_id} completion to {is_completed}")
+                            logger.debug(f"Alt+click detected: Toggling activity {activity_id} completion to {is_completed}")
                             self.toggleActivityCompletion(activity_id, is_completed, activity_type)
                         event.accept()
                         return
@@ -1238,7 +1241,7 @@ class WeeklyPlanView(QWidget):
             event.accept()
             
         except Exception as e:
-            print(f"Error handling scene click: {e}")
+            logger.error(f"Error handling scene click: {e}", exc_info=True)
             import traceback
             traceback.print_exc()
             event.accept()
@@ -1306,7 +1309,7 @@ class WeeklyPlanView(QWidget):
                     elif action == complete_action:
                         # Toggle the completion status
                         new_status = not is_completed
-                        print(f"Toggling completion from menu: {activity_id} to {new_status}")
+                        logger.debug(f"Toggling completion from menu: {activity_id} to {new_status}")
                         self.toggleActivityCompletion(activity_id, new_status, activity_type)
                     elif action == edit_action:
                         self.editActivity(activity_id, activity_type)
@@ -1321,7 +1324,7 @@ class WeeklyPlanView(QWidget):
             event.accept()
                 
         except Exception as e:
-            print(f"Error showing context menu: {e}")
+            logger.error(f"Error showing context menu: {e}", exc_info=True)
             import traceback
             traceback.print_exc()
             event.accept()
@@ -1329,7 +1332,7 @@ class WeeklyPlanView(QWidget):
     def showActivityDetails(self, activity_id, activity_type):
         """Show activity details in a dialog."""
         if activity_id not in self.activity_items:
-            print(f"Activity {activity_id} not found")
+            logger.warning(f"Activity {activity_id} not found")
             return
             
         activity = self.activity_items[activity_id]['activity']
@@ -1338,18 +1341,18 @@ class WeeklyPlanView(QWidget):
             dialog = ActivityDetailsDialog(activity, self)
             dialog.exec()
         except Exception as e:
-            print(f"Error showing activity details: {e}")
+            logger.error(f"Error showing activity details: {e}", exc_info=True)
             import traceback
             traceback.print_exc()
 
     def toggleActivityCompletion(self, activity_id, is_completed, activity_type):
         """Toggle the completion status of an activity."""
         try:
-            print(f"Weekly Plan View: Toggling activity {activity_id} ({activity_type}) completion to {is_completed}")
+            logger.debug(f"Weekly Plan View: Toggling activity {activity_id} ({activity_type}) completion to {is_completed}")
             
             # Find the activity
             if activity_id not in self.activity_items:
-                print(f"Activity {activity_id} not found in activity_items")
+                logger.warning(f"Activity {activity_id} not found in activity_items")
                 return
                 
             activity_item = self.activity_items[activity_id]
@@ -1367,11 +1370,11 @@ class WeeklyPlanView(QWidget):
                 activity_date = self.current_week_start.addDays(day_index)
             
             if not activity_date:
-                print("ERROR: Could not determine activity date - database update will fail")
+                logger.error("Could not determine activity date - database update will fail")
                 return
                 
             # Always emit our own signal for other components to listen to
-            print(f"Emitting activityCompletionChanged signal: {activity_id}, {is_completed}, {activity_type}")
+            logger.debug(f"Emitting activityCompletionChanged signal: {activity_id}, {is_completed}, {activity_type}")
             self.activityCompletionChanged.emit(activity_id, is_completed, activity_type)
             
             # DIRECT DATABASE UPDATE - most reliable method
@@ -1381,15 +1384,15 @@ class WeeklyPlanView(QWidget):
             # Priority 1: direct access
             if hasattr(self, 'activities_manager') and self.activities_manager:
                 activities_manager = self.activities_manager
-                print(f"Using self.activities_manager")
+                logger.debug("Using self.activities_manager")
             # Priority 2: parent's activities_manager
             elif hasattr(self, 'parent') and self.parent and hasattr(self.parent, 'activities_manager'):
                 activities_manager = self.parent.activities_manager
-                print(f"Using parent.activities_manager")
+                logger.debug("Using parent.activities_manager")
             
             # Now use the activities_manager we found
             if activities_manager:
-                print(f"Calling toggle_activity_completion with date={activity_date.toString()}")
+                logger.debug(f"Calling toggle_activity_completion with date={activity_date.toString()}")
                 # Use the correct method signature with date parameter
                 success = activities_manager.toggle_activity_completion(
                     activity_id,
@@ -1398,11 +1401,11 @@ class WeeklyPlanView(QWidget):
                 )
                 
                 if success:
-                    print(f"Database update successful")
+                    logger.debug("Database update successful")
                 else:
-                    print(f"Database update failed")
+                    logger.warning("Database update failed")
             else:
-                print("ERROR: No activities_manager found - cannot update database")
+                logger.error("No activities_manager found - cannot update database")
                 
             # Update the visuals for this activity
             self.updateActivityVisuals(activity_id, is_completed)
@@ -1412,32 +1415,32 @@ class WeeklyPlanView(QWidget):
             
             # If parent has onActivityCompleted handler, call it
             if hasattr(self, 'parent') and self.parent and hasattr(self.parent, 'onActivityCompleted'):
-                print(f"Calling parent.onActivityCompleted")
+                logger.debug("Calling parent.onActivityCompleted")
                 self.parent.onActivityCompleted(activity_id, is_completed, activity_type)
             
             # If this is in the parent, update parent's activities view
             if hasattr(self, 'parent') and self.parent:
                 if hasattr(self.parent, 'activities_view') and self.parent.activities_view:
-                    print(f"Refreshing parent's activities view")
+                    logger.debug("Refreshing parent's activities view")
                     self.parent.activities_view.refresh()
             
             # If activities view exists directly, refresh it
             if hasattr(self, 'activities_view') and self.activities_view:
-                print(f"Refreshing self.activities_view")
+                logger.debug("Refreshing self.activities_view")
                 self.activities_view.refresh()
                 
         except Exception as e:
-            print(f"Error toggling activity completion: {e}")
+            logger.error(f"Error toggling activity completion: {e}", exc_info=True)
             import traceback
             traceback.print_exc()
 
     def updateActivityVisuals(self, activity_id, is_completed):
         """Update the visual appearance of an activity without refreshing the whole view."""
         try:
-            print(f"Updating visuals for activity {activity_id}, completed={is_completed}")
+            logger.debug(f"Updating visuals for activity {activity_id}, completed={is_completed}")
             
             if activity_id not in self.activity_items:
-                print(f"Activity {activity_id} not found in activity_items")
+                logger.warning(f"Activity {activity_id} not found in activity_items")
                 return
                 
             activity_item = self.activity_items[activity_id]
@@ -1484,7 +1487,7 @@ class WeeklyPlanView(QWidget):
             activity_rect.setPen(QPen(color.darker(), 1))
             
             # Remove any existing completion indicators
-            print("Removing old completion indicators")
+            logger.debug("Removing old completion indicators")
             for item in self.scene.items():
                 try:
                     # Remove green bar indicators
@@ -1494,13 +1497,13 @@ class WeeklyPlanView(QWidget):
                         abs(item.pos().y() - y_pos) < 10 and     # Close to the top of the activity
                         item.zValue() >= 2):                    # Completion indicators have high Z values
                         self.scene.removeItem(item)
-                        print(f"Removed an indicator item at z={item.zValue()}")
+                        logger.debug(f"Removed an indicator item at z={item.zValue()}")
                 except Exception as e:
-                    print(f"Error checking item: {e}")
+                    logger.error(f"Error checking item: {e}", exc_info=True)
             
             # Add new completion indicators if completed
             if is_completed:
-                print("Adding new completion indicator")
+                logger.debug("Adding new completion indicator")
                 
                 # Add the green bar on the left
                 complete_path = QPainterPath()
@@ -1514,70 +1517,70 @@ class WeeklyPlanView(QWidget):
             
             # Force a scene update for this area
             self.scene.update(rect.adjusted(-20, -20, 20, 20))
-            print("Scene updated")
+            logger.debug("Scene updated")
                 
         except Exception as e:
-            print(f"Error updating activity visuals: {e}")
+            logger.error(f"Error updating activity visuals: {e}", exc_info=True)
             import traceback
             traceback.print_exc()
 
     def connectParentSignals(self):
         """Connect signals from the parent to this view."""
         try:
-            print("Connecting parent signals...")
+            logger.debug("Connecting parent signals...")
             
             # Check if parent exists
             if not hasattr(self, 'parent') or not self.parent:
-                print("No parent found to connect signals")
+                logger.debug("No parent found to connect signals")
                 return
                 
             # Connect to standard activity signals if parent has them
             if hasattr(self.parent, 'activityCompleted') and hasattr(self.parent.activityCompleted, 'connect'):
-                print("Connected to parent.activityCompleted signal")
+                logger.debug("Connected to parent.activityCompleted signal")
                 self.parent.activityCompleted.connect(self.onActivityCompletedFromParent)
             
             # Connect to unified activities widget signals if available
             if hasattr(self.parent, 'activities_view'):
                 activity_view = self.parent.activities_view
                 if hasattr(activity_view, 'activityCompleted') and hasattr(activity_view.activityCompleted, 'connect'):
-                    print("Connected to activities_view.activityCompleted signal")
+                    logger.debug("Connected to activities_view.activityCompleted signal")
                     activity_view.activityCompleted.connect(self.onActivityCompletedFromParent)
                     
             # Connect our signals to parent and activities view for two-way synchronization
             # First to parent
             if hasattr(self.parent, 'onActivityCompleted'):
-                print("Connected activityCompletionChanged to parent.onActivityCompleted")
+                logger.debug("Connected activityCompletionChanged to parent.onActivityCompleted")
                 self.activityCompletionChanged.connect(self.parent.onActivityCompleted)
                 
             # Then to activities view
             if hasattr(self.parent, 'activities_view'):
                 activity_view = self.parent.activities_view
                 if hasattr(activity_view, 'onActivityCompletedFromOtherView'):
-                    print("Connected activityCompletionChanged to activities_view.onActivityCompletedFromOtherView")
+                    logger.debug("Connected activityCompletionChanged to activities_view.onActivityCompletedFromOtherView")
                     self.activityCompletionChanged.connect(activity_view.onActivityCompletedFromOtherView)
                     
         except Exception as e:
-            print(f"Error connecting parent signals: {e}")
+            logger.error(f"Error connecting parent signals: {e}", exc_info=True)
             import traceback
             traceback.print_exc()
 
     def onActivityCompletedFromParent(self, activity_id, completed, activity_type):
         """Handle activity completion signals from parent."""
         try:
-            print(f"Received activity completion update from parent: {activity_id}, {completed}, {activity_type}")
+            logger.debug(f"Received activity completion update from parent: {activity_id}, {completed}, {activity_type}")
             
             # Update our activity state
             for activity in self.activities:
                 if activity.get('id') == activity_id:
                     activity['completed'] = completed
-                    print(f"Updated local activity status to {completed}")
+                    logger.debug(f"Updated local activity status to {completed}")
                     break
             
             # Update the activity visualization
             self.updateActivityVisuals(activity_id, completed)
                 
         except Exception as e:
-            print(f"Error handling activity completion from parent: {e}")
+            logger.error(f"Error handling activity completion from parent: {e}", exc_info=True)
             import traceback
             traceback.print_exc()
             # If there's an error, refresh the whole view to ensure sync
@@ -0,0 +1,103 @@
+"""
+Benchmarks for the single-query goal progress API.
+
+Builds deep and wide synthetic goal trees and compares fetch_goal_progress
+against the previous per-goal subgoal queries. Run with ``-s`` to see timings.
+"""
+
+import sqlite3
+import time
+
+import pytest
+
+from app.models.goal_index import GoalIndex
+from app.models.goal_progress import fetch_goal_progress
+
+
+def make_goals_db(parent_ids):
+    """Create an in-memory goals table; parent_ids[i] is the parent of goal i + 1."""
+    conn = sqlite3.connect(':memory:')
+    cursor = conn.cursor()
+    cursor.execute("""
+        CREATE TABLE goals (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            parent_id INTEGER,
+            title TEXT NOT NULL,
+            created_date DATE,
+            due_date DATE,
+            due_time TIME,
+            completed INTEGER DEFAULT 0,
+            priority INTEGER DEFAULT 1,
+            color TEXT
+        )
+    """)
+    cursor.executemany(
+        "INSERT INTO goals (id, parent_id, title, created_date, due_date, completed) VALUES (?, ?, ?, ?, ?, ?)",
+        [
+            (goal_id, parent_id, f"Goal {goal_id}", '2024-01-01', '2024-12-31', goal_id % 3 == 0)
+            for goal_id, parent_id in enumerate(parent_ids, start=1)
+        ]
+    )
+    conn.commit()
+    return conn, cursor
+
+
+def deep_tree(depth):
+    """A single chain of goals, each one the parent of the next."""
+    return [None] + list(range(1, depth))
+
+
+def wide_tree(fanout, levels):
+    """A complete tree with the given fan-out."""
+    parent_ids = [None]
+    level_start, level_size = 1, 1
+    for _ in range(levels):
+        for parent_id in range(level_start, level_start + level_size):
+            parent_ids.extend([parent_id] * fanout)
+        level_start += level_size
+        level_size *= fanout
+    return parent_ids
+
+
+def per_goal_queries(cursor):
+    """The previous approach: one subgoal query per goal."""
+    cursor.execute("SELECT id FROM goals")
+    for (goal_id,) in cursor.fetchall():
+        cursor.execute("SELECT id, completed FROM goals WHERE parent_id = ?", (goal_id,))
+        cursor.fetchall()
+
+
+@pytest.mark.slow
+@pytest.mark.parametrize("name, parent_ids", [
+    ("deep", deep_tree(400)),
+    ("wide", wide_tree(10, 3)),
+    ("mixed", wide_tree(4, 5) + [None] + list(range(1366, 1465))),
+])
+def test_goal_progress_benchmark(name, parent_ids):
+    """fetch_goal_progress uses one statement and matches the in-memory index."""
+    conn, cursor = make_goals_db(parent_ids)
+
+    statements = []
+    conn.set_trace_callback(statements.append)
+    start = time.perf_counter()
+    goals = fetch_goal_progress(cursor)
+    single_query = time.perf_counter() - start
+    conn.set_trace_callback(None)
+
+    start = time.perf_counter()
+    per_goal_queries(cursor)
+    n_plus_one = time.perf_counter() - start
+
+    print(f"\n{name}: {len(goals)} goals, single query {single_query * 1000:.1f} ms, "
+          f"per-goal queries {n_plus_one * 1000:.1f} ms")
+
+    assert len(statements) == 1
+    assert len(goals) == len(parent_ids)
+
+    index = GoalIndex(goals)
+    for goal in goals:
+        assert index.subtree_counts(goal['id']) == (goal['subtree_completed'], goal['subtree_total'])
+        if not goal['completed']:
+            assert index.progress(goal['id']) == (goal['progress'] if goal['direct_total'] else 0)
+
+    conn.close()
@@ -0,0 +1,62 @@
+"""
+Import-time budget for application startup.
+
+Imports app.main in a fresh interpreter with ``-X importtime`` and checks
+that heavy libraries are left to the pages and features that use them. The
+wall-clock check that the whole import stays within IMPORT_BUDGET_MS
+(override with the TASKTITAN_IMPORT_BUDGET_MS environment variable on slow
+machines) is marked slow. Run with ``-s`` to see the slowest imports.
+"""
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+import app
+
+APP_ROOT = Path(app.__file__).resolve().parent.parent
+
+# Imported on first use: charts, the password hasher and secure config
+DEFERRED_MODULES = ('matplotlib', 'numpy', 'pyqtgraph', 'cryptography', 'bcrypt')
+
+IMPORT_BUDGET_MS = float(os.environ.get('TASKTITAN_IMPORT_BUDGET_MS', 1000))
+
+
+def import_times(module):
+    """Import a module in a new interpreter; return cumulative import time in µs by module name."""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=APP_ROOT, env={**os.environ, 'QT_QPA_PLATFORM': 'offscreen'},
+        capture_output=True, text=True, timeout=120
+    )
+    assert result.returncode == 0, result.stderr[-2000:]
+
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line.split(':', 1)[1].split('|')
+        times.setdefault(name.strip(), int(cumulative))
+    return times
+
+
+def test_startup_defers_heavy_imports():
+    """app.main imports without the deferred libraries."""
+    times = import_times('app.main')
+    assert [name for name in DEFERRED_MODULES if name in times] == []
+
+
+@pytest.mark.slow
+def test_startup_import_budget():
+    """app.main imports within budget."""
+    times = import_times('app.main')
+    total_ms = times['app.main'] / 1000
+    slowest = sorted(times.items(), key=lambda item: item[1], reverse=True)[:10]
+    print(f"\nimport app.main: {total_ms:.0f} ms")
+    for name, micros in slowest:
+        print(f"  {micros / 1000:8.1f} ms  {name}")
+
+    assert total_ms < IMPORT_BUDGET_MS
@@ -0,0 +1,88 @@
+"""
+Benchmark for the set-based database merge.
+
+Merges two databases holding a million activities each, with every id
+colliding, and checks that renamed goal references stay intact. Run with
+``-s`` to see timings.
+"""
+
+import os
+import sqlite3
+import time
+
+import pytest
+
+from app.utils.db_operations import DatabaseOperations
+
+GOALS = 100_000
+ACTIVITIES = 1_000_000
+
+
+def make_db(path, label):
+    """Create a database with GOALS goals and ACTIVITIES activities spread over them."""
+    conn = sqlite3.connect(path)
+    conn.execute("""
+        CREATE TABLE goals (id INTEGER PRIMARY KEY AUTOINCREMENT, parent_id INTEGER,
+                            title TEXT NOT NULL, completed INTEGER DEFAULT 0)
+    """)
+    conn.execute("""
+        CREATE TABLE activities (id INTEGER PRIMARY KEY AUTOINCREMENT, title TEXT NOT NULL,
+                                 date DATE, type TEXT NOT NULL DEFAULT 'task', goal_id INTEGER)
+    """)
+    conn.execute("""
+        CREATE TABLE todo_items (id INTEGER PRIMARY KEY AUTOINCREMENT, activity_id INTEGER,
+                                 text TEXT NOT NULL, completed INTEGER DEFAULT 0)
+    """)
+    conn.execute(
+        "WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n WHERE i < ?) "
+        "INSERT INTO goals (id, parent_id, title) SELECT i, CASE WHEN i > 1 THEN i / 2 END, ? || i FROM n",
+        (GOALS, label)
+    )
+    conn.execute(
+        "WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n WHERE i < ?) "
+        "INSERT INTO activities (id, title, date, goal_id) "
+        "SELECT i, ? || i, '2024-01-01', (i % ?) + 1 FROM n",
+        (ACTIVITIES, label, GOALS)
+    )
+    conn.execute(
+        "INSERT INTO todo_items (activity_id, text) SELECT id, 'todo' FROM activities WHERE id % 10 = 0"
+    )
+    conn.commit()
+    conn.close()
+
+
+@pytest.mark.slow
+def test_merge_benchmark(temp_dir):
+    """A million-row merge with renamed ids finishes quickly and keeps references."""
+    source_path = os.path.join(temp_dir, 'source.db')
+    dest_path = os.path.join(temp_dir, 'dest.db')
+    make_db(source_path, 'source ')
+    make_db(dest_path, 'dest ')
+
+    start = time.perf_counter()
+    success, error, stats = DatabaseOperations.merge_databases(source_path, dest_path, 'rename')
+    elapsed = time.perf_counter() - start
+    print(f"\nmerged {ACTIVITIES} activities and {GOALS} goals in {elapsed:.2f} s")
+
+    assert success is True, error
+    assert stats['activities_renamed'] == ACTIVITIES
+    assert stats['goals_renamed'] == GOALS
+
+    conn = sqlite3.connect(dest_path)
+    cursor = conn.cursor()
+    # Every source row points at a source goal or activity, never a destination one
+    cursor.execute("""
+        SELECT COUNT(*) FROM activities a JOIN goals g ON g.id = a.goal_id
+        WHERE substr(a.title, 1, 4) != substr(g.title, 1, 4)
+    """)
+    assert cursor.fetchone()[0] == 0
+    cursor.execute("""
+        SELECT COUNT(*) FROM goals c JOIN goals p ON p.id = c.parent_id
+        WHERE substr(c.title, 1, 4) != substr(p.title, 1, 4)
+    """)
+    assert cursor.fetchone()[0] == 0
+    cursor.execute("SELECT COUNT(*) FROM todo_items t LEFT JOIN activities a ON a.id = t.activity_id WHERE a.id IS NULL")
+    assert cursor.fetchone()[0] == 0
+    cursor.execute("SELECT COUNT(*) FROM todo_items")
+    assert cursor.fetchone()[0] == 2 * (ACTIVITIES // 10)
+    conn.close()
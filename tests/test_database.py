@@ -2,6 +2,7 @@
 Unit tests for database operations.
 """
 
+import os
 import pytest
 import sqlite3
 from datetime import datetime
@@ -80,6 +81,34 @@ class TestDatabaseManager:
         incomplete = db_manager.count_items("test_count", completed=False)
         assert incomplete == 2
 
+    
+    def test_count_items_follows_writes_from_other_connections(self, db_manager):
+        """Test that cached counts are recomputed after any connection writes the table."""
+        db_manager.execute("CREATE TABLE IF NOT EXISTS test_versions (id INTEGER PRIMARY KEY, completed INTEGER DEFAULT 0)")
+        db_manager.execute("INSERT INTO test_versions (completed) VALUES (0)")
+        db_manager.commit()
+        assert db_manager.count_items("test_versions") == 1
+        
+        # Unchanged tables are answered from the cache
+        queries = []
+        db_manager.conn.set_trace_callback(queries.append)
+        assert db_manager.count_items("test_versions") == 1
+        assert not any("COUNT(*)" in query for query in queries)
+        db_manager.conn.set_trace_callback(None)
+        
+        db_path = next(row[2] for row in db_manager.conn.execute("PRAGMA database_list") if row[1] == 'main')
+        other = sqlite3.connect(db_path)
+        other.execute("INSERT INTO test_versions (completed) VALUES (1)")
+        other.commit()
+        other.close()
+        assert db_manager.count_items("test_versions") == 2
+        assert db_manager.count_items("test_versions", completed=True) == 1
+        
+        db_manager.execute("DELETE FROM test_versions WHERE completed = 1")
+        db_manager.commit()
+        assert db_manager.count_items("test_versions") == 1
+        assert db_manager.count_items("test_versions", completed=True) == 0
+
 
 class TestActivitiesManager:
     """Test cases for ActivitiesManager."""
@@ -149,6 +178,35 @@ class TestActivitiesManager:
         assert len(activities) > 0
         assert any(a[1] == sample_activity_data['title'] for a in activities)
 
+    def test_get_activities_in_range(self, temp_db, sample_activity_data):
+        """Test retrieving activities for a date range filtered by type."""
+        conn, cursor = temp_db
+        manager = ActivitiesManager(conn, cursor)
+        manager.create_tables()
+
+        for date, activity_type in [('2024-01-31', 'event'), ('2024-02-10', 'event'),
+                                    ('2024-02-11', 'task'), ('2024-03-01', 'event')]:
+            manager.add_activity(dict(sample_activity_data, date=date, type=activity_type))
+
+        events = manager.get_activities_in_range('2024-02-01', '2024-02-29', 'event')
+        assert [e['date'].toString('yyyy-MM-dd') for e in events] == ['2024-02-10']
+
+        everything = manager.get_activities_in_range('2024-01-01', '2024-03-31')
+        assert len(everything) == 4
+
+        cursor.execute(
+            "EXPLAIN QUERY PLAN SELECT id FROM activities "
+            "WHERE date BETWEEN '2024-02-01' AND '2024-02-29' AND type = 'event'"
+        )
+        assert any('idx_activities_type_date' in row[-1] for row in cursor.fetchall())
+
+        # The month loader asks for every type
+        cursor.execute(
+            "EXPLAIN QUERY PLAN SELECT id FROM activities "
+            "WHERE date BETWEEN '2024-02-01' AND '2024-02-29'"
+        )
+        assert any('idx_activities_date' in row[-1] for row in cursor.fetchall())
+
 
 class TestDatabaseInitialization:
     """Test cases for database initialization."""
@@ -175,3 +233,99 @@ class TestDatabaseInitialization:
         assert 'title' in column_names
         assert 'due_date' in column_names
 
+
+
+class TestMergeDatabases:
+    """Test cases for the set-based database merge."""
+    
+    @staticmethod
+    def make_db(path, goals, activities):
+        """Create a database with goals (id, parent_id, title) and activities (id, goal_id, title)."""
+        conn = sqlite3.connect(path)
+        conn.execute("""
+            CREATE TABLE goals (id INTEGER PRIMARY KEY AUTOINCREMENT, parent_id INTEGER,
+                                title TEXT NOT NULL, completed INTEGER DEFAULT 0)
+        """)
+        conn.execute("""
+            CREATE TABLE activities (id INTEGER PRIMARY KEY AUTOINCREMENT, title TEXT NOT NULL,
+                                     type TEXT NOT NULL DEFAULT 'task', goal_id INTEGER)
+        """)
+        conn.execute("""
+            CREATE TABLE activity_completions (activity_id INTEGER NOT NULL, completion_date DATE NOT NULL,
+                                               PRIMARY KEY (activity_id, completion_date))
+        """)
+        conn.execute("CREATE TABLE journal_entries (id TEXT PRIMARY KEY, date TEXT UNIQUE, wins TEXT)")
+        conn.executemany("INSERT INTO goals (id, parent_id, title) VALUES (?, ?, ?)", goals)
+        # Column order differs from the other database on purpose
+        conn.executemany("INSERT INTO activities (id, goal_id, title) VALUES (?, ?, ?)", activities)
+        conn.commit()
+        conn.close()
+    
+    def make_pair(self, temp_dir):
+        dest_path = os.path.join(temp_dir, 'dest.db')
+        source_path = os.path.join(temp_dir, 'source.db')
+        self.make_db(dest_path, [(1, None, 'Dest root')], [(1, 1, 'Dest activity')])
+        self.make_db(source_path,
+                     [(1, None, 'Source root'), (2, 1, 'Source child')],
+                     [(1, 2, 'Source activity'), (2, 1, 'Other activity')])
+        conn = sqlite3.connect(source_path)
+        conn.execute("INSERT INTO activity_completions VALUES (1, '2024-01-01')")
+        conn.execute("INSERT INTO journal_entries VALUES ('uuid-1', '2024-01-01', 'source')")
+        conn.commit()
+        conn.close()
+        conn = sqlite3.connect(dest_path)
+        conn.execute("INSERT INTO journal_entries VALUES ('uuid-2', '2024-01-01', 'dest')")
+        conn.commit()
+        conn.close()
+        return source_path, dest_path
+    
+    def test_merge_rename_remaps_references(self, temp_dir):
+        """Test that renamed ids are applied to every reference."""
+        from app.utils.db_operations import DatabaseOperations
+        source_path, dest_path = self.make_pair(temp_dir)
+        
+        success, error, stats = DatabaseOperations.merge_databases(source_path, dest_path, 'rename')
+        assert success is True, error
+        assert stats['goals_renamed'] == 1 and stats['goals_added'] == 2
+        assert stats['activities_renamed'] == 1
+        
+        conn = sqlite3.connect(dest_path)
+        cursor = conn.cursor()
+        cursor.execute("SELECT id FROM goals WHERE title = 'Source root'")
+        source_root = cursor.fetchone()[0]
+        assert source_root != 1
+        cursor.execute("SELECT parent_id FROM goals WHERE title = 'Source child'")
+        assert cursor.fetchone()[0] == source_root
+        cursor.execute("SELECT goal_id FROM activities WHERE title = 'Other activity'")
+        assert cursor.fetchone()[0] == source_root
+        cursor.execute("SELECT a.title FROM activity_completions c JOIN activities a ON a.id = c.activity_id")
+        assert cursor.fetchall() == [('Source activity',)]
+        # One journal entry per day: the destination's entry is kept
+        cursor.execute("SELECT wins FROM journal_entries")
+        assert cursor.fetchall() == [('dest',)]
+        conn.close()
+    
+    def test_merge_skip_and_replace(self, temp_dir):
+        """Test the skip and replace conflict strategies."""
+        from app.utils.db_operations import DatabaseOperations
+        source_path, dest_path = self.make_pair(temp_dir)
+        
+        success, error, stats = DatabaseOperations.merge_databases(source_path, dest_path, 'skip')
+        assert success is True, error
+        assert stats['goals_skipped'] == 1 and stats['goals_added'] == 1
+        assert stats['activities_skipped'] == 1 and stats['activities_added'] == 1
+        conn = sqlite3.connect(dest_path)
+        assert conn.execute("SELECT title FROM goals WHERE id = 1").fetchone()[0] == 'Dest root'
+        conn.close()
+        
+        success, error, stats = DatabaseOperations.merge_databases(source_path, dest_path, 'replace')
+        assert success is True, error
+        assert stats['goals_replaced'] == 2
+        conn = sqlite3.connect(dest_path)
+        assert conn.execute("SELECT title FROM goals WHERE id = 1").fetchone()[0] == 'Source root'
+        assert conn.execute("SELECT COUNT(*) FROM goals").fetchone()[0] == 2
+        assert conn.execute("SELECT wins FROM journal_entries").fetchall() == [('source',)]
+        conn.close()
+        
+        success, error, _ = DatabaseOperations.merge_databases(source_path, dest_path, 'bogus')
+        assert success is False
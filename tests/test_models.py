@@ -2,10 +2,13 @@
 Unit tests for model classes.
 """
 
+import os
 import pytest
-from datetime import datetime
+from datetime import date, datetime
 from app.models.database_manager import DatabaseManager, get_manager
 from app.models.activities_manager import ActivitiesManager
+from app.models.goal_index import GoalIndex
+from app.models.goal_progress import fetch_goal_progress
 
 
 class TestDatabaseManagerSingleton:
@@ -86,3 +89,316 @@ class TestActivitiesManagerMethods:
         result = cursor.fetchone()
         assert result is None
 
+
+
+class TestGoalIndex:
+    """Test GoalIndex lookups and incremental progress."""
+    
+    @staticmethod
+    def make_goals():
+        return [
+            {'id': 1, 'parent_id': None, 'title': 'Root', 'completed': False},
+            {'id': 2, 'parent_id': 1, 'title': 'A', 'completed': False},
+            {'id': 3, 'parent_id': 1, 'title': 'B', 'completed': True},
+            {'id': 4, 'parent_id': 2, 'title': 'A1', 'completed': False},
+            {'id': 5, 'parent_id': 2, 'title': 'A2', 'completed': False},
+        ]
+    
+    def test_lookup(self):
+        """Test id and parent/child lookups."""
+        index = GoalIndex(self.make_goals())
+        
+        assert len(index) == 5
+        assert index.get(4)['title'] == 'A1'
+        assert [g['id'] for g in index.roots()] == [1]
+        assert [g['id'] for g in index.children(1)] == [2, 3]
+        assert [g['id'] for g in index.ancestors(5)] == [2, 1]
+        assert index.descendant_ids(1) == [2, 4, 5, 3]
+    
+    def test_progress_propagation(self):
+        """Test that completion changes update cached counts up the tree."""
+        index = GoalIndex(self.make_goals())
+        
+        assert index.progress(1) == 50
+        assert index.progress(2) == 0
+        assert index.subtree_counts(1) == (1, 4)
+        
+        assert index.set_completed(4, True) == [4, 2, 1]
+        assert index.progress(2) == 50
+        assert index.subtree_counts(1) == (2, 4)
+        assert index.set_completed(4, True) == []
+        
+        index.set_completed(5, True)
+        index.set_completed(2, True)
+        assert index.progress(1) == 100
+        assert index.subtree_counts(1) == (4, 4)
+    
+    def test_add_move_remove(self):
+        """Test structural changes keep the counts consistent."""
+        goals = self.make_goals()
+        index = GoalIndex(goals)
+        
+        index.add({'id': 6, 'parent_id': 3, 'title': 'B1', 'completed': True})
+        assert index.subtree_counts(1) == (2, 5)
+        
+        index.move(6, 4)
+        assert index.get(6)['parent_id'] == 4
+        assert index.progress(4) == 100
+        assert index.subtree_counts(2) == (1, 3)
+        with pytest.raises(ValueError):
+            index.move(2, 6)
+        
+        assert index.remove(2) == [2, 4, 6, 5]
+        assert index.subtree_counts(1) == (1, 1)
+        assert 4 not in index
+        
+        # A rebuild from scratch agrees with the incremental counts
+        remaining = [g for g in goals if g['id'] in index]
+        assert GoalIndex(remaining).subtree_counts(1) == index.subtree_counts(1)
+
+
+class TestGoalProgress:
+    """Test the single-query goal progress API."""
+    
+    def test_fetch_goal_progress(self, temp_db):
+        """Test direct, transitive and time-based progress."""
+        conn, cursor = temp_db
+        cursor.execute("DELETE FROM goals")
+        rows = [
+            (1, None, 'Root', '2024-01-01', '2024-01-11', 0),
+            (2, 1, 'A', '2024-01-01', '2024-01-11', 0),
+            (3, 1, 'B', '2024-01-01', '2024-01-11', 1),
+            (4, 2, 'A1', '2024-01-01', '2024-01-11', 1),
+            (5, 2, 'A2', None, '2024-01-15', 0),
+        ]
+        cursor.executemany(
+            "INSERT INTO goals (id, parent_id, title, created_date, due_date, completed) VALUES (?, ?, ?, ?, ?, ?)",
+            rows
+        )
+        conn.commit()
+        
+        statements = []
+        conn.set_trace_callback(statements.append)
+        goals = {g['id']: g for g in fetch_goal_progress(cursor, today=date(2024, 1, 6))}
+        conn.set_trace_callback(None)
+        
+        assert len(statements) == 1
+        assert (goals[1]['direct_completed'], goals[1]['direct_total']) == (1, 2)
+        assert (goals[1]['subtree_completed'], goals[1]['subtree_total']) == (2, 4)
+        assert goals[1]['progress'] == 50
+        assert goals[3]['progress'] == 100
+        assert goals[4]['subtree_ratio'] is None
+        # No subgoals: progress follows elapsed time (5 of 10 days)
+        assert goals[1]['time_progress'] == 50
+        # Missing created date defaults to two weeks before the due date
+        assert goals[5]['progress'] == 35
+        
+        index = GoalIndex(goals.values())
+        for goal_id in goals:
+            assert index.subtree_counts(goal_id) == (
+                goals[goal_id]['subtree_completed'], goals[goal_id]['subtree_total']
+            )
+
+    
+    def test_goal_progress_served_from_result_cache(self, temp_db, temp_dir):
+        """Test warm starts from the disk tier and background revalidation after writes."""
+        import sqlite3
+        from PyQt6.QtCore import Qt
+        from app.models.result_cache import ResultCache
+        from app.utils.cache import CacheManager
+        from app.utils.disk_cache import DiskCache
+        conn, cursor = temp_db
+        cursor.execute("DELETE FROM goals")
+        cursor.execute("INSERT INTO goals (id, title, due_date, completed) VALUES (1, 'Root', '2024-01-11', 0)")
+        conn.commit()
+        disk = DiskCache(os.path.join(temp_dir, 'results.db'))
+        
+        first = ResultCache(conn, disk_cache=disk)
+        assert [g['id'] for g in fetch_goal_progress(cursor, date(2024, 1, 6), result_cache=first)] == [1]
+        
+        # A new session starts with an empty memory tier but the same disk tier
+        CacheManager.get_instance().clear()
+        statements = []
+        conn.set_trace_callback(statements.append)
+        warm = ResultCache(conn, disk_cache=disk)
+        assert [g['id'] for g in fetch_goal_progress(cursor, date(2024, 1, 6), result_cache=warm)] == [1]
+        conn.set_trace_callback(None)
+        assert not any('WITH RECURSIVE' in statement for statement in statements)
+        
+        db_path = next(row[2] for row in conn.execute("PRAGMA database_list") if row[1] == 'main')
+        other = sqlite3.connect(db_path)
+        other.execute("INSERT INTO goals (id, title, due_date, completed) VALUES (2, 'Next', '2024-01-12', 0)")
+        other.commit()
+        other.close()
+        
+        refreshed = []
+        warm.result_refreshed.connect(refreshed.append, Qt.ConnectionType.DirectConnection)
+        stale = fetch_goal_progress(cursor, date(2024, 1, 6), result_cache=warm, stale_ok=True)
+        assert [g['id'] for g in stale] == [1]
+        warm.wait(10)
+        assert len(refreshed) == 1
+        assert [g['id'] for g in fetch_goal_progress(cursor, date(2024, 1, 6), result_cache=warm)] == [1, 2]
+        disk.close()
+    
+    def test_result_cache_tells_databases_apart(self, temp_dir):
+        """Test that a new database at the same path does not get the old one's results."""
+        import sqlite3
+        from app.models.result_cache import ResultCache
+        from app.models.table_versions import ensure_version_triggers
+        from app.utils.disk_cache import DiskCache
+        db_path = os.path.join(temp_dir, 'tasktitan.db')
+        disk = DiskCache(os.path.join(temp_dir, 'results.db'))
+        
+        for title in ('first', 'second'):
+            if os.path.exists(db_path):
+                os.remove(db_path)
+            conn = sqlite3.connect(db_path)
+            conn.execute("CREATE TABLE goals (id INTEGER PRIMARY KEY, title TEXT)")
+            ensure_version_triggers(conn)
+            # Same writes, so the same table versions as the database before
+            conn.execute("INSERT INTO goals (title) VALUES (?)", (title,))
+            conn.commit()
+            cache = ResultCache(conn, disk_cache=disk)
+            assert cache.fetch_rows("SELECT title FROM goals", tables=['goals']) == [(title,)]
+            conn.close()
+        disk.close()
+
+
+class TestGoalTreeModel:
+    """Test the goal tree model and its filter proxy."""
+    
+    def test_filter_keeps_ancestors(self):
+        """Test that recursive filtering shows matches with their parents."""
+        from app.views.goal_tree_model import GoalTreeModel, GoalFilterProxyModel
+        
+        index = GoalIndex(TestGoalIndex.make_goals())
+        model = GoalTreeModel(index)
+        proxy = GoalFilterProxyModel()
+        proxy.setSourceModel(model)
+        
+        assert model.rowCount() == 1
+        assert model.index(0, GoalTreeModel.PROGRESS_COLUMN).data() == "50%"
+        assert model.parent(model.indexForGoal(4)) == model.indexForGoal(2)
+        
+        proxy.setFilters("a2")
+        root = proxy.index(0, 0)
+        assert root.data(GoalTreeModel.GoalIdRole) == 1
+        assert proxy.rowCount(root) == 1
+        assert proxy.rowCount(proxy.index(0, 0, root)) == 1
+        
+        proxy.setFilters(completion_filter=True)
+        assert proxy.rowCount() == 1
+        assert proxy.rowCount(proxy.index(0, 0)) == 1
+        
+        proxy.setFilters()
+        assert proxy.rowCount(proxy.index(0, 0)) == 2
+
+
+class TestArchive:
+    """Test cases for hot/cold history archival."""
+    
+    @staticmethod
+    def make_db(temp_dir):
+        import os
+        import sqlite3
+        db_path = os.path.join(temp_dir, 'tasktitan.db')
+        conn = sqlite3.connect(db_path)
+        conn.executescript("""
+            CREATE TABLE activities (id INTEGER PRIMARY KEY AUTOINCREMENT, title TEXT NOT NULL,
+                date DATE NOT NULL, start_time TIME, end_time TIME, completed INTEGER DEFAULT 0,
+                type TEXT NOT NULL, priority INTEGER DEFAULT 1, category TEXT, days_of_week TEXT,
+                goal_id INTEGER, created_at TIMESTAMP, color TEXT);
+            CREATE TABLE activity_completions (activity_id INTEGER NOT NULL, completion_date DATE NOT NULL,
+                PRIMARY KEY (activity_id, completion_date));
+            CREATE TABLE todo_items (id INTEGER PRIMARY KEY AUTOINCREMENT, activity_id INTEGER,
+                text TEXT NOT NULL, completed INTEGER DEFAULT 0);
+            CREATE TABLE time_entries (id TEXT PRIMARY KEY, date TEXT, start_time TEXT, end_time TEXT,
+                category TEXT);
+            INSERT INTO activities (id, title, date, start_time, end_time, type) VALUES
+                (1, 'Old task', '2020-03-01', '09:00', '10:00', 'task'),
+                (2, 'Old habit', '2020-03-01', '07:00', '07:30', 'habit'),
+                (3, 'New task', '2030-01-01', '09:00', '10:00', 'task');
+            INSERT INTO activity_completions VALUES (1, '2020-03-01'), (2, '2020-03-01'), (2, '2030-01-01');
+            INSERT INTO todo_items (activity_id, text) VALUES (1, 'old todo'), (3, 'new todo');
+            INSERT INTO time_entries VALUES ('a', '2020-03-01', '09:00', '10:00', 'Work'),
+                                            ('b', '2030-01-01', '09:00', '10:00', 'Work');
+        """)
+        conn.commit()
+        return db_path, conn
+    
+    def test_archive_moves_old_history(self, temp_dir):
+        """Test that old rows move to the archive and stay readable."""
+        from app.models.archive import ArchiveManager, history_source
+        db_path, conn = self.make_db(temp_dir)
+        
+        counts = ArchiveManager(db_path).archive_before('2025-01-01', batch_size=1)
+        assert counts == {'activities': 1, 'activity_completions': 2, 'time_entries': 1}
+        
+        # Only the habit keeps its old row in the hot database
+        assert conn.execute("SELECT id FROM activities ORDER BY id").fetchall() == [(2,), (3,)]
+        assert conn.execute("SELECT text FROM todo_items").fetchall() == [('new todo',)]
+        assert conn.execute("SELECT COUNT(*) FROM time_entries").fetchone()[0] == 1
+        
+        # Recent ranges read the main table; older ranges attach the archive
+        assert history_source(conn, 'time_entries', '2026-01-01') == 'time_entries'
+        source = history_source(conn, 'time_entries', '2020-01-01')
+        assert conn.execute(f"SELECT id FROM {source} ORDER BY id").fetchall() == [('a',), ('b',)]
+        assert conn.execute(
+            f"SELECT text FROM {history_source(conn, 'todo_items')}"
+        ).fetchall() == [('new todo',), ('old todo',)]
+        
+        manager = ActivitiesManager(conn, conn.cursor())
+        titles = [a['title'] for a in manager.get_activities_in_range('2020-01-01', '2030-12-31')]
+        assert titles == ['Old habit', 'Old task', 'New task']
+        from PyQt6.QtCore import QDate
+        old_day = {a['title']: a['completed'] for a in manager.get_activities_for_date(QDate(2020, 3, 1))}
+        assert old_day == {'Old task': 1, 'Old habit': 1}
+        conn.close()
+    
+    def test_archive_stops_between_batches(self, temp_dir):
+        """Test that a stopped run leaves every row readable."""
+        from app.models.archive import ArchiveManager, history_source
+        db_path, conn = self.make_db(temp_dir)
+        archive = ArchiveManager(db_path)
+        
+        batches = []
+        counts = archive.archive_before('2025-01-01', batch_size=1,
+                                        should_stop=lambda: batches.append(1) or len(batches) > 1)
+        assert counts == {'activities': 1}
+        assert archive.archived_before() == '2025-01-01'
+        source = history_source(conn, 'activity_completions', '2020-01-01')
+        assert conn.execute(f"SELECT COUNT(*) FROM {source}").fetchone()[0] == 3
+        
+        archive.archive_before('2025-01-01')
+        assert conn.execute("SELECT COUNT(*) FROM activity_completions").fetchone()[0] == 1
+        conn.close()
+    
+    def test_writes_reach_archived_activities(self, temp_dir):
+        """Test that changing an archived activity moves it back first."""
+        from app.models.archive import ArchiveManager, history_source
+        db_path, conn = self.make_db(temp_dir)
+        ArchiveManager(db_path).archive_before('2025-01-01')
+        conn.execute("PRAGMA foreign_keys = ON")
+        manager = ActivitiesManager(conn, conn.cursor())
+        
+        assert manager.get_activity_by_id(1)['title'] == 'Old task'
+        assert [item[1] for item in manager.get_todo_items(1)] == ['old todo']
+        
+        assert manager.update_activity(1, {'title': 'Edited task'})
+        assert conn.execute("SELECT title FROM activities WHERE id = 1").fetchone() == ('Edited task',)
+        assert conn.execute("SELECT COUNT(*) FROM archive.activities").fetchone()[0] == 0
+        assert conn.execute("SELECT COUNT(*) FROM archive.todo_items").fetchone()[0] == 0
+        titles = [a['title'] for a in manager.get_activities_in_range('2020-01-01', '2020-12-31')]
+        assert titles == ['Old habit', 'Edited task']
+        
+        # The habit stays hot; only the toggled completion comes back
+        assert manager.toggle_activity_completion(2, False, '2020-03-01')
+        source = history_source(conn, 'activity_completions')
+        assert conn.execute(f"SELECT * FROM {source} WHERE activity_id = 2").fetchall() == [(2, '2030-01-01')]
+        
+        item_id = manager.get_todo_items(1)[0][0]
+        manager.update_todo_item(item_id, 'done todo', 1)
+        assert manager.get_todo_item(item_id) == (item_id, 'done todo', 1)
+        assert manager.delete_activity(1)
+        assert manager.get_activity_by_id(1) is None
+        conn.close()
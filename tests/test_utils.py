@@ -4,6 +4,7 @@ Unit tests for utility functions.
 
 import pytest
 import os
+import logging
 import tempfile
 from app.utils.validators import (
     validate_text,
@@ -230,3 +231,1098 @@ class TestConfigManager:
         width = get_config('window.width')
         assert width == 1600
 
+
+@pytest.fixture
+def isolated_config(tmp_path, monkeypatch):
+    """A configuration manager of its own, writing to a temporary file."""
+    import app.core.config as config_module
+    monkeypatch.setattr(ConfigManager, '_initialized', False)
+    monkeypatch.setattr(ConfigManager, '_get_config_path', lambda self: tmp_path / 'config.json')
+    monkeypatch.setattr(config_module, 'SAVE_DELAY', 0.05)
+    manager = ConfigManager()
+    # get_config() and set_config() use it too
+    monkeypatch.setattr(ConfigManager, '_instance', manager)
+    yield manager
+    manager.flush()
+
+
+class TestConfigWriteBehind:
+    """Test cases for debounced configuration writes."""
+    
+    @pytest.fixture
+    def manager(self, isolated_config):
+        return isolated_config
+    
+    def _read(self, manager):
+        import json
+        with open(manager.config_file, encoding='utf-8') as f:
+            return json.load(f)
+    
+    def test_changes_are_coalesced(self, manager, monkeypatch):
+        """Test that a burst of changes is written once."""
+        import time
+        writes = []
+        original_replace = os.replace
+        monkeypatch.setattr(os, 'replace', lambda src, dst: (writes.append(dst), original_replace(src, dst)))
+        
+        for width in range(1000, 1010):
+            manager.set('window.width', width)
+        manager.update_section('window', {'height': 700})
+        assert self._read(manager)['window']['width'] == 1200
+        
+        time.sleep(0.3)
+        assert len(writes) == 1
+        assert self._read(manager)['window'] == {**manager.get('window'), 'width': 1009, 'height': 700}
+    
+    def test_flush_writes_atomically(self, manager):
+        """Test that flush writes pending changes without leaving a temporary file."""
+        manager.set('updates.last_check', '2024-01-01')
+        manager.flush()
+        
+        assert self._read(manager)['updates']['last_check'] == '2024-01-01'
+        assert [p.name for p in manager.config_file.parent.iterdir()] == ['config.json']
+    
+    def test_concurrent_flushes(self, manager):
+        """Test that flushes from several threads leave the latest values and no temporary files."""
+        import threading
+        
+        def writer(worker):
+            for i in range(20):
+                manager.set(f'plugins.worker{worker}', i, save=False)
+                manager._save_config()
+        
+        threads = [threading.Thread(target=writer, args=(worker,)) for worker in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        assert self._read(manager)['plugins'] == {f'worker{worker}': 19 for worker in range(4)}
+        assert [p.name for p in manager.config_file.parent.iterdir()] == ['config.json']
+    
+    def test_one_saver_thread_per_burst(self, manager):
+        """Test that a burst of changes is written by a single saver thread."""
+        import threading
+        for width in range(1000, 1050):
+            manager.set('window.width', width)
+        savers = [t for t in threading.enumerate() if t.name == 'TaskTitanConfigSave']
+        assert len(savers) == 1
+        savers[0].join(timeout=5)
+        assert not savers[0].is_alive()
+        assert self._read(manager)['window']['width'] == 1049
+    
+    def test_get_uses_dot_paths(self, manager):
+        """Test lookups of values, sections and missing keys."""
+        assert manager.get('window.width') == 1200
+        assert manager.get('window')['width'] == 1200
+        assert manager.get('window.missing', 'fallback') == 'fallback'
+        assert manager.get('window.width.deeper') is None
+        
+        manager.set('plugins.example.enabled', True, save=False)
+        assert manager.get('plugins.example.enabled') is True
+        assert manager.get('plugins.example') == {'enabled': True}
+        
+        manager.config = {'window': {'width': 800}}
+        assert manager.get('window.width') == 800
+    
+    def test_returned_sections_are_copies(self, manager):
+        """Test that changing a returned section does not change the configuration."""
+        window = manager.get('window')
+        window['width'] = 1
+        manager.get_section('window')['height'] = 1
+        assert manager.get('window.width') == 1200
+        assert manager.get('window')['height'] == manager.get('window.height') != 1
+        
+        manager.update_section('window', {'width': 900}, save=False)
+        assert manager.get('window.width') == 900
+
+
+class TestSecureConfig:
+    """Test cases for encrypted configuration values."""
+    
+    @pytest.fixture
+    def manager(self, isolated_config, monkeypatch):
+        """Manager whose key identity is controlled by the test, counting derivations."""
+        manager = isolated_config
+        manager.identity = 'alice'
+        manager.derivations = 0
+        manager.lookups = 0
+        original = ConfigManager._get_encryption_key
+        
+        def counting_key(self, identity=None):
+            self.derivations += 1
+            return original(self, identity)
+        
+        def counting_identity(self):
+            self.lookups += 1
+            return self.identity
+        
+        monkeypatch.setattr(ConfigManager, '_get_key_identity', counting_identity)
+        monkeypatch.setattr(ConfigManager, '_get_encryption_key', counting_key)
+        return manager
+    
+    def test_key_derived_once_per_identity(self, manager):
+        """Test that repeated secure reads and writes reuse the derived key."""
+        manager.set_secure('ai.openai_api_key', 'sk-one', save=False)
+        manager.set_secure('ai.anthropic_api_key', 'sk-two', save=False)
+        assert manager.get('ai.openai_api_key').startswith('ENC:')
+        assert manager.get_secure('ai.openai_api_key') == 'sk-one'
+        assert manager.get_secure('ai.anthropic_api_key') == 'sk-two'
+        assert manager.derivations == 1
+        # The identity found for the cache is the one the key is derived from
+        assert manager.lookups == 1
+        
+        # Logging in as someone else derives their key
+        manager.identity = 'bob'
+        manager.invalidate_encryption_key()
+        assert manager.get_secure('ai.openai_api_key', 'unreadable') == 'unreadable'
+        assert manager.derivations == 2
+    
+    def test_secure_many(self, manager):
+        """Test batch encryption and decryption of a section."""
+        assert manager.set_secure_many({
+            'ai.openai_api_key': 'sk-one',
+            'ai.anthropic_api_key': 'sk-two',
+        }, save=False) is True
+        
+        assert manager.get_secure_many(['ai.openai_api_key', 'ai.anthropic_api_key', 'ai.missing']) == {
+            'ai.openai_api_key': 'sk-one',
+            'ai.anthropic_api_key': 'sk-two',
+            'ai.missing': None,
+        }
+        section = manager.get_secure_many('ai')
+        assert section['ai.openai_api_key'] == 'sk-one'
+        assert section['ai.provider'] == 'openai'
+        assert manager.derivations == 1
+
+
+
+class TestBackupManager:
+    """Test cases for database backups."""
+    
+    @pytest.fixture(autouse=True)
+    def config(self, isolated_config):
+        # Backups read their settings from a configuration of their own
+        return isolated_config
+    
+    def make_manager(self, temp_dir):
+        import sqlite3
+        from app.utils.backup_manager import BackupManager
+        
+        backups_dir = os.path.join(temp_dir, 'backups')
+        os.makedirs(backups_dir)
+        manager = BackupManager(db_path=os.path.join(temp_dir, 'live.db'), backups_dir=backups_dir)
+        
+        # Live database in WAL mode with data that is not checkpointed yet
+        conn = sqlite3.connect(manager.db_path)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA wal_autocheckpoint=0")
+        conn.execute("CREATE TABLE goals (id INTEGER PRIMARY KEY, title TEXT)")
+        conn.executemany("INSERT INTO goals (title) VALUES (?)", [(f"goal {i}",) for i in range(500)])
+        conn.commit()
+        return manager, conn
+    
+    def test_create_backup_includes_wal_pages(self, temp_dir):
+        """Test that a backup of a live WAL database is complete."""
+        import sqlite3
+        manager, conn = self.make_manager(temp_dir)
+        progress = []
+        manager.backup_progress.connect(lambda done, total: progress.append((done, total)))
+        
+        success, backup_path = manager.create_backup("test_backup")
+        conn.close()
+        
+        assert success is True
+        assert progress and progress[-1][0] == progress[-1][1]
+        assert not os.path.exists(backup_path + ".partial")
+        backup = sqlite3.connect(backup_path)
+        assert backup.execute("SELECT COUNT(*) FROM goals").fetchone()[0] == 500
+        backup.close()
+    
+    def test_create_backup_async(self, temp_dir):
+        """Test that backups can run on a worker thread."""
+        manager, conn = self.make_manager(temp_dir)
+        
+        assert manager.create_backup_async("async_backup") is True
+        assert manager.wait_for_backup(timeout=30) is True
+        conn.close()
+        
+        assert os.path.exists(os.path.join(manager.backups_dir, "async_backup.db"))
+
+    
+    def test_one_backup_at_a_time(self, temp_dir):
+        """Test that a backup is refused while another one is being created."""
+        from app.utils import backup_manager
+        manager, conn = self.make_manager(temp_dir)
+        conn.close()
+        
+        with backup_manager._backup_lock:
+            assert manager.is_backup_running() is True
+            assert manager.create_backup("blocked") == (False, "Backup already in progress")
+            assert manager.create_backup_async("blocked") is False
+        assert not os.path.exists(os.path.join(manager.backups_dir, "blocked.db"))
+        assert manager.create_backup("allowed")[0] is True
+    
+    @pytest.mark.parametrize('backup_format', ['file', 'chunked'])
+    def test_backups_include_history_archive(self, temp_dir, isolated_config, backup_format):
+        """Test that backups carry the history archive and restores never duplicate or lose rows."""
+        import sqlite3
+        from app.models.archive import ArchiveManager
+        isolated_config.set('backup.backup_format', backup_format, save=False)
+        manager, conn = self.make_manager(temp_dir)
+        conn.execute("CREATE TABLE activities (id INTEGER PRIMARY KEY, title TEXT, date TEXT, type TEXT)")
+        conn.executemany("INSERT INTO activities (title, date, type) VALUES (?, ?, 'task')",
+                         [(f"a{i}", f"20{20 + i % 5}-06-01") for i in range(100)])
+        conn.commit()
+        conn.close()
+        archive = ArchiveManager(manager.db_path)
+        
+        def counts():
+            main = sqlite3.connect(manager.db_path)
+            hot = main.execute("SELECT COUNT(*) FROM activities").fetchone()[0]
+            main.close()
+            cold = 0
+            if os.path.exists(archive.archive_path):
+                cold_conn = sqlite3.connect(archive.archive_path)
+                tables = [row[0] for row in cold_conn.execute("SELECT name FROM sqlite_master")]
+                if 'activities' in tables:
+                    cold = cold_conn.execute("SELECT COUNT(*) FROM activities").fetchone()[0]
+                cold_conn.close()
+            return hot, cold
+        
+        success, before_archiving = manager.create_backup("before_archiving")
+        assert success is True
+        archive.archive_before('2022-01-01')
+        assert counts() == (60, 40)
+        success, archived_once = manager.create_backup("archived_once")
+        assert success is True
+        
+        archive.archive_before('2024-01-01')
+        assert counts() == (20, 80)
+        assert manager.restore_backup(archived_once) == (True, None)
+        assert counts() == (60, 40)
+        
+        # All history is in the older backup's database: the archive is emptied
+        assert manager.restore_backup(before_archiving) == (True, None)
+        assert counts() == (100, 0)
+        assert archive.archived_before() is None
+    
+    def test_list_backups_uses_catalog(self, temp_dir, monkeypatch):
+        """Test that listing reads the catalog and re-verification is explicit."""
+        import shutil
+        manager, conn = self.make_manager(temp_dir)
+        success, backup_path = manager.create_backup("catalog_backup")
+        conn.close()
+        assert success is True
+        
+        # A backup copied in by hand is picked up without being opened
+        copied_path = os.path.join(manager.backups_dir, "copied_backup.db")
+        shutil.copy(backup_path, copied_path)
+        verify_calls = []
+        monkeypatch.setattr(manager, '_verify_backup', lambda path: verify_calls.append(path) or True)
+        monkeypatch.setattr(manager, 'verify_backups_async', lambda paths=None: False)
+        backups = dict(manager.list_backups())
+        assert verify_calls == []
+        assert backups[backup_path]['verified'] is True
+        assert backups[backup_path]['sha256']
+        assert backups[copied_path]['verified'] is None
+        monkeypatch.undo()
+        
+        # The catalog survives a new manager instance
+        assert os.path.exists(manager.get_catalog().catalog_path)
+        manager._catalog = None
+        assert manager.verify_backups([copied_path]) == (1, 0)
+        assert dict(manager.list_backups())[copied_path]['verified'] is True
+        
+        # Corruption is only noticed by the explicit verification job
+        with open(backup_path, 'r+b') as f:
+            f.seek(0)
+            f.write(b"garbage")
+        assert dict(manager.list_backups())[backup_path]['verified'] is True
+        assert manager.verify_backups_async() is True
+        assert manager.wait_for_verification(timeout=30) is True
+        backups = dict(manager.list_backups())
+        assert backups[backup_path]['verified'] is False
+        assert backups[copied_path]['verified'] is True
+        
+        os.remove(copied_path)
+        assert copied_path not in dict(manager.list_backups())
+    
+    def test_maintenance_verifies_backups(self, temp_dir):
+        """Test that idle maintenance re-verifies backups with one catalog write."""
+        from app.utils.maintenance import MaintenanceScheduler
+        manager, conn = self.make_manager(temp_dir)
+        paths = [manager.create_backup(f"backup_{i}")[1] for i in range(3)]
+        conn.close()
+        with open(paths[0], 'r+b') as f:
+            f.write(b"garbage")
+        
+        catalog = manager.get_catalog()
+        original_save = catalog.save
+        saves = []
+        catalog.save = lambda: saves.append(1) or original_save()
+        
+        scheduler = MaintenanceScheduler(manager.db_path, backup_manager=manager)
+        scheduler.idle_timer.stop()
+        records = scheduler.run_maintenance(['verify_backups'])
+        assert records[0]['status'] == 'done'
+        assert records[0]['detail'] == "3 backups verified, 1 failed"
+        assert [catalog.get(path)['verified'] for path in paths] == [False, True, True]
+        
+        saves.clear()
+        assert manager.verify_backups() == (3, 1)
+        assert len(saves) == 1
+        
+        # A stopped check records nothing
+        verified_at = catalog.get(paths[1])['verified_at']
+        assert manager.verify_backup(paths[1], should_stop=lambda: True) is None
+        assert catalog.get(paths[1])['verified_at'] == verified_at
+        manager.get_backup_store().add_backup(paths[1], 'chunked')
+        store_path = manager.get_backup_store().manifest_path('chunked')
+        assert manager.get_backup_store().verify_backup(store_path, should_stop=lambda: True) is None
+
+
+class TestBackupStore:
+    """Test cases for the deduplicating backup store."""
+    
+    def test_dedup_restore_and_gc(self, temp_dir):
+        """Test that unchanged chunks are shared and backups restore intact."""
+        import sqlite3
+        from datetime import datetime, timedelta
+        from app.utils.backup_store import BackupStore
+        
+        db_path = os.path.join(temp_dir, 'data.db')
+        conn = sqlite3.connect(db_path)
+        conn.execute("CREATE TABLE goals (id INTEGER PRIMARY KEY, title TEXT)")
+        conn.executemany("INSERT INTO goals (title) VALUES (?)", [("x" * 200,) for _ in range(3000)])
+        conn.commit()
+        
+        store = BackupStore(os.path.join(temp_dir, 'store'))
+        first = store.add_backup(db_path, 'first')
+        assert first['new_chunks'] == len(set(first['chunks']))
+        
+        # A small change only adds the chunks it touched
+        conn.execute("UPDATE goals SET title = 'changed' WHERE id = 3000")
+        conn.commit()
+        conn.close()
+        second = store.add_backup(db_path, 'second')
+        assert 0 < second['new_chunks'] <= 2
+        assert second['new_chunks'] < len(second['chunks'])
+        
+        restored_path = os.path.join(temp_dir, 'restored.db')
+        success, error = store.restore_backup('second', restored_path)
+        assert success is True, error
+        restored = sqlite3.connect(restored_path)
+        assert restored.execute("SELECT title FROM goals WHERE id = 3000").fetchone()[0] == 'changed'
+        restored.close()
+        
+        # Pruning the first backup frees only the chunks it alone referenced
+        store.remove_backup('first')
+        removed, _ = store.collect_garbage()
+        assert removed == len(set(first['chunks']) - set(second['chunks']))
+        assert store.prune(datetime.now() + timedelta(days=1)) == 1
+        assert store.list_manifests() == []
+    
+    def test_concurrent_atomic_writes(self, temp_dir, monkeypatch):
+        """Test that writers of the same file do not collide and sync before renaming."""
+        import threading
+        from app.utils.backup_store import BackupStore
+        synced = []
+        original_fsync = os.fsync
+        monkeypatch.setattr(os, 'fsync', lambda fd: (synced.append(fd), original_fsync(fd)))
+        
+        path = os.path.join(temp_dir, 'manifest.json')
+        errors = []
+        def writer(value):
+            try:
+                for _ in range(20):
+                    BackupStore._write_atomic(path, value * 1000)
+            except Exception as e:
+                errors.append(e)
+        threads = [threading.Thread(target=writer, args=(bytes([65 + i]),)) for i in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        assert errors == []
+        assert len(synced) == 80
+        with open(path, 'rb') as f:
+            data = f.read()
+        assert len(data) == 1000 and len(set(data)) == 1
+        assert os.listdir(temp_dir) == ['manifest.json']
+
+
+class TestDatabaseStats:
+    """Test cases for fast database statistics and the background integrity check."""
+    
+    def make_db(self, temp_dir, rows=500):
+        import sqlite3
+        db_path = os.path.join(temp_dir, 'stats.db')
+        conn = sqlite3.connect(db_path)
+        conn.execute("CREATE TABLE activities (id INTEGER PRIMARY KEY, title TEXT)")
+        conn.execute("CREATE INDEX idx_activities_title ON activities(title)")
+        conn.executemany("INSERT INTO activities (title) VALUES (?)", [(f"a{i}",) for i in range(rows)])
+        conn.commit()
+        return db_path, conn
+    
+    def test_stats_cached_until_data_changes(self, temp_dir):
+        """Test that stats are reused until another connection writes."""
+        import sqlite3
+        from app.utils.db_operations import DatabaseOperations
+        db_path, conn = self.make_db(temp_dir)
+        try:
+            stats = DatabaseOperations.get_database_stats(db_path)
+            assert stats['tables']['activities'] == 500
+            assert stats['counts_exact'] is False
+            # Served from the cache while nothing has changed
+            from app.utils import db_operations
+            cached = db_operations._stats_cache[db_path]
+            assert 'conn' not in cached
+            assert DatabaseOperations.get_database_stats(db_path) == stats
+            assert db_operations._stats_cache[db_path] is cached
+            
+            # Estimates come from sqlite_stat1 once it exists
+            conn.execute("DELETE FROM activities WHERE id > 400")
+            conn.execute("ANALYZE")
+            conn.commit()
+            refreshed = DatabaseOperations.get_database_stats(db_path)
+            assert db_operations._stats_cache[db_path] is not cached
+            assert refreshed['tables']['activities'] == 400
+            
+            exact = DatabaseOperations.get_database_stats(db_path, exact_counts=True)
+            assert exact['counts_exact'] is True
+            assert exact['tables']['activities'] == 400
+            
+            # Only the most recently read databases are kept
+            for i in range(db_operations.STATS_CACHE_SIZE):
+                other_path = os.path.join(temp_dir, f'other_{i}.db')
+                sqlite3.connect(other_path).close()
+                DatabaseOperations.get_database_stats(other_path)
+            assert db_path not in db_operations._stats_cache
+        finally:
+            conn.close()
+            DatabaseOperations.clear_stats_cache()
+    
+    def test_integrity_check_progress_and_cancel(self, temp_dir):
+        """Test that the integrity check reports progress and can be cancelled."""
+        from app.utils.db_operations import IntegrityCheck
+        db_path, conn = self.make_db(temp_dir)
+        tables = conn.execute("SELECT COUNT(*) FROM sqlite_master WHERE type = 'table'").fetchone()[0]
+        conn.close()
+        
+        check = IntegrityCheck(db_path)
+        progress = []
+        results = []
+        check.progress.connect(lambda done, total: progress.append((done, total)))
+        check.finished.connect(lambda ok, problems: results.append((ok, problems)))
+        assert check.run() == (True, [])
+        # One step per table, then the whole-file pass
+        assert progress[-1] == (tables + 1, tables + 1)
+        assert results == [(True, [])]
+        
+        check.cancel()
+        assert check.run() == (False, ['cancelled'])
+
+
+class TestAttachmentStore:
+    """Test cases for the content-addressed attachment store."""
+    
+    def test_store_deduplicates_and_releases(self, temp_dir, monkeypatch):
+        """Test that identical files are stored once and freed with their last row."""
+        import sqlite3
+        from app.utils import attachment_store, db_utils
+        
+        def attachments_dir(category=None, date_str=None):
+            path = os.path.join(temp_dir, 'attachments', date_str or category or '')
+            os.makedirs(path, exist_ok=True)
+            return path
+        monkeypatch.setattr(attachment_store, 'get_attachments_dir', attachments_dir)
+        monkeypatch.setattr(db_utils, 'get_attachments_dir', attachments_dir)
+        
+        source = os.path.join(temp_dir, 'photo.jpg')
+        with open(source, 'wb') as f:
+            f.write(os.urandom(3 * attachment_store.COPY_BUFFER_SIZE + 17))
+        
+        store = attachment_store.AttachmentStore(os.path.join(temp_dir, 'store'))
+        progress = []
+        first = attachment_store.store_attachment(source, '2024-03-01', 'Images', store=store,
+                                                  progress=lambda done, total: progress.append(done))
+        second = attachment_store.store_attachment(source, '2024-03-02', store=store)
+        
+        assert first['content_hash'] == second['content_hash']
+        assert not first['deduplicated'] and second['deduplicated']
+        assert progress[-1] == os.path.getsize(source)
+        blob = store.blob_path(first['content_hash'])
+        # Date and category folders link to the single stored copy
+        assert os.stat(blob).st_nlink == 4
+        assert os.path.samefile(first['shortcut_path'], blob)
+        # Shared contents cannot be edited in place through any link
+        assert not os.stat(first['file_path']).st_mode & 0o222
+        
+        conn = sqlite3.connect(':memory:')
+        cursor = conn.cursor()
+        attachment_store.ensure_attachment_schema(cursor)
+        for date_str, stored in (('2024-03-01', first), ('2024-03-02', second)):
+            cursor.execute(
+                "INSERT INTO journal_attachments (date, file_path, content_hash, size) VALUES (?, ?, ?, ?)",
+                (date_str, stored['file_path'], stored['content_hash'], stored['size'])
+            )
+        
+        cursor.execute("DELETE FROM journal_attachments WHERE date = '2024-03-01'")
+        assert not store.release(cursor, first['content_hash'])
+        cursor.execute("DELETE FROM journal_attachments")
+        assert store.release(cursor, first['content_hash'])
+        assert not os.path.exists(blob)
+        # The date folder keeps its own link to the data
+        assert os.path.getsize(second['file_path']) == os.path.getsize(source)
+        assert db_utils.remove_attachment(second['file_path'])
+        conn.close()
+    
+    def test_cancelled_copy_leaves_nothing(self, temp_dir):
+        """Test that a cancelled import removes its partial file."""
+        from app.utils.attachment_store import AttachmentStore, AttachmentCopyCancelled
+        source = os.path.join(temp_dir, 'video.mp4')
+        with open(source, 'wb') as f:
+            f.write(b'x' * 1024)
+        store = AttachmentStore(os.path.join(temp_dir, 'store'))
+        with pytest.raises(AttachmentCopyCancelled):
+            store.add_file(source, should_stop=lambda: True)
+        assert os.listdir(store.store_dir) == []
+    
+    def test_maintenance_collects_garbage(self, temp_dir, monkeypatch):
+        """Test that idle maintenance removes only old files no database refers to."""
+        import sqlite3
+        import time
+        from app.utils import maintenance
+        from app.utils.attachment_store import AttachmentStore, ensure_attachment_schema
+        
+        store = AttachmentStore(os.path.join(temp_dir, 'store'))
+        digests = {name: digit * 64 for name, digit in (('kept', 'a'), ('other', 'b'), ('unused', 'c'), ('new', 'd'))}
+        for name, digest in digests.items():
+            blob = store.blob_path(digest)
+            os.makedirs(os.path.dirname(blob), exist_ok=True)
+            with open(blob, 'wb') as f:
+                f.write(name.encode())
+            if name != 'new':
+                old = time.time() - 2 * 24 * 60 * 60
+                os.utime(blob, (old, old))
+        
+        # Two databases share the store, each referring to one file
+        db_paths = {}
+        for name in ('kept', 'other'):
+            db_paths[name] = os.path.join(temp_dir, f'{name}.db')
+            conn = sqlite3.connect(db_paths[name])
+            ensure_attachment_schema(conn.cursor())
+            conn.execute("INSERT INTO journal_attachments (date, file_path, content_hash) VALUES (?, ?, ?)",
+                         ('2024-03-01', name, digests[name]))
+            conn.commit()
+            conn.close()
+        monkeypatch.setattr(maintenance, 'get_config', lambda key, default=None: (
+            {'Other': {'path': db_paths['other']}, 'Gone': {'path': os.path.join(temp_dir, 'gone.db')}}
+            if key == 'database.saved_databases' else default
+        ))
+        
+        scheduler = maintenance.MaintenanceScheduler(db_paths['kept'], attachment_store=store)
+        scheduler.idle_timer.stop()
+        records = scheduler.run_maintenance(['attachment_gc'])
+        assert records[0]['detail'] == "1 unreferenced files removed"
+        remaining = {name for name, digest in digests.items() if os.path.exists(store.blob_path(digest))}
+        assert remaining == {'kept', 'other', 'new'}
+    
+    def test_metadata_and_thumbnails(self, temp_dir):
+        """Test that image metadata is indexed and thumbnails are cached by hash."""
+        import sqlite3
+        from PyQt6.QtCore import Qt
+        from PyQt6.QtGui import QImage, QColor
+        from app.utils.attachment_store import describe_file, ensure_attachment_schema
+        from app.utils.thumbnail_cache import ThumbnailCache
+        from app.utils.db_utils import list_attachment_categories
+        
+        image_path = os.path.join(temp_dir, 'scan.png')
+        image = QImage(400, 200, QImage.Format.Format_RGB32)
+        image.fill(QColor('red'))
+        assert image.save(image_path)
+        
+        assert describe_file(image_path) == {'mime_type': 'image/png', 'width': 400, 'height': 200}
+        assert describe_file(os.path.join(temp_dir, 'notes.txt'))['width'] is None
+        
+        cache = ThumbnailCache(os.path.join(temp_dir, 'thumbnails'), size=64)
+        ready = []
+        cache.thumbnail_ready.connect(lambda content_hash, path: ready.append(content_hash),
+                                      Qt.ConnectionType.DirectConnection)
+        assert cache.get('ab' * 32, image_path) is None
+        assert cache.wait(10)
+        thumbnail_path = cache.get('ab' * 32)
+        assert thumbnail_path and ready == ['ab' * 32]
+        thumbnail = QImage(thumbnail_path)
+        assert (thumbnail.width(), thumbnail.height()) == (64, 32)
+        
+        conn = sqlite3.connect(':memory:')
+        ensure_attachment_schema(conn.cursor())
+        conn.executemany(
+            "INSERT INTO journal_attachments (date, file_path, category) VALUES (?, ?, ?)",
+            [('2024-03-01', 'a', 'Receipts'), ('2024-03-02', 'b', 'Receipts'), ('2024-03-02', 'c', None)]
+        )
+        assert list_attachment_categories(conn) == ['Receipts']
+        conn.close()
+
+
+class TestJournalAutosave:
+    """Test cases for journal schema checks, write-behind saves and text counts."""
+    
+    def test_schema_drops_unique_date(self, temp_dir):
+        """Test that an old journal table loses its UNIQUE date and gains new columns."""
+        import sqlite3
+        from app.utils.journal_autosave import ensure_journal_schema
+        conn = sqlite3.connect(os.path.join(temp_dir, 'journal.db'))
+        conn.execute("CREATE TABLE journal_entries (id TEXT PRIMARY KEY, date TEXT UNIQUE, wins TEXT, "
+                     "challenges TEXT, learnings TEXT, tomorrow TEXT, gratitude TEXT)")
+        conn.execute("INSERT INTO journal_entries (id, date, wins) VALUES ('a', '2024-01-01', 'kept')")
+        ensure_journal_schema(conn.cursor())
+        conn.execute("INSERT INTO journal_entries (id, date) VALUES ('b', '2024-01-01')")
+        assert conn.execute("SELECT wins FROM journal_entries WHERE id = 'a'").fetchone()[0] == 'kept'
+        assert 'free_writing' in [row[1] for row in conn.execute("PRAGMA table_info(journal_entries)")]
+        conn.close()
+    
+    def test_autosaver_coalesces_snapshots(self, temp_dir):
+        """Test that queued snapshots of one entry become a single upsert of the latest."""
+        import sqlite3
+        from app.utils.journal_autosave import JournalAutosaver, ensure_journal_schema
+        db_path = os.path.join(temp_dir, 'journal.db')
+        conn = sqlite3.connect(db_path)
+        ensure_journal_schema(conn.cursor())
+        conn.commit()
+        
+        autosaver = JournalAutosaver(db_path)
+        writes = []
+        original_write = autosaver._write
+        autosaver._write = lambda c, batch: writes.append(len(batch)) or original_write(c, batch)
+        
+        with autosaver._condition:
+            # Held lock keeps the worker from starting a batch until all are queued
+            for text in ('h', 'he', 'hello'):
+                autosaver._pending['entry'] = {'id': 'entry', 'date': '2024-01-01', 'free_writing': text}
+            autosaver.save({'id': 'entry', 'date': '2024-01-01', 'free_writing': 'hello world'})
+        assert autosaver.flush(10)
+        autosaver.save({'id': 'entry', 'date': '2024-01-01', 'free_writing': 'hello again'})
+        assert autosaver.flush(10)
+        
+        assert writes == [1, 1]
+        rows = conn.execute("SELECT id, free_writing FROM journal_entries").fetchall()
+        assert rows == [('entry', 'hello again')]
+        conn.close()
+    
+    def test_text_stats_follow_edits(self):
+        """Test that incremental counts match a full recount after edits."""
+        from PyQt6.QtWidgets import QApplication, QTextEdit
+        from PyQt6.QtGui import QTextCursor
+        from app.utils.journal_autosave import TextStatsCounter
+        app = QApplication.instance() or QApplication([])
+        editor = QTextEdit()
+        document = editor.document()
+        stats = TextStatsCounter(document)
+        cursor = QTextCursor(document)
+        cursor.insertText("one two\nthree")
+        cursor.setPosition(4)
+        cursor.setPosition(9, QTextCursor.MoveMode.KeepAnchor)
+        cursor.insertText("2\nfour five\n")
+        text = document.toPlainText()
+        assert (stats.words, stats.characters) == (len(text.split()), len(text))
+        document.setPlainText("")
+        assert (stats.words, stats.characters) == (0, 0)
+
+
+class TestCacheManager:
+    """Test cases for the byte-accounted, tagged cache manager."""
+    
+    def make_cache(self, monkeypatch, max_bytes):
+        from app.utils.cache import CacheManager
+        monkeypatch.setattr(CacheManager, '_instance', None)
+        cache = CacheManager()
+        cache.max_bytes = max_bytes
+        return cache
+    
+    def test_falsy_values_hit_and_tags_invalidate(self, monkeypatch):
+        """Test that cached zeros are hits and that tags drop only their entries."""
+        cache = self.make_cache(monkeypatch, 1024 * 1024)
+        cache.set("count:goals:None", 0, tags=("table:goals",))
+        cache.set("count:tasks:None", 3, tags=("table:tasks",))
+        assert cache.get("count:goals:None", "missing") == 0
+        assert cache.get("count:habits:None") is None
+        
+        assert cache.invalidate_tags("table:goals") == 1
+        assert not cache.contains("count:goals:None")
+        assert cache.get("count:tasks:None") == 3
+        
+        stats = cache.get_stats()['namespaces']['count']
+        assert (stats['hits'], stats['misses'], stats['invalidations']) == (2, 1, 1)
+        assert 'table:goals' not in cache.tag_index
+    
+    def test_evicts_least_recently_used_by_bytes(self, monkeypatch):
+        """Test that eviction keeps the byte total within budget."""
+        cache = self.make_cache(monkeypatch, 1000)
+        for key in ('a', 'b', 'c'):
+            cache.set(key, key, size=300)
+        cache.get('a')
+        cache.set('d', 'd', size=300)
+        assert [cache.contains(key) for key in 'abcd'] == [True, False, True, True]
+        assert cache.current_bytes == 900
+        
+        # An entry larger than the whole budget is not cached and evicts nothing
+        cache.set('huge', 'x', size=2000)
+        assert not cache.contains('huge') and cache.current_bytes == 900
+        assert cache.get_stats()['namespaces']['b']['evictions'] == 1
+    
+    def test_cached_decorator_keys(self, monkeypatch):
+        """Test that keyword order does not matter and None results are cached."""
+        from app.utils.cache import cached
+        self.make_cache(monkeypatch, 1024 * 1024)
+        calls = []
+        
+        @cached("lookup", tags=lambda name, **kwargs: (f"name:{name}",))
+        def lookup(name, a=1, b=2):
+            """Look something up."""
+            calls.append(name)
+            return None
+        
+        assert lookup("x", a=1, b=2) is None
+        assert lookup("x", b=2, a=1) is None
+        assert calls == ["x"]
+        assert lookup.__doc__ == "Look something up."
+        from app.utils.cache import CacheManager
+        CacheManager.get_instance().invalidate_tags("name:x")
+        lookup("x", a=1, b=2)
+        assert calls == ["x", "x"]
+
+    
+    def test_timed_cache_expiry_and_bound(self, monkeypatch):
+        """Test per-entry TTLs, the entry bound and sweeps that touch only expired items."""
+        import time
+        from app.utils.cache import TimedCache
+        now = [1000.0]
+        monkeypatch.setattr(time, 'monotonic', lambda: now[0])
+        cache = TimedCache(default_ttl=10, max_entries=3, sweep=False)
+        cache.set('short', 1, ttl=1)
+        cache.set('long', 2, ttl=100)
+        cache.set('long', 3, ttl=100)
+        cache.set('default', None)
+        assert cache.get('default', default='missing') is None
+        
+        now[0] += 5
+        assert cache.cleanup_expired() == 1
+        assert cache.get('short') is None and cache.get('long') == 3
+        # The replaced item of 'long' is left in the heap until it surfaces
+        assert len(cache._heap) == 3
+        
+        for key in ('a', 'b'):
+            cache.set(key, key, ttl=50)
+        # Full: the entry expiring soonest ('default') made room
+        assert len(cache) == 3 and cache.get('default', default='missing') == 'missing'
+    
+    def test_timed_cache_sweeper_frees_unread_entries(self):
+        """Test that the sweeper thread drops expired entries and then exits."""
+        from app.utils.cache import TimedCache
+        cache = TimedCache()
+        cache.set('write-once', 'x', ttl=0.05)
+        sweeper = cache._sweeper
+        sweeper.join(5)
+        assert not sweeper.is_alive()
+        assert len(cache) == 0 and cache._heap == []
+
+    
+    def test_disk_cache_evicts_by_size_and_persists(self, temp_dir):
+        """Test LRU eviction by stored size and reopening the cache file."""
+        from app.utils.disk_cache import DiskCache
+        path = os.path.join(temp_dir, 'results.db')
+        cache = DiskCache(path, max_bytes=5000)
+        for key in ('a', 'b', 'c'):
+            assert cache.set(key, 'v1', b'x' * 2000)
+        assert cache.get('a') is None
+        assert cache.get('c') == ('v1', b'x' * 2000)
+        assert cache.total_bytes <= 5000
+        assert not cache.set('huge', 'v1', b'x' * 6000)
+        cache.close()
+        
+        reopened = DiskCache(path, max_bytes=5000)
+        assert reopened.get('b')[1] == b'x' * 2000
+        assert reopened.total_bytes == cache.total_bytes
+        reopened.clear()
+        assert reopened.get('b') is None and reopened.total_bytes == 0
+        reopened.close()
+
+
+
+class TestLogging:
+    """Test cases for the logging formatters, filters and handlers."""
+    
+    def make_record(self, msg, level=logging.INFO, lineno=10, created=None, **extra):
+        record = logging.LogRecord('TaskTitan.test', level, __file__, lineno, msg, None, None)
+        if created is not None:
+            record.created = created
+        record.__dict__.update(extra)
+        return record
+    
+    def test_rate_limit_per_call_site(self):
+        """Test that chatty call sites are limited and warnings always pass."""
+        from app.utils.logger import RateLimitFilter
+        rate_filter = RateLimitFilter(burst=3, interval=60)
+        passed = [rate_filter.filter(self.make_record(f"hit {i}", created=1000 + i)) for i in range(10)]
+        assert passed == [True] * 3 + [False] * 7
+        assert rate_filter.filter(self.make_record("other site", lineno=11, created=1005))
+        assert rate_filter.filter(self.make_record("problem", level=logging.WARNING, created=1005))
+        
+        later = self.make_record("hit again", created=1100)
+        assert rate_filter.filter(later)
+        # The count travels on the record and the formatters render it
+        assert later.getMessage() == "hit again" and later.suppressed == 7
+        from app.utils.logger import TextFormatter, JsonLinesFormatter
+        assert TextFormatter('%(message)s').format(later) == "hit again (7 similar messages suppressed)"
+        assert '"suppressed": 7' in JsonLinesFormatter().format(later)
+    
+    def test_json_lines_format(self):
+        """Test that JSON lines carry the message, location and timing fields."""
+        import json
+        from app.utils.logger import JsonLinesFormatter
+        line = JsonLinesFormatter().format(self.make_record("Loaded charts", duration_ms=12.5))
+        entry = json.loads(line)
+        assert entry['message'] == "Loaded charts"
+        assert entry['level'] == 'INFO' and entry['duration_ms'] == 12.5
+        assert entry['location'].endswith(':10') and 'elapsed_ms' in entry
+    
+    def test_queue_keeps_exceptions_for_formatters(self):
+        """Test that queued records reach the formatters with their exception and arguments."""
+        import json
+        import queue
+        import sys
+        from app.utils.logger import RecordQueueHandler, JsonLinesFormatter
+        log_queue = queue.SimpleQueue()
+        handler = RecordQueueHandler(log_queue)
+        try:
+            raise ValueError("disk full")
+        except ValueError:
+            record = logging.LogRecord('TaskTitan.test', logging.ERROR, __file__, 10,
+                                       "Could not save %s", ('entry',), sys.exc_info())
+        handler.emit(record)
+        
+        queued = log_queue.get_nowait()
+        assert queued is not record and queued.args == ('entry',)
+        entry = json.loads(JsonLinesFormatter().format(queued))
+        assert entry['message'] == "Could not save entry"
+        assert entry['exception'].endswith("ValueError: disk full")
+    
+    def test_rotated_files_are_compressed(self, temp_dir):
+        """Test that rollover leaves a gzip file and a fresh log."""
+        import gzip
+        from app.utils.logger import CompressingRotatingFileHandler
+        log_file = os.path.join(temp_dir, 'test.log')
+        handler = CompressingRotatingFileHandler(log_file, maxBytes=100, backupCount=2, encoding='utf-8')
+        handler.setFormatter(logging.Formatter('%(message)s'))
+        for i in range(3):
+            handler.emit(self.make_record(f"line {i} " + "x" * 60))
+        handler.close()
+        with gzip.open(log_file + '.1.gz', 'rt', encoding='utf-8') as f:
+            assert f.read().startswith('line 1')
+        # The earlier file was shifted only after it was compressed
+        with gzip.open(log_file + '.2.gz', 'rt', encoding='utf-8') as f:
+            assert f.read().startswith('line 0')
+        assert not [name for name in os.listdir(temp_dir) if name.endswith('.pending')]
+    
+    def test_print_routed_to_module_logger(self, caplog):
+        """Test that printed lines are logged under the printing module with their severity."""
+        import io
+        from app.utils.logger import PrintToLogger
+        stream = PrintToLogger(io.StringIO())
+        with caplog.at_level(logging.INFO, logger='TaskTitan'):
+            print("Loaded 3 entries", file=stream)
+            print("Error saving entry:", "disk full", file=stream)
+        records = [(r.name, r.levelno, r.getMessage()) for r in caplog.records]
+        assert records == [
+            (f'TaskTitan.{__name__}', logging.INFO, "Loaded 3 entries"),
+            (f'TaskTitan.{__name__}', logging.ERROR, "Error saving entry: disk full"),
+        ]
+
+
+class TestMaintenanceScheduler:
+    """Test cases for idle-time database maintenance."""
+    
+    def make_scheduler(self, temp_dir):
+        import sqlite3
+        from app.utils.maintenance import MaintenanceScheduler
+        
+        db_path = os.path.join(temp_dir, 'maintenance.db')
+        conn = sqlite3.connect(db_path)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA wal_autocheckpoint=0")
+        conn.execute("CREATE TABLE goals (id INTEGER PRIMARY KEY, title TEXT)")
+        conn.execute("CREATE INDEX idx_goals_title ON goals(title)")
+        conn.executemany("INSERT INTO goals (title) VALUES (?)", [(f"goal {i}",) for i in range(2000)])
+        conn.commit()
+        
+        scheduler = MaintenanceScheduler(db_path)
+        scheduler.idle_timer.stop()
+        # The application's connection stays open, like in the running app
+        return scheduler, db_path, conn
+    
+    def test_run_maintenance_records_tasks(self, temp_dir):
+        """Test that due tasks run, are logged and are not due again."""
+        import sqlite3
+        scheduler, db_path, app_conn = self.make_scheduler(temp_dir)
+        wal_size = os.path.getsize(db_path + '-wal')
+        
+        records = scheduler.run_maintenance()
+        statuses = {r['task']: r['status'] for r in records}
+        assert statuses['wal_checkpoint'] == 'done'
+        assert statuses['analyze'] == 'done'
+        assert 'skipped' in next(r['detail'] for r in records if r['task'] == 'incremental_vacuum')
+        # Only the maintenance_log insert is left in the WAL
+        assert os.path.getsize(db_path + '-wal') < wal_size / 4
+        
+        conn = sqlite3.connect(db_path)
+        assert conn.execute("SELECT COUNT(*) FROM sqlite_stat1").fetchone()[0] > 0
+        assert conn.execute("SELECT COUNT(*) FROM maintenance_log").fetchone()[0] == len(records)
+        conn.close()
+        
+        # Nothing is due right after a complete run
+        assert scheduler.run_maintenance() == []
+        app_conn.close()
+    
+    def test_user_activity_interrupts(self, temp_dir):
+        """Test that a pass stops as soon as the user becomes active."""
+        scheduler, _, app_conn = self.make_scheduler(temp_dir)
+        
+        # Simulate input arriving during the first step
+        original = scheduler._task_optimize
+        def optimize_then_input(conn):
+            scheduler._user_active.set()
+            yield from original(conn)
+        scheduler._task_optimize = optimize_then_input
+        
+        records = scheduler.run_maintenance()
+        assert [(r['task'], r['status']) for r in records] == [('optimize', 'interrupted')]
+        # The interrupted task is still due next time
+        scheduler._task_optimize = original
+        assert scheduler.run_maintenance()[0]['task'] == 'optimize'
+        app_conn.close()
+    
+    def test_failing_tasks_back_off(self, temp_dir):
+        """Test that a failing task is not retried on every idle check and old log rows are pruned."""
+        import sqlite3
+        from datetime import datetime, timedelta
+        from app.utils import maintenance
+        scheduler, db_path, app_conn = self.make_scheduler(temp_dir)
+        
+        def failing(conn):
+            raise sqlite3.DatabaseError("disk I/O error")
+            yield
+        scheduler._task_optimize = failing
+        assert scheduler.run_maintenance(['optimize'])[0]['status'] == 'failed'
+        
+        conn = sqlite3.connect(db_path)
+        assert 'optimize' not in scheduler._due_tasks(conn)
+        
+        def age_log(delta):
+            started_at = (datetime.now() - delta).isoformat(timespec='seconds')
+            conn.execute("UPDATE maintenance_log SET started_at = ? WHERE task = 'optimize'", (started_at,))
+            conn.commit()
+        age_log(maintenance.FAILURE_RETRY_DELAY)
+        assert 'optimize' in scheduler._due_tasks(conn)
+        
+        # The delay doubles with the second failure
+        scheduler.run_maintenance(['optimize'])
+        age_log(maintenance.FAILURE_RETRY_DELAY)
+        assert 'optimize' not in scheduler._due_tasks(conn)
+        age_log(maintenance.FAILURE_RETRY_DELAY * 2)
+        assert 'optimize' in scheduler._due_tasks(conn)
+        
+        age_log(maintenance.LOG_RETENTION + timedelta(days=1))
+        scheduler.run_maintenance(['wal_checkpoint'])
+        tasks = [row[0] for row in conn.execute("SELECT task FROM maintenance_log")]
+        assert tasks == ['wal_checkpoint']
+        conn.close()
+        app_conn.close()
+
+
+class TestThemeManager:
+    """Test cases for theme palette and stylesheet caching."""
+    
+    def test_colors_cached_until_theme_changes(self, monkeypatch):
+        """Test that colors are resolved once and re-resolved after a change."""
+        from app.themes import ThemeManager
+        
+        class FakeSettings:
+            reads = 0
+            values = {'theme/name': 'Dark', 'theme/follow_system': False}
+            
+            def value(self, key, default=None, type=None):
+                FakeSettings.reads += 1
+                return self.values.get(key, default)
+        
+        monkeypatch.setattr(ThemeManager, '_settings', classmethod(lambda cls: FakeSettings()))
+        monkeypatch.setattr(ThemeManager, '_selection', None)
+        monkeypatch.setattr(ThemeManager, '_resolved_names', {})
+        monkeypatch.setattr(ThemeManager, '_colors', {})
+        
+        assert ThemeManager.get_color('bg') == '#121212'
+        assert ThemeManager.get_color('bg') == '#121212'
+        assert ThemeManager.get_color('primary') == '#8B5CF6'
+        assert FakeSettings.reads == 2
+        
+        FakeSettings.values['theme/name'] = 'Nord'
+        ThemeManager.invalidate_cache()
+        assert ThemeManager.get_color('bg') == '#2E3440'
+        assert ThemeManager.get_current_palette()['bg'] == '#2E3440'
+        assert FakeSettings.reads == 4
+    
+    def test_stylesheet_generated_once_per_palette(self):
+        """Test that the stylesheet of a palette is memoized."""
+        from app.themes import ThemeManager, compiled_theme_qss, _compile_theme_qss
+        ThemeManager._init_registry()
+        palette = ThemeManager._PALETTES['Dracula']
+        
+        first = compiled_theme_qss(palette)
+        hits = _compile_theme_qss.cache_info().hits
+        assert compiled_theme_qss(dict(palette)) is first
+        assert _compile_theme_qss.cache_info().hits == hits + 1
+        assert palette['primary'] in first
+
+
+class TestIconCache:
+    """Test cases for the icon and pixmap cache."""
+    
+    def test_icons_rendered_once(self):
+        """Test that icons are pre-rasterized once and served from the cache."""
+        from PyQt6.QtWidgets import QApplication
+        from app.resources import icons
+        
+        app = QApplication.instance() or QApplication([])
+        icons.clear_cache()
+        
+        icon = icons.get_icon('add')
+        assert [size.width() for size in icon.availableSizes()] == list(icons.ICON_SIZES)
+        assert icons.get_icon('add').cacheKey() == icon.cacheKey()
+        rendered = len(icons._pixmap_cache)
+        icons.get_icon('add')
+        assert len(icons._pixmap_cache) == rendered
+        
+        # Unknown names fall back, or give an empty icon
+        assert not icons.get_icon('no-such-icon', fallback='edit').isNull()
+        assert icons.get_icon('no-such-icon').isNull()
+    
+    def test_tinted_pixmap(self):
+        """Test that tinted pixmaps are cached separately from plain ones."""
+        from PyQt6.QtWidgets import QApplication
+        from app.resources import icons
+        
+        app = QApplication.instance() or QApplication([])
+        icons.clear_cache()
+        
+        plain = icons.get_pixmap('add', size=24)
+        tinted = icons.get_pixmap('add', size=24, tint='#ff0000')
+        assert plain.cacheKey() != tinted.cacheKey()
+        assert icons.get_pixmap('add', size=24, tint='#ff0000').cacheKey() == tinted.cacheKey()
+        
+        image = tinted.toImage()
+        opaque = [image.pixelColor(x, y) for x in range(image.width()) for y in range(image.height())
+                  if image.pixelColor(x, y).alpha() == 255]
+        assert opaque and all(color.name() == '#ff0000' for color in opaque)